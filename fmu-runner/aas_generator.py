@@ -5,8 +5,8 @@ Generates BaSyx V2-compatible JSON payloads from FMU describe metadata,
 following IDTA 02006 (Provision of Simulation Models) for the simulation submodel.
 """
 
+import asyncio
 import base64
-import hashlib
 import io
 import json
 import logging
@@ -21,6 +21,8 @@ from urllib.parse import urlsplit
 
 import httpx
 
+from fmu_inventory import default_inventory
+
 logger = logging.getLogger("fmu-runner.aas")
 
 
@@ -125,46 +127,20 @@ def _fmu_digest(fmu_path: Path) -> str:
     """Return a digest for the configured-root FMU matching its filename.
 
     The caller supplies the already resolved FMU path to indicate that a hash
-    is wanted, but the file to read is selected from directory entries below
+    is wanted, but the file to read is selected from the FMU inventory of
     ``FMU_DATA_PATH``.  This keeps an arbitrary path from becoming a file
-    system access in this module as well as in the runner.
+    system access in this module as well as in the runner.  The inventory
+    hashes each file version once and persists the digest, so this only
+    reads the file for new or changed FMUs; it still blocks, so async code
+    calls it through ``asyncio.to_thread``.
     """
+    filename = fmu_path.name
+    if not re.fullmatch(r"[A-Za-z0-9][A-Za-z0-9._:-]*\.fmu", filename, re.IGNORECASE):
+        return ""
     try:
-        base = Path(FMU_DATA_PATH).resolve()
-        filename = fmu_path.name
-        if not re.fullmatch(r"[A-Za-z0-9][A-Za-z0-9._:-]*\.fmu", filename, re.IGNORECASE):
-            return ""
-
-        def _find_match(directory: Path) -> Optional[Path]:
-            try:
-                entries = directory.iterdir()
-            except OSError:
-                return None
-            for entry in entries:
-                if os.path.normcase(entry.name) != os.path.normcase(filename):
-                    continue
-                try:
-                    candidate = entry.resolve(strict=True)
-                except OSError:
-                    continue
-                try:
-                    candidate.relative_to(base)
-                except ValueError:
-                    continue
-                if candidate.is_file():
-                    return candidate
-            return None
-
-        candidate = _find_match(base)
-        if candidate is None:
-            for child in base.iterdir():
-                if child.is_dir():
-                    candidate = _find_match(child)
-                    if candidate is not None:
-                        break
-        if candidate is None:
-            return ""
-        return hashlib.sha256(candidate.read_bytes()).hexdigest()
+        inventory = default_inventory(FMU_DATA_PATH)
+        entry = inventory.find(filename)
+        return inventory.sha256(entry) if entry is not None else ""
     except (OSError, ValueError):
         return ""
 
@@ -276,6 +252,7 @@ def build_simulation_submodel(
     extra_info: Optional[dict] = None,
     *,
     fmu_path: Optional[Path] = None,
+    fmu_sha256: Optional[str] = None,
 ) -> dict:
     """Build the IDTA 02006 SimulationModels submodel JSON for BaSyx V2.
 
@@ -285,6 +262,7 @@ def build_simulation_submodel(
 
     *fmu_path* is the filesystem path to the ``.fmu`` binary; when supplied a
     SHA-256 digest is computed and embedded in the ``ModelFile`` element.
+    Pass *fmu_sha256* when the digest was already computed off the event loop.
     """
     submodel_id = _submodel_id_for_fmu(lab_id)
 
@@ -312,7 +290,9 @@ def build_simulation_submodel(
     ]
 
     # ModelFile (File element per IDTA 02006) — best-effort SHA-256 when fmu_path is available.
-    _fmu_sha256 = _fmu_digest(fmu_path) if fmu_path is not None else ""
+    _fmu_sha256 = fmu_sha256
+    if _fmu_sha256 is None:
+        _fmu_sha256 = _fmu_digest(fmu_path) if fmu_path is not None else ""
     _model_file: dict = {
         "idShort": "ModelFile",
         "modelType": "File",
@@ -730,7 +710,11 @@ async def sync_fmu_to_basyx(
                 _extra_sm_ids: list = [_unit_sm_id] if _unit_sm_id else []
 
                 shell_payload = build_aas_shell(lab_id, access_key, metadata, extra_info, extra_submodel_ids=_extra_sm_ids)
-                submodel_payload = build_simulation_submodel(lab_id, access_key, metadata, extra_info, fmu_path=fmu_path)
+                # Hashing reads the FMU from disk: keep it off the event loop.
+                fmu_sha256 = await asyncio.to_thread(_fmu_digest, fmu_path) if fmu_path is not None else ""
+                submodel_payload = build_simulation_submodel(
+                    lab_id, access_key, metadata, extra_info, fmu_path=fmu_path, fmu_sha256=fmu_sha256,
+                )
 
                 # --- Submodel: PUT (create or replace) ---
                 if not re.fullmatch(r"[A-Za-z0-9_-]{1,1024}", submodel_id_encoded):
@@ -0,0 +1,167 @@
+"""Bounded per-lab wait queues for simulation slots.
+
+A request that finds its lab's slots taken waits here instead of getting an
+immediate 429. Each lab's queue admits the request whose reservation ends
+first, then the earliest arrival. A released slot is handed straight to the
+head of the queue, so new arrivals cannot overtake queued requests.
+
+The queue only tracks waiters; the caller owns the slot counts and calls
+``enqueue``/``grant`` under its own lock, so checking for a free slot and
+queueing is one atomic step. Waiters may belong to different event loops.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass, field
+import heapq
+import itertools
+import math
+import threading
+import time
+from typing import Any, Optional
+
+
+class AdmissionQueueFull(Exception):
+    """The lab already has ``max_depth`` requests waiting."""
+
+
+@dataclass(order=True)
+class AdmissionTicket:
+    deadline: float
+    sequence: int
+    lab_id: str = field(compare=False)
+    enqueued_at: float = field(compare=False)
+    expires_at: float = field(compare=False)
+    loop: asyncio.AbstractEventLoop = field(compare=False, repr=False)
+    granted: asyncio.Future = field(compare=False, repr=False)
+    # waiting -> granted | withdrawn
+    state: str = field(default="waiting", compare=False)
+
+
+class AdmissionQueue:
+    def __init__(self, *, max_depth: int = 32, max_wait_seconds: float = 30.0):
+        self.max_depth = max(0, int(max_depth))
+        self.max_wait_seconds = max(0.0, float(max_wait_seconds))
+        self._lock = threading.Lock()
+        self._queues: dict[str, list[AdmissionTicket]] = {}
+        self._sequence = itertools.count()
+        self._metrics = {
+            "queued": 0, "admitted": 0, "timedOut": 0, "abandoned": 0, "rejectedFull": 0,
+            "waitSecondsTotal": 0.0, "waitSecondsMax": 0.0,
+        }
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_depth > 0 and self.max_wait_seconds > 0
+
+    def waiting(self, lab_id: str) -> int:
+        with self._lock:
+            return len(self._queues.get(lab_id) or ())
+
+    def waiting_labs(self) -> dict[str, int]:
+        """Queue depth of every lab that has requests waiting."""
+        with self._lock:
+            return {lab_id: len(queue) for lab_id, queue in self._queues.items() if queue}
+
+    def enqueue(self, lab_id: str, *, deadline: Optional[float] = None) -> AdmissionTicket:
+        """Queue the calling coroutine; raises ``AdmissionQueueFull`` at ``max_depth``.
+
+        ``deadline`` is the reservation end (epoch seconds); ``None`` sorts last.
+        """
+        now = time.monotonic()
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            queue = self._queues.setdefault(lab_id, [])
+            if len(queue) >= self.max_depth:
+                self._metrics["rejectedFull"] += 1
+                raise AdmissionQueueFull(lab_id)
+            ticket = AdmissionTicket(
+                deadline=math.inf if deadline is None else float(deadline),
+                sequence=next(self._sequence),
+                lab_id=lab_id,
+                enqueued_at=now,
+                expires_at=now + self.max_wait_seconds,
+                loop=loop,
+                granted=loop.create_future(),
+            )
+            heapq.heappush(queue, ticket)
+            self._metrics["queued"] += 1
+        return ticket
+
+    def position(self, ticket: AdmissionTicket) -> Optional[int]:
+        """1-based place in the lab's queue, or ``None`` once the ticket left it."""
+        with self._lock:
+            if ticket.state != "waiting":
+                return None
+            return 1 + sum(1 for other in self._queues.get(ticket.lab_id) or () if other < ticket)
+
+    def grant(self, lab_id: str) -> bool:
+        """Hand one freed slot to the lab's head waiter.
+
+        Returns ``False`` when nobody could take it, in which case the caller
+        keeps the slot free.
+        """
+        with self._lock:
+            queue = self._queues.get(lab_id)
+            while queue:
+                ticket = heapq.heappop(queue)
+                try:
+                    ticket.loop.call_soon_threadsafe(_resolve, ticket.granted)
+                except RuntimeError:
+                    # The waiter's event loop is gone: it can never take the slot.
+                    ticket.state = "withdrawn"
+                    self._metrics["abandoned"] += 1
+                    continue
+                ticket.state = "granted"
+                waited = time.monotonic() - ticket.enqueued_at
+                self._metrics["admitted"] += 1
+                self._metrics["waitSecondsTotal"] += waited
+                self._metrics["waitSecondsMax"] = max(self._metrics["waitSecondsMax"], waited)
+                if not queue:
+                    del self._queues[lab_id]
+                return True
+            self._queues.pop(lab_id, None)
+            return False
+
+    async def wait(self, ticket: AdmissionTicket, timeout: float) -> bool:
+        """Wait up to ``timeout`` seconds; ``True`` once the slot is granted."""
+        try:
+            await asyncio.wait_for(asyncio.shield(ticket.granted), timeout=max(0.0, timeout))
+        except asyncio.TimeoutError:
+            pass
+        with self._lock:
+            return ticket.state == "granted"
+
+    def withdraw(self, ticket: AdmissionTicket, *, timed_out: bool = False) -> bool:
+        """Leave the queue. ``False`` means the slot was already granted and is now the caller's."""
+        with self._lock:
+            if ticket.state != "waiting":
+                return ticket.state == "withdrawn"
+            ticket.state = "withdrawn"
+            queue = self._queues.get(ticket.lab_id) or []
+            if ticket in queue:
+                queue.remove(ticket)
+                heapq.heapify(queue)
+            if not queue:
+                self._queues.pop(ticket.lab_id, None)
+            self._metrics["timedOut" if timed_out else "abandoned"] += 1
+            return True
+
+    def metrics(self) -> dict[str, Any]:
+        with self._lock:
+            snapshot: dict[str, Any] = dict(self._metrics)
+            snapshot["depth"] = {lab_id: len(queue) for lab_id, queue in self._queues.items()}
+        admitted = snapshot["admitted"]
+        snapshot["waitSecondsAvg"] = round(snapshot["waitSecondsTotal"] / admitted, 6) if admitted else 0.0
+        snapshot["waitSecondsTotal"] = round(snapshot["waitSecondsTotal"], 6)
+        snapshot["waitSecondsMax"] = round(snapshot["waitSecondsMax"], 6)
+        snapshot["waiting"] = sum(snapshot["depth"].values())
+        snapshot["maxDepth"] = self.max_depth
+        snapshot["maxWaitSeconds"] = self.max_wait_seconds
+        return snapshot
+
+
+def _resolve(future: asyncio.Future) -> None:
+    if not future.done():
+        future.set_result(True)
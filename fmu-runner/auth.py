@@ -9,11 +9,14 @@ Gateway configured through ISSUER. FMU validation must therefore use that
 issuer and its JWKS endpoint instead of the local blockchain-services one.
 """
 
+import asyncio
 import os
 import logging
 import time
 import hashlib
-from typing import Optional, TypedDict
+import threading
+from collections import OrderedDict
+from typing import Any, Optional, TypedDict
 from urllib.parse import urlparse
 
 import jwt
@@ -114,6 +117,16 @@ JWKS_CACHE_TTL = int(os.getenv("JWKS_CACHE_TTL", "300"))  # seconds
 JWKS_STALE_IF_ERROR_MAX_SECONDS = max(
     0, int(os.getenv("JWKS_STALE_IF_ERROR_MAX_SECONDS", "900"))
 )
+# Forced refreshes (unknown kid) are coalesced to at most one per interval
+JWKS_REFRESH_MIN_INTERVAL_SECONDS = max(0.0, float(os.getenv("JWKS_REFRESH_MIN_INTERVAL_SECONDS", "10")))
+# A kid still missing after a refresh is rejected without refetching for this long
+JWKS_UNKNOWN_KID_BACKOFF_SECONDS = max(0.0, float(os.getenv("JWKS_UNKNOWN_KID_BACKOFF_SECONDS", "60")))
+# The background refresher renews the keys once this fraction of the TTL has passed
+_JWKS_REFRESH_AHEAD = 0.8
+_JWKS_REFRESH_FLOOR_SECONDS = 1.0
+_UNKNOWN_KIDS_MAX = 1024
+# Verified tokens remembered so repeated polls skip the signature check (0 disables)
+JWT_CLAIMS_CACHE_ENTRIES = max(0, int(os.getenv("JWT_CLAIMS_CACHE_ENTRIES", "4096")))
 
 class _JwksCacheState(TypedDict):
     data: Optional[dict]
@@ -124,6 +137,84 @@ class _JwksCacheState(TypedDict):
 _jwks_cache: _JwksCacheState = {"data": None, "fetched_at": 0.0, "stale_since": 0.0}
 
 
+class _SigningKeyIndex(TypedDict):
+    source: Optional[dict]
+    keys: dict[str, Any]
+
+
+# Parsed public keys by kid, rebuilt only when the JWKS payload changes.
+_signing_keys: _SigningKeyIndex = {"source": None, "keys": {}}
+
+
+def _signing_keys_for(jwks_data: dict) -> dict[str, Any]:
+    """Return the kid -> ``PyJWK`` index for ``jwks_data``, parsing it only once."""
+    index = _signing_keys
+    if index["source"] is not jwks_data:
+        keys = {key.key_id: key for key in jwt.PyJWKSet.from_dict(jwks_data).keys if key.key_id}
+        index["keys"] = keys
+        index["source"] = jwks_data
+    return index["keys"]
+
+
+class VerifiedClaimsCache:
+    """Bounded LRU of verified token claims, keyed by the token's SHA-256.
+
+    An entry never outlives the token's ``exp`` and is only served while the
+    key that verified it is still in the current JWKS, so a key rotation or
+    removal takes effect on the next request. Entries also record the issuer
+    and audience they were checked against.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max(0, int(max_entries))
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, tuple[dict, float, Any, tuple]]" = OrderedDict()
+        self._metrics = {"hits": 0, "misses": 0, "evictions": 0, "expired": 0}
+
+    def get(self, token_hash: str, *, now: float, keys: dict[str, Any], context: tuple) -> Optional[dict]:
+        if not self.max_entries:
+            return None
+        with self._lock:
+            entry = self._entries.get(token_hash)
+            if entry is None:
+                self._metrics["misses"] += 1
+                return None
+            claims, expires_at, key, entry_context = entry
+            if now >= expires_at or keys.get(key.key_id) is not key or entry_context != context:
+                del self._entries[token_hash]
+                self._metrics["expired"] += 1
+                self._metrics["misses"] += 1
+                return None
+            self._entries.move_to_end(token_hash)
+            self._metrics["hits"] += 1
+        return dict(claims)
+
+    def put(self, token_hash: str, claims: dict, *, key: Any, context: tuple) -> None:
+        if not self.max_entries:
+            return
+        try:
+            expires_at = float(claims["exp"])
+        except (KeyError, TypeError, ValueError):
+            return
+        with self._lock:
+            self._entries[token_hash] = (dict(claims), expires_at, key, context)
+            self._entries.move_to_end(token_hash)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._metrics["evictions"] += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def metrics(self) -> dict:
+        with self._lock:
+            return {**self._metrics, "entries": len(self._entries), "maxEntries": self.max_entries}
+
+
+_verified_claims = VerifiedClaimsCache(JWT_CLAIMS_CACHE_ENTRIES)
+
+
 def _cached_jwks_key_count(cached: object) -> int:
     if not isinstance(cached, dict):
         return 0
@@ -131,11 +222,42 @@ def _cached_jwks_key_count(cached: object) -> int:
     return len(keys) if isinstance(keys, list) else 0
 
 
-async def _fetch_jwks(*, force: bool = False) -> dict:
-    """Fetch JWKS (cached with TTL, or immediately when a new kid appears)."""
-    cached_jwks = _jwks_cache["data"]
-    if not force and cached_jwks is not None and (time.time() - _jwks_cache["fetched_at"]) < JWKS_CACHE_TTL:
+class _JwksRefreshState(TypedDict):
+    task: Optional[asyncio.Task]
+    completed_at: float  # time.monotonic() of the last finished download attempt
+    refresher: Optional[asyncio.Task]
+
+
+_jwks_refresh: _JwksRefreshState = {"task": None, "completed_at": 0.0, "refresher": None}
+_jwks_refresh_metrics = {"fetches": 0, "failures": 0, "coalesced": 0, "servedStale": 0, "unknownKidRejections": 0}
+# kid -> time.monotonic() until which it is rejected without a refresh
+_unknown_kids: "OrderedDict[str, float]" = OrderedDict()
+
+
+def _stale_jwks_or_raise(exc: Exception) -> dict:
+    now = time.time()
+    cached_jwks = _jwks_cache.get("data")
+    fetched_at = float(_jwks_cache.get("fetched_at") or 0.0)
+    stale_age = now - fetched_at
+    if (
+        cached_jwks is not None
+        and fetched_at > 0
+        and stale_age >= 0
+        and stale_age < JWKS_STALE_IF_ERROR_MAX_SECONDS
+    ):
+        if not _jwks_cache.get("stale_since"):
+            _jwks_cache["stale_since"] = now
+        logger.warning(
+            "Using stale JWKS cache after issuer failure (age=%.0fs, max=%.0fs)",
+            stale_age,
+            JWKS_STALE_IF_ERROR_MAX_SECONDS,
+        )
         return cached_jwks
+    raise HTTPException(status_code=503, detail="Auth service unavailable") from exc
+
+
+async def _download_jwks() -> dict:
+    _jwks_refresh_metrics["fetches"] += 1
     try:
         async with httpx.AsyncClient(timeout=10) as client:
             resp = await client.get(AUTH_JWKS_URL)
@@ -147,26 +269,111 @@ async def _fetch_jwks(*, force: bool = False) -> dict:
             logger.info("Fetched JWKS from %s (%d keys)", AUTH_JWKS_URL, len(fetched_jwks.get("keys", [])))
             return fetched_jwks
     except Exception as exc:
+        _jwks_refresh_metrics["failures"] += 1
         logger.error("Failed to fetch JWKS from %s: %s", AUTH_JWKS_URL, exc)
-        now = time.time()
-        cached_jwks = _jwks_cache.get("data")
-        fetched_at = float(_jwks_cache.get("fetched_at") or 0.0)
-        stale_age = now - fetched_at
-        if (
-            cached_jwks is not None
-            and fetched_at > 0
-            and stale_age >= 0
-            and stale_age < JWKS_STALE_IF_ERROR_MAX_SECONDS
-        ):
-            if not _jwks_cache.get("stale_since"):
-                _jwks_cache["stale_since"] = now
-            logger.warning(
-                "Using stale JWKS cache after issuer failure (age=%.0fs, max=%.0fs)",
-                stale_age,
-                JWKS_STALE_IF_ERROR_MAX_SECONDS,
+        return _stale_jwks_or_raise(exc)
+    finally:
+        _jwks_refresh["completed_at"] = time.monotonic()
+
+
+def _retrieve_refresh_result(task: asyncio.Task) -> None:
+    # Nobody may await a background refresh; _download_jwks already logged failures.
+    if not task.cancelled():
+        task.exception()
+
+
+def _refresh_jwks() -> asyncio.Task:
+    """Start a JWKS download, or join the one already running on this loop."""
+    task = _jwks_refresh["task"]
+    if task is not None and not task.done() and task.get_loop() is asyncio.get_running_loop():
+        _jwks_refresh_metrics["coalesced"] += 1
+        return task
+    task = asyncio.get_running_loop().create_task(_download_jwks())
+    task.add_done_callback(_retrieve_refresh_result)
+    _jwks_refresh["task"] = task
+    return task
+
+
+async def _fetch_jwks(*, force: bool = False) -> dict:
+    """Return the JWKS without waiting on the issuer whenever cached keys are usable.
+
+    Fresh keys are returned as is. Keys past ``JWKS_CACHE_TTL`` but within the
+    stale-if-error window are returned while a single background download
+    renews them. Only a cold or fully expired cache, or a forced refresh for a
+    new kid, waits for the download, which concurrent callers share; forced
+    refreshes run at most once per ``JWKS_REFRESH_MIN_INTERVAL_SECONDS``.
+    """
+    cached_jwks = _jwks_cache["data"]
+    if cached_jwks is not None:
+        if force:
+            in_flight = _jwks_refresh["task"]
+            recently_refreshed = (
+                time.monotonic() - _jwks_refresh["completed_at"] < JWKS_REFRESH_MIN_INTERVAL_SECONDS
             )
-            return cached_jwks
-        raise HTTPException(status_code=503, detail="Auth service unavailable") from exc
+            if recently_refreshed and (in_flight is None or in_flight.done()):
+                return cached_jwks
+        else:
+            age = time.time() - _jwks_cache["fetched_at"]
+            if age < JWKS_CACHE_TTL:
+                return cached_jwks
+            if age < JWKS_STALE_IF_ERROR_MAX_SECONDS:
+                _jwks_refresh_metrics["servedStale"] += 1
+                _refresh_jwks()
+                return cached_jwks
+    return await asyncio.shield(_refresh_jwks())
+
+
+async def _jwks_refresh_loop() -> None:
+    while True:
+        fetched_at = float(_jwks_cache.get("fetched_at") or 0.0)
+        due_in = fetched_at + JWKS_CACHE_TTL * _JWKS_REFRESH_AHEAD - time.time()
+        await asyncio.sleep(max(JWKS_REFRESH_MIN_INTERVAL_SECONDS, due_in, _JWKS_REFRESH_FLOOR_SECONDS))
+        try:
+            await _fetch_jwks(force=True)
+        except HTTPException:
+            # Already logged; requests keep using cached keys within the stale window.
+            pass
+
+
+def start_jwks_refresher() -> None:
+    """Renew the JWKS ahead of its TTL so requests never wait on the issuer."""
+    refresher = _jwks_refresh["refresher"]
+    if refresher is None or refresher.done():
+        _jwks_refresh["refresher"] = asyncio.get_running_loop().create_task(_jwks_refresh_loop())
+
+
+async def stop_jwks_refresher() -> None:
+    refresher = _jwks_refresh["refresher"]
+    _jwks_refresh["refresher"] = None
+    if refresher is not None and not refresher.done():
+        refresher.cancel()
+        try:
+            await refresher
+        except asyncio.CancelledError:
+            pass
+
+
+def _unknown_kid_backed_off(kid: str) -> bool:
+    retry_at = _unknown_kids.get(kid)
+    if retry_at is None:
+        return False
+    if time.monotonic() < retry_at:
+        return True
+    del _unknown_kids[kid]
+    return False
+
+
+def _remember_unknown_kid(kid: str) -> None:
+    if JWKS_UNKNOWN_KID_BACKOFF_SECONDS <= 0:
+        return
+    _unknown_kids[kid] = time.monotonic() + JWKS_UNKNOWN_KID_BACKOFF_SECONDS
+    _unknown_kids.move_to_end(kid)
+    while len(_unknown_kids) > _UNKNOWN_KIDS_MAX:
+        _unknown_kids.popitem(last=False)
+
+
+def jwks_refresh_metrics() -> dict:
+    return {**_jwks_refresh_metrics, "unknownKids": len(_unknown_kids)}
 
 
 def jwks_health() -> dict:
@@ -206,6 +413,10 @@ def jwks_health() -> dict:
     }
 
 
+def claims_cache_metrics() -> dict:
+    return _verified_claims.metrics()
+
+
 def _extract_token(request: Request) -> str:
     """Extract the FMU credential from the explicit Bearer header only.
 
@@ -224,31 +435,31 @@ async def verify_jwt_token(token: str) -> dict:
     if not JWT_AUDIENCE:
         raise HTTPException(status_code=503, detail="JWT audience validation is not configured")
     jwks_data = await _fetch_jwks()
+    token_hash = hashlib.sha256(token.encode("utf-8")).hexdigest()
+    context = (JWT_ISSUER, JWT_AUDIENCE)
 
     try:
-        # Build signing keys from JWKS
-        jwk_client_keys = jwt.PyJWKSet.from_dict(jwks_data)
+        signing_keys = _signing_keys_for(jwks_data)
+        cached_claims = _verified_claims.get(token_hash, now=time.time(), keys=signing_keys, context=context)
+        if cached_claims is not None:
+            return cached_claims
+
         header = jwt.get_unverified_header(token)
         kid = header.get("kid")
-
-        # Find matching key
-        signing_key = None
-        for key in jwk_client_keys.keys:
-            if kid and key.key_id == kid:
-                signing_key = key
-                break
+        signing_key = signing_keys.get(kid) if kid else None
 
         if signing_key is None:
+            if not kid or _unknown_kid_backed_off(kid):
+                _jwks_refresh_metrics["unknownKidRejections"] += 1
+                raise HTTPException(status_code=401, detail="No matching signing key found")
             # A signing-key rotation can legitimately happen before the
             # normal cache TTL.  Refresh once so both current and overlap JWKS
-            # entries are observed without making every request uncached.
+            # entries are observed; a kid that is still missing is rejected
+            # without refetching until its backoff expires.
             jwks_data = await _fetch_jwks(force=True)
-            jwk_client_keys = jwt.PyJWKSet.from_dict(jwks_data)
-            for key in jwk_client_keys.keys:
-                if kid and key.key_id == kid:
-                    signing_key = key
-                    break
+            signing_key = _signing_keys_for(jwks_data).get(kid)
             if signing_key is None:
+                _remember_unknown_kid(kid)
                 raise HTTPException(status_code=401, detail="No matching signing key found")
 
         claims = jwt.decode(
@@ -262,7 +473,8 @@ async def verify_jwt_token(token: str) -> dict:
             issuer=JWT_ISSUER,
             audience=JWT_AUDIENCE,
         )
-        claims["_credentialHash"] = hashlib.sha256(token.encode("utf-8")).hexdigest()
+        claims["_credentialHash"] = token_hash
+        _verified_claims.put(token_hash, claims, key=signing_key, context=context)
         return claims
 
     except jwt.ExpiredSignatureError:
@@ -0,0 +1,120 @@
+"""Pooled HTTP client for the auth service (session tickets and observation).
+
+Ticket issue/redeem and session-observation calls share one keep-alive
+connection pool per event loop instead of opening a fresh connection each.
+A POST is retried, after a jittered exponential backoff, only when it
+never reached the server: connection setup failed or no pooled connection
+became free. Ticket redemption is single-use, so failures after the request
+was sent are not retried; idle connections expire before typical server
+keep-alive timeouts to make a closed reused connection unlikely.
+
+Short-lived service tokens (the session-observer JWT) are minted through
+``cached_token`` and reused until shortly before they expire.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+import threading
+import time
+from typing import Any, Callable, Hashable, Optional
+
+import httpx
+
+
+logger = logging.getLogger("fmu-runner.auth-service")
+
+# Failures raised before the request could have been processed upstream.
+_RETRYABLE_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+
+class AuthServiceClient:
+    def __init__(
+        self,
+        *,
+        timeout: float = 10.0,
+        max_connections: int = 16,
+        max_keepalive_connections: int = 8,
+        keepalive_expiry: float = 15.0,
+        max_attempts: int = 3,
+        retry_backoff: float = 0.05,
+        token_refresh_margin: float = 15.0,
+    ):
+        self.timeout = timeout
+        self.limits = httpx.Limits(
+            max_connections=max(1, max_connections),
+            max_keepalive_connections=max(0, max_keepalive_connections),
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.max_attempts = max(1, max_attempts)
+        self.retry_backoff = max(0.0, retry_backoff)
+        self.token_refresh_margin = max(0.0, token_refresh_margin)
+        self._client: Optional[httpx.AsyncClient] = None
+        self._client_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock = threading.Lock()
+        # key -> (token, expires_at epoch seconds)
+        self._tokens: dict[Hashable, tuple[str, float]] = {}
+        self._metrics = {"requests": 0, "retries": 0, "failures": 0, "tokensMinted": 0, "tokensReused": 0}
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """Return the keep-alive client bound to the running event loop."""
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client_loop is not loop:
+            self._client = httpx.AsyncClient(timeout=self.timeout, limits=self.limits)
+            self._client_loop = loop
+        return self._client
+
+    def _backoff(self, attempt: int) -> float:
+        # Full jitter keeps retrying runners from hitting the service in step.
+        return random.uniform(0.0, self.retry_backoff * (2 ** attempt))
+
+    async def post(self, url: str, *, headers: dict[str, str], json: Any) -> httpx.Response:
+        attempt = 0
+        while True:
+            with self._lock:
+                self._metrics["requests"] += 1
+            try:
+                return await self._get_client().post(url, headers=headers, json=json)
+            except _RETRYABLE_ERRORS as exc:
+                attempt += 1
+                if attempt >= self.max_attempts:
+                    with self._lock:
+                        self._metrics["failures"] += 1
+                    raise
+                with self._lock:
+                    self._metrics["retries"] += 1
+                logger.warning("Auth service request to %s failed (%s); retrying", url, exc.__class__.__name__)
+                await asyncio.sleep(self._backoff(attempt - 1))
+
+    def cached_token(self, key: Hashable, mint: Callable[[], tuple[str, float]]) -> str:
+        """Return the cached token for ``key``; ``mint`` returns ``(token, expires_at)``."""
+        now = time.time()
+        with self._lock:
+            cached = self._tokens.get(key)
+            if cached is not None and now < cached[1] - self.token_refresh_margin:
+                self._metrics["tokensReused"] += 1
+                return cached[0]
+        token, expires_at = mint()
+        with self._lock:
+            self._tokens[key] = (token, expires_at)
+            self._metrics["tokensMinted"] += 1
+        return token
+
+    def discard_token(self, key: Hashable) -> None:
+        with self._lock:
+            self._tokens.pop(key, None)
+
+    def metrics(self) -> dict[str, Any]:
+        with self._lock:
+            snapshot: dict[str, Any] = dict(self._metrics)
+        snapshot["maxConnections"] = self.limits.max_connections
+        snapshot["maxAttempts"] = self.max_attempts
+        return snapshot
+
+    async def aclose(self) -> None:
+        client, self._client = self._client, None
+        self._client_loop = None
+        if client is not None:
+            await client.aclose()
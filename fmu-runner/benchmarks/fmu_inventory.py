@@ -0,0 +1,91 @@
+"""Cost of FMU health counts, lookups and digests with and without the inventory.
+
+Creates ``--fmus`` files of ``--size-kib`` in ``--providers`` provider
+directories and times ``--calls`` health counts (``rglob`` versus the
+inventory), name lookups (directory walk versus the index) and SHA-256
+digests (re-reading the file versus the cached digest, and a restarted
+inventory loading the persisted digest).
+
+    python benchmarks/fmu_inventory.py --fmus 500 --size-kib 2048
+"""
+
+import argparse
+import hashlib
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from fmu_inventory import FmuDigestStore, FmuInventory  # noqa: E402
+
+
+def _walk_lookup(base: Path, filename: str):
+    for entry in base.iterdir():
+        if entry.name == filename and entry.is_file():
+            return entry.resolve()
+    for child in base.iterdir():
+        if child.is_dir():
+            for entry in child.iterdir():
+                if entry.name == filename and entry.is_file():
+                    return entry.resolve()
+    return None
+
+
+def _timed(label: str, calls: int, function) -> None:
+    started = time.perf_counter()
+    for index in range(calls):
+        function(index)
+    elapsed = time.perf_counter() - started
+    print(f"{label:<28} {elapsed / calls * 1e3:>10.3f} ms/call")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--fmus", type=int, default=500)
+    parser.add_argument("--providers", type=int, default=20)
+    parser.add_argument("--size-kib", type=int, default=256)
+    parser.add_argument("--calls", type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        base = Path(directory)
+        payload = os.urandom(args.size_kib * 1024)
+        names = []
+        for index in range(args.fmus):
+            provider = base / f"provider-{index % args.providers}"
+            provider.mkdir(exist_ok=True)
+            (provider / f"model-{index}.fmu").write_bytes(payload)
+            names.append(f"model-{index}.fmu")
+        cache = base / "fmu-digests.json"
+        inventory = FmuInventory(base, digest_store=FmuDigestStore(cache))
+        inventory.count()
+
+        print(f"fmus={args.fmus} providers={args.providers} size={args.size_kib} KiB mode={inventory.mode}")
+        _timed("health count (rglob)", args.calls, lambda _: sum(1 for _ in base.rglob("*.fmu")))
+        _timed("health count (inventory)", args.calls, lambda _: inventory.count())
+        _timed("lookup (directory walk)", args.calls, lambda i: _walk_lookup(base, names[i % len(names)]))
+        _timed("lookup (inventory)", args.calls, lambda i: inventory.find(names[i % len(names)]))
+        sample = names[: min(10, len(names))]
+        _timed(
+            "sha256 (read_bytes)",
+            args.calls,
+            lambda i: hashlib.sha256(_walk_lookup(base, sample[i % len(sample)]).read_bytes()).hexdigest(),
+        )
+        _timed("sha256 (inventory)", args.calls, lambda i: inventory.sha256(inventory.find(sample[i % len(sample)])))
+        inventory.close()
+
+        def _restarted(store):
+            def call(i):
+                restarted = FmuInventory(base, watch="poll", digest_store=store() if store else None)
+                restarted.sha256(restarted.find(sample[i % len(sample)]))
+            return call
+
+        _timed("sha256 (restart)", max(1, args.calls // 10), _restarted(None))
+        _timed("sha256 (restart, persisted)", max(1, args.calls // 10), _restarted(lambda: FmuDigestStore(cache)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""History page latency by page depth on a large simulation history.
+
+Builds a ``--rows`` history (spread over ``--bindings`` reservation/user
+bindings, each row carrying a ``--result-bytes`` result) with the runner's
+own schema, then times one page at increasing depths for the previous
+``lower(...)`` + ``OFFSET`` query and the keyset query on normalised
+binding columns.
+
+    python benchmarks/history_pagination.py --rows 1000000
+"""
+
+import argparse
+import asyncio
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+os.environ.setdefault("FMU_BACKEND_MODE", "local")
+os.environ.setdefault("FMU_LOCAL_DEV_MODE", "true")
+
+import main  # noqa: E402
+
+
+_COLUMNS = "id, lab_id, user_sub, fmu_filename, fmi_type, elapsed_seconds, status, created_at"
+_LEGACY = (
+    f"SELECT {_COLUMNS} FROM simulation_history "
+    "WHERE lab_id = ? AND lower(reservation_key) = ? AND lower(puc_hash) = ? "
+    "ORDER BY created_at DESC LIMIT ? OFFSET ?"
+)
+_KEYSET = (
+    f"SELECT {_COLUMNS} FROM simulation_history "
+    "WHERE lab_id = ? AND reservation_key_norm = ? AND puc_hash_norm = ? {after}"
+    "ORDER BY created_at DESC, id DESC LIMIT ?"
+)
+
+
+def _populate(connection: sqlite3.Connection, rows: int, bindings: int, result_bytes: int) -> None:
+    result = "x" * result_bytes
+
+    def _rows():
+        for index in range(rows):
+            binding = index % bindings
+            yield (
+                f"sim_{index:08d}",
+                "1",
+                f"0xRes{binding}",
+                f"puc{binding}",
+                f"0xres{binding}",
+                f"puc{binding}",
+                result,
+                f"2026-01-01 {index // 3600 % 24:02d}:{index // 60 % 60:02d}:{index % 60:02d}.{index:08d}",
+            )
+
+    connection.executemany(
+        "INSERT INTO simulation_history (id, lab_id, reservation_key, puc_hash, reservation_key_norm, "
+        "puc_hash_norm, result, created_at) VALUES (?,?,?,?,?,?,?,?)",
+        _rows(),
+    )
+    connection.commit()
+
+
+def _time(func, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best * 1e3
+
+
+def run():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--bindings", type=int, default=4)
+    parser.add_argument("--result-bytes", type=int, default=256)
+    parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        main.HISTORY_DB_PATH = str(Path(tmp) / "history.db")
+        asyncio.run(main._init_db())
+        connection = sqlite3.connect(main.HISTORY_DB_PATH)
+        started = time.perf_counter()
+        _populate(connection, args.rows, args.bindings, args.result_bytes)
+        print(f"rows={args.rows} bindings={args.bindings} populated in {time.perf_counter() - started:.1f}s")
+
+        binding = ("1", "0xres0", "puc0")
+        per_binding = args.rows // args.bindings
+        depths = [0]
+        while depths[-1] * 10 < per_binding // args.limit:
+            depths.append(max(1, depths[-1] * 10))
+        depths.append(per_binding // args.limit - 1)
+
+        # Walk the keyset pages once, remembering the cursor before each measured depth.
+        cursors = {}
+        after = None
+        for page in range(depths[-1] + 1):
+            if page in depths:
+                cursors[page] = after
+            clause = "AND (created_at, id) < (?, ?) " if after else ""
+            rows = connection.execute(
+                _KEYSET.format(after=clause), (*binding, *(after or ()), args.limit)
+            ).fetchall()
+            after = (rows[-1][7], rows[-1][0])
+
+        print(f"{'page':>8} {'offset ms':>10} {'keyset ms':>10}")
+        for page in depths:
+            legacy_ms = _time(lambda: connection.execute(
+                _LEGACY, (*binding, args.limit, page * args.limit)
+            ).fetchall())
+            cursor = cursors[page]
+            clause = "AND (created_at, id) < (?, ?) " if cursor else ""
+            keyset_ms = _time(lambda: connection.execute(
+                _KEYSET.format(after=clause), (*binding, *(cursor or ()), args.limit)
+            ).fetchall())
+            print(f"{page:>8} {legacy_ms:>10.2f} {keyset_ms:>10.3f}")
+        connection.close()
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,83 @@
+"""Response-path cost of persisting simulation history.
+
+Compares the previous per-call ``aiosqlite`` connection (connect, insert,
+commit, close) with queueing the row on :class:`HistoryStore`, for
+``--writes`` concurrent saves, and reports how long the store takes to
+commit them in the background.
+
+    python benchmarks/history_store_writes.py --writes 500
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import aiosqlite
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from history_store import HistoryStore  # noqa: E402
+
+
+_SCHEMA = "CREATE TABLE simulation_history (id TEXT PRIMARY KEY, lab_id TEXT, result TEXT)"
+_INSERT = "INSERT INTO simulation_history (id, lab_id, result) VALUES (?,?,?)"
+
+
+async def _legacy(path: str, writes: int, result: dict) -> float:
+    async def _save(index: int):
+        async with aiosqlite.connect(path) as db:
+            await db.execute(_INSERT, (f"legacy-{index}", "1", json.dumps(result)))
+            await db.commit()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(_save(index) for index in range(writes)))
+    return time.perf_counter() - started
+
+
+async def _batched(store: HistoryStore, writes: int, result: dict) -> tuple[float, float]:
+    async def _save(index: int):
+        store.submit(_INSERT, lambda: (f"store-{index}", "1", json.dumps(result)))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(_save(index) for index in range(writes)))
+    queued = time.perf_counter() - started
+    await asyncio.to_thread(store.flush, 60)
+    return queued, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--writes", type=int, default=200)
+    parser.add_argument("--rows", type=int, default=100, help="result rows per simulation")
+    args = parser.parse_args()
+    result = {"time": [index * 0.01 for index in range(args.rows)], "outputs": {"h": list(range(args.rows))}}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy_path = str(Path(tmp) / "legacy.db")
+        store_path = str(Path(tmp) / "store.db")
+        for path in (legacy_path, store_path):
+            asyncio.run(_create(path))
+        legacy = asyncio.run(_legacy(legacy_path, args.writes, result))
+        store = HistoryStore(store_path)
+        queued, committed = asyncio.run(_batched(store, args.writes, result))
+        metrics = store.metrics()
+        store.close()
+
+    print(f"writes={args.writes} rows={args.rows}")
+    print(f"   per-call connection: {legacy * 1e3:9.1f} ms on the response path")
+    print(f"   history store queue: {queued * 1e3:9.1f} ms on the response path")
+    print(f"  history store commit: {committed * 1e3:9.1f} ms in the background ({metrics['batches']} transactions)")
+
+
+async def _create(path: str) -> None:
+    async with aiosqlite.connect(path) as db:
+        await db.execute(_SCHEMA)
+        await db.commit()
+
+
+if __name__ == "__main__":
+    main()
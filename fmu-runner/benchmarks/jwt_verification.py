@@ -0,0 +1,99 @@
+"""Bearer-token verifications per second on one core.
+
+Compares the previous per-request path (parse the whole JWKS, scan it for
+the kid, check the signature) with the kid-indexed key cache alone and with
+the verified-claims cache, for ``--tokens`` distinct tokens presented
+round-robin as repeated polls of one reservation would be.
+
+    python benchmarks/jwt_verification.py --requests 20000 --keys 4
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+import jwt
+from cryptography.hazmat.primitives.asymmetric import rsa
+from jwt.algorithms import RSAAlgorithm
+
+os.environ.setdefault("JWT_AUDIENCE", "https://gateway.example/fmu")
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import auth  # noqa: E402
+
+
+def _material(key_count: int, token_count: int) -> tuple[dict, list[str]]:
+    jwks = {"keys": []}
+    private_key = None
+    for index in range(key_count):
+        private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        jwk = json.loads(RSAAlgorithm.to_jwk(private_key.public_key()))
+        jwk["kid"] = f"kid-{index}"
+        jwks["keys"].append(jwk)
+    now = int(time.time())
+    tokens = [
+        jwt.encode(
+            {"sub": f"user-{index}", "iss": auth.JWT_ISSUER, "aud": auth.JWT_AUDIENCE, "iat": now, "exp": now + 3600},
+            private_key,
+            algorithm="RS256",
+            headers={"kid": f"kid-{key_count - 1}"},
+        )
+        for index in range(token_count)
+    ]
+    return jwks, tokens
+
+
+def _legacy_verify(token: str, jwks: dict) -> dict:
+    signing_key = None
+    kid = jwt.get_unverified_header(token).get("kid")
+    for key in jwt.PyJWKSet.from_dict(jwks).keys:
+        if kid and key.key_id == kid:
+            signing_key = key
+            break
+    return jwt.decode(
+        token,
+        signing_key.key,
+        algorithms=auth.JWT_ALGORITHMS,
+        options={"verify_aud": True, "require": ["exp", "iat", "iss"]},
+        issuer=auth.JWT_ISSUER,
+        audience=auth.JWT_AUDIENCE,
+    )
+
+
+async def _rate(verify, tokens: list[str], requests: int) -> float:
+    started = time.perf_counter()
+    for index in range(requests):
+        await verify(tokens[index % len(tokens)])
+    return requests / (time.perf_counter() - started)
+
+
+async def run(args) -> None:
+    jwks, tokens = _material(args.keys, args.tokens)
+    auth._jwks_cache.update({"data": jwks, "fetched_at": time.time(), "stale_since": 0.0})
+
+    async def legacy(token):
+        return _legacy_verify(token, jwks)
+
+    print(f"keys={args.keys} tokens={args.tokens} requests={args.requests}")
+    print(f"{'path':<28} {'req/s':>10}")
+    print(f"{'parse JWKS per request':<28} {await _rate(legacy, tokens, args.requests):>10.0f}")
+    auth._verified_claims = auth.VerifiedClaimsCache(0)
+    print(f"{'kid-indexed keys':<28} {await _rate(auth.verify_jwt_token, tokens, args.requests):>10.0f}")
+    auth._verified_claims = auth.VerifiedClaimsCache(auth.JWT_CLAIMS_CACHE_ENTRIES)
+    print(f"{'keys + verified claims':<28} {await _rate(auth.verify_jwt_token, tokens, args.requests):>10.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=20_000)
+    parser.add_argument("--keys", type=int, default=4)
+    parser.add_argument("--tokens", type=int, default=16)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""Cold versus warm cost of loading FMU metadata for describe/run/initialize.
+
+Cold is a fresh ``read_model_description`` (unzip plus XML parse); warm is a
+``ModelDescriptionCache`` hit, which only stats the file.
+
+    python benchmarks/model_metadata_cache.py --fmu ../fmu-data/BouncingBall.fmu
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from fmpy import read_model_description  # noqa: E402
+
+from model_metadata_cache import ModelDescriptionCache  # noqa: E402
+
+
+def _time_per_call(func, iterations: int) -> float:
+    func()
+    started = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - started) / iterations * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    default_fmu = Path(__file__).resolve().parents[2] / "fmu-data" / "BouncingBall.fmu"
+    parser.add_argument("--fmu", default=str(default_fmu))
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    cache = ModelDescriptionCache()
+    rows = [
+        ("cold", _time_per_call(lambda: read_model_description(args.fmu), args.iterations)),
+        ("warm", _time_per_call(lambda: cache.get(args.fmu, read_model_description), args.iterations)),
+    ]
+    print(f"fmu={Path(args.fmu).name} iterations={args.iterations}")
+    for label, micros in rows:
+        print(f"{label:>6}: {micros:9.1f} us/call")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""Per-download cost of building a proxy FMU archive.
+
+Compares the previous path (deflate every member into a fresh ``BytesIO``
+ZIP, then SHA-256 and HMAC the whole archive) with assembling the download
+from a cached template, for a runtime binary of ``--binary-kib`` KiB and a
+model description with ``--variables`` variables.
+
+    python benchmarks/proxy_artifact_template.py --binary-kib 2048
+"""
+
+import argparse
+import hashlib
+import hmac
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+import zipfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from proxy_artifact import ProxyArtifactTemplate  # noqa: E402
+
+
+def _legacy_download(model_xml: bytes, config: bytes, binary: Path, key: bytes) -> int:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("modelDescription.xml", model_xml)
+        archive.writestr("resources/modelDescription.xml", model_xml)
+        archive.writestr("resources/config.json", config)
+        archive.write(binary, "binaries/linux64/decentralabs_proxy.so")
+    content = buffer.getvalue()
+    hashlib.sha256(content).hexdigest()
+    hmac.new(key, content, hashlib.sha256).hexdigest()
+    return len(content)
+
+
+def _template_download(template: ProxyArtifactTemplate, config: bytes, key: bytes) -> int:
+    artifact = template.assemble(config, signing_key=key)
+    return sum(len(chunk) for chunk in artifact.chunks())
+
+
+def _measure(func, iterations: int) -> tuple[float, int]:
+    func()
+    tracemalloc.start()
+    started = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    elapsed = (time.perf_counter() - started) / iterations * 1e3
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--binary-kib", type=int, default=1024)
+    parser.add_argument("--variables", type=int, default=200)
+    parser.add_argument("--iterations", type=int, default=50)
+    args = parser.parse_args()
+
+    model_xml = (
+        "<fmiModelDescription>"
+        + "".join(f'<ScalarVariable name="v{index}" valueReference="{index}"/>' for index in range(args.variables))
+        + "</fmiModelDescription>"
+    ).encode("utf-8")
+    config = json.dumps({"sessionTicket": "st_" + "x" * 48, "labId": "1"}).encode("utf-8")
+    key = b"signing-key"
+
+    with tempfile.TemporaryDirectory() as tmp:
+        binary = Path(tmp) / "decentralabs_proxy.so"
+        # Half random, half repetitive: roughly how a stripped shared library compresses.
+        half = args.binary_kib * 512
+        binary.write_bytes(os.urandom(half) + bytes(range(256)) * (half // 256))
+        template = ProxyArtifactTemplate([
+            ("modelDescription.xml", model_xml),
+            ("resources/modelDescription.xml", model_xml),
+            ("binaries/linux64/decentralabs_proxy.so", binary),
+        ])
+
+        rows = [
+            ("build per request", *_measure(lambda: _legacy_download(model_xml, config, binary, key), args.iterations)),
+            ("cached template", *_measure(lambda: _template_download(template, config, key), args.iterations)),
+        ]
+
+    print(f"binaryKiB={args.binary_kib} variables={args.variables} archiveBytes={template.size}")
+    for label, millis, peak in rows:
+        print(f"{label:>18}: {millis:8.3f} ms/download  peak {peak / 1024:8.1f} KiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""Per-sample cost of realtime ``_get_values``/``_set_values`` for a wide model.
+
+Maps ``--outputs`` synthetic Real variables onto the value references of a
+real FMU (BouncingBall by default), so every sample is an actual FMI call
+through FMPy with that many references. Compares the compiled access plan
+with the previous per-call grouping and scalar normalization.
+
+    python benchmarks/realtime_access_plan.py --outputs 1000
+"""
+
+import argparse
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from fmpy import extract, instantiate_fmu, read_model_description  # noqa: E402
+
+from realtime_ws import RealtimeWsManager, _RealtimeSession  # noqa: E402
+
+
+def _legacy_get_values(session, variables):
+    """The per-call implementation access plans replaced."""
+    selected = [session._variables[name] for name in variables if name in session._variables]
+    by_type = defaultdict(lambda: {"variables": [], "refs": [], "nValues": 0})
+    for var in selected:
+        variable_type = session._normalize_variable_type(var)
+        by_type[variable_type]["variables"].append(var)
+        by_type[variable_type]["refs"].append(int(var.valueReference))
+        by_type[variable_type]["nValues"] += session._variable_flat_size(var)
+    outputs = {}
+    for variable_type, payload in by_type.items():
+        getter = getattr(session._fmu, f"get{variable_type}")
+        refs = payload["refs"]
+        vals = getter(list(refs)) if payload["nValues"] == len(refs) else getter(list(refs), nValues=payload["nValues"])
+        offset = 0
+        for variable in payload["variables"]:
+            count = session._variable_flat_size(variable)
+            segment = [session._normalize_scalar_value(variable_type, value) for value in vals[offset: offset + count]]
+            offset += count
+            outputs[variable.name] = segment[0] if count == 1 else segment
+    return outputs
+
+
+def _legacy_set_values(session, values):
+    by_type = defaultdict(lambda: {"refs": [], "values": []})
+    for name, value in values.items():
+        variable = session._variables.get(name)
+        if not variable:
+            continue
+        variable_type = session._normalize_variable_type(variable)
+        session._variable_flat_size(variable)
+        by_type[variable_type]["refs"].append(int(variable.valueReference))
+        by_type[variable_type]["values"].append(value)
+    for variable_type, payload in by_type.items():
+        setter = getattr(session._fmu, f"set{variable_type}")
+        setter(list(payload["refs"]), [float(v) for v in payload["values"]])
+
+
+def _time_per_call(func, iterations):
+    func()
+    started = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - started) / iterations * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--fmu", default=str(Path(__file__).resolve().parents[2] / "fmu-data" / "BouncingBall.fmu"))
+    parser.add_argument("--outputs", type=int, default=1000)
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    manager = RealtimeWsManager(
+        logger=SimpleNamespace(error=lambda *a, **k: None),
+        verify_jwt_token=None,
+        enforce_fmu_claim=lambda claims: None,
+        resolve_fmu_path=lambda access_key: Path(args.fmu),
+        get_claim_lab_id=lambda claims: "1",
+        normalize_lab_id=lambda value: value,
+        coerce_epoch_seconds=lambda value: value,
+        acquire_slot=lambda lab_id: None,
+        release_slot=lambda lab_id: None,
+    )
+    session = _RealtimeSession(manager, "bench", {"sub": "bench", "exp": None}, Path(args.fmu))
+    md = read_model_description(args.fmu)
+    real_refs = [int(var.valueReference) for var in md.modelVariables if var.type == "Real"]
+    tunable_refs = [int(var.valueReference) for var in md.modelVariables if var.variability == "tunable" and var.type == "Real"]
+    session._model_description = md
+    session._variables = {
+        f"out{index}": SimpleNamespace(name=f"out{index}", valueReference=real_refs[index % len(real_refs)], type="Real", dimensions=[])
+        for index in range(args.outputs)
+    }
+    for index in range(args.outputs):
+        session._variables[f"in{index}"] = SimpleNamespace(
+            name=f"in{index}", valueReference=tunable_refs[index % len(tunable_refs)], type="Real", dimensions=[],
+        )
+
+    session._unzipdir = extract(args.fmu)
+    session._fmu = instantiate_fmu(session._unzipdir, md, fmi_type="CoSimulation")
+    session._fmu.instantiate()
+    session._fmu.setupExperiment(startTime=0.0)
+    session._fmu.enterInitializationMode()
+    session._fmu.exitInitializationMode()
+    try:
+        outputs = [f"out{index}" for index in range(args.outputs)]
+        inputs = {f"in{index}": 0.7 for index in range(args.outputs)}
+        assert _legacy_get_values(session, outputs) == session._get_values(outputs)
+
+        rows = [
+            ("get legacy", _time_per_call(lambda: _legacy_get_values(session, outputs), args.iterations)),
+            ("get plan", _time_per_call(lambda: session._get_values(outputs), args.iterations)),
+            ("set legacy", _time_per_call(lambda: _legacy_set_values(session, inputs), args.iterations)),
+            ("set plan", _time_per_call(lambda: session._set_values(inputs), args.iterations)),
+        ]
+    finally:
+        session._shutdown_fmu()
+
+    print(f"fmu={Path(args.fmu).name} variables={args.outputs} iterations={args.iterations}")
+    for label, micros in rows:
+        print(f"{label:>12}: {micros:9.1f} us/call")
+
+
+if __name__ == "__main__":
+    main()
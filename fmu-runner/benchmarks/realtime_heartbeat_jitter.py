@@ -0,0 +1,135 @@
+"""Heartbeat jitter of realtime sessions as the number of concurrent sessions grows.
+
+Every session runs its normal ``_run_loop`` against a stand-in FMU whose
+``doStep`` blocks for ``--step-cost-ms`` without holding the GIL, as native
+FMU code does. Each session is attached to an in-memory websocket that
+timestamps ``session.heartbeat`` events; jitter is the deviation of the
+observed heartbeat interval from the configured one.
+
+    python benchmarks/realtime_heartbeat_jitter.py
+    python benchmarks/realtime_heartbeat_jitter.py --inline   # doStep on the event loop
+
+With FMU work on the per-session threads the percentiles stay flat as the
+session count grows; ``--inline`` shows the previous behaviour, where every
+step stalls the shared event loop.
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from realtime_ws import RealtimeWsManager, _RealtimeSession, _WsConnection  # noqa: E402
+
+
+class _BlockingFmu:
+    def __init__(self, step_cost: float):
+        self.step_cost = step_cost
+
+    def doStep(self, current_time, delta_t):
+        time.sleep(self.step_cost)
+
+    def terminate(self):
+        pass
+
+    def freeInstance(self):
+        pass
+
+
+class _RecordingWebSocket:
+    def __init__(self):
+        self.heartbeats: list[float] = []
+
+    async def send_json(self, payload):
+        if payload.get("type") == "session.heartbeat":
+            self.heartbeats.append(time.monotonic())
+
+
+def _build_manager(heartbeat_seconds: float) -> RealtimeWsManager:
+    return RealtimeWsManager(
+        logger=SimpleNamespace(error=lambda *args, **kwargs: None),
+        verify_jwt_token=None,
+        enforce_fmu_claim=lambda claims: None,
+        resolve_fmu_path=lambda access_key: Path(f"/tmp/{access_key}"),
+        get_claim_lab_id=lambda claims: str(claims.get("labId")),
+        normalize_lab_id=lambda value: str(value) if value is not None else None,
+        coerce_epoch_seconds=lambda value: int(value) if value is not None else None,
+        acquire_slot=lambda lab_id: None,
+        release_slot=lambda lab_id: None,
+        ws_heartbeat_seconds=heartbeat_seconds,
+    )
+
+
+async def _inline_call_fmu(self, func, *args):
+    return func(*args)
+
+
+async def _measure(sessions: int, *, step_cost: float, step_size: float, heartbeat: float, duration: float) -> list[float]:
+    manager = _build_manager(heartbeat)
+    claims = {"sub": "bench", "labId": "1", "accessKey": "bench.fmu", "exp": 4102444800}
+    running: list[tuple[_RealtimeSession, _RecordingWebSocket]] = []
+    for index in range(sessions):
+        session = _RealtimeSession(manager, f"bench-{index:04d}", claims, Path("/tmp/bench.fmu"))
+        session._fmu = _BlockingFmu(step_cost)
+        session.step_size = step_size
+        session.stop_time = float("inf")
+        websocket = _RecordingWebSocket()
+        await session.attach(_WsConnection(websocket=websocket, queue_size=256))
+        await session.start()
+        running.append((session, websocket))
+
+    await asyncio.sleep(duration)
+
+    jitter = []
+    for session, websocket in running:
+        await session.terminate("benchmark")
+        beats = websocket.heartbeats
+        jitter.extend(abs((later - earlier) - heartbeat) * 1000.0 for earlier, later in zip(beats, beats[1:]))
+    return jitter
+
+
+def _percentile(values: list[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", default="1,4,16,64", help="comma separated session counts")
+    parser.add_argument("--step-cost-ms", type=float, default=5.0)
+    parser.add_argument("--step-size", type=float, default=0.01)
+    parser.add_argument("--heartbeat-ms", type=float, default=50.0)
+    parser.add_argument("--duration", type=float, default=3.0)
+    parser.add_argument("--inline", action="store_true", help="run doStep on the event loop for comparison")
+    args = parser.parse_args()
+
+    if args.inline:
+        _RealtimeSession._call_fmu = _inline_call_fmu
+
+    mode = "inline" if args.inline else "fmu-thread"
+    print(f"mode={mode} stepCost={args.step_cost_ms}ms heartbeat={args.heartbeat_ms}ms")
+    print(f"{'sessions':>8} {'samples':>8} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8} {'mean ms':>8}")
+    for count in (int(value) for value in args.sessions.split(",") if value.strip()):
+        jitter = asyncio.run(_measure(
+            count,
+            step_cost=args.step_cost_ms / 1000.0,
+            step_size=args.step_size,
+            heartbeat=args.heartbeat_ms / 1000.0,
+            duration=args.duration,
+        ))
+        if not jitter:
+            print(f"{count:>8} {0:>8} {'-':>8} {'-':>8} {'-':>8} {'-':>8}")
+            continue
+        print(
+            f"{count:>8} {len(jitter):>8} {_percentile(jitter, 0.5):>8.2f} {_percentile(jitter, 0.99):>8.2f} "
+            f"{max(jitter):>8.2f} {statistics.fmean(jitter):>8.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
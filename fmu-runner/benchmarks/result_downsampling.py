@@ -0,0 +1,65 @@
+"""Payload size and server time of projected JSON results.
+
+Builds a ``--rows`` result with ``--variables`` noisy outputs and compares
+serialising it whole with selecting one variable, cutting a 10% time window,
+and decimating to ``--max-points`` rows with M4 and LTTB.
+
+    python benchmarks/result_downsampling.py --rows 1000000 --max-points 2000
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from result_projection import ResultProjection  # noqa: E402
+
+
+def _result(rows: int, variables: int) -> dict:
+    rng = np.random.default_rng(0)
+    time_values = np.linspace(0.0, 100.0, rows)
+    outputs = {
+        f"y{index}": (np.sin(time_values * (index + 1)) + rng.normal(0.0, 0.1, rows)).tolist()
+        for index in range(variables)
+    }
+    return {"time": time_values.tolist(), "outputs": outputs, "outputVariables": list(outputs)}
+
+
+def _measure(result: dict, options: dict) -> tuple[float, int, int]:
+    started = time.perf_counter()
+    projection = ResultProjection.from_options(options)
+    projected = projection.apply(result) if projection is not None else result
+    size = len(json.dumps(projected).encode("utf-8"))
+    return (time.perf_counter() - started) * 1e3, size, len(projected["time"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--variables", type=int, default=4)
+    parser.add_argument("--max-points", type=int, default=2000)
+    args = parser.parse_args()
+
+    result = _result(args.rows, args.variables)
+    cases = [
+        ("full", {}),
+        ("one variable", {"variables": ["y0"]}),
+        ("10% window", {"windowStart": 0.0, "windowEnd": 10.0}),
+        ("m4", {"maxPoints": args.max_points}),
+        ("lttb", {"maxPoints": args.max_points, "downsample": "lttb"}),
+        ("one variable, m4", {"variables": ["y0"], "maxPoints": args.max_points}),
+    ]
+    print(f"rows={args.rows} variables={args.variables} maxPoints={args.max_points}")
+    print(f"{'case':<18} {'rows':>9} {'payload KiB':>12} {'ms':>9}")
+    for name, options in cases:
+        elapsed_ms, size, rows = _measure(result, options)
+        print(f"{name:<18} {rows:>9} {size / 1024:>12.1f} {elapsed_ms:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""Per-frame relay cost of a Station ``sim.outputs`` frame in the Gateway proxy.
+
+Compares the previous decode/re-encode path (``json.loads`` then the
+``json.dumps`` done by ``send_json``) with the passthrough classifier, for a
+frame carrying ``--outputs`` Real values.
+
+    python benchmarks/station_relay_passthrough.py --outputs 1000
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from station_ws_proxy import _is_passthrough_frame  # noqa: E402
+
+
+def _legacy_relay(frame: str) -> str:
+    payload = json.loads(frame)
+    str(payload.get("requestId") or "").strip()
+    str(payload.get("type") or "").strip()
+    return json.dumps(payload)
+
+
+def _passthrough_relay(frame: str) -> str:
+    if _is_passthrough_frame(frame):
+        return frame
+    return _legacy_relay(frame)
+
+
+def _time_per_call(func, iterations: int) -> float:
+    func()
+    started = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - started) / iterations * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--outputs", type=int, default=200)
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    frame = json.dumps({
+        "type": "sim.outputs",
+        "sessionId": "sess_bench",
+        "seq": 1,
+        "dropped": 0,
+        "simTime": 1.25,
+        "values": {f"out{index}": index * 0.001 for index in range(args.outputs)},
+    })
+    assert _passthrough_relay(frame) == _legacy_relay(frame)
+
+    rows = [
+        ("decode+encode", _time_per_call(lambda: _legacy_relay(frame), args.iterations)),
+        ("passthrough", _time_per_call(lambda: _passthrough_relay(frame), args.iterations)),
+    ]
+    print(f"outputs={args.outputs} frameBytes={len(frame)} iterations={args.iterations}")
+    for label, micros in rows:
+        print(f"{label:>14}: {micros:9.1f} us/frame")
+
+
+if __name__ == "__main__":
+    main()
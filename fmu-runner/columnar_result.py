@@ -0,0 +1,257 @@
+from __future__ import annotations
+
+import json
+import os
+import weakref
+import zipfile
+from multiprocessing import shared_memory
+from typing import Any, Iterator, Optional
+
+import numpy as np
+
+
+NPZ_MEDIA_TYPE = "application/x-npz"
+_STREAM_CHUNK_BYTES = 1024 * 1024
+_JSON_CHUNK_ROWS = 64 * 1024
+_SHM_DIRECTORY = "/dev/shm"
+
+
+def wants_columnar(accept_header: Optional[str]) -> bool:
+    """True when the client explicitly asks for the binary NPZ result."""
+    for part in str(accept_header or "").split(","):
+        media_type, *params = [item.strip().lower() for item in part.split(";")]
+        if media_type != NPZ_MEDIA_TYPE:
+            continue
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip() == "q":
+                try:
+                    return float(value) > 0
+                except ValueError:
+                    return False
+        return True
+    return False
+
+
+def _shm_free_bytes() -> Optional[int]:
+    try:
+        stat = os.statvfs(_SHM_DIRECTORY)
+    except (AttributeError, OSError):
+        return None
+    return stat.f_bavail * stat.f_frsize
+
+
+def export_columns(result: np.ndarray) -> dict[str, Any]:
+    """Copy a structured FMPy result into shared memory, one contiguous column at a time.
+
+    Runs inside the worker. Only the small descriptor is pickled back to the
+    API process, which maps the same segment and owns unlinking it. A result
+    larger than the free space in ``/dev/shm`` (64 MB in a default Docker
+    container) would fault the worker with SIGBUS while it is written, so
+    such columns are sent through the worker pipe instead.
+    """
+    names = result.dtype.names
+    if names is None:
+        raise RuntimeError("FMU simulation returned no named result columns")
+    length = int(result.shape[0])
+    columns = []
+    offset = 0
+    for name in names:
+        dtype = result.dtype.fields[name][0]
+        nbytes = dtype.itemsize * length
+        columns.append({"name": name, "dtype": dtype.str, "offset": offset, "nbytes": nbytes})
+        offset += nbytes
+    free = _shm_free_bytes()
+    if free is not None and offset >= free:
+        return {
+            "length": length,
+            "columns": columns,
+            "arrays": {column["name"]: np.ascontiguousarray(result[column["name"]]) for column in columns},
+        }
+    segment = shared_memory.SharedMemory(create=True, size=max(1, offset))
+    try:
+        for column in columns:
+            target = np.ndarray(
+                (length,),
+                dtype=np.dtype(column["dtype"]),
+                buffer=segment.buf,
+                offset=column["offset"],
+            )
+            target[:] = result[column["name"]]
+            del target
+    except BaseException:
+        segment.close()
+        segment.unlink()
+        raise
+    name = segment.name
+    segment.close()
+    return {"shm": name, "length": length, "columns": columns}
+
+
+def _release_segment(segment: shared_memory.SharedMemory) -> None:
+    try:
+        segment.close()
+    finally:
+        try:
+            segment.unlink()
+        except FileNotFoundError:
+            pass
+
+
+class ColumnarResult:
+    """API-side view over a worker result held in shared memory.
+
+    Results that did not fit in ``/dev/shm`` arrive as in-process arrays and
+    are served the same way. The segment is unlinked on ``close()`` or, should
+    nobody ever read the result, when the view is garbage collected.
+    """
+
+    def __init__(self, descriptor: dict[str, Any]):
+        self.length = int(descriptor["length"])
+        self.columns = list(descriptor["columns"])
+        self._arrays: Optional[dict[str, np.ndarray]] = None
+        self._segment: Optional[shared_memory.SharedMemory] = None
+        self._finalizer: Optional[weakref.finalize] = None
+        if "arrays" in descriptor:
+            self._arrays = dict(descriptor["arrays"])
+        else:
+            self._segment = shared_memory.SharedMemory(name=descriptor["shm"])
+            self._finalizer = weakref.finalize(self, _release_segment, self._segment)
+
+    @property
+    def output_variables(self) -> list[str]:
+        return [column["name"] for column in self.columns if column["name"].lower() != "time"]
+
+    def column(self, name: str) -> np.ndarray:
+        if self._arrays is not None:
+            return self._arrays[name]
+        if self._segment is None:
+            raise RuntimeError("columnar result is closed")
+        for column in self.columns:
+            if column["name"] == name:
+                return np.ndarray(
+                    (self.length,),
+                    dtype=np.dtype(column["dtype"]),
+                    buffer=self._segment.buf,
+                    offset=column["offset"],
+                )
+        raise KeyError(name)
+
+    def to_json_result(self) -> dict[str, Any]:
+        """The default JSON result shape, materialised from the shared columns."""
+        time_col: list = []
+        outputs = {}
+        for column in self.columns:
+            values = self.column(column["name"]).tolist()
+            if column["name"].lower() == "time":
+                time_col = values
+            else:
+                outputs[column["name"]] = values
+        return {"time": time_col, "outputs": outputs, "outputVariables": list(outputs.keys())}
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_json_result())
+
+    def iter_json(self, chunk_rows: int = _JSON_CHUNK_ROWS) -> Iterator[bytes]:
+        """Yield ``to_json()`` in pieces, converting ``chunk_rows`` values at a time.
+
+        Only one slice of one column is ever held as Python objects.
+        """
+        time_name: Optional[str] = None
+        outputs: dict[str, None] = {}
+        for column in self.columns:
+            if column["name"].lower() == "time":
+                time_name = column["name"]
+            else:
+                outputs[column["name"]] = None
+        yield b'{"time": '
+        if time_name is None:
+            yield b"[]"
+        else:
+            yield from self._iter_json_array(time_name, chunk_rows)
+        yield b', "outputs": {'
+        for position, name in enumerate(outputs):
+            yield f'{", " if position else ""}{json.dumps(name)}: '.encode("utf-8")
+            yield from self._iter_json_array(name, chunk_rows)
+        yield f'}}, "outputVariables": {json.dumps(list(outputs))}}}'.encode("utf-8")
+
+    def _iter_json_array(self, name: str, chunk_rows: int) -> Iterator[bytes]:
+        values = self.column(name)
+        yield b"["
+        for start in range(0, values.size, chunk_rows):
+            body = json.dumps(values[start:start + chunk_rows].tolist())[1:-1]
+            yield f'{", " if start else ""}{body}'.encode("utf-8")
+        yield b"]"
+
+    def detached(self) -> "ColumnarResult":
+        """A copy of the columns that stays readable after ``close()``."""
+        if self._arrays is not None:
+            arrays = dict(self._arrays)  # already private to this process
+        else:
+            arrays = {column["name"]: np.array(self.column(column["name"])) for column in self.columns}
+        return ColumnarResult({"length": self.length, "columns": self.columns, "arrays": arrays})
+
+    def iter_npz(self, chunk_bytes: int = _STREAM_CHUNK_BYTES) -> Iterator[bytes]:
+        """Yield an uncompressed NPZ archive with one ``.npy`` member per column.
+
+        Column bytes are written straight from shared memory; the archive is
+        built on an unseekable sink so nothing beyond one chunk is buffered.
+        """
+        sink = _ChunkSink()
+        with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_STORED, allowZip64=True) as archive:
+            for column in self.columns:
+                values = self.column(column["name"])
+                with archive.open(f"{column['name']}.npy", "w", force_zip64=True) as member:
+                    np.lib.format.write_array_header_1_0(
+                        member,
+                        {"descr": values.dtype.str, "fortran_order": False, "shape": values.shape},
+                    )
+                    raw = memoryview(values).cast("B")
+                    for start in range(0, len(raw), chunk_bytes):
+                        member.write(raw[start:start + chunk_bytes])
+                        yield from sink.drain()
+                    del raw
+                del values
+                yield from sink.drain()
+        yield from sink.drain()
+
+    def close(self) -> None:
+        self._arrays = None
+        self._segment = None
+        if self._finalizer is not None:
+            self._finalizer()
+
+
+def discard_columnar_result(result: Any) -> None:
+    """Unlink a worker result that will never be sent (timeout, cancel, error)."""
+    if not isinstance(result, dict) or not isinstance(result.get("columnar"), dict):
+        return
+    if "arrays" in result["columnar"]:
+        return
+    try:
+        ColumnarResult(result["columnar"]).close()
+    except FileNotFoundError:
+        pass
+
+
+class _ChunkSink:
+    def __init__(self):
+        self._chunks: list[bytes] = []
+        self._position = 0
+
+    def write(self, data) -> int:
+        chunk = bytes(data)
+        self._chunks.append(chunk)
+        self._position += len(chunk)
+        return len(chunk)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self) -> None:
+        return None
+
+    def drain(self) -> Iterator[bytes]:
+        chunks, self._chunks = self._chunks, []
+        if chunks:
+            yield b"".join(chunks)
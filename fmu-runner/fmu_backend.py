@@ -1,9 +1,14 @@
 from __future__ import annotations
 
+import asyncio
+from collections import OrderedDict
+from contextvars import ContextVar
 from dataclasses import dataclass
+import importlib.util
 import logging
 import re
-from typing import Any, Callable, Optional
+import time
+from typing import Any, Callable, Optional, cast
 from urllib.parse import urlparse, urlunparse
 
 import httpx
@@ -14,6 +19,9 @@ ModelMetadata = dict[str, Any]
 logger = logging.getLogger("fmu-runner.backend")
 
 _FMU_ACCESS_KEY_SEGMENT_RE = re.compile(r"[A-Za-z0-9][A-Za-z0-9._-]{0,127}")
+# Time the current task waited for a Station concurrency slot, until its
+# request records it as part of its pool wait.
+_slot_wait_seconds: ContextVar[float] = ContextVar("station_slot_wait_seconds", default=0.0)
 
 
 class BaseFmuBackend:
@@ -62,6 +70,9 @@ class BaseFmuBackend:
     async def list_authorized_fmu(self, *, claims: dict) -> dict:
         raise NotImplementedError
 
+    async def aclose(self) -> None:
+        return None
+
 
 @dataclass
 class LocalFmuBackend(BaseFmuBackend):
@@ -94,6 +105,14 @@ class LocalFmuBackend(BaseFmuBackend):
         return self.list_loader(self.authorized_access_key(claims))
 
 
+@dataclass
+class _Revalidation:
+    """ETag exchange for one conditional Station GET."""
+
+    etag: Optional[str] = None
+    not_modified: bool = False
+
+
 class StationFmuBackend(BaseFmuBackend):
     mode = "station"
 
@@ -103,10 +122,118 @@ class StationFmuBackend(BaseFmuBackend):
         base_url: str,
         internal_token: str = "",
         request_timeout: float = 10.0,
+        max_connections: int = 32,
+        max_keepalive_connections: int = 16,
+        keepalive_expiry: float = 30.0,
+        max_concurrency: int = 16,
+        http2: bool = False,
+        metadata_cache_entries: int = 64,
+        metadata_cache_ttl: float = 300.0,
     ):
         self.base_url = base_url.rstrip("/")
         self.internal_token = internal_token
         self.request_timeout = request_timeout
+        self.limits = httpx.Limits(
+            max_connections=max(1, max_connections),
+            max_keepalive_connections=max(0, max_keepalive_connections),
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.max_concurrency = max(1, max_concurrency)
+        self.http2 = http2 and importlib.util.find_spec("h2") is not None
+        if http2 and not self.http2:
+            logger.warning("HTTP/2 to the Station requires the h2 package; using HTTP/1.1")
+        self._client: Optional[httpx.AsyncClient] = None
+        self._client_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._concurrency: Optional[asyncio.Semaphore] = None
+        self._in_flight = 0
+        self._requests = 0
+        self._new_connections = 0
+        self._pool_waits = 0
+        self._pool_wait_seconds = 0.0
+        self._pool_wait_max_seconds = 0.0
+        self.metadata_cache_entries = max(0, metadata_cache_entries)
+        self.metadata_cache_ttl = max(0.0, metadata_cache_ttl)
+        # accessKey -> (etag, normalised metadata, validated_at)
+        self._metadata_cache: OrderedDict[str, tuple[Optional[str], ModelMetadata, float]] = OrderedDict()
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """Return the shared keep-alive client for this Station.
+
+        The pool is bound to the running event loop; a new loop (tests, or a
+        restarted app) gets a fresh pool instead of reusing dead connections.
+        """
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client_loop is not loop:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=self.request_timeout,
+                limits=self.limits,
+                http2=self.http2,
+                event_hooks={"request": [self._trace_request]},
+            )
+            self._client_loop = loop
+            self._concurrency = asyncio.Semaphore(self.max_concurrency)
+        return self._client
+
+    async def _trace_request(self, request: httpx.Request):
+        # httpcore reports connection setup and header send through the
+        # "trace" extension; the first of those marks the end of the wait
+        # for a pooled connection. A wait for a concurrency slot before it
+        # belongs to the same request and is recorded with it, once.
+        slot_wait = _slot_wait_seconds.get()
+        _slot_wait_seconds.set(0.0)
+        queued_at = time.perf_counter()
+        state = {"waiting": True}
+
+        async def _trace(event_name: str, _info: dict):
+            if not state["waiting"]:
+                return
+            if event_name == "connection.connect_tcp.started":
+                self._new_connections += 1
+            elif not event_name.endswith(".send_request_headers.started"):
+                return
+            state["waiting"] = False
+            self._record_pool_wait(slot_wait + time.perf_counter() - queued_at)
+
+        request.extensions["trace"] = _trace
+        self._requests += 1
+
+    def _record_pool_wait(self, seconds: float):
+        self._pool_waits += 1
+        self._pool_wait_seconds += seconds
+        self._pool_wait_max_seconds = max(self._pool_wait_max_seconds, seconds)
+
+    async def _acquire_slot(self) -> None:
+        self._get_client()
+        started = time.perf_counter()
+        await cast(asyncio.Semaphore, self._concurrency).acquire()
+        _slot_wait_seconds.set(time.perf_counter() - started)
+        self._in_flight += 1
+
+    def _release_slot(self) -> None:
+        self._in_flight -= 1
+        if self._concurrency is not None:
+            self._concurrency.release()
+
+    def pool_metrics(self) -> dict[str, Any]:
+        requests, waits = self._requests, self._pool_waits
+        return {
+            "http2": self.http2,
+            "maxConnections": self.limits.max_connections,
+            "maxConcurrency": self.max_concurrency,
+            "inFlight": self._in_flight,
+            "requests": requests,
+            "newConnections": self._new_connections,
+            "reuseRatio": round(1.0 - self._new_connections / requests, 4) if requests else None,
+            "poolWaitMsAvg": round(self._pool_wait_seconds / waits * 1000.0, 3) if waits else 0.0,
+            "poolWaitMsMax": round(self._pool_wait_max_seconds * 1000.0, 3),
+        }
+
+    async def aclose(self) -> None:
+        client, self._client = self._client, None
+        self._client_loop = None
+        if client is not None:
+            await client.aclose()
 
     def _headers(self) -> dict[str, str]:
         headers = {"Accept": "application/json"}
@@ -233,7 +360,13 @@ class StationFmuBackend(BaseFmuBackend):
         path = f"{base_path}/internal/fmu/sessions" if base_path else "/internal/fmu/sessions"
         return urlunparse((ws_scheme, parsed.netloc, path, "", "", ""))
 
-    async def _request_json(self, operation: str, *, access_key: Optional[str] = None) -> dict[str, Any]:
+    async def _request_json(
+        self,
+        operation: str,
+        *,
+        access_key: Optional[str] = None,
+        revalidation: Optional[_Revalidation] = None,
+    ) -> dict[str, Any]:
         if not self.base_url:
             raise HTTPException(status_code=503, detail="Station backend is not configured")
 
@@ -254,15 +387,25 @@ class StationFmuBackend(BaseFmuBackend):
         else:
             raise ValueError("Unsupported Station GET operation")
 
+        await self._acquire_slot()
         try:
-            async with httpx.AsyncClient(base_url=self.base_url, timeout=self.request_timeout) as client:
-                request_kwargs = {"headers": self._headers()}
-                if operation in {"describe", "catalog"}:
-                    request_kwargs["headers"]["X-FMU-Access-Key"] = key
-                response = await client.get(path, **request_kwargs)
+            request_kwargs = {"headers": self._headers()}
+            if operation in {"describe", "catalog"}:
+                request_kwargs["headers"]["X-FMU-Access-Key"] = key
+            if revalidation is not None and revalidation.etag:
+                request_kwargs["headers"]["If-None-Match"] = revalidation.etag
+            response = await self._get_client().get(path, **request_kwargs)
         except httpx.HTTPError as exc:
             logger.warning("Station backend GET failed: %s", exc)
             raise HTTPException(status_code=503, detail="Station backend unavailable") from exc
+        finally:
+            self._release_slot()
+
+        if revalidation is not None:
+            if response.status_code == 304 and revalidation.etag:
+                revalidation.not_modified = True
+                return {}
+            revalidation.etag = response.headers.get("etag")
 
         if response.status_code >= 400:
             detail_text = response.text
@@ -305,16 +448,18 @@ class StationFmuBackend(BaseFmuBackend):
         path = "/internal/fmu/simulations/run"
         station_payload = dict(payload)
         station_payload["accessKey"] = key
+        await self._acquire_slot()
         try:
-            async with httpx.AsyncClient(base_url=self.base_url, timeout=self.request_timeout) as client:
-                response = await client.post(
-                    path,
-                    headers=self._headers_for(authorization=authorization),
-                    json=station_payload,
-                )
+            response = await self._get_client().post(
+                path,
+                headers=self._headers_for(authorization=authorization),
+                json=station_payload,
+            )
         except httpx.HTTPError as exc:
             logger.warning("Station backend POST failed: %s", exc)
             raise HTTPException(status_code=503, detail="Station backend unavailable") from exc
+        finally:
+            self._release_slot()
 
         if response.status_code >= 400:
             raise HTTPException(status_code=response.status_code, detail=self._response_error_detail(response))
@@ -334,7 +479,12 @@ class StationFmuBackend(BaseFmuBackend):
         claims: dict,
         request_payload: dict[str, Any],
         authorization: Optional[str] = None,
-    ) -> tuple[httpx.AsyncClient, httpx.Response]:
+    ) -> httpx.Response:
+        """Open a streaming run on the shared pool; the caller must ``aclose()`` the response.
+
+        Streams hold a pooled connection for their whole run but not a
+        concurrency slot, so long simulations do not block describe/run calls.
+        """
         context = self.build_authorized_context(
             claims=claims,
             requested_lab_id=request_payload.get("labId"),
@@ -357,17 +507,17 @@ class StationFmuBackend(BaseFmuBackend):
         ):
             raise HTTPException(status_code=400, detail="Token contains an invalid FMU file key")
         path = "/internal/fmu/simulations/stream"
-        client = httpx.AsyncClient(base_url=self.base_url, timeout=None)
+        client = self._get_client()
         request = client.build_request(
             "POST",
             path,
             headers=self._headers_for(accept="application/x-ndjson", authorization=authorization),
             json=payload,
+            timeout=httpx.Timeout(None, pool=self.request_timeout),
         )
         try:
             response = await client.send(request, stream=True)
         except httpx.HTTPError as exc:
-            await client.aclose()
             logger.warning("Station backend stream failed: %s", exc)
             raise HTTPException(status_code=503, detail="Station backend unavailable") from exc
 
@@ -376,9 +526,8 @@ class StationFmuBackend(BaseFmuBackend):
                 await response.aread()
             finally:
                 await response.aclose()
-                await client.aclose()
             raise HTTPException(status_code=response.status_code, detail=self._response_error_detail(response))
-        return client, response
+        return response
 
     async def run_authorized_simulation(
         self,
@@ -511,12 +660,42 @@ class StationFmuBackend(BaseFmuBackend):
             "checks": checks,
             "fmuCount": fmu_count,
             "backendMode": self.mode,
+            "stationPool": self.pool_metrics(),
         }
 
     async def get_authorized_model_metadata(self, *, claims: dict, requested_fmu_filename: Optional[str] = None) -> ModelMetadata:
+        """Describe an FMU on the Station, cached per accessKey.
+
+        Cached metadata is served for ``metadata_cache_ttl`` seconds and then
+        revalidated with the Station's ETag when it sent one. The returned
+        dict is shared and must not be mutated.
+        """
         access_key = self.ensure_requested_access_key(claims, requested_fmu_filename)
-        payload = await self._request_json("describe", access_key=access_key)
-        return self._normalize_model_metadata(payload)
+        if not self.metadata_cache_entries:
+            payload = await self._request_json("describe", access_key=access_key)
+            return self._normalize_model_metadata(payload)
+
+        cached = self._metadata_cache.get(access_key)
+        if cached is not None and time.monotonic() - cached[2] < self.metadata_cache_ttl:
+            self._metadata_cache.move_to_end(access_key)
+            return cached[1]
+        revalidation = _Revalidation(etag=cached[0] if cached is not None else None)
+        payload = await self._request_json("describe", access_key=access_key, revalidation=revalidation)
+        if revalidation.not_modified and cached is not None:
+            metadata = cached[1]
+        else:
+            metadata = self._normalize_model_metadata(payload)
+        self._metadata_cache[access_key] = (revalidation.etag, metadata, time.monotonic())
+        self._metadata_cache.move_to_end(access_key)
+        while len(self._metadata_cache) > self.metadata_cache_entries:
+            self._metadata_cache.popitem(last=False)
+        return metadata
+
+    def invalidate_model_metadata(self, access_key: Optional[str] = None) -> None:
+        if access_key is None:
+            self._metadata_cache.clear()
+        else:
+            self._metadata_cache.pop(access_key, None)
 
     async def list_authorized_fmu(self, *, claims: dict) -> dict:
         access_key = self.authorized_access_key(claims)
@@ -0,0 +1,465 @@
+"""In-memory index of the FMUs below ``FMU_DATA_PATH``.
+
+Health checks, listings, path resolution and FMU digests (AAS, worker pool,
+metadata and result caches) used to walk the data directory and re-read
+whole FMUs to hash them. The inventory walks it once and keeps each FMU's
+resolved path, size and mtime; the SHA-256 is computed on first use and kept
+while the file is unchanged.
+With a ``FmuDigestStore`` the digests also survive restarts: they are
+persisted by device, inode, size and mtime, so an unchanged FMU is hashed
+once, not once per process.
+
+On Linux the index watches every directory with inotify and rescans only
+after the kernel reported a change. The watch descriptor is non-blocking and
+drained on each lookup, so a file written before a lookup is always seen
+without a watcher thread. Where inotify is unavailable, or misses changes
+made by other hosts (network storage), ``watch="poll"`` rescans at most
+every ``poll_interval`` seconds instead.
+
+Lookups keep the runner's resolution rules: a name matches a file in the
+root or in one provider sub-directory, and a symlink only counts when it
+resolves inside the root.
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+import ctypes
+import ctypes.util
+from dataclasses import dataclass
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+import threading
+import time
+from typing import Any, Iterable, Optional
+
+
+logger = logging.getLogger("fmu-runner.inventory")
+
+# Read once here so the runner and the AAS generator share one inventory.
+# The index is refreshed by inotify; "poll" rescans every
+# FMU_INVENTORY_POLL_SECONDS instead (network storage, where inotify misses
+# changes made by other hosts).
+FMU_INVENTORY_WATCH = os.getenv("FMU_INVENTORY_WATCH", "auto").strip().lower()
+FMU_INVENTORY_POLL_SECONDS = float(os.getenv("FMU_INVENTORY_POLL_SECONDS", "30"))
+# SHA-256 digests persisted across restarts (next to the history database
+# unless FMU_DIGEST_CACHE_PATH says otherwise); FMU_DATA_PATH is read-only.
+FMU_DIGEST_CACHE_PATH = os.getenv("FMU_DIGEST_CACHE_PATH", "").strip() or os.path.join(
+    os.path.dirname(os.getenv("HISTORY_DB_PATH", "/app/data/history.db")) or ".", "fmu-digests.json",
+)
+
+_IN_ATTRIB = 0x004
+_IN_CLOSE_WRITE = 0x008
+_IN_MOVED_FROM = 0x040
+_IN_MOVED_TO = 0x080
+_IN_CREATE = 0x100
+_IN_DELETE = 0x200
+_IN_DELETE_SELF = 0x400
+_IN_MOVE_SELF = 0x800
+_WATCH_MASK = (
+    _IN_ATTRIB | _IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO
+    | _IN_CREATE | _IN_DELETE | _IN_DELETE_SELF | _IN_MOVE_SELF
+)
+_HASH_CHUNK_BYTES = 1 << 20
+
+
+@dataclass(frozen=True)
+class FmuEntry:
+    path: Path  # resolved, inside the root
+    relative: str  # of the resolved path
+    name: str  # directory entry name, matched by lookups
+    depth: int
+    size: int
+    mtime_ns: int
+    inode: int
+    device: int = 0
+
+    @property
+    def signature(self) -> tuple[int, int, int]:
+        return (self.size, self.mtime_ns, self.inode)
+
+    @property
+    def digest_key(self) -> str:
+        """Identifies this file version across restarts."""
+        return f"{self.device}:{self.inode}:{self.size}:{self.mtime_ns}"
+
+
+class FmuDigestStore:
+    """SHA-256 digests persisted as one JSON file, keyed by ``FmuEntry.digest_key``.
+
+    The file is read on first use and rewritten atomically whenever a digest
+    is added, keeping only the FMUs still present. A missing or corrupt file
+    starts an empty store; an unwritable one leaves the digests in memory.
+    """
+
+    def __init__(self, path: str | os.PathLike):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._digests: Optional[dict[str, str]] = None
+        self._write_failed = False
+
+    def _load(self) -> dict[str, str]:
+        # Caller holds the lock.
+        if self._digests is None:
+            try:
+                data = json.loads(self.path.read_text(encoding="utf-8"))
+            except FileNotFoundError:
+                data = {}
+            except (OSError, ValueError) as exc:
+                logger.warning("Ignoring FMU digest cache %s (%s)", self.path, exc)
+                data = {}
+            digests = data.get("digests") if isinstance(data, dict) else None
+            self._digests = {
+                str(key): value for key, value in (digests or {}).items()
+                if isinstance(value, str) and len(value) == 64
+            }
+        return self._digests
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            return self._load().get(key)
+
+    def put(self, key: str, value: str, *, live: Iterable[str]) -> None:
+        """Record ``key`` and drop digests of files not in ``live``."""
+        with self._lock:
+            keep = set(live) | {key}
+            digests = {name: digest for name, digest in self._load().items() if name in keep}
+            digests[key] = value
+            self._digests = digests
+            self._write(digests)
+
+    def _write(self, digests: dict[str, str]) -> None:
+        temporary = self.path.with_name(f".{self.path.name}.{os.getpid()}.tmp")
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            temporary.write_text(json.dumps({"version": 1, "digests": digests}), encoding="utf-8")
+            os.replace(temporary, self.path)
+        except OSError as exc:
+            if not self._write_failed:
+                logger.warning("Unable to persist FMU digests to %s (%s)", self.path, exc)
+            self._write_failed = True
+            try:
+                temporary.unlink()
+            except OSError:
+                pass
+            return
+        self._write_failed = False
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._load())
+
+
+class _Inotify:
+    """Minimal non-blocking inotify binding (no watcher thread)."""
+
+    def __init__(self):
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or None, use_errno=True)
+        self._add_watch = libc.inotify_add_watch
+        self._add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.fd = fd
+
+    def watch(self, directory: str) -> None:
+        if self._add_watch(self.fd, os.fsencode(directory), _WATCH_MASK) < 0:
+            raise OSError(ctypes.get_errno(), f"inotify_add_watch failed for {directory}")
+
+    def drain(self) -> bool:
+        """Consume pending events; ``True`` if there were any."""
+        changed = False
+        while True:
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                return changed
+            if not data:
+                return changed
+            changed = True
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+class FmuInventory:
+    def __init__(
+        self,
+        root: str | os.PathLike,
+        *,
+        watch: str = "auto",
+        poll_interval: float = 30.0,
+        digest_store: Optional[FmuDigestStore] = None,
+    ):
+        self.root = Path(root)
+        self.poll_interval = max(0.0, float(poll_interval))
+        self.digest_store = digest_store
+        self._lock = threading.Lock()
+        self._entries: dict[str, FmuEntry] = {}
+        self._by_name: dict[str, list[FmuEntry]] = {}
+        self._root_available = False
+        self._scanned_at: Optional[float] = None
+        self._dirty = True
+        # resolved path -> (signature, sha256 hex digest)
+        self._digests: dict[Path, tuple[tuple[int, int, int], str]] = {}
+        self._metrics = {"scans": 0, "lookups": 0, "hits": 0, "digestsComputed": 0, "digestHits": 0, "digestsLoaded": 0}
+        self._inotify: Optional[_Inotify] = None
+        if watch != "poll":
+            try:
+                self._inotify = _Inotify()
+            except (OSError, AttributeError) as exc:
+                logger.info("inotify unavailable for %s (%s); polling every %.0fs", self.root, exc, self.poll_interval)
+
+    @property
+    def mode(self) -> str:
+        return "inotify" if self._inotify is not None else "poll"
+
+    def _stale(self) -> bool:
+        if self._dirty or self._scanned_at is None:
+            return True
+        if self._inotify is not None:
+            return self._inotify.drain()
+        return time.monotonic() - self._scanned_at >= self.poll_interval
+
+    def _refresh(self, *, force: bool = False) -> None:
+        # Caller holds the lock.
+        if not force and not self._stale():
+            return
+        if self._inotify is not None:
+            # Events raised by the rescan itself are stale once it finishes.
+            self._inotify.drain()
+        self._scan()
+
+    def _scan(self) -> None:
+        entries: dict[str, FmuEntry] = {}
+        directories: list[str] = []
+        try:
+            base = self.root.resolve()
+            self._root_available = base.is_dir()
+        except OSError:
+            self._root_available = False
+        if self._root_available:
+            self._walk(base, base, 0, entries, directories)
+        # Without a watched root (missing, or out of watches) rescan on access.
+        unwatched = not self._root_available
+        if self._inotify is not None:
+            for directory in directories:
+                try:
+                    self._inotify.watch(directory)
+                except OSError:
+                    unwatched = True
+        by_name: dict[str, list[FmuEntry]] = {}
+        for entry in sorted(entries.values(), key=lambda item: (item.depth, item.relative)):
+            by_name.setdefault(os.path.normcase(entry.name), []).append(entry)
+        self._entries = entries
+        self._by_name = by_name
+        live = {entry.path: entry.signature for entry in entries.values()}
+        self._digests = {path: cached for path, cached in self._digests.items() if live.get(path) == cached[0]}
+        self._scanned_at = time.monotonic()
+        self._dirty = unwatched and self._inotify is not None
+        self._metrics["scans"] += 1
+
+    def _walk(self, base: Path, directory: Path, depth: int, entries: dict, directories: list[str]) -> None:
+        directories.append(str(directory))
+        try:
+            with os.scandir(directory) as iterator:
+                children = list(iterator)
+        except OSError:
+            return
+        for child in children:
+            try:
+                # Provider directories may be symlinks; deeper levels are not
+                # followed to keep link loops out of the walk.
+                if child.is_dir(follow_symlinks=depth == 0):
+                    self._walk(base, Path(child.path), depth + 1, entries, directories)
+                    continue
+                if not child.name.lower().endswith(".fmu"):
+                    continue
+                resolved = Path(child.path).resolve(strict=True)
+                resolved.relative_to(base)
+                stat = resolved.stat()
+            except (OSError, ValueError):
+                continue
+            if not resolved.is_file():
+                continue
+            entries[str(Path(child.path).relative_to(base))] = FmuEntry(
+                path=resolved,
+                relative=str(resolved.relative_to(base)),
+                name=child.name,
+                depth=depth,
+                size=stat.st_size,
+                mtime_ns=stat.st_mtime_ns,
+                inode=stat.st_ino,
+                device=stat.st_dev,
+            )
+
+    def refresh(self) -> None:
+        with self._lock:
+            self._refresh(force=True)
+
+    def available(self) -> bool:
+        """Whether the root directory exists."""
+        with self._lock:
+            self._refresh()
+            return self._root_available
+
+    def entries(self) -> list[FmuEntry]:
+        with self._lock:
+            self._refresh()
+            return [self._entries[key] for key in sorted(self._entries)]
+
+    def count(self) -> int:
+        with self._lock:
+            self._refresh()
+            return len(self._entries)
+
+    def find(self, filename: str) -> Optional[FmuEntry]:
+        """The FMU named ``filename`` in the root or one provider directory."""
+        with self._lock:
+            self._refresh()
+            self._metrics["lookups"] += 1
+            entry = self._match(filename)
+            if entry is not None and not _unchanged(entry):
+                # Changed behind the index (e.g. on network storage): rescan once.
+                self._refresh(force=True)
+                entry = self._match(filename)
+            if entry is not None:
+                self._metrics["hits"] += 1
+            return entry
+
+    def _match(self, filename: str) -> Optional[FmuEntry]:
+        for entry in self._by_name.get(os.path.normcase(filename), ()):
+            if entry.depth <= 1:
+                return entry
+        return None
+
+    def sha256(self, entry: FmuEntry) -> str:
+        """SHA-256 of ``entry``, hashed in chunks once per file version.
+
+        Blocking file I/O: async callers run it in a worker thread.
+        """
+        with self._lock:
+            cached = self._digests.get(entry.path)
+            if cached is not None and cached[0] == entry.signature:
+                self._metrics["digestHits"] += 1
+                return cached[1]
+        store = self.digest_store
+        value = store.get(entry.digest_key) if store is not None else None
+        if value is not None:
+            with self._lock:
+                self._digests[entry.path] = (entry.signature, value)
+                self._metrics["digestsLoaded"] += 1
+            return value
+        value = _hash_file(entry.path)
+        with self._lock:
+            self._digests[entry.path] = (entry.signature, value)
+            self._metrics["digestsComputed"] += 1
+            live = [item.digest_key for item in self._entries.values()]
+        if store is not None:
+            store.put(entry.digest_key, value, live=live)
+        return value
+
+    def sha256_file(self, path: str | os.PathLike) -> str:
+        """SHA-256 of the FMU at ``path``, sharing the cached and persisted digests.
+
+        ``path`` need not be indexed (e.g. it lies outside the root): it is
+        keyed by its current stat like any entry.
+        """
+        resolved = Path(path).resolve(strict=True)
+        stat = resolved.stat()
+        entry = FmuEntry(
+            path=resolved,
+            relative=str(resolved),
+            name=resolved.name,
+            depth=-1,
+            size=stat.st_size,
+            mtime_ns=stat.st_mtime_ns,
+            inode=stat.st_ino,
+            device=stat.st_dev,
+        )
+        return self.sha256(entry)
+
+    def metrics(self) -> dict[str, Any]:
+        with self._lock:
+            snapshot: dict[str, Any] = dict(self._metrics)
+            snapshot["fmus"] = len(self._entries)
+            snapshot["digestsCached"] = len(self._digests)
+            scanned_at = self._scanned_at
+        if self.digest_store is not None:
+            snapshot["digestsPersisted"] = len(self.digest_store)
+        snapshot["mode"] = self.mode
+        snapshot["scanAgeSeconds"] = round(time.monotonic() - scanned_at, 3) if scanned_at is not None else None
+        return snapshot
+
+    def close(self) -> None:
+        with self._lock:
+            if self._inotify is not None:
+                self._inotify.close()
+                self._inotify = None
+
+
+def _hash_file(path: Path) -> str:
+    # One reused buffer: large FMUs are never held in memory at once.
+    digest = hashlib.sha256()
+    buffer = bytearray(_HASH_CHUNK_BYTES)
+    view = memoryview(buffer)
+    with open(path, "rb", buffering=0) as handle:
+        while True:
+            read = handle.readinto(buffer)
+            if not read:
+                break
+            digest.update(view[:read])
+    return digest.hexdigest()
+
+
+def _unchanged(entry: FmuEntry) -> bool:
+    try:
+        stat = entry.path.stat()
+    except OSError:
+        return False
+    return (stat.st_size, stat.st_mtime_ns, stat.st_ino) == entry.signature
+
+
+_SHARED_MAX = 8
+_shared_lock = threading.Lock()
+_shared: "OrderedDict[tuple[str, str, float, str], FmuInventory]" = OrderedDict()
+
+
+def shared_inventory(
+    root: str | os.PathLike,
+    *,
+    watch: str = "auto",
+    poll_interval: float = 30.0,
+    digest_cache_path: Optional[str | os.PathLike] = None,
+) -> FmuInventory:
+    """The process-wide inventory for ``root``, shared by every caller.
+
+    ``digest_cache_path`` persists its SHA-256 digests (see ``FmuDigestStore``).
+    """
+    cache = os.path.abspath(os.fspath(digest_cache_path)) if digest_cache_path else ""
+    key = (os.path.abspath(os.fspath(root)), watch, float(poll_interval), cache)
+    with _shared_lock:
+        inventory = _shared.get(key)
+        if inventory is None:
+            inventory = _shared[key] = FmuInventory(
+                root, watch=watch, poll_interval=poll_interval,
+                digest_store=FmuDigestStore(cache) if cache else None,
+            )
+            while len(_shared) > _SHARED_MAX:
+                # Only a changed root gets here; the evicted index keeps working by polling.
+                _shared.popitem(last=False)[1].close()
+        _shared.move_to_end(key)
+        return inventory
+
+
+def default_inventory(root: str | os.PathLike) -> FmuInventory:
+    """The shared inventory of ``root`` with the ``FMU_INVENTORY_*`` settings."""
+    return shared_inventory(
+        root,
+        watch=FMU_INVENTORY_WATCH,
+        poll_interval=FMU_INVENTORY_POLL_SECONDS,
+        digest_cache_path=FMU_DIGEST_CACHE_PATH,
+    )
@@ -0,0 +1,483 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from concurrent.futures import Future, InvalidStateError
+from dataclasses import dataclass, field
+import hashlib
+import logging
+import multiprocessing
+from multiprocessing import resource_tracker
+import os
+from pathlib import Path
+import shutil
+import tempfile
+import threading
+import time
+from typing import Any, Callable, Optional
+
+from fmpy import extract, instantiate_fmu, read_model_description
+
+
+logger = logging.getLogger("fmu-runner.workers")
+
+_WORKER_READY_TIMEOUT_SECONDS = 30.0
+_DIGEST_CHUNK_SIZE = 1024 * 1024
+
+
+class FmuWorkerUnavailable(RuntimeError):
+    """Raised when a pooled FMU worker cannot be started or has died."""
+
+
+class PreparedModel:
+    """An FMU extracted once inside a worker, with its native instances kept loaded."""
+
+    def __init__(self, digest: str, fmu_path: str, directory: Path):
+        self.digest = digest
+        self.directory = str(directory)
+        extract(fmu_path, unzipdir=self.directory)
+        self.model_description = read_model_description(self.directory)
+        self._instances: dict[str, Any] = {}
+        self._used: set[str] = set()
+
+    def instance(self, fmi_type: str) -> Any:
+        fmu = self._instances.get(fmi_type)
+        if fmu is None:
+            fmu = instantiate_fmu(self.directory, self.model_description, fmi_type)
+            self._instances[fmi_type] = fmu
+        self._used.add(fmi_type)
+        return fmu
+
+    def reset_instances(self) -> None:
+        """Return used instances to the instantiated state for the next job."""
+        for fmi_type in list(self._used):
+            fmu = self._instances.get(fmi_type)
+            reset = getattr(fmu, "reset", None)
+            try:
+                if reset is None:
+                    raise AttributeError("FMU instance cannot be reset")
+                reset()
+            except Exception:
+                self._free_instance(fmi_type)
+        self._used.clear()
+
+    def discard_instances(self) -> None:
+        """Free instances touched by a failed job; their state is unknown."""
+        for fmi_type in list(self._used):
+            self._free_instance(fmi_type)
+        self._used.clear()
+
+    def close(self) -> None:
+        for fmi_type in list(self._instances):
+            self._free_instance(fmi_type)
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def _free_instance(self, fmi_type: str) -> None:
+        fmu = self._instances.pop(fmi_type, None)
+        if fmu is None:
+            return
+        try:
+            fmu.freeInstance()
+        except Exception:
+            pass
+
+
+def _worker_main(conn, job_target: Callable[..., Any], workdir: str, max_models: int) -> None:
+    models: OrderedDict[str, PreparedModel] = OrderedDict()
+    conn.send(("ready", os.getpid()))
+    try:
+        while True:
+            try:
+                message = conn.recv()
+            except (EOFError, OSError):
+                break
+            if message is None:
+                break
+            digest, fmu_path, args, stream = message
+            prepared: Optional[PreparedModel] = None
+            try:
+                prepared = models.get(digest)
+                if prepared is None:
+                    prepared = PreparedModel(digest, fmu_path, Path(workdir) / digest)
+                    models[digest] = prepared
+                    while len(models) > max_models:
+                        _, evicted = models.popitem(last=False)
+                        evicted.close()
+                models.move_to_end(digest)
+                job_kwargs: dict[str, Any] = {"prepared_model": prepared}
+                if stream:
+                    job_kwargs["emit_chunk"] = lambda payload: conn.send(("chunk", payload))
+                result = job_target(fmu_path, *args, **job_kwargs)
+                prepared.reset_instances()
+                reply: tuple[str, Any] = ("ok", result)
+            except BaseException as exc:
+                if prepared is not None:
+                    prepared.discard_instances()
+                reply = ("error", exc)
+            try:
+                conn.send(reply)
+            except Exception:
+                conn.send(("error", FmuWorkerUnavailable(f"FMU worker reply could not be encoded: {type(reply[1]).__name__}")))
+    finally:
+        for prepared in models.values():
+            prepared.close()
+
+
+@dataclass(eq=False)
+class _Worker:
+    process: Any
+    conn: Any
+    workdir: str
+    jobs: int = 0
+    models: OrderedDict = field(default_factory=OrderedDict)
+    lease: Optional["FmuWorkerLease"] = None
+    killed: bool = False
+
+
+class FmuWorkerLease:
+    """Handle returned with each submitted job.
+
+    It mirrors the small part of ``ProcessPoolExecutor`` that the API uses for
+    isolation: ``kill()`` terminates the worker running this job (the worker is
+    then replaced), and ``shutdown()`` simply releases the lease.
+    """
+
+    def __init__(self, pool: "FmuWorkerPool", worker: _Worker, digest: str, hit: bool):
+        self._pool = pool
+        self._worker = worker
+        self.digest = digest
+        self.hit = hit
+        self.done = False
+
+    @property
+    def pid(self) -> Optional[int]:
+        return getattr(self._worker.process, "pid", None)
+
+    def kill(self) -> bool:
+        return self._pool._kill_lease(self)
+
+    def shutdown(self, wait: bool = False, *, cancel_futures: bool = False) -> None:
+        """Leases are returned to the pool when their job finishes."""
+        return None
+
+
+class FmuWorkerPool:
+    """Supervised pool of pre-forked FMU workers with per-model affinity.
+
+    Each worker keeps recently used FMUs extracted and instantiated, keyed by
+    the SHA-256 of the FMU file, so repeated runs of the same model skip the
+    unzip and the shared-library load. Workers are recycled after
+    ``max_jobs_per_worker`` jobs and replaced whenever one is killed.
+    ``digest`` computes that SHA-256; without it the pool keeps its own
+    stat-keyed digests.
+    """
+
+    def __init__(
+        self,
+        job_target: Callable[..., Any],
+        *,
+        size: int = 4,
+        max_jobs_per_worker: int = 50,
+        max_models_per_worker: int = 4,
+        mp_context: Any = None,
+        digest: Optional[Callable[[str], str]] = None,
+    ):
+        self._job_target = job_target
+        self._digest = digest
+        self.size = max(0, int(size))
+        self.max_jobs_per_worker = max(1, int(max_jobs_per_worker))
+        self.max_models_per_worker = max(1, int(max_models_per_worker))
+        self._ctx = mp_context or multiprocessing.get_context()
+        self._lock = threading.Lock()
+        self._idle: list[_Worker] = []
+        self._busy: set[_Worker] = set()
+        self._digests: dict[tuple[str, int, int], str] = {}
+        self._closed = False
+        self._broken = False
+        self._metrics = {
+            "hits": 0,
+            "misses": 0,
+            "spawned": 0,
+            "recycled": 0,
+            "killed": 0,
+            "spawnFailures": 0,
+            "spawnSecondsTotal": 0.0,
+            "spawnSecondsMax": 0.0,
+            "spawnSecondsLast": 0.0,
+        }
+
+    @property
+    def broken(self) -> bool:
+        return self._broken or self._closed
+
+    def warm(self) -> int:
+        """Pre-fork workers until ``size`` are idle; returns how many started."""
+        started = 0
+        while True:
+            with self._lock:
+                if self._closed or len(self._idle) + len(self._busy) >= self.size:
+                    return started
+            worker = self._spawn_worker()
+            with self._lock:
+                closed = self._closed
+                if not closed:
+                    self._idle.append(worker)
+            if closed:
+                self._retire(worker)
+                return started
+            started += 1
+
+    def submit(
+        self,
+        fmu_path: str,
+        *args: Any,
+        on_chunk: Optional[Callable[[Any], None]] = None,
+    ) -> tuple[FmuWorkerLease, Future]:
+        """Run one job on a warm worker.
+
+        With ``on_chunk`` the job also receives an ``emit_chunk`` callable and
+        every payload it emits is handed to ``on_chunk`` from the reader thread
+        before the result resolves. ``on_chunk`` may block to apply
+        backpressure; if it raises, the job is treated as abandoned and its
+        worker is killed.
+        """
+        digest = self.fmu_digest(fmu_path)
+        with self._lock:
+            if self._closed:
+                raise FmuWorkerUnavailable("FMU worker pool is shut down")
+            worker = self._take_idle(digest)
+        if worker is None:
+            worker = self._spawn_worker()
+        with self._lock:
+            hit = digest in worker.models
+            self._metrics["hits" if hit else "misses"] += 1
+            worker.models[digest] = True
+            worker.models.move_to_end(digest)
+            while len(worker.models) > self.max_models_per_worker:
+                worker.models.popitem(last=False)
+            lease = FmuWorkerLease(self, worker, digest, hit)
+            worker.lease = lease
+            worker.jobs += 1
+            self._busy.add(worker)
+
+        future: Future = Future()
+        future.set_running_or_notify_cancel()
+        try:
+            worker.conn.send((digest, fmu_path, args, on_chunk is not None))
+        except Exception as exc:
+            self._dispose(self._finish(worker, lease, alive=False))
+            raise FmuWorkerUnavailable("FMU worker rejected the job") from exc
+        threading.Thread(
+            target=self._await_result,
+            args=(worker, lease, future, on_chunk),
+            name=f"fmu-worker-{lease.pid}",
+            daemon=True,
+        ).start()
+        return lease, future
+
+    def fmu_digest(self, fmu_path: str) -> str:
+        if self._digest is not None:
+            return self._digest(fmu_path)
+        stat = os.stat(fmu_path)
+        key = (str(fmu_path), stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            cached = self._digests.get(key)
+        if cached is not None:
+            return cached
+        digest = hashlib.sha256()
+        with open(fmu_path, "rb") as handle:
+            for chunk in iter(lambda: handle.read(_DIGEST_CHUNK_SIZE), b""):
+                digest.update(chunk)
+        value = digest.hexdigest()
+        with self._lock:
+            self._digests = {k: v for k, v in self._digests.items() if k[0] != key[0]}
+            self._digests[key] = value
+        return value
+
+    def metrics(self) -> dict[str, Any]:
+        with self._lock:
+            snapshot: dict[str, Any] = dict(self._metrics)
+            snapshot["idle"] = len(self._idle)
+            snapshot["busy"] = len(self._busy)
+        lookups = snapshot["hits"] + snapshot["misses"]
+        snapshot["hitRatio"] = round(snapshot["hits"] / lookups, 4) if lookups else 0.0
+        spawned = snapshot["spawned"]
+        snapshot["spawnSecondsAvg"] = round(snapshot["spawnSecondsTotal"] / spawned, 6) if spawned else 0.0
+        for key in ("spawnSecondsTotal", "spawnSecondsMax", "spawnSecondsLast"):
+            snapshot[key] = round(snapshot[key], 6)
+        snapshot["size"] = self.size
+        snapshot["maxJobsPerWorker"] = self.max_jobs_per_worker
+        return snapshot
+
+    def shutdown(self, wait: bool = False, *, cancel_futures: bool = False) -> None:
+        with self._lock:
+            self._closed = True
+            workers = list(self._idle) + list(self._busy)
+            self._idle.clear()
+        for worker in workers:
+            if worker in self._busy:
+                self._kill_worker(worker)
+            else:
+                self._retire(worker, wait=wait)
+
+    # -- internals ---------------------------------------------------------
+
+    def _take_idle(self, digest: str) -> Optional[_Worker]:
+        for index, worker in enumerate(self._idle):
+            if digest in worker.models:
+                return self._idle.pop(index)
+        if self._idle:
+            # Prefer the worker holding the fewest models so warm ones keep theirs.
+            worker = min(self._idle, key=lambda item: len(item.models))
+            self._idle.remove(worker)
+            return worker
+        return None
+
+    def _spawn_worker(self) -> _Worker:
+        workdir = tempfile.mkdtemp(prefix="fmu-worker-")
+        # Workers must share this process's tracker so shared-memory results
+        # they hand over are not unlinked when the worker exits or is killed.
+        resource_tracker.ensure_running()
+        parent_conn, child_conn = self._ctx.Pipe()
+        process = None
+        started = time.monotonic()
+        try:
+            process = self._ctx.Process(
+                target=_worker_main,
+                args=(child_conn, self._job_target, workdir, self.max_models_per_worker),
+                daemon=True,
+            )
+            process.start()
+            child_conn.close()
+            if not parent_conn.poll(_WORKER_READY_TIMEOUT_SECONDS):
+                raise TimeoutError("worker did not report ready")
+            parent_conn.recv()
+        except Exception as exc:
+            with self._lock:
+                self._metrics["spawnFailures"] += 1
+            if process is not None and process.is_alive():
+                process.kill()
+            parent_conn.close()
+            shutil.rmtree(workdir, ignore_errors=True)
+            logger.error("Unable to start FMU worker: %s", type(exc).__name__)
+            raise FmuWorkerUnavailable("isolated FMU worker pool is unavailable") from exc
+        elapsed = time.monotonic() - started
+        with self._lock:
+            self._broken = False
+            self._metrics["spawned"] += 1
+            self._metrics["spawnSecondsTotal"] += elapsed
+            self._metrics["spawnSecondsLast"] = elapsed
+            self._metrics["spawnSecondsMax"] = max(self._metrics["spawnSecondsMax"], elapsed)
+        return _Worker(process=process, conn=parent_conn, workdir=workdir)
+
+    def _await_result(
+        self,
+        worker: _Worker,
+        lease: FmuWorkerLease,
+        future: Future,
+        on_chunk: Optional[Callable[[Any], None]] = None,
+    ) -> None:
+        while True:
+            try:
+                status, payload = worker.conn.recv()
+            except (EOFError, OSError):
+                reason = "killed" if worker.killed else "exited unexpectedly"
+                retired = self._finish(worker, lease, alive=False)
+                self._set_future(future, exception=FmuWorkerUnavailable(f"FMU worker {reason}"))
+                self._dispose(retired)
+                return
+            if status != "chunk":
+                break
+            if on_chunk is None or worker.killed:
+                continue
+            try:
+                on_chunk(payload)
+            except Exception:
+                self._kill_worker(worker)
+        if status != "ok":
+            with self._lock:
+                # The worker only keeps models it managed to prepare.
+                if not lease.hit:
+                    worker.models.pop(lease.digest, None)
+        # Return the worker before resolving: a caller resubmitting straight
+        # away must find it idle and warm, not fork a cold one.
+        retired = self._finish(worker, lease, alive=True)
+        if status == "ok":
+            self._set_future(future, result=payload)
+        else:
+            self._set_future(future, exception=payload)
+        self._dispose(retired)
+
+    @staticmethod
+    def _set_future(future: Future, *, result: Any = None, exception: Optional[BaseException] = None) -> None:
+        try:
+            if exception is not None:
+                future.set_exception(exception)
+            else:
+                future.set_result(result)
+        except InvalidStateError:
+            pass
+
+    def _finish(self, worker: _Worker, lease: FmuWorkerLease, *, alive: bool) -> Optional[_Worker]:
+        """Put ``worker`` back in the idle list, or return it for ``_dispose``.
+
+        Only bookkeeping happens here, so callers can run it before they
+        resolve the job's future and retire the worker afterwards.
+        """
+        with self._lock:
+            lease.done = True
+            worker.lease = None
+            self._busy.discard(worker)
+            reusable = alive and not worker.killed and worker.process.is_alive()
+            if reusable and not self._closed and worker.jobs < self.max_jobs_per_worker:
+                if len(self._idle) < self.size:
+                    self._idle.append(worker)
+                    return None
+            elif reusable:
+                self._metrics["recycled"] += 1
+        return worker
+
+    def _dispose(self, worker: Optional[_Worker]) -> None:
+        """Retire a worker ``_finish`` let go and top the pool back up."""
+        if worker is None:
+            return
+        self._retire(worker)
+        try:
+            self.warm()
+        except FmuWorkerUnavailable:
+            with self._lock:
+                self._broken = not self._idle and not self._busy
+
+    def _kill_lease(self, lease: FmuWorkerLease) -> bool:
+        with self._lock:
+            worker = lease._worker
+            if lease.done or worker.lease is not lease:
+                return False
+        self._kill_worker(worker)
+        return True
+
+    def _kill_worker(self, worker: _Worker) -> None:
+        with self._lock:
+            worker.killed = True
+            self._metrics["killed"] += 1
+        try:
+            if worker.process.is_alive():
+                worker.process.kill()
+        except Exception as exc:
+            logger.warning("Unable to terminate FMU worker process: %s", exc)
+
+    @staticmethod
+    def _retire(worker: _Worker, *, wait: bool = False) -> None:
+        try:
+            if worker.process.is_alive() and not worker.killed:
+                worker.conn.send(None)
+                worker.process.join(timeout=5 if wait else 0.5)
+            if worker.process.is_alive():
+                worker.process.kill()
+            worker.process.join(timeout=1)
+        except Exception:
+            pass
+        try:
+            worker.conn.close()
+        except Exception:
+            pass
+        shutil.rmtree(worker.workdir, ignore_errors=True)
@@ -0,0 +1,291 @@
+"""Long-lived SQLite store for the simulation history.
+
+Writes are queued without blocking the caller and committed by a single
+writer thread, which drains whatever is queued into one transaction. Reads
+use a small pool of connections. A write can be tagged with keys (a row id,
+a lab) and a read waits only for the queued writes carrying the key it names,
+so it sees its own rows without flushing everyone else's. The database runs
+in WAL mode with ``synchronous=NORMAL`` so readers are not blocked by the
+writer, and the writer checkpoints the WAL periodically so it does not grow
+unbounded.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Optional, Sequence
+
+
+logger = logging.getLogger("fmu-runner.history")
+
+_STOP = object()
+
+
+def _configure(connection: sqlite3.Connection, *, busy_timeout_ms: int) -> sqlite3.Connection:
+    connection.execute(f"PRAGMA busy_timeout={int(busy_timeout_ms)}")
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    return connection
+
+
+class HistoryStore:
+    """Batched writer plus pooled readers over one SQLite database file."""
+
+    def __init__(
+        self,
+        path: str,
+        *,
+        batch_size: int = 128,
+        queue_size: int = 10000,
+        read_connections: int = 4,
+        checkpoint_interval_seconds: float = 60.0,
+        busy_timeout_ms: int = 5000,
+    ):
+        self.path = str(path)
+        self.batch_size = max(1, int(batch_size))
+        self.read_connections = max(1, int(read_connections))
+        self.checkpoint_interval_seconds = max(0.0, float(checkpoint_interval_seconds))
+        self.busy_timeout_ms = int(busy_timeout_ms)
+        self._queue: queue.Queue = queue.Queue(maxsize=max(1, int(queue_size)))
+        self._lock = threading.Lock()
+        self._committed = threading.Condition(self._lock)
+        self._submitted_seq = 0
+        self._committed_seq = 0
+        # key -> seq of the latest queued write carrying it, until committed
+        self._pending_keys: dict[str, int] = {}
+        self._writer: Optional[threading.Thread] = None
+        self._closed = False
+        self._readers: queue.LifoQueue[sqlite3.Connection] = queue.LifoQueue()
+        self._reader_count = 0
+        self._metrics = {"written": 0, "batches": 0, "dropped": 0, "failed": 0, "checkpoints": 0}
+
+    # ----- writes -----
+
+    def submit(self, sql: str, params: Sequence[Any] | Callable[[], Sequence[Any]],
+               *, keys: Sequence[str] = ()) -> bool:
+        """Queue one write; ``params`` may be a callable evaluated on the writer thread.
+
+        Reads naming one of ``keys`` wait for this write. Never blocks.
+        Returns ``False`` when the store is closed or the queue is full, in
+        which case the write is dropped.
+        """
+        with self._lock:
+            if self._closed:
+                return False
+            self._ensure_writer()
+            try:
+                self._queue.put_nowait((self._submitted_seq + 1, sql, params, tuple(keys)))
+            except queue.Full:
+                self._metrics["dropped"] += 1
+                logger.error("History write queue is full; dropping write")
+                return False
+            self._submitted_seq += 1
+            for key in keys:
+                self._pending_keys[key] = self._submitted_seq
+            return True
+
+    def flush(self, timeout: Optional[float] = 5.0) -> bool:
+        """Wait until every write submitted so far has been committed (or failed)."""
+        with self._committed:
+            target = self._submitted_seq
+            return self._committed.wait_for(lambda: self._committed_seq >= target, timeout=timeout)
+
+    def flush_key(self, key: str, timeout: Optional[float] = 5.0) -> bool:
+        """Wait until the writes queued with ``key`` have been committed (or failed)."""
+        with self._committed:
+            target = self._pending_keys.get(key)
+            if target is None:
+                return True
+            return self._committed.wait_for(lambda: self._committed_seq >= target, timeout=timeout)
+
+    def pending(self) -> int:
+        with self._lock:
+            return self._submitted_seq - self._committed_seq
+
+    def _ensure_writer(self) -> None:
+        if self._writer is None or not self._writer.is_alive():
+            self._writer = threading.Thread(target=self._run_writer, name="fmu-history-writer", daemon=True)
+            self._writer.start()
+
+    def _run_writer(self) -> None:
+        connection: Optional[sqlite3.Connection] = None
+        last_checkpoint = time.monotonic()
+        stopping = False
+        while not stopping:
+            wait = None
+            if self.checkpoint_interval_seconds:
+                wait = max(0.0, last_checkpoint + self.checkpoint_interval_seconds - time.monotonic())
+            try:
+                item = self._queue.get(timeout=wait)
+            except queue.Empty:
+                item = None
+            batch = []
+            if item is _STOP:
+                stopping = True
+            elif item is not None:
+                batch.append(item)
+                # Take whatever else is already queued; a burst becomes one transaction.
+                while len(batch) < self.batch_size:
+                    try:
+                        item = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if item is _STOP:
+                        stopping = True
+                        break
+                    batch.append(item)
+
+            if batch:
+                connection = self._write_batch(connection, batch)
+            if connection is not None and (
+                stopping
+                or (self.checkpoint_interval_seconds and time.monotonic() - last_checkpoint >= self.checkpoint_interval_seconds)
+            ):
+                self._checkpoint(connection, "TRUNCATE" if stopping else "PASSIVE")
+                last_checkpoint = time.monotonic()
+            elif connection is None:
+                last_checkpoint = time.monotonic()
+        if connection is not None:
+            connection.close()
+
+    def _write_batch(self, connection: Optional[sqlite3.Connection], batch: list) -> Optional[sqlite3.Connection]:
+        rows = []
+        failed = 0
+        for seq, sql, params, _keys in batch:
+            try:
+                rows.append((sql, tuple(params() if callable(params) else params)))
+            except Exception as exc:
+                failed += 1
+                logger.error("Failed to prepare simulation history write: %s", exc)
+        try:
+            if connection is None:
+                connection = _configure(
+                    sqlite3.connect(self.path, check_same_thread=False, isolation_level=None),
+                    busy_timeout_ms=self.busy_timeout_ms,
+                )
+            try:
+                self._execute_rows(connection, rows)
+            except sqlite3.DatabaseError:
+                # One bad row must not cost the rest of the batch.
+                for row in rows:
+                    try:
+                        self._execute_rows(connection, [row])
+                    except sqlite3.DatabaseError as exc:
+                        failed += 1
+                        logger.error("Failed to save simulation history: %s", exc)
+        except sqlite3.Error as exc:
+            failed += len(rows)
+            logger.error("Failed to save simulation history: %s", exc)
+            if connection is not None:
+                connection.close()
+            connection = None
+        with self._committed:
+            self._committed_seq = max(self._committed_seq, batch[-1][0])
+            for seq, _sql, _params, keys in batch:
+                for key in keys:
+                    if self._pending_keys.get(key) == seq:
+                        del self._pending_keys[key]
+            self._metrics["batches"] += 1
+            self._metrics["written"] += len(batch) - failed
+            self._metrics["failed"] += failed
+            self._committed.notify_all()
+        return connection
+
+    @staticmethod
+    def _execute_rows(connection: sqlite3.Connection, rows: list) -> None:
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            for sql, params in rows:
+                connection.execute(sql, params)
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+
+    def _checkpoint(self, connection: sqlite3.Connection, mode: str) -> None:
+        try:
+            connection.execute(f"PRAGMA wal_checkpoint({mode})").fetchall()
+            with self._lock:
+                self._metrics["checkpoints"] += 1
+        except sqlite3.Error as exc:
+            logger.warning("History WAL checkpoint failed: %s", exc)
+
+    # ----- reads -----
+
+    async def fetchall(self, sql: str, params: Sequence[Any] = (), *, after: Optional[str] = None) -> list[dict]:
+        return await asyncio.to_thread(self._read, sql, tuple(params), False, after)
+
+    async def fetchone(self, sql: str, params: Sequence[Any] = (), *, after: Optional[str] = None) -> Optional[dict]:
+        return await asyncio.to_thread(self._read, sql, tuple(params), True, after)
+
+    def _read(self, sql: str, params: tuple, one: bool, after: Optional[str]):
+        # Read-your-writes: a client that just got its response sees its history
+        # row, without waiting for writes that do not carry the key it reads.
+        if after is not None:
+            self.flush_key(after)
+        connection = self._acquire_reader()
+        try:
+            cursor = connection.execute(sql, params)
+            if one:
+                row = cursor.fetchone()
+                return dict(row) if row is not None else None
+            return [dict(row) for row in cursor.fetchall()]
+        finally:
+            self._readers.put(connection)
+
+    def _acquire_reader(self) -> sqlite3.Connection:
+        try:
+            return self._readers.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            create = self._reader_count < self.read_connections
+            if create:
+                self._reader_count += 1
+        if not create:
+            return self._readers.get()
+        try:
+            connection = _configure(
+                sqlite3.connect(self.path, check_same_thread=False),
+                busy_timeout_ms=self.busy_timeout_ms,
+            )
+        except BaseException:
+            with self._lock:
+                self._reader_count -= 1
+            raise
+        connection.row_factory = sqlite3.Row
+        return connection
+
+    # ----- lifecycle -----
+
+    def close(self, timeout: Optional[float] = 10.0) -> None:
+        """Commit queued writes, checkpoint the WAL and close every connection."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            writer = self._writer
+        if writer is not None and writer.is_alive():
+            self._queue.put(_STOP, timeout=timeout)
+            writer.join(timeout)
+        while True:
+            try:
+                connection = self._readers.get_nowait()
+            except queue.Empty:
+                break
+            connection.close()
+
+    def metrics(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "path": os.path.basename(self.path),
+                "queued": self._submitted_seq - self._committed_seq,
+                "readConnections": self._reader_count,
+                **self._metrics,
+            }
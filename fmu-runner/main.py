@@ -17,9 +17,9 @@ import shutil
 import asyncio
 import math
 import io
-import zipfile
+import gzip
 import hashlib
-import hmac
+import itertools
 import re
 from datetime import datetime, timezone
 from urllib.parse import urlparse, urlunparse
@@ -29,15 +29,17 @@ try:
 except ImportError:
     posix_resource = None  # Not available on Windows
 from pathlib import Path
-from typing import Any, Optional, cast
-from concurrent.futures import ProcessPoolExecutor, Future
+from typing import Any, Callable, Iterable, Optional, cast
+from concurrent.futures import ProcessPoolExecutor, Future, TimeoutError as FutureTimeoutError
 from collections import defaultdict, deque
+import threading
 from threading import Lock
 from uuid import uuid4
 
 import aiosqlite
 import httpx
 import jwt
+import numpy as np
 from fmpy import read_model_description, simulate_fmu
 from fastapi import FastAPI, HTTPException, Depends, Query, WebSocket, Request
 from fastapi.responses import StreamingResponse, Response, JSONResponse
@@ -45,8 +47,42 @@ from pydantic import BaseModel, Field, field_validator
 from starlette.datastructures import UploadFile
 from xml.etree import ElementTree as ET
 
-from auth import _fetch_jwks, verify_jwt, verify_jwt_token, jwks_health
+from admission_queue import AdmissionQueue, AdmissionQueueFull, AdmissionTicket
+from auth import (
+    _fetch_jwks,
+    claims_cache_metrics,
+    jwks_health,
+    jwks_refresh_metrics,
+    start_jwks_refresher,
+    stop_jwks_refresher,
+    verify_jwt,
+    verify_jwt_token,
+)
+from auth_service_client import AuthServiceClient
+from columnar_result import (
+    NPZ_MEDIA_TYPE,
+    ColumnarResult,
+    discard_columnar_result,
+    export_columns,
+    wants_columnar,
+)
 from fmu_backend import LocalFmuBackend, StationFmuBackend
+from fmu_inventory import FmuEntry, FmuInventory, default_inventory
+from fmu_worker_pool import FmuWorkerLease, FmuWorkerPool
+from history_store import HistoryStore
+from model_metadata_cache import ModelDescriptionCache
+from proxy_artifact import ProxyArtifactTemplate, ProxyRuntimeIndex, ProxyTemplateCache, RuntimeFile
+from result_blobs import (
+    GZIP_MEDIA_TYPE,
+    ResultBlobStore,
+    ResultSpool,
+    ResultTooLargeError,
+    columnar_summary,
+    result_summary,
+)
+from result_cache import ResultCache, result_cache_key
+from result_projection import ResultProjection
+from simulation_scheduler import SimulationScheduler, parse_lab_weights, read_host_limits, size_capacity
 from realtime_ws import RealtimeWsManager
 from station_ws_proxy import StationRealtimeWsProxyManager
 
@@ -75,6 +111,11 @@ FMU_DATA_PATH = os.getenv("FMU_DATA_PATH", "/app/fmu-data")
 _AAS_LINK_DATA_PATH = Path(os.getenv("AAS_LINK_DATA_PATH", "/app/data/aas-links"))
 MAX_SIMULATION_TIMEOUT = int(os.getenv("MAX_SIMULATION_TIMEOUT", "300"))
 MAX_CONCURRENT_PER_MODEL = int(os.getenv("MAX_CONCURRENT_PER_MODEL", "10"))
+# Requests that find their lab's slots taken wait in a bounded per-lab queue
+# (earliest reservation end first). A depth or wait of 0 restores the
+# immediate 429.
+FMU_ADMISSION_QUEUE_DEPTH = max(0, int(os.getenv("FMU_ADMISSION_QUEUE_DEPTH", "32")))
+FMU_ADMISSION_MAX_WAIT_SECONDS = max(0.0, float(os.getenv("FMU_ADMISSION_MAX_WAIT_SECONDS", "30")))
 # Keep the virtual address-space ceiling above the container memory ceiling.
 # FMPy/Numpy can reserve substantial virtual address space before dlopen() maps
 # the FMU binary; the Docker cgroup remains the effective resident-memory cap.
@@ -82,9 +123,62 @@ FMU_WORKER_ADDRESS_SPACE_LIMIT = int(os.getenv(
     "FMU_WORKER_ADDRESS_SPACE_LIMIT",
     str(2 * 1024 ** 3),
 ))
+# Gateway-wide cap on running simulations. 0 sizes it from the cgroup CPU
+# quota and memory limit, assuming FMU_WORKER_MEMORY_BYTES per worker (never
+# more than FMU_WORKER_ADDRESS_SPACE_LIMIT); realtime sessions are left out.
+# FMU_LAB_WEIGHTS ("labId=weight,...") skews the fair share between labs when
+# the cap is contended.
+FMU_GLOBAL_MAX_CONCURRENT = max(0, int(os.getenv("FMU_GLOBAL_MAX_CONCURRENT", "0")))
+FMU_WORKER_MEMORY_BYTES = max(1, int(os.getenv("FMU_WORKER_MEMORY_BYTES", str(512 * 1024 ** 2))))
+FMU_LAB_WEIGHTS = os.getenv("FMU_LAB_WEIGHTS", "")
+# NDJSON streaming: rows per `data` chunk (clients may lower/raise it up to
+# the max with options.chunkSize) and chunks buffered before the worker blocks.
+FMU_STREAM_CHUNK_ROWS = max(1, int(os.getenv("FMU_STREAM_CHUNK_ROWS", "500")))
+FMU_STREAM_MAX_CHUNK_ROWS = max(1, int(os.getenv("FMU_STREAM_MAX_CHUNK_ROWS", "10000")))
+FMU_STREAM_QUEUE_CHUNKS = max(1, int(os.getenv("FMU_STREAM_QUEUE_CHUNKS", "8")))
+# Parameter sweeps: cases accepted per request (after grid expansion).
+FMU_SWEEP_MAX_CASES = max(1, int(os.getenv("FMU_SWEEP_MAX_CASES", "1000")))
+# Warm worker pool: idle workers kept pre-forked, jobs before a worker is
+# recycled, and extracted FMUs each worker keeps loaded.
+FMU_WORKER_POOL_SIZE = max(0, int(os.getenv("FMU_WORKER_POOL_SIZE", "4")))
+FMU_WORKER_MAX_JOBS = max(1, int(os.getenv("FMU_WORKER_MAX_JOBS", "50")))
+FMU_WORKER_MAX_MODELS = max(1, int(os.getenv("FMU_WORKER_MAX_MODELS", "4")))
 MAX_STOP_TIME = float(os.getenv("MAX_STOP_TIME", "86400"))  # 24h upper bound
 MIN_STEP_SIZE = float(os.getenv("MIN_STEP_SIZE", "1e-6"))    # 1 µs lower bound
 HISTORY_DB_PATH = os.getenv("HISTORY_DB_PATH", "/app/data/history.db")
+# History writes are queued and committed in batches by one writer thread;
+# reads share a small connection pool. The WAL is checkpointed periodically.
+FMU_HISTORY_BATCH_SIZE = max(1, int(os.getenv("FMU_HISTORY_BATCH_SIZE", "128")))
+FMU_HISTORY_QUEUE_SIZE = max(1, int(os.getenv("FMU_HISTORY_QUEUE_SIZE", "10000")))
+FMU_HISTORY_READ_CONNECTIONS = max(1, int(os.getenv("FMU_HISTORY_READ_CONNECTIONS", "4")))
+FMU_HISTORY_CHECKPOINT_SECONDS = float(os.getenv("FMU_HISTORY_CHECKPOINT_SECONDS", "60"))
+# History results are stored as gzip blobs (next to the history database
+# unless FMU_RESULT_BLOB_PATH says otherwise); rows keep a reference and
+# summary stats. Blobs expire by age and, oldest first, above the size cap.
+FMU_RESULT_BLOB_PATH = os.getenv("FMU_RESULT_BLOB_PATH", "").strip()
+FMU_RESULT_BLOB_MAX_BYTES = max(0, int(os.getenv("FMU_RESULT_BLOB_MAX_BYTES", str(10 * 1024 ** 3))))
+FMU_RESULT_BLOB_MAX_AGE_SECONDS = max(0.0, float(os.getenv("FMU_RESULT_BLOB_MAX_AGE_SECONDS", str(30 * 86400))))
+# Retention also runs on this interval, so blobs expire without new results.
+FMU_RESULT_BLOB_EVICT_INTERVAL_SECONDS = max(0.0, float(os.getenv("FMU_RESULT_BLOB_EVICT_INTERVAL_SECONDS", "600")))
+# Opt-in content-addressed cache of JSON run results, stored next to the
+# history database unless FMU_RESULT_CACHE_PATH says otherwise.
+FMU_RESULT_CACHE_ENABLED = os.getenv("FMU_RESULT_CACHE_ENABLED", "false").strip().lower() in (
+    "1", "true", "yes", "on",
+)
+FMU_RESULT_CACHE_PATH = os.getenv("FMU_RESULT_CACHE_PATH", "").strip() or os.path.join(
+    os.path.dirname(HISTORY_DB_PATH) or ".", "result-cache",
+)
+FMU_RESULT_CACHE_MAX_BYTES = int(os.getenv("FMU_RESULT_CACHE_MAX_BYTES", str(256 * 1024 ** 2)))
+FMU_RESULT_CACHE_MAX_AGE_SECONDS = float(os.getenv("FMU_RESULT_CACHE_MAX_AGE_SECONDS", "86400"))
+# Parsed modelDescription.xml per FMU (local) or describe payload per
+# accessKey (station). 0 entries disables the cache.
+FMU_METADATA_CACHE_ENTRIES = max(0, int(os.getenv("FMU_METADATA_CACHE_ENTRIES", "64")))
+FMU_METADATA_CACHE_TTL_SECONDS = float(os.getenv("FMU_METADATA_CACHE_TTL_SECONDS", "300"))
+# Precompressed proxy FMU templates per (model, FMI version, runtime build).
+FMU_PROXY_TEMPLATE_CACHE_ENTRIES = max(0, int(os.getenv("FMU_PROXY_TEMPLATE_CACHE_ENTRIES", "32")))
+# The runtime binaries are listed once; directory changes are seen at once,
+# binaries rewritten in place within this many seconds.
+FMU_PROXY_RUNTIME_RESCAN_SECONDS = float(os.getenv("FMU_PROXY_RUNTIME_RESCAN_SECONDS", "60"))
 WS_SESSION_QUEUE_SIZE = int(os.getenv("WS_SESSION_QUEUE_SIZE", "64"))
 WS_HEARTBEAT_SECONDS = float(os.getenv("WS_HEARTBEAT_SECONDS", "15"))
 WS_EXPIRING_NOTICE_SECONDS = int(os.getenv("WS_EXPIRING_NOTICE_SECONDS", "60"))
@@ -102,6 +196,13 @@ AUTH_SESSION_TICKET_REDEEM_URL = os.getenv(
 AUTH_SESSION_TICKET_INTERNAL_TOKEN = _env_or_secret_file("AUTH_SESSION_TICKET_INTERNAL_TOKEN")
 SESSION_OBSERVER_GATEWAY_ID = os.getenv("SESSION_OBSERVER_GATEWAY_ID", "").strip().lower()
 SESSION_OBSERVER_SIGNING_SECRET = _env_or_secret_file("SESSION_OBSERVER_SIGNING_SECRET").strip()
+SESSION_OBSERVER_TOKEN_TTL_SECONDS = 60
+# Keep-alive pool to the auth service for session tickets and observation;
+# only requests that never reached it are retried.
+AUTH_SERVICE_MAX_CONNECTIONS = int(os.getenv("AUTH_SERVICE_MAX_CONNECTIONS", "16"))
+AUTH_SERVICE_MAX_KEEPALIVE = int(os.getenv("AUTH_SERVICE_MAX_KEEPALIVE", "8"))
+AUTH_SERVICE_KEEPALIVE_EXPIRY = float(os.getenv("AUTH_SERVICE_KEEPALIVE_EXPIRY", "15"))
+AUTH_SERVICE_MAX_ATTEMPTS = max(1, int(os.getenv("AUTH_SERVICE_MAX_ATTEMPTS", "3")))
 
 
 def _default_access_audit_url() -> str:
@@ -130,6 +231,19 @@ FMU_LOCAL_REALTIME_ENABLED = os.getenv("FMU_LOCAL_REALTIME_ENABLED", "false").st
 FMU_STATION_BASE_URL = os.getenv("FMU_STATION_BASE_URL", "").strip()
 FMU_STATION_INTERNAL_TOKEN = _env_or_secret_file("FMU_STATION_INTERNAL_TOKEN").strip()
 FMU_STATION_REQUEST_TIMEOUT = float(os.getenv("FMU_STATION_REQUEST_TIMEOUT", "10"))
+# Keep-alive HTTP pool to the Station; FMU_STATION_MAX_CONCURRENCY bounds
+# in-flight describe/catalog/run/health calls (streams are not counted).
+FMU_STATION_MAX_CONNECTIONS = int(os.getenv("FMU_STATION_MAX_CONNECTIONS", "32"))
+FMU_STATION_MAX_KEEPALIVE = int(os.getenv("FMU_STATION_MAX_KEEPALIVE", "16"))
+FMU_STATION_KEEPALIVE_EXPIRY = float(os.getenv("FMU_STATION_KEEPALIVE_EXPIRY", "30"))
+FMU_STATION_MAX_CONCURRENCY = int(os.getenv("FMU_STATION_MAX_CONCURRENCY", "16"))
+FMU_STATION_HTTP2 = os.getenv("FMU_STATION_HTTP2", "false").strip().lower() in (
+    "1", "true", "yes", "on",
+)
+# Shared, multiplexed realtime channels to the Station. 0 keeps one Station
+# WebSocket per public client.
+FMU_STATION_WS_CHANNELS = max(0, int(os.getenv("FMU_STATION_WS_CHANNELS", "0")))
+FMU_STATION_WS_STREAM_QUEUE = max(1, int(os.getenv("FMU_STATION_WS_STREAM_QUEUE", "256")))
 FMU_SESSION_OBSERVATION_MAX_ATTEMPTS = max(
     1, int(os.getenv("FMU_SESSION_OBSERVATION_MAX_ATTEMPTS", "3"))
 )
@@ -162,7 +276,31 @@ logger.setLevel(logging.INFO)
 # ---------------------------------------------------------------------------
 
 _active_counts: dict[str, int] = defaultdict(int)
+# The realtime share of _active_counts; those sessions are bounded per lab only.
+_realtime_counts: dict[str, int] = defaultdict(int)
 _active_lock = Lock()
+_admission_queue = AdmissionQueue(
+    max_depth=FMU_ADMISSION_QUEUE_DEPTH,
+    max_wait_seconds=FMU_ADMISSION_MAX_WAIT_SECONDS,
+)
+
+
+def _create_scheduler() -> SimulationScheduler:
+    limits = read_host_limits()
+    capacity = FMU_GLOBAL_MAX_CONCURRENT or size_capacity(
+        limits,
+        worker_memory_bytes=FMU_WORKER_MEMORY_BYTES,
+        address_space_limit=FMU_WORKER_ADDRESS_SPACE_LIMIT,
+    )
+    try:
+        weights = parse_lab_weights(FMU_LAB_WEIGHTS)
+    except ValueError as exc:
+        logger.error("Ignoring FMU_LAB_WEIGHTS: %s", exc)
+        weights = {}
+    return SimulationScheduler(capacity, weights=weights, limits=limits)
+
+
+_scheduler = _create_scheduler()
 
 _proxy_download_hits: dict[str, deque[float]] = defaultdict(deque)
 _proxy_download_lock = Lock()
@@ -193,44 +331,256 @@ def _allow_proxy_download(key: str) -> bool:
         return True
 
 
+def _concurrency_limit_error(detail: Optional[str] = None) -> HTTPException:
+    return HTTPException(
+        status_code=429,
+        detail=detail or f"Concurrency limit ({MAX_CONCURRENT_PER_MODEL}) reached for this FMU. Try again shortly.",
+        headers={"Retry-After": str(max(1, math.ceil(FMU_ADMISSION_MAX_WAIT_SECONDS)))},
+    )
+
+
+def _scheduled_counts() -> dict[str, int]:
+    """Running simulations per lab that count toward the gateway-wide cap.
+
+    Realtime sessions are long-lived and idle most of the time, so they are
+    left out. Call with ``_active_lock`` held.
+    """
+    return {lab_id: count - _realtime_counts.get(lab_id, 0) for lab_id, count in _active_counts.items()}
+
+
+def _slot_limit_reason(lab_id: str) -> str:
+    """Which limit is keeping *lab_id* waiting; call with ``_active_lock`` held."""
+    if _active_counts[lab_id] < MAX_CONCURRENT_PER_MODEL and not _scheduler.has_room(_scheduled_counts()):
+        return f"Gateway-wide simulation limit ({_scheduler.capacity}) reached"
+    return f"Concurrency limit ({MAX_CONCURRENT_PER_MODEL}) reached for this FMU"
+
+
 def _acquire_slot(lab_id: str):
     """Acquire a concurrency slot for *lab_id*. Raises 429 if limit reached."""
+    if not _try_acquire_slot(lab_id):
+        with _active_lock:
+            reason = _slot_limit_reason(lab_id)
+        raise _concurrency_limit_error(f"{reason}. Try again shortly.")
+
+
+def _lab_slot_free(lab_id: str) -> bool:
+    """Whether *lab_id* is below its own limit; call with ``_active_lock`` held."""
+    # Queued requests go first: a free slot is theirs, not a newcomer's.
+    return _active_counts[lab_id] < MAX_CONCURRENT_PER_MODEL and not _admission_queue.waiting(lab_id)
+
+
+def _slot_free_for(lab_id: str) -> bool:
+    """Whether *lab_id* may start a simulation now; call with ``_active_lock`` held."""
+    return _lab_slot_free(lab_id) and _scheduler.has_room(_scheduled_counts())
+
+
+def _try_acquire_slot(lab_id: str) -> bool:
     with _active_lock:
-        if _active_counts[lab_id] >= MAX_CONCURRENT_PER_MODEL:
-            raise HTTPException(
-                status_code=429,
-                detail=f"Concurrency limit ({MAX_CONCURRENT_PER_MODEL}) reached for this FMU. Try again shortly.",
-            )
+        if not _slot_free_for(lab_id):
+            return False
         _active_counts[lab_id] += 1
+        return True
 
 
 def _release_slot(lab_id: str):
     with _active_lock:
         _active_counts[lab_id] = max(0, _active_counts[lab_id] - 1)
+        _dispatch_waiting_slots()
+
+
+def _acquire_realtime_slot(lab_id: str):
+    """Acquire a per-lab slot for a realtime session; the gateway-wide cap does not apply."""
+    with _active_lock:
+        if not _lab_slot_free(lab_id):
+            raise _concurrency_limit_error()
+        _active_counts[lab_id] += 1
+        _realtime_counts[lab_id] += 1
+
+
+def _release_realtime_slot(lab_id: str):
+    with _active_lock:
+        _realtime_counts[lab_id] = max(0, _realtime_counts[lab_id] - 1)
+        _active_counts[lab_id] = max(0, _active_counts[lab_id] - 1)
+        _dispatch_waiting_slots()
+
+
+def _dispatch_waiting_slots() -> None:
+    """Give free capacity to queued requests, the lab furthest below its share first.
+
+    Call with ``_active_lock`` held.
+    """
+    while _scheduler.has_room(scheduled := _scheduled_counts()):
+        eligible = [
+            waiting_lab for waiting_lab in _admission_queue.waiting_labs()
+            if _active_counts[waiting_lab] < MAX_CONCURRENT_PER_MODEL
+        ]
+        chosen = _scheduler.next_lab(scheduled, eligible)
+        if chosen is None:
+            return
+        if _admission_queue.grant(chosen):
+            _active_counts[chosen] += 1
+
+
+def _enqueue_for_slot(lab_id: str, claims: dict) -> Optional[AdmissionTicket]:
+    """Take a slot for *lab_id* now (``None``) or join its wait queue.
+
+    Raises 429 when queueing is disabled or the lab's queue is full.
+    """
+    with _active_lock:
+        if _slot_free_for(lab_id):
+            _active_counts[lab_id] += 1
+            return None
+        reason = _slot_limit_reason(lab_id)
+        if MAX_CONCURRENT_PER_MODEL <= 0 or not _admission_queue.enabled:
+            raise _concurrency_limit_error(f"{reason}. Try again shortly.")
+        try:
+            return _admission_queue.enqueue(lab_id, deadline=_coerce_epoch_seconds(claims.get("exp")))
+        except AdmissionQueueFull:
+            raise _concurrency_limit_error(
+                f"{reason} and the wait queue for this FMU is full. Try again shortly."
+            ) from None
+
+
+async def _slot_wait_positions(ticket: AdmissionTicket):
+    """Yield the ticket's queue position whenever it changes, until its slot is granted.
+
+    Raises 429 after ``FMU_ADMISSION_MAX_WAIT_SECONDS``. A caller that stops
+    early must pass the ticket to ``_abandon_slot_wait``.
+    """
+    reported = None
+    while True:
+        position = _admission_queue.position(ticket)
+        if position is None:
+            return
+        if position != reported:
+            reported = position
+            yield position
+        remaining = ticket.expires_at - time.monotonic()
+        if remaining <= 0:
+            if _admission_queue.withdraw(ticket, timed_out=True):
+                with _active_lock:
+                    reason = _slot_limit_reason(ticket.lab_id)
+                raise _concurrency_limit_error(
+                    f"{reason}; no slot became free within "
+                    f"{FMU_ADMISSION_MAX_WAIT_SECONDS:g}s. Try again shortly."
+                )
+            return
+        if await _admission_queue.wait(ticket, min(1.0, remaining)):
+            return
+
+
+def _abandon_slot_wait(ticket: AdmissionTicket) -> None:
+    if not _admission_queue.withdraw(ticket):
+        # Granted while the caller was giving up: pass the slot on.
+        _release_slot(ticket.lab_id)
+
+
+async def _admit(lab_id: str, claims: dict) -> None:
+    """Hold a slot for *lab_id*, waiting in its queue if necessary."""
+    ticket = _enqueue_for_slot(lab_id, claims)
+    if ticket is None:
+        return
+    try:
+        async for _position in _slot_wait_positions(ticket):
+            pass
+    except BaseException:
+        _abandon_slot_wait(ticket)
+        raise
 
 
 # ---------------------------------------------------------------------------
 # Execution pool for simulations
 # ---------------------------------------------------------------------------
 
+def _run_pooled_simulation(*args, **kwargs):
+    """Worker entry point; resolves ``_run_simulation`` at call time."""
+    return _run_simulation(*args, **kwargs)
+
+
+def _fmu_content_digest(fmu_path: str) -> str:
+    """SHA-256 of an FMU file from the inventory's shared, persisted digests.
+
+    The worker pool, the metadata cache, the result cache and AAS all use
+    it, so each FMU version is hashed once.
+    """
+    return _fmu_inventory().sha256_file(fmu_path)
+
+
 def _create_executor():
     try:
-        return ProcessPoolExecutor(max_workers=4)
+        return FmuWorkerPool(
+            _run_pooled_simulation,
+            # Idle workers beyond what the scheduler can ever run only hold memory.
+            size=min(FMU_WORKER_POOL_SIZE, _scheduler.capacity),
+            max_jobs_per_worker=FMU_WORKER_MAX_JOBS,
+            max_models_per_worker=FMU_WORKER_MAX_MODELS,
+            digest=_fmu_content_digest,
+        )
     except (PermissionError, OSError) as exc:
         # Never run native FMU code in an ASGI thread. A thread cannot be
         # force-terminated when an FMU blocks in a native call, so fail closed
         # and let the API report that local execution is unavailable.
-        logger.error("ProcessPoolExecutor unavailable; local FMU execution disabled: %s", exc)
+        logger.error("FMU worker pool unavailable; local FMU execution disabled: %s", exc)
         return None
 
 
 _executor = _create_executor()
+_result_cache: Optional[ResultCache] = (
+    ResultCache(
+        FMU_RESULT_CACHE_PATH,
+        max_bytes=FMU_RESULT_CACHE_MAX_BYTES,
+        max_age_seconds=FMU_RESULT_CACHE_MAX_AGE_SECONDS,
+    )
+    if FMU_RESULT_CACHE_ENABLED
+    else None
+)
+
+
+_model_metadata_cache = ModelDescriptionCache(
+    max_entries=FMU_METADATA_CACHE_ENTRIES,
+    max_age_seconds=FMU_METADATA_CACHE_TTL_SECONDS,
+    # Revalidation reuses the shared digests instead of re-reading the FMU.
+    digest=lambda path: _fmu_content_digest(str(path)),
+)
+
+
+_proxy_template_cache = ProxyTemplateCache(max_entries=FMU_PROXY_TEMPLATE_CACHE_ENTRIES)
+# Template builds in flight, so concurrent misses for one key deflate once.
+_proxy_template_builds: dict[Any, asyncio.Future] = {}
+_proxy_runtime_index_instance: Optional[ProxyRuntimeIndex] = None
+_proxy_runtime_index_lock = Lock()
+
+
+def _proxy_runtime_index() -> ProxyRuntimeIndex:
+    """Return the runtime index for ``FMU_PROXY_RUNTIME_PATH``, replacing it if the path changed."""
+    global _proxy_runtime_index_instance
+    root = Path(FMU_PROXY_RUNTIME_PATH).resolve()
+    with _proxy_runtime_index_lock:
+        index = _proxy_runtime_index_instance
+        if index is None or index.root != root:
+            index = _proxy_runtime_index_instance = ProxyRuntimeIndex(
+                root, rescan_seconds=FMU_PROXY_RUNTIME_RESCAN_SECONDS,
+            )
+        return index
+
+
+_auth_service_client = AuthServiceClient(
+    max_connections=AUTH_SERVICE_MAX_CONNECTIONS,
+    max_keepalive_connections=AUTH_SERVICE_MAX_KEEPALIVE,
+    keepalive_expiry=AUTH_SERVICE_KEEPALIVE_EXPIRY,
+    max_attempts=AUTH_SERVICE_MAX_ATTEMPTS,
+)
+
+
+def _read_model_description_cached(fmu_path: str | Path):
+    return _model_metadata_cache.get(fmu_path, read_model_description)
+
 
 # ---------------------------------------------------------------------------
 # Running-simulation registry (for cancellation — #17)
 # ---------------------------------------------------------------------------
 
-_running_futures: dict[str, tuple[Future, str, str, str, Optional[ProcessPoolExecutor]]] = {}
+_running_futures: dict[str, tuple[Future, str, str, str, Any]] = {}
 _running_lock = Lock()
 
 
@@ -239,7 +589,7 @@ def _track_running_future(
     future: Future,
     lab_id: str,
     claims: dict,
-    executor: Optional[ProcessPoolExecutor] = None,
+    executor: Any = None,
 ):
     with _running_lock:
         _running_futures[sim_id] = (
@@ -253,6 +603,15 @@ def _track_running_future(
 
 def _shutdown_simulation_executor(executor: Any, *, force: bool = False) -> None:
     """Stop one isolated worker pool, killing native workers on cancellation."""
+    if isinstance(executor, FmuWorkerLease):
+        # A pooled worker cannot be interrupted mid-call either: kill it and
+        # let the pool replace it. Completed leases are already returned.
+        if force:
+            executor.kill()
+        return
+    if isinstance(executor, FmuWorkerPool):
+        executor.shutdown(wait=False, cancel_futures=True)
+        return
     if not isinstance(executor, ProcessPoolExecutor):
         return
     if force:
@@ -267,29 +626,52 @@ def _shutdown_simulation_executor(executor: Any, *, force: bool = False) -> None
     executor.shutdown(wait=False, cancel_futures=True)
 
 
-def _submit_simulation(*args):
-    """Submit work to a fresh one-process pool in production.
+def _submit_simulation(*args, on_chunk=None):
+    """Lease a warm worker from the pool in production.
 
-    Tests may replace ``_executor`` with a lightweight fake; in
-    that case the replacement is used directly so the contract remains easy
-    to exercise without spawning processes.
+    The returned handle is what ``_shutdown_simulation_executor`` kills on
+    timeout or cancellation. ``on_chunk`` receives rows streamed by the worker
+    (pool only). Tests may replace ``_executor`` with a lightweight
+    fake; in that case the replacement is used directly so the contract
+    remains easy to exercise without spawning processes.
     """
     if _executor is None:
         raise RuntimeError("isolated FMU worker pool is unavailable")
-    if isinstance(_executor, ProcessPoolExecutor):
-        try:
-            executor = ProcessPoolExecutor(max_workers=1)
-        except (PermissionError, OSError) as exc:
-            raise RuntimeError("isolated FMU worker pool is unavailable") from exc
-        try:
-            future = executor.submit(_run_simulation, *args)
-        except Exception:
-            _shutdown_simulation_executor(executor, force=True)
-            raise
-        return executor, future
+    if isinstance(_executor, FmuWorkerPool):
+        return _executor.submit(*args, on_chunk=on_chunk)
     return _executor, _executor.submit(_run_simulation, *args)
 
 
+async def _submit_simulation_off_loop(*args, on_chunk=None):
+    """``_submit_simulation`` in a worker thread.
+
+    Submitting may hash the FMU and fork a worker, which must not stall the
+    event loop. If the caller is cancelled meanwhile, the job it would have
+    owned is killed as soon as the submission returns.
+    """
+    submission = asyncio.ensure_future(asyncio.to_thread(_submit_simulation, *args, on_chunk=on_chunk))
+    try:
+        return await asyncio.shield(submission)
+    except asyncio.CancelledError:
+        submission.add_done_callback(_kill_orphaned_submission)
+        raise
+
+
+def _kill_orphaned_submission(submission: asyncio.Future) -> None:
+    if submission.cancelled() or submission.exception() is not None:
+        return
+    job_executor, future = submission.result()
+    future.add_done_callback(_discard_abandoned_result)
+    _shutdown_simulation_executor(job_executor, force=True)
+
+
+def _discard_abandoned_result(future: Future) -> None:
+    """Release shared memory of a result that finished after its caller gave up."""
+    if future.cancelled() or future.exception() is not None:
+        return
+    discard_columnar_result(future.result())
+
+
 def _finalize_simulation_tracking(sim_id: str, lab_id_fallback: Optional[str] = None):
     """Remove simulation from registry and release one concurrency slot."""
     lab_to_release = lab_id_fallback
@@ -314,14 +696,33 @@ async def _lifespan(_app: FastAPI):
             await _fetch_jwks(force=True)
         except HTTPException:
             logging.warning("JWKS preload failed; health will remain DOWN until keys are loaded")
+    start_jwks_refresher()
     if _realtime_manager is not None:
         await _realtime_manager.start()
+    if isinstance(_executor, FmuWorkerPool) and _fmu_backend.supports_local_execution:
+        try:
+            await asyncio.to_thread(_executor.warm)
+        except RuntimeError:
+            logger.warning("FMU worker pre-fork failed; workers will be started on demand")
+    blob_retention = None
+    if FMU_RESULT_BLOB_EVICT_INTERVAL_SECONDS and _fmu_backend.supports_local_execution:
+        blob_retention = asyncio.create_task(_result_blob_retention_loop())
     try:
         yield
     finally:
+        if blob_retention is not None:
+            blob_retention.cancel()
+            try:
+                await blob_retention
+            except asyncio.CancelledError:
+                pass
+        await stop_jwks_refresher()
         if _realtime_manager is not None:
             await _realtime_manager.stop()
+        await _fmu_backend.aclose()
+        await _auth_service_client.aclose()
         _shutdown_simulation_executor(_executor)
+        await _close_history_store()
         await _cleanup_temp_files()
 
 
@@ -333,10 +734,72 @@ app = FastAPI(title="FMU Runner", version="0.2.0", lifespan=_lifespan)
 # #29 — Simulation history (SQLite)
 # ---------------------------------------------------------------------------
 
+_history_store_instance: Optional[HistoryStore] = None
+_history_store_lock = Lock()
+
+
+def _history_store() -> HistoryStore:
+    """Return the store for ``HISTORY_DB_PATH``, replacing it if the path changed."""
+    global _history_store_instance
+    with _history_store_lock:
+        previous = _history_store_instance
+        if previous is not None and previous.path == HISTORY_DB_PATH:
+            return previous
+        _history_store_instance = HistoryStore(
+            HISTORY_DB_PATH,
+            batch_size=FMU_HISTORY_BATCH_SIZE,
+            queue_size=FMU_HISTORY_QUEUE_SIZE,
+            read_connections=FMU_HISTORY_READ_CONNECTIONS,
+            checkpoint_interval_seconds=FMU_HISTORY_CHECKPOINT_SECONDS,
+        )
+        store = _history_store_instance
+    if previous is not None:
+        previous.close()
+    return store
+
+
+_result_blob_store_instance: Optional[ResultBlobStore] = None
+
+
+def _result_blob_store() -> ResultBlobStore:
+    """Return the blob store for the current history location."""
+    global _result_blob_store_instance
+    directory = Path(FMU_RESULT_BLOB_PATH or os.path.join(os.path.dirname(HISTORY_DB_PATH) or ".", "results"))
+    with _history_store_lock:
+        store = _result_blob_store_instance
+        if store is None or store.directory != directory:
+            store = _result_blob_store_instance = ResultBlobStore(
+                directory,
+                max_bytes=FMU_RESULT_BLOB_MAX_BYTES,
+                max_age_seconds=FMU_RESULT_BLOB_MAX_AGE_SECONDS,
+            )
+        return store
+
+
+async def _result_blob_retention_loop() -> None:
+    """Expire history blobs on a timer; writes alone would leave a quiet gateway's blobs on disk."""
+    while True:
+        try:
+            await asyncio.to_thread(_result_blob_store().evict)
+        except Exception as exc:
+            logger.warning("Result blob retention failed: %s", exc)
+        await asyncio.sleep(FMU_RESULT_BLOB_EVICT_INTERVAL_SECONDS)
+
+
+async def _close_history_store() -> None:
+    global _history_store_instance
+    with _history_store_lock:
+        store, _history_store_instance = _history_store_instance, None
+    if store is not None:
+        await asyncio.to_thread(store.close)
+
+
 async def _init_db():
     """Create history DB schema if needed."""
     os.makedirs(os.path.dirname(HISTORY_DB_PATH) or ".", exist_ok=True)
     async with aiosqlite.connect(HISTORY_DB_PATH) as db:
+        # WAL is persistent: set once here so readers never wait on the writer.
+        await db.execute("PRAGMA journal_mode=WAL")
         await db.execute("""
             CREATE TABLE IF NOT EXISTS simulation_history (
                 id TEXT PRIMARY KEY,
@@ -357,40 +820,193 @@ async def _init_db():
         """)
         cursor = await db.execute("PRAGMA table_info(simulation_history)")
         columns = {row[1] for row in await cursor.fetchall()}
-        for name in ("reservation_key", "puc_hash", "credential_hash"):
+        for name in ("reservation_key", "puc_hash", "credential_hash", "result_sha256", "result_summary"):
+            if name not in columns:
+                await db.execute(f"ALTER TABLE simulation_history ADD COLUMN {name} TEXT")
+        if "result_size" not in columns:
+            await db.execute("ALTER TABLE simulation_history ADD COLUMN result_size INTEGER")
+        # Binding columns hold the trimmed, lower-cased reservationKey/pucHash so
+        # lookups compare plain columns (and can use an index) instead of lower().
+        for name, source in (("reservation_key_norm", "reservation_key"), ("puc_hash_norm", "puc_hash")):
             if name not in columns:
                 await db.execute(f"ALTER TABLE simulation_history ADD COLUMN {name} TEXT")
+                await db.execute(f"UPDATE simulation_history SET {name} = lower(trim({source}))")
         await db.execute("CREATE INDEX IF NOT EXISTS idx_history_lab ON simulation_history(lab_id)")
         await db.execute(
             "CREATE INDEX IF NOT EXISTS idx_history_reservation ON simulation_history(lab_id, reservation_key)"
         )
+        # Covers the history listing: filter, keyset order and every listed column,
+        # so a page never reads the (large) result rows.
+        await db.execute(
+            "CREATE INDEX IF NOT EXISTS idx_history_binding ON simulation_history("
+            "lab_id, reservation_key_norm, puc_hash_norm, created_at DESC, id DESC, "
+            "user_sub, fmu_filename, fmi_type, elapsed_seconds, status)"
+        )
+        # A parameter sweep is one history row; each case is a row here.
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS simulation_sweep_cases (
+                sweep_id TEXT NOT NULL,
+                case_index INTEGER NOT NULL,
+                parameters TEXT,
+                status TEXT,
+                detail TEXT,
+                elapsed_seconds REAL,
+                result TEXT,
+                result_sha256 TEXT,
+                result_size INTEGER,
+                result_summary TEXT,
+                PRIMARY KEY (sweep_id, case_index)
+            )
+        """)
         await db.commit()
 
 
-async def _save_history(sim_id, lab_id, claims, fmu_filename, fmi_type, params, options, result, elapsed):
-    """Persist a completed simulation to SQLite."""
+def _history_binding(value: Any) -> Optional[str]:
+    return str(value).strip().lower() if value is not None else None
+
+
+def _history_lab_key(lab_id: Any) -> str:
+    """History write key of a lab's listing; row reads use the row id."""
+    return f"lab:{lab_id}"
+
+
+def _stored_result_columns(blobs: ResultBlobStore, result: Any) -> tuple:
+    """``(inline result, digest, size, summary)`` for a history row; runs on the writer thread."""
+    if isinstance(result, ResultSpool):
+        try:
+            return _stored_streamed_columns(blobs, result.iter_json, lambda: result.summary)
+        finally:
+            result.close()
+    if isinstance(result, ColumnarResult):
+        return _stored_streamed_columns(blobs, result.iter_json, lambda: columnar_summary(result))
+    payload = result if isinstance(result, str) else json.dumps(result)
+    encoded = payload.encode("utf-8")
+    summary = result_summary(json.loads(payload) if isinstance(result, str) else result)
+    inline: Optional[str] = None
+    try:
+        digest: Optional[str] = blobs.put(encoded)
+    except ResultTooLargeError as exc:
+        _log_result_too_large(exc)
+        digest = exc.digest
+    except OSError as exc:
+        logger.warning("Unable to store simulation result blob; keeping it inline: %s", exc)
+        digest, inline = None, payload
+    return inline, digest, len(encoded), json.dumps(summary)
+
+
+def _log_result_too_large(exc: ResultTooLargeError) -> None:
+    # The row keeps the digest and summary only, so the result reads as expired.
+    logger.warning("Simulation result is too large to store; keeping its summary only: %s", exc)
+
+
+def _stored_streamed_columns(blobs: ResultBlobStore, iter_json: Callable[[], Iterable[bytes]],
+                             summary: Callable[[], dict]) -> tuple:
+    """Stream result JSON into the blob store; an inline copy is only built if that fails.
+
+    ``summary`` is read once the JSON has been produced, as a spool fills it in
+    while emitting.
+    """
     try:
-        async with aiosqlite.connect(HISTORY_DB_PATH) as db:
-            await db.execute(
-                "INSERT INTO simulation_history "
-                "(id,lab_id,user_sub,reservation_key,puc_hash,credential_hash,fmu_filename,fmi_type,parameters,options,result,elapsed_seconds) "
-                "VALUES (?,?,?,?,?,?,?,?,?,?,?,?)",
-                (
-                    sim_id,
-                    str(lab_id),
-                    claims.get("sub"),
-                    claims.get("reservationKey"),
-                    claims.get("pucHash"),
-                    claims.get("_credentialHash"),
-                    fmu_filename,
-                    fmi_type,
-                    json.dumps(params),
-                    json.dumps(options),
-                    json.dumps(result),
-                    elapsed,
-                ),
-            )
-            await db.commit()
+        digest, size = blobs.put_stream(iter_json())
+        return None, digest, size, json.dumps(summary())
+    except ResultTooLargeError as exc:
+        _log_result_too_large(exc)
+        return None, exc.digest, exc.size, json.dumps(summary())
+    except OSError as exc:
+        logger.warning("Unable to store simulation result blob; keeping it inline: %s", exc)
+    payload = b"".join(iter_json())
+    return payload.decode("utf-8"), None, len(payload), json.dumps(summary())
+
+
+async def _save_history(sim_id, lab_id, claims, fmu_filename, fmi_type, params, options, result, elapsed,
+                        status="completed"):
+    """Queue a completed simulation for the history writer.
+
+    ``result`` may be JSON text, a result dict, a detached ``ColumnarResult``
+    (binary result responses) or the ``ResultSpool`` of a streamed run, which
+    the writer closes; dicts and columns are serialised on the writer thread,
+    so persistence adds no latency to the response. The result goes to the
+    blob store and the row keeps its digest and summary stats. A result too
+    large for the store keeps only those, and an inline copy is written only
+    if the blob cannot be written for another reason.
+    """
+    claims_snapshot = (
+        claims.get("sub"),
+        claims.get("reservationKey"),
+        claims.get("pucHash"),
+        claims.get("_credentialHash"),
+        _history_binding(claims.get("reservationKey")),
+        _history_binding(claims.get("pucHash")),
+    )
+
+    blobs = _result_blob_store()
+
+    def _row():
+        return (
+            sim_id,
+            str(lab_id),
+            *claims_snapshot,
+            fmu_filename,
+            fmi_type,
+            json.dumps(params),
+            json.dumps(options),
+            *_stored_result_columns(blobs, result),
+            elapsed,
+            status,
+        )
+
+    queued = False
+    try:
+        queued = _history_store().submit(
+            "INSERT INTO simulation_history "
+            "(id,lab_id,user_sub,reservation_key,puc_hash,credential_hash,reservation_key_norm,puc_hash_norm,"
+            "fmu_filename,fmi_type,parameters,options,result,result_sha256,result_size,result_summary,"
+            "elapsed_seconds,status) "
+            "VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)",
+            _row,
+            keys=(sim_id, _history_lab_key(lab_id)),
+        )
+    except Exception as exc:
+        logger.error("Failed to save simulation history: %s", exc)
+    if not queued and isinstance(result, ResultSpool):
+        result.close()
+
+
+def _save_sweep_case(sweep_id: str, case_index: int, params: dict, status: str,
+                     result: Any, elapsed: float, detail: Optional[str] = None) -> None:
+    """Queue one sweep case row; its result goes to the blob store like a run's."""
+    blobs = _result_blob_store()
+
+    def _row():
+        stored = _stored_result_columns(blobs, result) if result is not None else (None, None, None, None)
+        return (sweep_id, case_index, json.dumps(params), status, detail, elapsed, *stored)
+
+    try:
+        _history_store().submit(
+            "INSERT OR REPLACE INTO simulation_sweep_cases "
+            "(sweep_id,case_index,parameters,status,detail,elapsed_seconds,"
+            "result,result_sha256,result_size,result_summary) VALUES (?,?,?,?,?,?,?,?,?,?)",
+            _row,
+            keys=(sweep_id,),
+        )
+    except Exception as exc:
+        logger.error("Failed to save sweep case history: %s", exc)
+
+
+def _finish_sweep_history(sweep_id: str, lab_id: Any, status: str, outcomes: list, elapsed: float) -> None:
+    """Queue the final status and case summary of a sweep recorded as ``running``."""
+    blobs = _result_blob_store()
+
+    def _row():
+        return (*_stored_result_columns(blobs, {"cases": outcomes}), elapsed, status, sweep_id)
+
+    try:
+        _history_store().submit(
+            "UPDATE simulation_history SET result=?,result_sha256=?,result_size=?,result_summary=?,"
+            "elapsed_seconds=?,status=? WHERE id=?",
+            _row,
+            keys=(sweep_id, _history_lab_key(lab_id)),
+        )
     except Exception as exc:
         logger.error("Failed to save simulation history: %s", exc)
 
@@ -411,6 +1027,14 @@ class SimulationRequest(BaseModel):
         return value
 
 
+class SweepRequest(SimulationRequest):
+    """A parameter sweep: ``cases`` (parameter overrides) and/or a ``grid``
+    (name -> values, expanded as a cartesian product), each merged over
+    ``parameters``."""
+    cases: list[dict] = Field(default_factory=list)
+    grid: dict[str, list] = Field(default_factory=dict)
+
+
 # ----- helpers -----
 
 def _is_within_base(base: Path, candidate: Path) -> bool:
@@ -502,46 +1126,32 @@ def _effective_timeout_seconds(requested_timeout: int, claims: dict) -> int:
     return min(capped_timeout, remaining)
 
 
-def _resolve_fmu_path(fmu_filename: str) -> Path:
-    """Search *FMU_DATA_PATH* for a .fmu file matching *fmu_filename*."""
+def _fmu_inventory() -> FmuInventory:
+    return default_inventory(FMU_DATA_PATH)
+
+
+def _find_fmu_entry(fmu_filename: str) -> FmuEntry:
+    """Look up *fmu_filename* in the FMU inventory of *FMU_DATA_PATH*.
+
+    Matches come from directory enumeration of the trusted root (directly or
+    one provider sub-directory deep, fmu-data/<provider-wallet>/file.fmu);
+    no path is ever constructed from the request value.
+    """
     fmu_filename = _validate_storage_key(fmu_filename, "FMU filename")
     if not fmu_filename.lower().endswith(".fmu"):
         raise HTTPException(status_code=400, detail="Only .fmu files are accepted")
-    base = Path(FMU_DATA_PATH).resolve()
-    if not base.is_dir():
+    inventory = _fmu_inventory()
+    if not inventory.available():
         raise HTTPException(status_code=503, detail="FMU data directory is unavailable")
+    entry = inventory.find(fmu_filename)
+    if entry is None:
+        raise HTTPException(status_code=404, detail=f"FMU file not found: {fmu_filename}")
+    return entry
 
-    def _trusted_match(directory: Path) -> Optional[Path]:
-        """Return a matching file already discovered under the trusted root."""
-        try:
-            entries = directory.iterdir()
-        except OSError:
-            return None
-        for entry in entries:
-            # Compare against the directory entry name; never construct a path
-            # by appending the request value to a filesystem path.
-            if os.path.normcase(entry.name) != os.path.normcase(fmu_filename):
-                continue
-            try:
-                resolved = entry.resolve(strict=True)
-            except OSError:
-                continue
-            if _is_within_base(base, resolved) and resolved.is_file():
-                return resolved
-        return None
-
-    # Direct match.  The path comes from directory enumeration, not user input.
-    direct = _trusted_match(base)
-    if direct is not None:
-        return direct
 
-    # Search in provider sub-directories (fmu-data/<provider-wallet>/file.fmu).
-    for child in base.iterdir():
-        if child.is_dir():
-            candidate = _trusted_match(child)
-            if candidate is not None:
-                return candidate
-    raise HTTPException(status_code=404, detail=f"FMU file not found: {fmu_filename}")
+def _resolve_fmu_path(fmu_filename: str) -> Path:
+    """Search *FMU_DATA_PATH* for a .fmu file matching *fmu_filename*."""
+    return _find_fmu_entry(fmu_filename).path
 
 
 def _extract_authorization_header(request: Request) -> Optional[str]:
@@ -890,9 +1500,9 @@ def _public_model_metadata(metadata: dict) -> dict:
 
 def _local_backend_health_payload() -> dict:
     checks = {"fmuDataPath": False, "executor": False}
-    base = Path(FMU_DATA_PATH)
-    checks["fmuDataPath"] = base.is_dir()
-    fmu_count = sum(1 for _ in base.rglob("*.fmu")) if checks["fmuDataPath"] else 0
+    inventory = _fmu_inventory()
+    checks["fmuDataPath"] = inventory.available()
+    fmu_count = inventory.count() if checks["fmuDataPath"] else 0
     try:
         checks["executor"] = (
             _executor is not None
@@ -901,35 +1511,52 @@ def _local_backend_health_payload() -> dict:
     except Exception:
         checks["executor"] = False
     overall = all(checks.values())
-    return {
+    payload = {
         "status": "UP" if overall else "DEGRADED",
         "checks": checks,
         "fmuCount": fmu_count,
         "backendMode": "local",
     }
+    if isinstance(_executor, FmuWorkerPool):
+        payload["workerPool"] = _executor.metrics()
+    if _result_cache is not None:
+        payload["resultCache"] = _result_cache.metrics()
+    payload["metadataCache"] = _model_metadata_cache.metrics()
+    payload["fmuInventory"] = inventory.metrics()
+    payload["admissionQueue"] = _admission_queue.metrics()
+    with _active_lock:
+        running = {key: count for key, count in _scheduled_counts().items() if count}
+    payload["scheduler"] = _scheduler.snapshot(running, _admission_queue.waiting_labs())
+    if _history_store_instance is not None:
+        payload["historyStore"] = _history_store_instance.metrics()
+    if _result_blob_store_instance is not None:
+        payload["resultBlobs"] = _result_blob_store_instance.metrics()
+    return payload
 
 
 def _load_local_model_metadata(fmu_filename: str) -> dict:
     fmu_path = _resolve_fmu_path(fmu_filename)
     try:
-        md = read_model_description(str(fmu_path))
+        return _model_metadata_cache.derived(
+            fmu_path,
+            "metadata",
+            read_model_description,
+            _model_metadata_from_model_description,
+        )
+    except HTTPException:
+        raise
     except Exception as exc:
         logger.error("Failed to read model description for %s: %s", fmu_filename, exc)
         raise HTTPException(status_code=422, detail="Cannot parse FMU") from exc
-    return _model_metadata_from_model_description(md)
 
 
 def _list_local_fmus_payload(claimed_file: str) -> dict:
-    resolved = _resolve_fmu_path(claimed_file)
-    base = Path(FMU_DATA_PATH).resolve()
-    if not _is_within_base(base, resolved):
-        return {"fmus": []}
-    rel = resolved.relative_to(base)
+    entry = _find_fmu_entry(claimed_file)
     return {
         "fmus": [{
-            "filename": resolved.name,
-            "path": str(rel),
-            "sizeBytes": resolved.stat().st_size,
+            "filename": entry.path.name,
+            "path": entry.relative,
+            "sizeBytes": entry.size,
             "source": "provisioned",
         }]
     }
@@ -942,6 +1569,13 @@ def _build_fmu_backend():
             base_url=FMU_STATION_BASE_URL,
             internal_token=FMU_STATION_INTERNAL_TOKEN,
             request_timeout=FMU_STATION_REQUEST_TIMEOUT,
+            max_connections=FMU_STATION_MAX_CONNECTIONS,
+            max_keepalive_connections=FMU_STATION_MAX_KEEPALIVE,
+            keepalive_expiry=FMU_STATION_KEEPALIVE_EXPIRY,
+            max_concurrency=FMU_STATION_MAX_CONCURRENCY,
+            http2=FMU_STATION_HTTP2,
+            metadata_cache_entries=FMU_METADATA_CACHE_ENTRIES,
+            metadata_cache_ttl=FMU_METADATA_CACHE_TTL_SECONDS,
         )
 
     if FMU_BACKEND_MODE != "local":
@@ -1009,7 +1643,7 @@ async def _stream_station_simulation(request: Request, req: SimulationRequest, c
     # A failed Station call is therefore an accepted-but-not-released job, not
     # work that ran without durable evidence.
     await _record_browser_session_started(request, claims, sim_id)
-    client, response = await station_backend.open_authorized_simulation_stream(
+    response = await station_backend.open_authorized_simulation_stream(
         claims=claims,
         request_payload=_simulation_request_payload(req, sim_id),
         authorization=authorization,
@@ -1023,7 +1657,6 @@ async def _stream_station_simulation(request: Request, req: SimulationRequest, c
                     yield chunk
         finally:
             await response.aclose()
-            await client.aclose()
 
     return StreamingResponse(_forward_stream(), media_type=media_type)
 
@@ -1238,37 +1871,26 @@ def _build_proxy_model_description_xml(model_metadata: dict) -> bytes:
     return xml_bytes
 
 
-def _collect_runtime_files(*, fmi_version: str, model_identifier: str) -> list[tuple[Path, str]]:
-    runtime_root = Path(FMU_PROXY_RUNTIME_PATH).resolve()
-    binaries_root = (runtime_root / "binaries").resolve()
-    if not binaries_root.exists() or not binaries_root.is_dir():
-        raise HTTPException(
-            status_code=503,
-            detail="FMU proxy runtime binaries are not provisioned on Lab Gateway",
-        )
-    files: list[tuple[Path, str]] = []
+def _collect_runtime_files(*, fmi_version: str, model_identifier: str) -> list[tuple[RuntimeFile, str]]:
+    """Runtime binaries with their archive names, from the cached runtime index."""
+    files: list[tuple[RuntimeFile, str]] = []
     fmi_major_version = _parse_fmi_major_version(fmi_version)
     fmi3_platform_map = {
         "win64": ("x86_64-windows", ".dll"),
         "linux64": ("x86_64-linux", ".so"),
         "darwin64": ("x86_64-darwin", ".dylib"),
     }
-    for file_path in binaries_root.rglob("*"):
-        if file_path.is_file() and not file_path.name.startswith("."):
-            rel_path = file_path.relative_to(binaries_root)
-            if fmi_major_version >= 3:
-                parts = rel_path.parts
-                if not parts:
-                    continue
-                platform = fmi3_platform_map.get(parts[0])
-                if platform is None:
-                    continue
-                platform_dir, expected_suffix = platform
-                archive_name = f"binaries/{platform_dir}/{model_identifier}{expected_suffix}"
-            else:
-                archive_name = file_path.relative_to(runtime_root).as_posix()
-            rel = archive_name
-            files.append((file_path, rel))
+    for runtime_file in _proxy_runtime_index().files():
+        parts = runtime_file.relative
+        if fmi_major_version >= 3:
+            platform = fmi3_platform_map.get(parts[0])
+            if platform is None:
+                continue
+            platform_dir, expected_suffix = platform
+            archive_name = f"binaries/{platform_dir}/{model_identifier}{expected_suffix}"
+        else:
+            archive_name = "/".join(("binaries", *parts))
+        files.append((runtime_file, archive_name))
     if not files:
         raise HTTPException(
             status_code=503,
@@ -1277,6 +1899,57 @@ def _collect_runtime_files(*, fmi_version: str, model_identifier: str) -> list[t
     return files
 
 
+async def _proxy_artifact_template(
+    model_metadata: dict,
+    fmi_version: str,
+    model_identifier: str,
+) -> ProxyArtifactTemplate:
+    """Return the cached template holding everything but the per-download config.
+
+    Listing the runtime and building a template (which deflates every binary)
+    run off the event loop, and concurrent misses for one key share a build.
+    """
+    runtime_files = await asyncio.to_thread(
+        _collect_runtime_files, fmi_version=fmi_version, model_identifier=model_identifier,
+    )
+    metadata_digest = hashlib.sha256(
+        json.dumps(model_metadata, sort_keys=True, separators=(",", ":"), default=str).encode("utf-8")
+    ).hexdigest()
+    runtime_build = tuple(
+        (archive_name, str(runtime_file.path), runtime_file.size, runtime_file.mtime_ns)
+        for runtime_file, archive_name in runtime_files
+    )
+    key = (metadata_digest, fmi_version, runtime_build)
+    template = _proxy_template_cache.peek(key)
+    if template is not None:
+        return template
+
+    def _build() -> ProxyArtifactTemplate:
+        model_xml = _build_proxy_model_description_xml(model_metadata)
+        # Also place modelDescription.xml inside resources/ — the proxy DLL receives
+        # fmuResourceLocation pointing to the resources/ directory and looks for
+        # modelDescription.xml there first (FMI spec §2.1.6).
+        members: list[tuple[str, bytes | Path]] = [
+            ("modelDescription.xml", model_xml),
+            ("resources/modelDescription.xml", model_xml),
+        ]
+        members.extend((archive_name, runtime_file.path) for runtime_file, archive_name in runtime_files)
+        return ProxyArtifactTemplate(members)
+
+    build = _proxy_template_builds.get(key)
+    if build is None:
+        build = asyncio.ensure_future(asyncio.to_thread(_proxy_template_cache.get, key, _build))
+        _proxy_template_builds[key] = build
+
+        def _forget(_build_future, key=key):
+            if _proxy_template_builds.get(key) is _build_future:
+                del _proxy_template_builds[key]
+
+        build.add_done_callback(_forget)
+    # A client that disconnects must not cancel a build others are waiting on.
+    return await asyncio.shield(build)
+
+
 async def _issue_session_ticket(
     authorization: str,
     *,
@@ -1330,10 +2003,10 @@ async def _redeem_session_ticket(
     if reservation_key:
         payload["reservationKey"] = str(reservation_key)
 
-    response = await _post_session_ticket_request(
+    response = await _post_as_session_observer(
         AUTH_SESSION_TICKET_REDEEM_URL,
         payload=payload,
-        authorization=_session_observer_authorization(),
+        build_headers=lambda authorization: _build_session_ticket_headers(authorization=authorization),
     )
 
     if response.status_code >= 400:
@@ -1376,21 +2049,50 @@ def _session_observer_authorization() -> str:
             status_code=503,
             detail={"code": "SESSION_OBSERVER_NOT_CONFIGURED", "error": "Session observer signing secret is too short"},
         )
-    now = int(time.time())
-    token = jwt.encode(
-        {
-            "iss": SESSION_OBSERVER_GATEWAY_ID,
-            "sub": SESSION_OBSERVER_GATEWAY_ID,
-            "aud": "session-observation",
-            "scope": "session-observation:submit",
-            "iat": now,
-            "exp": now + 60,
-            "jti": base64.urlsafe_b64encode(os.urandom(18)).rstrip(b"=").decode("ascii"),
-        },
-        signing_key,
-        algorithm="HS256",
+
+    def _mint() -> tuple[str, float]:
+        now = int(time.time())
+        expires_at = now + SESSION_OBSERVER_TOKEN_TTL_SECONDS
+        token = jwt.encode(
+            {
+                "iss": SESSION_OBSERVER_GATEWAY_ID,
+                "sub": SESSION_OBSERVER_GATEWAY_ID,
+                "aud": "session-observation",
+                "scope": "session-observation:submit",
+                "iat": now,
+                "exp": expires_at,
+                "jti": base64.urlsafe_b64encode(os.urandom(18)).rstrip(b"=").decode("ascii"),
+            },
+            signing_key,
+            algorithm="HS256",
+        )
+        return f"Bearer {token}", expires_at
+
+    # Reused until shortly before it expires instead of signing one per call.
+    return _auth_service_client.cached_token(_session_observer_token_key(), _mint)
+
+
+def _session_observer_token_key() -> tuple[str, str]:
+    secret_digest = hashlib.sha256(SESSION_OBSERVER_SIGNING_SECRET.encode("utf-8")).hexdigest()
+    return ("session-observer", f"{SESSION_OBSERVER_GATEWAY_ID}:{secret_digest}")
+
+
+async def _post_as_session_observer(
+    url: str,
+    *,
+    payload: dict[str, Any],
+    build_headers: Callable[[str], dict[str, str]],
+) -> httpx.Response:
+    """POST with the cached observer token; a refused token is re-minted once."""
+    response = await _auth_service_client.post(
+        url, headers=build_headers(_session_observer_authorization()), json=payload,
     )
-    return f"Bearer {token}"
+    if response.status_code == 401:
+        _auth_service_client.discard_token(_session_observer_token_key())
+        response = await _auth_service_client.post(
+            url, headers=build_headers(_session_observer_authorization()), json=payload,
+        )
+    return response
 
 
 async def _confirm_fmu_session_started(
@@ -1419,15 +2121,14 @@ async def _confirm_fmu_session_started(
         "accessType": "fmu",
         "observedAt": int(time.time()),
     }
-    async with httpx.AsyncClient(timeout=10) as client:
-        response = await client.post(
-            ACCESS_AUDIT_URL,
-            headers={
-                "Content-Type": "application/json",
-                "Authorization": _session_observer_authorization(),
-            },
-            json=body,
-        )
+    response = await _post_as_session_observer(
+        ACCESS_AUDIT_URL,
+        payload=body,
+        build_headers=lambda authorization: {
+            "Content-Type": "application/json",
+            "Authorization": authorization,
+        },
+    )
     if response.status_code >= 400:
         raise HTTPException(status_code=response.status_code, detail=_extract_response_error_payload(response))
     payload = response.json()
@@ -1522,12 +2223,11 @@ async def _post_session_ticket_request(
     payload: dict[str, Any],
     authorization: Optional[str] = None,
 ) -> httpx.Response:
-    async with httpx.AsyncClient(timeout=10) as client:
-        return await client.post(
-            url,
-            headers=_build_session_ticket_headers(authorization=authorization),
-            json=payload,
-        )
+    return await _auth_service_client.post(
+        url,
+        headers=_build_session_ticket_headers(authorization=authorization),
+        json=payload,
+    )
 
 
 def _extract_response_error_text(response: httpx.Response) -> str:
@@ -1610,8 +2310,8 @@ if _fmu_backend.supports_local_execution and FMU_LOCAL_REALTIME_ENABLED:
         get_claim_lab_id=_get_claim_lab_id,
         normalize_lab_id=_normalize_lab_id,
         coerce_epoch_seconds=_coerce_epoch_seconds,
-        acquire_slot=_acquire_slot,
-        release_slot=_release_slot,
+        acquire_slot=_acquire_realtime_slot,
+        release_slot=_release_realtime_slot,
         redeem_session_ticket=_redeem_session_ticket,
         issue_session_ticket=_issue_session_ticket,
         confirm_session_started=_confirm_fmu_session_started,
@@ -1622,6 +2322,7 @@ if _fmu_backend.supports_local_execution and FMU_LOCAL_REALTIME_ENABLED:
         ws_cleanup_seconds=WS_CLEANUP_SECONDS,
         internal_ws_token=INTERNAL_WS_TOKEN,
         ws_create_rate_limit_per_minute=WS_CREATE_RATE_LIMIT_PER_MINUTE,
+        model_description_cache=_model_metadata_cache,
     )
 elif _fmu_backend.mode == "station":
     _realtime_manager = StationRealtimeWsProxyManager(
@@ -1638,6 +2339,8 @@ elif _fmu_backend.mode == "station":
         ws_cleanup_seconds=WS_CLEANUP_SECONDS,
         internal_ws_token=INTERNAL_WS_TOKEN,
         ws_create_rate_limit_per_minute=WS_CREATE_RATE_LIMIT_PER_MINUTE,
+        station_channels=FMU_STATION_WS_CHANNELS,
+        station_stream_queue_size=FMU_STATION_WS_STREAM_QUEUE,
     )
 else:
     _realtime_manager = _UnsupportedRealtimeManager(
@@ -1654,17 +2357,32 @@ else:
 
 def _run_simulation(fmu_path: str, start_time: float, stop_time: float, step_size: float,
                     start_values: dict, timeout: int, fmi_type: str = "CoSimulation",
-                    solver_name: str = "Euler"):
-    """Execute simulation in a subprocess (called via ProcessPoolExecutor).
+                    solver_name: str = "Euler", result_format: str = "json",
+                    chunk_rows: int = 0, *, prepared_model: Any = None, emit_chunk: Any = None):
+    """Execute simulation in a pooled worker process.
 
     Returns dict with keys: time, outputs, outputVariables.
-    Supports both CoSimulation and ModelExchange FMU types.
+    Supports both CoSimulation and ModelExchange FMU types. When the worker
+    already holds the FMU extracted and instantiated (``prepared_model``),
+    FMPy runs against it instead of unzipping and loading it again.
+    With ``result_format="npz"`` the columns are left in shared memory and
+    only a ``{"columnar": descriptor}`` is returned to the API process.
+    With ``emit_chunk`` the recorded rows are drained every ``chunk_rows``
+    samples and emitted as they are produced; only a summary is returned.
     """
     # Apply resource limits inside the worker process (Linux only)
     try:
         if posix_resource is not None:
             resource_api = cast(Any, posix_resource)
-            resource_api.setrlimit(resource_api.RLIMIT_CPU, (timeout, timeout + 5))
+            # Workers are reused, so the CPU budget is relative to what this
+            # process has already consumed. Only the soft limit moves: SIGXCPU
+            # terminates the worker and the pool replaces it.
+            usage = resource_api.getrusage(resource_api.RUSAGE_SELF)
+            cpu_soft = int(usage.ru_utime + usage.ru_stime) + timeout
+            _, cpu_hard = resource_api.getrlimit(resource_api.RLIMIT_CPU)
+            if cpu_hard != resource_api.RLIM_INFINITY:
+                cpu_soft = min(cpu_soft, cpu_hard)
+            resource_api.setrlimit(resource_api.RLIMIT_CPU, (cpu_soft, cpu_hard))
             resource_api.setrlimit(
                 resource_api.RLIMIT_AS,
                 (FMU_WORKER_ADDRESS_SPACE_LIMIT, FMU_WORKER_ADDRESS_SPACE_LIMIT),
@@ -1682,10 +2400,49 @@ def _run_simulation(fmu_path: str, start_time: float, stop_time: float, step_siz
     # For ModelExchange, FMPy provides an ODE solver (default: Euler; optional: CVode)
     if fmi_type == "ModelExchange":
         sim_kwargs["solver"] = solver_name
+    target = fmu_path
+    if prepared_model is not None:
+        target = prepared_model.directory
+        sim_kwargs["model_description"] = prepared_model.model_description
+        sim_kwargs["fmu_instance"] = prepared_model.instance(fmi_type)
+
+    streamed_rows = 0
+    if emit_chunk is not None:
+        chunk_rows = max(1, int(chunk_rows or FMU_STREAM_CHUNK_ROWS))
+
+        def _drain_rows(_time, recorder):
+            nonlocal streamed_rows
+            if len(recorder.rows) >= chunk_rows:
+                rows = recorder.rows[:chunk_rows]
+                del recorder.rows[:chunk_rows]
+                streamed_rows += len(rows)
+                emit_chunk(_result_columns(np.array(rows, dtype=np.dtype(recorder.cols))))
+            return True
+
+        sim_kwargs["step_finished"] = _drain_rows
+
+    result = simulate_fmu(target, **sim_kwargs)
+
+    if emit_chunk is not None:
+        # The recorder now only holds rows not yet emitted.
+        for start in range(0, len(result), chunk_rows):
+            block = result[start:start + chunk_rows]
+            streamed_rows += len(block)
+            emit_chunk(_result_columns(block))
+        return {
+            "streamed": True,
+            "rows": streamed_rows,
+            "outputVariables": [name for name in result.dtype.names or () if name.lower() != "time"],
+        }
 
-    result = simulate_fmu(fmu_path, **sim_kwargs)
+    if result_format == "npz":
+        return {"columnar": export_columns(result)}
 
-    # result is a numpy structured array
+    return _result_columns(result)
+
+
+def _result_columns(result) -> dict:
+    """Convert an FMPy structured result array to the JSON result shape."""
     column_names = result.dtype.names
     if column_names is None:
         raise RuntimeError("FMU simulation returned no named result columns")
@@ -1728,6 +2485,8 @@ async def aas_sync_fmu(access_key: str, request: Request):
     """
     from aas_generator import sync_fmu_to_basyx
 
+    if isinstance(_fmu_backend, StationFmuBackend):
+        _fmu_backend.invalidate_model_metadata(access_key)
     aasx_bytes: Optional[bytes] = None
     lab_id: str = access_key  # default; may be overridden below
 
@@ -1759,10 +2518,12 @@ async def aas_sync_fmu(access_key: str, request: Request):
     metadata: dict = {}
     fmu_path: Optional[Path] = None  # set in the metadata (non-AASX) path below
     if not aasx_bytes:
-        # Need FMU metadata for the auto-generation path
+        # Need FMU metadata for the auto-generation path. A sync usually
+        # follows a re-provisioned FMU, so start from a fresh parse.
         fmu_path = _resolve_fmu_path(access_key)
+        _model_metadata_cache.invalidate(fmu_path)
         try:
-            md = read_model_description(str(fmu_path))
+            md = _read_model_description_cached(fmu_path)
         except Exception as exc:
             logger.error(
                 "AAS sync: cannot read FMU %s: %s",
@@ -1807,7 +2568,7 @@ async def aas_hints_fmu(access_key: str):
     """
     fmu_path = _resolve_fmu_path(access_key)
     try:
-        md = read_model_description(str(fmu_path))
+        md = _read_model_description_cached(fmu_path)
     except Exception as exc:
         logger.error(
             "Cannot read FMU model description for %s: %s",
@@ -2002,9 +2763,10 @@ async def health():
     """Backend-aware health check for the active FMU backend mode."""
     payload = await _fmu_backend.health()
     # Keep the JWKS cache alive even when the runner receives no authenticated
-    # traffic.  Without this refresh, jwks_health() eventually marks an
-    # otherwise healthy runner as DOWN solely because the cached keys aged past
-    # JWKS_STALE_IF_ERROR_MAX_SECONDS.
+    # traffic or the background refresher is not running.  Without this
+    # refresh, jwks_health() eventually marks an otherwise healthy runner as
+    # DOWN solely because the cached keys aged past
+    # JWKS_STALE_IF_ERROR_MAX_SECONDS.  Usable cached keys are returned at once.
     try:
         await _fetch_jwks()
     except HTTPException:
@@ -2015,7 +2777,12 @@ async def health():
     checks = dict(payload.get("checks") or {})
     checks["jwks"] = auth_status["status"] == "UP"
     payload["checks"] = checks
-    payload["auth"] = auth_status
+    payload["auth"] = {**auth_status, "claimsCache": claims_cache_metrics(), "refresh": jwks_refresh_metrics()}
+    channel_metrics = getattr(_realtime_manager, "channel_metrics", None)
+    if callable(channel_metrics) and channel_metrics() is not None:
+        payload["stationChannels"] = channel_metrics()
+    payload["proxyTemplates"] = _proxy_template_cache.metrics()
+    payload["authService"] = _auth_service_client.metrics()
     if auth_status["status"] == "DOWN":
         payload["status"] = "DOWN"
     elif auth_status["status"] != "UP":
@@ -2080,13 +2847,9 @@ async def download_proxy_fmu(
         claims=claims,
         requested_fmu_filename=str(fmu_filename),
     )
-    model_xml = _build_proxy_model_description_xml(model_metadata)
     proxy_fmi_version = "3.0" if _parse_fmi_major_version(model_metadata.get("fmiVersion")) >= 3 else "2.0.3"
     proxy_model_identifier = _proxy_model_identifier(model_metadata)
-    runtime_files = _collect_runtime_files(
-        fmi_version=proxy_fmi_version,
-        model_identifier=proxy_model_identifier,
-    )
+    template = await _proxy_artifact_template(model_metadata, proxy_fmi_version, proxy_model_identifier)
 
     config_payload = {
         "protocolVersion": "1.0",
@@ -2098,44 +2861,34 @@ async def download_proxy_fmu(
         "ticketExpiresAt": ticket_expiry,
         "timeMode": "simtime",
     }
-
-    archive_buffer = io.BytesIO()
-    with zipfile.ZipFile(archive_buffer, "w", compression=zipfile.ZIP_DEFLATED) as archive:
-        archive.writestr("modelDescription.xml", model_xml)
-        # Also place modelDescription.xml inside resources/ — the proxy DLL receives
-        # fmuResourceLocation pointing to the resources/ directory and looks for
-        # modelDescription.xml there first (FMI spec §2.1.6).
-        archive.writestr("resources/modelDescription.xml", model_xml)
-        archive.writestr("resources/config.json", json.dumps(config_payload, separators=(",", ":")))
-        for file_path, archive_name in runtime_files:
-            archive.write(file_path, archive_name)
-
-    archive_bytes = archive_buffer.getvalue()
-    artifact_sha256 = hashlib.sha256(archive_bytes).hexdigest()
+    artifact = template.assemble(
+        json.dumps(config_payload, separators=(",", ":")).encode("utf-8"),
+        signing_key=FMU_PROXY_SIGNING_KEY.encode("utf-8") if FMU_PROXY_SIGNING_KEY else None,
+    )
 
     proxy_name = f"fmu-proxy-lab-{lab_id}.fmu"
     headers = {
         "Content-Disposition": f'attachment; filename="{proxy_name}"',
-        "X-Proxy-Artifact-Sha256": artifact_sha256,
+        "Content-Length": str(artifact.size),
+        "X-Proxy-Artifact-Sha256": artifact.sha256,
     }
-    if FMU_PROXY_SIGNING_KEY:
-        signature = hmac.new(
-            FMU_PROXY_SIGNING_KEY.encode("utf-8"),
-            archive_bytes,
-            hashlib.sha256,
-        ).hexdigest()
-        headers["X-Proxy-Artifact-Signature"] = f"hmac-sha256={signature}"
+    if artifact.signature:
+        headers["X-Proxy-Artifact-Signature"] = f"hmac-sha256={artifact.signature}"
 
     logger.info(
         "Generated proxy FMU lab_id=%s reservation_key=%s ticket_id=%s bytes=%s sha256=%s signed=%s",
         str(lab_id).replace("\r", "\\r").replace("\n", "\\n"),
         str(effective_reservation_key).replace("\r", "\\r").replace("\n", "\\n"),
         str(_normalize_ticket_id(session_ticket) or "-").replace("\r", "\\r").replace("\n", "\\n"),
-        len(archive_bytes),
-        artifact_sha256,
-        "yes" if FMU_PROXY_SIGNING_KEY else "no",
+        artifact.size,
+        artifact.sha256,
+        "yes" if artifact.signature else "no",
+    )
+    return StreamingResponse(
+        artifact.stream(),
+        media_type="application/octet-stream",
+        headers=headers,
     )
-    return Response(content=archive_bytes, media_type="application/octet-stream", headers=headers)
 
 
 @app.get("/api/v1/simulations/describe")
@@ -2228,37 +2981,107 @@ async def run_simulation(
     solver_name = req.options.get("solver", "Euler")
     if not fmi_type:
         try:
-            md = read_model_description(str(fmu_path))
+            md = _read_model_description_cached(fmu_path)
             fmi_type = "CoSimulation" if md.coSimulation else ("ModelExchange" if md.modelExchange else "CoSimulation")
         except Exception:
             fmi_type = "CoSimulation"
 
-    # Concurrency check
-    _acquire_slot(lab_id)
+    columnar = wants_columnar(request.headers.get("accept"))
+    # Projection only shapes this response; history and the result cache keep the full result.
+    projection = None if columnar else _result_projection(req.options)
+    submit_args = (
+        str(fmu_path),
+        start_time,
+        stop_time,
+        step_size,
+        req.parameters,
+        timeout,
+        fmi_type,
+        solver_name,
+        "npz" if columnar else "json",
+    )
+    cache_key = None
+    if _result_cache is not None and not columnar and req.options.get("cache", True) is not False:
+        cache_key = result_cache_key(
+            await asyncio.to_thread(_fmu_content_digest, str(fmu_path)),
+            parameters=req.parameters,
+            start_time=start_time,
+            stop_time=stop_time,
+            step_size=step_size,
+            fmi_type=fmi_type,
+            solver=solver_name,
+        )
 
     sim_id = uuid4().hex
     t0 = time.monotonic()
+    cache_hit = False
+    async def observe():
+        return await _record_browser_session_started(request, claims, sim_id)
+
+    if cache_key is None:
+        sim_result = await _execute_local_simulation(
+            sim_id, lab_id, claims, submit_args, timeout, observe=observe,
+        )
+    else:
+        # The executing request is observed once admitted, like an uncached
+        # run. Cache hits and requests joined to an identical run in flight
+        # never take a slot; they are observed once their result is in hand.
+        # Their simId only names the history entry, so cancelling it is a 404.
+        sim_result, cache_hit = await _result_cache.get_or_compute(
+            cache_key,
+            lambda: _execute_local_simulation(sim_id, lab_id, claims, submit_args, timeout, observe=observe),
+        )
+        if cache_hit:
+            await observe()
+
+    elapsed = round(time.monotonic() - t0, 3)
+    logger.info(
+        "Simulation completed for lab %s in %.3fs",
+        str(lab_id).replace("\r", "\\r").replace("\n", "\\n"),
+        elapsed,
+    )
+
+    if isinstance(sim_result.get("columnar"), dict):
+        return await _columnar_simulation_response(
+            sim_id, lab_id, claims, fmu_filename, fmi_type, req, sim_result["columnar"], elapsed,
+        )
+
+    # Persist to history DB (#29)
+    await _save_history(sim_id, lab_id, claims, fmu_filename, fmi_type,
+                        req.parameters, req.options, sim_result, elapsed)
+
+    if projection is not None:
+        sim_result = await asyncio.to_thread(_apply_result_projection, projection, sim_result)
+
+    return {
+        "status": "completed",
+        "simId": sim_id,
+        "simulationTime": elapsed,
+        "fmiType": fmi_type,
+        "cacheHit": cache_hit,
+        **sim_result,
+    }
+
+
+async def _execute_local_simulation(sim_id, lab_id, claims, submit_args, timeout, observe=None) -> dict:
+    """Run one simulation on a pooled worker within the lab's concurrency budget."""
+    # Concurrency check: waits in the lab's queue while its slots are busy.
+    await _admit(lab_id, claims)
+
     future: Optional[Future] = None
     job_executor: Any = None
     try:
         # Durable observation is the acceptance gate. The executor is not
         # released until it succeeds, so a failed observation cannot race with
         # work that has already started.
-        await _record_browser_session_started(request, claims, sim_id)
-        job_executor, future = _submit_simulation(
-            str(fmu_path),
-            start_time,
-            stop_time,
-            step_size,
-            req.parameters,
-            timeout,
-            fmi_type,
-            solver_name,
-        )
+        if observe is not None:
+            await observe()
+        job_executor, future = await _submit_simulation_off_loop(*submit_args)
         _track_running_future(sim_id, future, lab_id, claims, job_executor)
         try:
-            sim_result = await asyncio.wait_for(asyncio.wrap_future(future), timeout=timeout)
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout=timeout)
         except asyncio.TimeoutError as exc:
+            future.add_done_callback(_discard_abandoned_result)
             if not future.done():
                 future.cancel()
             # Future.cancel() cannot stop a process that already entered FMPy.
@@ -2279,24 +3102,39 @@ async def run_simulation(
     finally:
         _finalize_simulation_tracking(sim_id, lab_id)
 
-    elapsed = round(time.monotonic() - t0, 3)
-    logger.info(
-        "Simulation completed for lab %s in %.3fs",
-        str(lab_id).replace("\r", "\\r").replace("\n", "\\n"),
-        elapsed,
-    )
 
-    # Persist to history DB (#29)
-    await _save_history(sim_id, lab_id, claims, fmu_filename, fmi_type,
-                        req.parameters, req.options, sim_result, elapsed)
+async def _columnar_simulation_response(sim_id, lab_id, claims, fmu_filename, fmi_type,
+                                        req: SimulationRequest, descriptor: dict, elapsed: float):
+    """Stream a worker result from shared memory as an NPZ archive.
 
-    return {
-        "status": "completed",
-        "simId": sim_id,
-        "simulationTime": elapsed,
-        "fmiType": fmi_type,
-        **sim_result,
-    }
+    History keeps the JSON result shape. It gets a private copy of the
+    columns, which the history writer thread serialises, so the response
+    never waits on per-sample lists.
+    """
+    result = ColumnarResult(descriptor)
+    try:
+        history_result = await asyncio.to_thread(result.detached)
+        await _save_history(sim_id, lab_id, claims, fmu_filename, fmi_type,
+                            req.parameters, req.options, history_result, elapsed)
+    except BaseException:
+        result.close()
+        raise
+
+    def _npz_body():
+        try:
+            yield from result.iter_npz()
+        finally:
+            result.close()
+
+    return StreamingResponse(
+        _npz_body(),
+        media_type=NPZ_MEDIA_TYPE,
+        headers={
+            "X-Simulation-Id": sim_id,
+            "X-Simulation-Time": str(elapsed),
+            "X-Fmi-Type": str(fmi_type),
+        },
+    )
 
 
 # ---------------------------------------------------------------------------
@@ -2356,6 +3194,19 @@ async def _cleanup_temp_files():
         logger.info("Cleaned up %d FMPy temp directories", removed)
 
 
+def _stream_chunk_rows(requested: Any) -> int:
+    """Rows per NDJSON ``data`` chunk: ``options.chunkSize`` within the configured cap."""
+    if requested is None:
+        return min(FMU_STREAM_CHUNK_ROWS, FMU_STREAM_MAX_CHUNK_ROWS)
+    try:
+        rows = int(requested)
+    except (TypeError, ValueError) as exc:
+        raise HTTPException(status_code=400, detail="chunkSize must be a positive integer") from exc
+    if rows <= 0:
+        raise HTTPException(status_code=400, detail="chunkSize must be a positive integer")
+    return min(rows, FMU_STREAM_MAX_CHUNK_ROWS)
+
+
 # ---------------------------------------------------------------------------
 # #18 — NDJSON Streaming endpoint
 # ---------------------------------------------------------------------------
@@ -2369,6 +3220,7 @@ async def stream_simulation(
     """Execute a simulation and stream results as newline-delimited JSON.
 
     Each line is a JSON object with a ``type`` field:
+      - ``queued``   — waiting for a lab slot, with the queue ``position``
       - ``started``  — simulation ID assigned
       - ``progress`` — heartbeat with elapsed seconds
       - ``data``     — chunk of time + output arrays
@@ -2416,55 +3268,123 @@ async def stream_simulation(
     solver_name = req.options.get("solver", "Euler")
     if not fmi_type:
         try:
-            md = read_model_description(str(fmu_path))
+            md = _read_model_description_cached(fmu_path)
             fmi_type = "CoSimulation" if md.coSimulation else ("ModelExchange" if md.modelExchange else "CoSimulation")
         except Exception:
             fmi_type = "CoSimulation"
 
+    chunk_rows = _stream_chunk_rows(req.options.get("chunkSize"))
+    # Rows arrive while the worker runs, so data events carry the count the
+    # output grid implies; `completed` reports the number actually sent.
+    expected_chunks = max(1, math.ceil((round((stop_time - start_time) / step_size) + 1) / chunk_rows))
     sim_id = uuid4().hex
 
     async def _event_stream():
         t0 = time.monotonic()
         future: Optional[Future] = None
         job_executor: Any = None
-        _acquire_slot(lab_id)
+        loop = asyncio.get_running_loop()
+        chunks: asyncio.Queue = asyncio.Queue(maxsize=FMU_STREAM_QUEUE_CHUNKS)
+        abandoned = threading.Event()
+        spool = None
+
+        def _push_chunk(payload):
+            # Runs on the pool reader thread. Blocking here stops reading the
+            # worker pipe, which in turn blocks the worker: memory stays bounded.
+            # The put is scheduled once: cancelling and re-scheduling it could
+            # enqueue the same rows twice when the cancel lands too late.
+            if abandoned.is_set():
+                raise RuntimeError("stream consumer went away")
+            pending = asyncio.run_coroutine_threadsafe(chunks.put(payload), loop)
+            while True:
+                try:
+                    pending.result(timeout=1.0)
+                    return
+                except FutureTimeoutError:
+                    # A put that completed meanwhile is picked up by the next result().
+                    if abandoned.is_set() and not pending.done():
+                        pending.cancel()
+                        raise RuntimeError("stream consumer went away")
+
+        try:
+            ticket = _enqueue_for_slot(lab_id, claims)
+            if ticket is not None:
+                try:
+                    async for position in _slot_wait_positions(ticket):
+                        yield json.dumps({"type": "queued", "simId": sim_id, "position": position}) + "\n"
+                except BaseException:
+                    _abandon_slot_wait(ticket)
+                    raise
+        except HTTPException as exc:
+            yield json.dumps({"type": "error", "simId": sim_id, "status": exc.status_code, "detail": exc.detail}) + "\n"
+            return
+
         try:
             # Observation is the durable acceptance gate; only then is the
             # worker released and the `started` event exposed.
             await _record_browser_session_started(request, claims, sim_id)
-            job_executor, future = _submit_simulation(
+            job_executor, future = await _submit_simulation_off_loop(
                 str(fmu_path), start_time, stop_time, step_size,
-                req.parameters, timeout, fmi_type, solver_name,
+                req.parameters, timeout, fmi_type, solver_name, "json", chunk_rows,
+                on_chunk=_push_chunk,
             )
             _track_running_future(sim_id, future, lab_id, claims, job_executor)
+            # Every chunk is queued before the future resolves, so the end
+            # marker always arrives after the last row.
+            future.add_done_callback(
+                lambda _done: asyncio.run_coroutine_threadsafe(chunks.put(None), loop)
+            )
             yield json.dumps({"type": "started", "simId": sim_id}) + "\n"
 
-            # Heartbeat while simulation runs
-            while not future.done():
-                elapsed = round(time.monotonic() - t0, 1)
-                if elapsed >= timeout:
+            # Forward rows while the worker produces them, with a heartbeat
+            # whenever a second passes without one.
+            chunk_index = 0
+            last_progress = t0
+            spool = ResultSpool()
+            while True:
+                try:
+                    payload = await asyncio.wait_for(chunks.get(), timeout=1.0)
+                except asyncio.TimeoutError:
+                    payload = {}
+                if payload is None:
+                    break
+                if payload:
+                    spool.append(payload)
+                    yield json.dumps({
+                        "type": "data",
+                        "chunkIndex": chunk_index,
+                        "totalChunks": expected_chunks,
+                        "time": payload.get("time", []),
+                        "outputs": payload.get("outputs", {}),
+                    }) + "\n"
+                    chunk_index += 1
+                now = time.monotonic()
+                if now - t0 >= timeout:
                     future.cancel()
                     _shutdown_simulation_executor(job_executor, force=True)
                     yield json.dumps({"type": "error", "simId": sim_id, "detail": "Simulation timed out"}) + "\n"
                     return
-                yield json.dumps({"type": "progress", "elapsedSeconds": elapsed}) + "\n"
-                await asyncio.sleep(1)
+                if now - last_progress >= 1.0:
+                    last_progress = now
+                    yield json.dumps({"type": "progress", "elapsedSeconds": round(now - t0, 1)}) + "\n"
 
             sim_result = future.result()
 
-            # Stream results in chunks (~10 chunks)
-            time_data = sim_result.get("time", [])
-            chunk_size = max(1, len(time_data) // 10)
-            total_chunks = max(1, -(-len(time_data) // chunk_size))  # ceil division
-            for idx in range(0, len(time_data), chunk_size):
-                chunk = {
-                    "type": "data",
-                    "chunkIndex": idx // chunk_size,
-                    "totalChunks": total_chunks,
-                    "time": time_data[idx:idx + chunk_size],
-                    "outputs": {k: v[idx:idx + chunk_size] for k, v in sim_result.get("outputs", {}).items()},
-                }
-                yield json.dumps(chunk) + "\n"
+            if not sim_result.get("streamed"):
+                # Executors that cannot stream return the whole result; send
+                # it in the same fixed-size chunks.
+                time_data = sim_result.get("time", [])
+                total_chunks = max(1, -(-len(time_data) // chunk_rows))  # ceil division
+                for idx in range(0, len(time_data), chunk_rows):
+                    chunk = {
+                        "type": "data",
+                        "chunkIndex": chunk_index,
+                        "totalChunks": total_chunks,
+                        "time": time_data[idx:idx + chunk_rows],
+                        "outputs": {k: v[idx:idx + chunk_rows] for k, v in sim_result.get("outputs", {}).items()},
+                    }
+                    chunk_index += 1
+                    yield json.dumps(chunk) + "\n"
 
             elapsed = round(time.monotonic() - t0, 3)
             yield json.dumps({
@@ -2473,10 +3393,16 @@ async def stream_simulation(
                 "simulationTime": elapsed,
                 "fmiType": fmi_type,
                 "outputVariables": sim_result.get("outputVariables", []),
+                "totalChunks": chunk_index,
             }) + "\n"
 
+            history_result: Any = sim_result
+            if sim_result.get("streamed"):
+                # The history writer streams the spool into the blob store and closes it.
+                spool.output_variables = list(sim_result.get("outputVariables", []))
+                history_result, spool = spool, None
             await _save_history(sim_id, lab_id, claims, fmu_filename, fmi_type,
-                                req.parameters, req.options, sim_result, elapsed)
+                                req.parameters, req.options, history_result, elapsed)
 
         except Exception as exc:
             logger.exception(
@@ -2486,11 +3412,300 @@ async def stream_simulation(
             )
             yield json.dumps(_stream_error_payload(exc, sim_id=sim_id)) + "\n"
         finally:
+            abandoned.set()
+            while not chunks.empty():
+                chunks.get_nowait()
+            if future is not None and not future.done():
+                # The client went away mid-stream: stop the worker as well.
+                _shutdown_simulation_executor(job_executor, force=True)
+            if spool is not None:
+                spool.close()
             _finalize_simulation_tracking(sim_id, lab_id)
 
     return StreamingResponse(_event_stream(), media_type="application/x-ndjson")
 
 
+def _expand_sweep_cases(req: SweepRequest) -> list[dict]:
+    """Explicit ``cases`` followed by the ``grid`` product, each without ``parameters`` merged in."""
+    cases = []
+    for case in req.cases:
+        if not isinstance(case, dict):
+            raise HTTPException(status_code=400, detail="Each sweep case must be an object of parameter values")
+        cases.append(dict(case))
+    if req.grid:
+        names = list(req.grid)
+        values = [req.grid[name] for name in names]
+        if any(not isinstance(options, list) or not options for options in values):
+            raise HTTPException(status_code=400, detail="Each sweep grid entry must be a non-empty list")
+        count = math.prod(len(options) for options in values)
+        if len(cases) + count > FMU_SWEEP_MAX_CASES:
+            raise HTTPException(status_code=400, detail=f"Sweep exceeds maximum of {FMU_SWEEP_MAX_CASES} cases")
+        cases.extend(dict(zip(names, combination)) for combination in itertools.product(*values))
+    if not cases:
+        raise HTTPException(status_code=400, detail="Sweep needs at least one case or grid entry")
+    if len(cases) > FMU_SWEEP_MAX_CASES:
+        raise HTTPException(status_code=400, detail=f"Sweep exceeds maximum of {FMU_SWEEP_MAX_CASES} cases")
+    return cases
+
+
+@app.post("/api/v1/simulations/sweep")
+async def sweep_simulation(
+    req: SweepRequest,
+    request: Request,
+    claims: dict = Depends(verify_jwt),
+):
+    """Run one FMU over many parameter sets and stream each case as NDJSON.
+
+    Cases run in parallel on the worker pool, using up to ``options.maxParallel``
+    of the lab's ``MAX_CONCURRENT_PER_MODEL`` slots (the first one may be
+    queued for). Workers keep the FMU extracted between cases. Lines are
+    ``queued`` while waiting, ``started``, one ``case`` per parameter set in
+    completion order, then ``completed``. The
+    sweep is one history entry, ``running`` from the start (``cancelled`` if
+    the stream closes early); its cases are listed by ``/result``.
+    Closing the stream stops the remaining cases.
+    """
+    _enforce_fmu_claim(claims)
+    _ensure_local_execution_backend("Simulation sweep endpoint")
+
+    fmu_filename = claims.get("accessKey") or claims.get("fmuFileName")
+    claims_lab_id = _get_claim_lab_id(claims)
+    request_lab_id = _normalize_lab_id(req.labId)
+    if claims_lab_id and request_lab_id and claims_lab_id != request_lab_id:
+        raise HTTPException(status_code=403, detail="JWT not authorised for requested labId")
+    lab_id = request_lab_id or claims_lab_id or "unknown"
+    _enforce_requested_reservation(claims, req.reservationKey)
+    if req.labId is None and claims_lab_id:
+        req.labId = claims_lab_id
+    if not fmu_filename:
+        raise HTTPException(status_code=400, detail="Cannot determine FMU file name from JWT or request")
+
+    fmu_path = _resolve_fmu_path(fmu_filename)
+
+    start_time = float(req.options.get("startTime", 0))
+    stop_time = float(req.options.get("stopTime", 10))
+    step_size = float(req.options.get("stepSize", 0.01))
+    requested_timeout = int(req.options.get("timeout", MAX_SIMULATION_TIMEOUT))
+
+    if stop_time <= start_time:
+        raise HTTPException(status_code=400, detail="stopTime must be greater than startTime")
+    if step_size <= 0:
+        raise HTTPException(status_code=400, detail="stepSize must be positive")
+    if requested_timeout <= 0:
+        raise HTTPException(status_code=400, detail="timeout must be positive")
+    timeout = _effective_timeout_seconds(requested_timeout, claims)
+    if stop_time > MAX_STOP_TIME:
+        raise HTTPException(status_code=400, detail=f"stopTime exceeds maximum ({MAX_STOP_TIME}s)")
+    if step_size < MIN_STEP_SIZE:
+        raise HTTPException(status_code=400, detail=f"stepSize below minimum ({MIN_STEP_SIZE}s)")
+
+    fmi_type = req.options.get("fmiType", None)
+    solver_name = req.options.get("solver", "Euler")
+    if not fmi_type:
+        try:
+            md = _read_model_description_cached(fmu_path)
+            fmi_type = "CoSimulation" if md.coSimulation else ("ModelExchange" if md.modelExchange else "CoSimulation")
+        except Exception:
+            fmi_type = "CoSimulation"
+
+    cases = _expand_sweep_cases(req)
+    try:
+        max_parallel = int(req.options.get("maxParallel", MAX_CONCURRENT_PER_MODEL))
+    except (TypeError, ValueError) as exc:
+        raise HTTPException(status_code=400, detail="maxParallel must be a positive integer") from exc
+    if max_parallel <= 0:
+        raise HTTPException(status_code=400, detail="maxParallel must be a positive integer")
+    projection = _result_projection(req.options)
+    use_cache = _result_cache is not None and req.options.get("cache", True) is not False
+    fmu_digest = await asyncio.to_thread(_fmu_content_digest, str(fmu_path)) if use_cache else None
+
+    sweep_id = uuid4().hex
+    events: asyncio.Queue = asyncio.Queue()
+    pending = iter(enumerate(cases))
+    running: set = set()
+    # Case executions; with the result cache they run in tasks of their own,
+    # which outlive a cancelled worker. Slots are released once they finish.
+    computing: set = set()
+    stopping = asyncio.Event()
+    held_slots = 0
+
+    async def _run_case(parameters: dict) -> dict:
+        if stopping.is_set():
+            raise asyncio.CancelledError()
+        task = asyncio.current_task()
+        computing.add(task)
+        try:
+            return await _execute_case(parameters)
+        finally:
+            computing.discard(task)
+
+    async def _execute_case(parameters: dict) -> dict:
+        submission = asyncio.ensure_future(_submit_simulation_off_loop(
+            str(fmu_path), start_time, stop_time, step_size, parameters, timeout, fmi_type, solver_name, "json",
+        ))
+        try:
+            job_executor, future = await asyncio.shield(submission)
+        except asyncio.CancelledError:
+            # Let the submission return so its job is killed before the slot
+            # that accounts for it is released.
+            try:
+                job_executor, future = await submission
+            except Exception:
+                raise asyncio.CancelledError() from None
+            future.add_done_callback(_discard_abandoned_result)
+            _shutdown_simulation_executor(job_executor, force=True)
+            raise
+        running.add(job_executor)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout=timeout)
+        except asyncio.TimeoutError as exc:
+            future.add_done_callback(_discard_abandoned_result)
+            future.cancel()
+            _shutdown_simulation_executor(job_executor, force=True)
+            raise HTTPException(status_code=504, detail="Simulation timed out") from exc
+        finally:
+            running.discard(job_executor)
+            _shutdown_simulation_executor(job_executor)
+
+    async def _case_event(index: int, overrides: dict) -> dict:
+        parameters = {**req.parameters, **overrides}
+        t0 = time.monotonic()
+        try:
+            if use_cache:
+                key = result_cache_key(
+                    fmu_digest,
+                    parameters=parameters,
+                    start_time=start_time,
+                    stop_time=stop_time,
+                    step_size=step_size,
+                    fmi_type=fmi_type,
+                    solver=solver_name,
+                )
+                result, cache_hit = await _result_cache.get_or_compute(key, lambda: _run_case(parameters))
+            else:
+                result, cache_hit = await _run_case(parameters), False
+            response = await asyncio.to_thread(_apply_result_projection, projection, result) if projection else result
+        except Exception as exc:
+            elapsed = round(time.monotonic() - t0, 3)
+            detail = "Simulation failed"
+            if isinstance(exc, HTTPException) and isinstance(exc.detail, str):
+                detail = exc.detail
+            logger.warning("Sweep %s case %d failed: %s", sweep_id, index, type(exc).__name__)
+            _save_sweep_case(sweep_id, index, overrides, "failed", None, elapsed, detail)
+            return {"type": "case", "index": index, "parameters": overrides, "status": "failed",
+                    "simulationTime": elapsed, "detail": detail}
+        elapsed = round(time.monotonic() - t0, 3)
+        _save_sweep_case(sweep_id, index, overrides, "completed", result, elapsed)
+        return {"type": "case", "index": index, "parameters": overrides, "status": "completed",
+                "simulationTime": elapsed, "cacheHit": cache_hit, **response}
+
+    async def _worker():
+        # Each worker owns one slot and keeps it until no case is left. A
+        # cancelled worker leaves its slot to the teardown, which releases it
+        # only after the cases still executing are stopped.
+        nonlocal held_slots
+        for index, overrides in pending:
+            await events.put(await _case_event(index, overrides))
+        held_slots -= 1
+        _release_slot(lab_id)
+
+    async def _event_stream():
+        t0 = time.monotonic()
+        # The first slot may be queued for like any run; more are only taken
+        # while they are free.
+        try:
+            ticket = _enqueue_for_slot(lab_id, claims)
+            if ticket is not None:
+                try:
+                    async for position in _slot_wait_positions(ticket):
+                        yield json.dumps({"type": "queued", "sweepId": sweep_id, "position": position}) + "\n"
+                except BaseException:
+                    _abandon_slot_wait(ticket)
+                    raise
+        except HTTPException as exc:
+            yield json.dumps({
+                "type": "error", "sweepId": sweep_id, "status": exc.status_code, "detail": exc.detail,
+            }) + "\n"
+            return
+        slots = 1
+        while slots < min(max_parallel, len(cases)) and _try_acquire_slot(lab_id):
+            slots += 1
+        try:
+            await _record_browser_session_started(request, claims, sweep_id)
+        except BaseException as exc:
+            # A client that disconnects here (CancelledError/GeneratorExit)
+            # must not keep the slots either; the workers do not own them yet.
+            for _ in range(slots):
+                _release_slot(lab_id)
+            if not isinstance(exc, Exception):
+                raise
+            yield json.dumps(_stream_error_payload(exc, sim_id=sweep_id)) + "\n"
+            return
+
+        outcomes: list[Optional[dict]] = [None] * len(cases)
+
+        def _record(event: dict) -> None:
+            outcomes[event["index"]] = {
+                key: event[key] for key in ("index", "parameters", "status", "simulationTime", "detail")
+                if key in event
+            }
+
+        # The sweep row exists before any case row, so cases stay reachable
+        # through /cases/{index}/result even if the client leaves early.
+        await _save_history(sweep_id, lab_id, claims, fmu_filename, fmi_type, req.parameters,
+                            {**req.options, "sweepCases": len(cases)}, {"cases": outcomes}, 0.0, "running")
+        nonlocal held_slots
+        held_slots = slots
+        workers = [asyncio.create_task(_worker()) for _ in range(slots)]
+        finished = False
+        try:
+            yield json.dumps({
+                "type": "started", "sweepId": sweep_id, "cases": len(cases), "parallel": slots,
+            }) + "\n"
+            for _ in range(len(cases)):
+                event = await events.get()
+                _record(event)
+                yield json.dumps(event) + "\n"
+            await asyncio.gather(*workers)
+
+            elapsed = round(time.monotonic() - t0, 3)
+            failed = sum(1 for outcome in outcomes if outcome and outcome["status"] == "failed")
+            status = "completed" if not failed else ("failed" if failed == len(cases) else "partial")
+            _finish_sweep_history(sweep_id, lab_id, status, outcomes, elapsed)
+            finished = True
+            yield json.dumps({
+                "type": "completed",
+                "sweepId": sweep_id,
+                "status": status,
+                "simulationTime": elapsed,
+                "fmiType": fmi_type,
+                "completedCases": len(cases) - failed,
+                "failedCases": failed,
+            }) + "\n"
+        finally:
+            stopping.set()
+            for worker in workers:
+                worker.cancel()
+            # Uncached cases execute in the workers themselves.
+            executing = [task for task in computing if task not in workers]
+            for task in executing:
+                task.cancel()
+            for job_executor in list(running):
+                # The client went away mid-sweep: stop the cases still running.
+                _shutdown_simulation_executor(job_executor, force=True)
+            await asyncio.gather(*workers, *executing, return_exceptions=True)
+            for _ in range(held_slots):
+                _release_slot(lab_id)
+            held_slots = 0
+            if not finished:
+                # Cases that finished but were never sent are still recorded.
+                while not events.empty():
+                    _record(events.get_nowait())
+                _finish_sweep_history(sweep_id, lab_id, "cancelled", outcomes, round(time.monotonic() - t0, 3))
+
+    return StreamingResponse(_event_stream(), media_type="application/x-ndjson")
+
+
 # ---------------------------------------------------------------------------
 # #29 — Simulation history endpoints
 # ---------------------------------------------------------------------------
@@ -2500,9 +3715,15 @@ async def get_history(
     labId: Optional[str] = Query(None),
     limit: int = Query(20, ge=1, le=100),
     offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="nextCursor from the previous page"),
     claims: dict = Depends(verify_jwt),
 ):
-    """Return paginated simulation history for the lab authorised in the token."""
+    """Return paginated simulation history for the lab authorised in the token.
+
+    Pages are newest first. Follow ``nextCursor`` for the next page: it resumes
+    after the last row through the index, so every page costs the same.
+    ``offset`` is still accepted but gets slower the deeper it goes.
+    """
     _enforce_fmu_claim(claims)
     _ensure_local_execution_backend("Simulation history endpoint")
     claim_lab_id = _get_claim_lab_id(claims)
@@ -2513,42 +3734,271 @@ async def get_history(
         raise HTTPException(status_code=403, detail="Token is not authorised for requested labId")
     effective_lab_id = requested_lab_id or claim_lab_id
     reservation_key = _claim_reservation_key(claims)
+    if cursor and offset:
+        raise HTTPException(status_code=400, detail="Use either cursor or offset, not both")
 
-    async with aiosqlite.connect(HISTORY_DB_PATH) as db:
-        db.row_factory = aiosqlite.Row
-        cursor = await db.execute(
-            "SELECT id, lab_id, user_sub, fmu_filename, fmi_type, elapsed_seconds, status, created_at "
-            "FROM simulation_history WHERE lab_id = ? AND lower(reservation_key) = ? AND lower(puc_hash) = ? "
-            "ORDER BY created_at DESC LIMIT ? OFFSET ?",
-            (effective_lab_id, reservation_key, str(claims.get("pucHash") or "").strip().lower(), limit, offset),
-        )
-        rows = await cursor.fetchall()
-        return {"simulations": [dict(row) for row in rows]}
+    sql = (
+        "SELECT id, lab_id, user_sub, fmu_filename, fmi_type, elapsed_seconds, status, created_at "
+        "FROM simulation_history WHERE lab_id = ? AND reservation_key_norm = ? AND puc_hash_norm = ?"
+    )
+    params: list[Any] = [effective_lab_id, reservation_key, str(claims.get("pucHash") or "").strip().lower()]
+    if cursor:
+        sql += " AND (created_at, id) < (?, ?)"
+        params.extend(_decode_history_cursor(cursor))
+    sql += " ORDER BY created_at DESC, id DESC LIMIT ? OFFSET ?"
+    params.extend((limit + 1, offset))
+
+    rows = await _history_store().fetchall(sql, params, after=_history_lab_key(effective_lab_id))
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = _encode_history_cursor(rows[-1]["created_at"], rows[-1]["id"])
+    return {"simulations": rows, "nextCursor": next_cursor}
+
+
+def _encode_history_cursor(created_at: str, sim_id: str) -> str:
+    raw = json.dumps([created_at, sim_id], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _decode_history_cursor(cursor: str) -> tuple[str, str]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, sim_id = json.loads(raw)
+        if not isinstance(created_at, str) or not isinstance(sim_id, str):
+            raise ValueError("cursor fields must be strings")
+    except (ValueError, TypeError) as exc:
+        raise HTTPException(status_code=400, detail="Invalid history cursor") from exc
+    return created_at, sim_id
 
 
 @app.get("/api/v1/simulations/{sim_id}/result")
-async def get_simulation_result(sim_id: str, claims: dict = Depends(verify_jwt)):
-    """Retrieve full simulation result by ID."""
+async def get_simulation_result(
+    sim_id: str,
+    request: Request,
+    variables: Optional[str] = Query(None, description="Comma-separated output variables to return"),
+    windowStart: Optional[float] = Query(None),
+    windowEnd: Optional[float] = Query(None),
+    maxPoints: Optional[int] = Query(None, description="Decimate to at most this many rows"),
+    downsample: Optional[str] = Query(None, description="m4 (default) or lttb"),
+    claims: dict = Depends(verify_jwt),
+):
+    """Retrieve full simulation result by ID.
+
+    The JSON envelope is streamed from the stored result. With
+    ``Accept: application/gzip`` the compressed result JSON is returned as
+    stored, with ``Range`` support for resumable downloads. The projection
+    parameters (``variables``, ``windowStart``/``windowEnd``, ``maxPoints``,
+    ``downsample``) return a reduced JSON result instead and cannot be
+    combined with the gzip format.
+    """
     _enforce_fmu_claim(claims)
+    projection = _result_projection({
+        "variables": variables,
+        "windowStart": windowStart,
+        "windowEnd": windowEnd,
+        "maxPoints": maxPoints,
+        "downsample": downsample,
+    })
     _ensure_local_execution_backend("Simulation result endpoint")
     claim_lab_id = _get_claim_lab_id(claims)
     if not claim_lab_id:
         raise HTTPException(status_code=403, detail="Token has no authorised labId")
 
-    async with aiosqlite.connect(HISTORY_DB_PATH) as db:
-        db.row_factory = aiosqlite.Row
-        cursor = await db.execute(
-            "SELECT * FROM simulation_history WHERE id = ? AND lab_id = ? AND lower(reservation_key) = ? AND lower(puc_hash) = ?",
-            (sim_id, claim_lab_id, _claim_reservation_key(claims), str(claims.get("pucHash") or "").strip().lower()),
-        )
-        row = await cursor.fetchone()
+    row = await _history_store().fetchone(
+        "SELECT * FROM simulation_history WHERE id = ? AND lab_id = ? AND reservation_key_norm = ? AND puc_hash_norm = ?",
+        (sim_id, claim_lab_id, _claim_reservation_key(claims), str(claims.get("pucHash") or "").strip().lower()),
+        after=sim_id,
+    )
     if not row:
         raise HTTPException(status_code=404, detail="Simulation not found")
-    result = dict(row)
-    for key in ("parameters", "options", "result"):
+    result = row
+    result.pop("reservation_key_norm", None)
+    result.pop("puc_hash_norm", None)
+    inline_result = result.pop("result", None)
+    for key in ("parameters", "options", "result_summary"):
         if result.get(key):
             result[key] = json.loads(result[key])
-    return result
+    return await _stored_result_response(result, inline_result, request, projection, filename=f"{sim_id}.json.gz")
+
+
+@app.get("/api/v1/simulations/{sim_id}/cases/{case_index}/result")
+async def get_sweep_case_result(
+    sim_id: str,
+    case_index: int,
+    request: Request,
+    variables: Optional[str] = Query(None, description="Comma-separated output variables to return"),
+    windowStart: Optional[float] = Query(None),
+    windowEnd: Optional[float] = Query(None),
+    maxPoints: Optional[int] = Query(None, description="Decimate to at most this many rows"),
+    downsample: Optional[str] = Query(None, description="m4 (default) or lttb"),
+    claims: dict = Depends(verify_jwt),
+):
+    """Retrieve one case of a parameter sweep, with the same formats as ``/result``."""
+    _enforce_fmu_claim(claims)
+    projection = _result_projection({
+        "variables": variables,
+        "windowStart": windowStart,
+        "windowEnd": windowEnd,
+        "maxPoints": maxPoints,
+        "downsample": downsample,
+    })
+    _ensure_local_execution_backend("Simulation result endpoint")
+    claim_lab_id = _get_claim_lab_id(claims)
+    if not claim_lab_id:
+        raise HTTPException(status_code=403, detail="Token has no authorised labId")
+
+    row = await _history_store().fetchone(
+        "SELECT c.* FROM simulation_sweep_cases c JOIN simulation_history h ON h.id = c.sweep_id "
+        "WHERE c.sweep_id = ? AND c.case_index = ? "
+        "AND h.lab_id = ? AND h.reservation_key_norm = ? AND h.puc_hash_norm = ?",
+        (sim_id, case_index, claim_lab_id, _claim_reservation_key(claims),
+         str(claims.get("pucHash") or "").strip().lower()),
+        after=sim_id,
+    )
+    if not row:
+        raise HTTPException(status_code=404, detail="Sweep case not found")
+    inline_result = row.pop("result", None)
+    for key in ("parameters", "result_summary"):
+        if row.get(key):
+            row[key] = json.loads(row[key])
+    return await _stored_result_response(
+        row, inline_result, request, projection, filename=f"{sim_id}-{case_index}.json.gz",
+    )
+
+
+async def _stored_result_response(envelope: dict, inline_result: Optional[str], request: Request,
+                                  projection: Optional[ResultProjection], *, filename: str):
+    """Serve a stored result: streamed JSON envelope, projected JSON, or the gzip blob."""
+    wants_gzip = GZIP_MEDIA_TYPE in request.headers.get("accept", "").lower()
+    if wants_gzip and projection is not None:
+        raise HTTPException(status_code=400, detail="Projection parameters cannot be combined with Accept: application/gzip")
+    handle = None
+    digest = envelope.get("result_sha256")
+    if digest:
+        handle = await asyncio.to_thread(_result_blob_store().open, digest)
+        if handle is None:
+            raise HTTPException(status_code=410, detail="Simulation result has expired")
+
+    if wants_gzip:
+        if handle is None:
+            content = await asyncio.to_thread(gzip.compress, (inline_result or "null").encode("utf-8"))
+            return _ranged_response(io.BytesIO(content), len(content), request, filename=filename, etag=None)
+        size = os.fstat(handle.fileno()).st_size
+        return _ranged_response(handle, size, request, filename=filename, etag=f'"{digest}"')
+
+    if projection is not None:
+        envelope["result"] = await asyncio.to_thread(_project_stored_result, projection, handle, inline_result)
+        return envelope
+
+    prefix = json.dumps(envelope)[:-1] + ', "result": '
+
+    def _envelope():
+        yield prefix.encode("utf-8")
+        if handle is not None:
+            yield from ResultBlobStore.iter_decompressed(handle)
+        else:
+            yield (inline_result or "null").encode("utf-8")
+        yield b"}"
+
+    return StreamingResponse(_envelope(), media_type="application/json")
+
+
+def _result_projection(options: dict) -> Optional[ResultProjection]:
+    try:
+        return ResultProjection.from_options(options)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+
+def _apply_result_projection(projection: ResultProjection, result: dict) -> dict:
+    try:
+        return projection.apply(result)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+
+def _project_stored_result(projection: ResultProjection, handle, inline_result: Optional[str]) -> Any:
+    # The stored JSON is parsed whole, so memory grows with the full result,
+    # not with the selected columns or rows.
+    if handle is not None:
+        with handle, gzip.GzipFile(fileobj=handle, mode="rb") as stream:
+            stored = json.load(stream)
+    else:
+        stored = json.loads(inline_result or "null")
+    if not isinstance(stored, dict):
+        return stored
+    return _apply_result_projection(projection, stored)
+
+
+def _parse_byte_range(header: Optional[str], size: int) -> Optional[tuple[int, int]]:
+    """Return the inclusive ``(start, end)`` of a single-range ``Range`` header.
+
+    ``None`` means "send everything": no header, a multi-range request or a
+    unit other than bytes.
+    """
+    if not header:
+        return None
+    unit, _, spec = header.strip().partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    first, separator, last = spec.strip().partition("-")
+    try:
+        if not separator:
+            raise ValueError
+        if first:
+            start = int(first)
+            end = int(last) if last else size - 1
+        else:
+            start, end = max(0, size - int(last)), size - 1
+    except ValueError:
+        return None
+    if start < 0 or start >= size or end < start:
+        raise HTTPException(
+            status_code=416,
+            detail="Requested range not satisfiable",
+            headers={"Content-Range": f"bytes */{size}"},
+        )
+    return start, min(end, size - 1)
+
+
+def _ranged_response(handle, size: int, request: Request, *, filename: str, etag: Optional[str]):
+    headers = {
+        "Accept-Ranges": "bytes",
+        "Content-Disposition": f'attachment; filename="{filename}"',
+    }
+    if etag:
+        headers["ETag"] = etag
+        if request.headers.get("if-none-match") == etag:
+            handle.close()
+            return Response(status_code=304, headers=headers)
+    try:
+        byte_range = _parse_byte_range(request.headers.get("range"), size)
+    except HTTPException:
+        handle.close()
+        raise
+    start, end = byte_range or (0, size - 1)
+    headers["Content-Length"] = str(max(0, end - start + 1))
+    if byte_range is not None:
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+
+    def _body():
+        with handle:
+            handle.seek(start)
+            remaining = end - start + 1
+            while remaining > 0:
+                chunk = handle.read(min(64 * 1024, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                yield chunk
+
+    return StreamingResponse(
+        _body(),
+        status_code=206 if byte_range is not None else 200,
+        media_type=GZIP_MEDIA_TYPE,
+        headers=headers,
+    )
 
 
 
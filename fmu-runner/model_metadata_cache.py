@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from dataclasses import dataclass, field
+import hashlib
+import os
+from pathlib import Path
+import threading
+import time
+from typing import Any, Callable, Optional
+
+
+_HASH_CHUNK_BYTES = 1024 * 1024
+
+
+def _file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as handle:
+        for chunk in iter(lambda: handle.read(_HASH_CHUNK_BYTES), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+@dataclass
+class _Entry:
+    signature: tuple[int, int, int]  # (mtime_ns, size, inode)
+    sha256: str
+    model_description: Any
+    validated_at: float
+    derived: dict[str, Any] = field(default_factory=dict)
+
+
+class ModelDescriptionCache:
+    """In-process cache of parsed ``modelDescription.xml`` per FMU file.
+
+    A lookup costs one ``stat``: entries are reused while the file's mtime,
+    size and inode are unchanged. When they change, or an entry is older than
+    ``max_age_seconds``, the content digest is checked and the file is only
+    re-parsed if it differs from what is cached (for this path or any other).
+    ``digest`` supplies that SHA-256; pass a cached source (the runner uses
+    its FMU inventory) so revalidating an unchanged file reads nothing.
+    Entries are evicted least recently used beyond ``max_entries``;
+    ``max_entries=0`` disables caching. Cached objects are shared and must be
+    treated as read-only.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_entries: int = 64,
+        max_age_seconds: float = 300.0,
+        digest: Callable[[Path], str] = _file_sha256,
+    ):
+        self.max_entries = max(0, int(max_entries))
+        self.max_age_seconds = max(0.0, float(max_age_seconds))
+        self._digest = digest
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self._metrics = {"hits": 0, "revalidated": 0, "misses": 0, "evictions": 0, "invalidations": 0}
+
+    def get(self, path: str | os.PathLike, loader: Callable[[str], Any]) -> Any:
+        """Return the parsed model description of ``path``, loading it with ``loader`` on a miss."""
+        return self._entry(Path(path), loader).model_description
+
+    def derived(
+        self,
+        path: str | os.PathLike,
+        name: str,
+        loader: Callable[[str], Any],
+        build: Callable[[Any], Any],
+    ) -> Any:
+        """Return ``build(model_description)``, memoised alongside the cached entry."""
+        entry = self._entry(Path(path), loader)
+        with self._lock:
+            if name in entry.derived:
+                return entry.derived[name]
+        value = build(entry.model_description)
+        with self._lock:
+            entry.derived.setdefault(name, value)
+            return entry.derived[name]
+
+    def invalidate(self, path: Optional[str | os.PathLike] = None) -> None:
+        with self._lock:
+            if path is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(str(Path(path)), None)
+            self._metrics["invalidations"] += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def metrics(self) -> dict[str, Any]:
+        with self._lock:
+            return {"entries": len(self._entries), "maxEntries": self.max_entries, **self._metrics}
+
+    def _entry(self, path: Path, loader: Callable[[str], Any]) -> _Entry:
+        try:
+            stat = path.stat() if self.max_entries else None
+        except OSError:
+            # Let the loader report a missing or unreadable FMU its own way.
+            stat = None
+        if stat is None:
+            return _Entry((0, 0, 0), "", loader(str(path)), time.monotonic())
+
+        key = str(path)
+        signature = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if (
+                entry is not None
+                and entry.signature == signature
+                and now - entry.validated_at < self.max_age_seconds
+            ):
+                self._entries.move_to_end(key)
+                self._metrics["hits"] += 1
+                return entry
+
+        sha256 = self._digest(path)
+        with self._lock:
+            reusable = entry if entry is not None and entry.sha256 == sha256 else None
+            if reusable is None:
+                reusable = next((item for item in self._entries.values() if item.sha256 == sha256), None)
+        if reusable is not None:
+            model_description, derived, outcome = reusable.model_description, reusable.derived, "revalidated"
+        else:
+            model_description, derived, outcome = loader(str(path)), {}, "misses"
+
+        fresh = _Entry(signature, sha256, model_description, now, derived)
+        with self._lock:
+            self._metrics[outcome] += 1
+            self._entries[key] = fresh
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._metrics["evictions"] += 1
+        return fresh
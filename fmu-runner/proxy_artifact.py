@@ -0,0 +1,297 @@
+"""Precompressed proxy FMU templates with per-download ZIP assembly.
+
+Everything in a proxy FMU except ``resources/config.json`` (which carries the
+reservation's session ticket) depends only on the model, the proxy FMI
+version and the runtime build. Those members are deflated once into a
+template; a download appends the config as a stored entry followed by the
+central directory, and hashes only those trailing bytes on top of the
+template's saved SHA-256 / HMAC state. The template bytes are streamed from
+memory without being copied.
+
+``ProxyRuntimeIndex`` keeps the runtime build (the binaries, with their size
+and mtime) so a download does not walk the runtime tree to find it.
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from dataclasses import dataclass
+import hashlib
+import hmac
+import io
+import os
+from pathlib import Path
+import struct
+import threading
+import time
+from typing import Any, Callable, Hashable, Iterable, Iterator, Optional
+import zipfile
+import zlib
+
+
+CONFIG_MEMBER = "resources/config.json"
+_CHUNK_BYTES = 64 * 1024
+
+
+@dataclass
+class ProxyArtifact:
+    size: int
+    sha256: str
+    signature: Optional[str]
+    _entries: memoryview
+    _tail: bytes
+
+    def chunks(self) -> Iterator[memoryview | bytes]:
+        for offset in range(0, len(self._entries), _CHUNK_BYTES):
+            yield self._entries[offset:offset + _CHUNK_BYTES]
+        yield self._tail
+
+    async def stream(self):
+        # Chunks are slices of bytes already in memory; no need for a threadpool hop.
+        for chunk in self.chunks():
+            yield chunk
+
+    def to_bytes(self) -> bytes:
+        return b"".join(self.chunks())
+
+
+class ProxyArtifactTemplate:
+    """The static members of a proxy FMU, deflated once and kept as raw ZIP records."""
+
+    def __init__(self, members: Iterable[tuple[str, bytes | Path]]):
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+            for name, source in members:
+                if isinstance(source, Path):
+                    archive.write(source, name)
+                else:
+                    archive.writestr(name, source)
+        data = buffer.getvalue()
+
+        end_record = data[-zipfile.sizeEndCentDir:]
+        signature, _, _, _, count, central_size, central_offset, comment_size = struct.unpack(
+            zipfile.structEndArchive, end_record
+        )
+        # ZIP64 records would sit between the central directory and this record.
+        if (
+            signature != zipfile.stringEndArchive
+            or comment_size
+            or central_offset + central_size + zipfile.sizeEndCentDir != len(data)
+        ):
+            raise ValueError("Proxy template does not fit a plain ZIP layout")
+
+        self._entries = memoryview(data)[:central_offset]
+        self._central_directory = data[central_offset:central_offset + central_size]
+        self._count = count
+        self._sha256 = hashlib.sha256(self._entries)
+        self._hmac_states: dict[bytes, Any] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def size(self) -> int:
+        return len(self._entries) + len(self._central_directory) + zipfile.sizeEndCentDir
+
+    def assemble(self, config: bytes, *, signing_key: Optional[bytes] = None) -> ProxyArtifact:
+        """Return the full archive for ``config``; only the trailing records are built and hashed."""
+        offset = len(self._entries)
+        info = zipfile.ZipInfo(CONFIG_MEMBER, date_time=time.localtime()[:6])
+        info.compress_type = zipfile.ZIP_STORED
+        info.external_attr = 0o600 << 16
+        info.CRC = zlib.crc32(config)
+        info.compress_size = info.file_size = len(config)
+        filename = info.filename.encode("ascii")
+        dos_time = info.date_time[3] << 11 | info.date_time[4] << 5 | info.date_time[5] // 2
+        dos_date = (info.date_time[0] - 1980) << 9 | info.date_time[1] << 5 | info.date_time[2]
+        central_record = struct.pack(
+            zipfile.structCentralDir,
+            zipfile.stringCentralDir,
+            info.create_version,
+            info.create_system,
+            info.extract_version,
+            info.reserved,
+            info.flag_bits,
+            info.compress_type,
+            dos_time,
+            dos_date,
+            info.CRC,
+            info.compress_size,
+            info.file_size,
+            len(filename),
+            0,
+            0,
+            0,
+            info.internal_attr,
+            info.external_attr,
+            offset,
+        ) + filename
+        local_entry = info.FileHeader() + config
+        central_size = len(self._central_directory) + len(central_record)
+        end_record = struct.pack(
+            zipfile.structEndArchive,
+            zipfile.stringEndArchive,
+            0,
+            0,
+            self._count + 1,
+            self._count + 1,
+            central_size,
+            offset + len(local_entry),
+            0,
+        )
+        tail = b"".join((local_entry, self._central_directory, central_record, end_record))
+
+        sha256 = self._sha256.copy()
+        sha256.update(tail)
+        signature = None
+        if signing_key:
+            mac = self._hmac_state(signing_key).copy()
+            mac.update(tail)
+            signature = mac.hexdigest()
+        return ProxyArtifact(
+            size=offset + len(tail),
+            sha256=sha256.hexdigest(),
+            signature=signature,
+            _entries=self._entries,
+            _tail=tail,
+        )
+
+    def _hmac_state(self, key: bytes):
+        with self._lock:
+            state = self._hmac_states.get(key)
+            if state is None:
+                state = hmac.new(key, self._entries, hashlib.sha256)
+                self._hmac_states = {key: state}
+            return state
+
+
+class ProxyTemplateCache:
+    """LRU of :class:`ProxyArtifactTemplate` keyed by model, FMI version and runtime build."""
+
+    def __init__(self, *, max_entries: int = 32):
+        self.max_entries = max(0, int(max_entries))
+        self._lock = threading.Lock()
+        self._templates: OrderedDict[Hashable, ProxyArtifactTemplate] = OrderedDict()
+        self._metrics = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def peek(self, key: Hashable) -> Optional[ProxyArtifactTemplate]:
+        """Return the cached template (counted as a hit) without building on a miss."""
+        with self._lock:
+            template = self._templates.get(key)
+            if template is not None:
+                self._templates.move_to_end(key)
+                self._metrics["hits"] += 1
+            return template
+
+    def get(self, key: Hashable, build: Callable[[], ProxyArtifactTemplate]) -> ProxyArtifactTemplate:
+        with self._lock:
+            template = self._templates.get(key)
+            if template is not None:
+                self._templates.move_to_end(key)
+                self._metrics["hits"] += 1
+                return template
+            self._metrics["misses"] += 1
+        template = build()
+        if not self.max_entries:
+            return template
+        with self._lock:
+            template = self._templates.setdefault(key, template)
+            self._templates.move_to_end(key)
+            while len(self._templates) > self.max_entries:
+                self._templates.popitem(last=False)
+                self._metrics["evictions"] += 1
+        return template
+
+    def clear(self) -> None:
+        with self._lock:
+            self._templates.clear()
+
+    def metrics(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._templates),
+                "maxEntries": self.max_entries,
+                "bytes": sum(template.size for template in self._templates.values()),
+                **self._metrics,
+            }
+
+
+@dataclass(frozen=True)
+class RuntimeFile:
+    path: Path
+    relative: tuple[str, ...]  # path parts below binaries/
+    size: int
+    mtime_ns: int
+
+
+class ProxyRuntimeIndex:
+    """The files below a proxy runtime's ``binaries/`` directory, rescanned on change.
+
+    A scan records each file's size and mtime and each directory's mtime.
+    Later lookups only stat those directories, so adding, removing or
+    renaming a binary is seen at once. A binary rewritten in place keeps its
+    directory's mtime and is picked up by the full rescan that runs at least
+    every ``rescan_seconds``.
+    """
+
+    def __init__(self, root: str | os.PathLike, *, rescan_seconds: float = 60.0):
+        self.root = Path(root).resolve()
+        self.binaries_root = (self.root / "binaries").resolve()
+        self.rescan_seconds = max(0.0, float(rescan_seconds))
+        self._lock = threading.Lock()
+        self._files: tuple[RuntimeFile, ...] = ()
+        self._directories: tuple[tuple[str, int], ...] = ()
+        self._scanned_at: Optional[float] = None
+        self._metrics = {"scans": 0}
+
+    def files(self) -> tuple[RuntimeFile, ...]:
+        """Current runtime files; empty when ``binaries/`` is missing."""
+        with self._lock:
+            if not self._current():
+                self._scan()
+            return self._files
+
+    def _current(self) -> bool:
+        if self._scanned_at is None or time.monotonic() - self._scanned_at >= self.rescan_seconds:
+            return False
+        for directory, mtime_ns in self._directories:
+            try:
+                if os.stat(directory).st_mtime_ns != mtime_ns:
+                    return False
+            except OSError:
+                return False
+        return True
+
+    def _scan(self) -> None:
+        files: list[RuntimeFile] = []
+        directories: list[tuple[str, int]] = []
+        if self.binaries_root.is_dir():
+            for directory, subdirectories, names in os.walk(self.binaries_root):
+                subdirectories.sort()
+                try:
+                    directories.append((directory, os.stat(directory).st_mtime_ns))
+                except OSError:
+                    continue
+                for name in sorted(names):
+                    if name.startswith("."):
+                        continue
+                    path = Path(directory, name)
+                    try:
+                        stat = path.stat()
+                    except OSError:
+                        continue
+                    files.append(RuntimeFile(
+                        path, path.relative_to(self.binaries_root).parts, stat.st_size, stat.st_mtime_ns,
+                    ))
+        else:
+            # Appears later: watch the runtime root for it.
+            try:
+                directories.append((str(self.root), os.stat(self.root).st_mtime_ns))
+            except OSError:
+                pass
+        self._files = tuple(files)
+        self._directories = tuple(directories)
+        self._scanned_at = time.monotonic()
+        self._metrics["scans"] += 1
+
+    def metrics(self) -> dict[str, Any]:
+        with self._lock:
+            return {"files": len(self._files), "directories": len(self._directories), **self._metrics}
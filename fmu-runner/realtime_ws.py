@@ -1,19 +1,35 @@
 import asyncio
 import base64
+import ctypes
 import json
+import math
 import secrets
 import shutil
 import time
+from collections import OrderedDict
 from collections import defaultdict
 from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Any, Optional
 from uuid import uuid4
 
 from fastapi import HTTPException, WebSocket, WebSocketDisconnect
+import numpy as np
 from fmpy import extract, instantiate_fmu, read_model_description
 
+from ws_mux import (
+    MUX_CLOSE,
+    MUX_CLOSED,
+    MUX_OPEN,
+    STATION_MUX_SUBPROTOCOL,
+    decode_mux_frame,
+    encode_mux_frame,
+    mux_control,
+    parse_mux_control,
+)
+
 
 def _public_http_detail(exc: HTTPException, fallback: str) -> str:
     """Keep validation feedback while hiding upstream/internal exception text."""
@@ -30,6 +46,51 @@ def _normalize_binding(value: Any) -> str:
     return str(value or "").strip().lower()
 
 
+BINARY_OUTPUTS_SUBPROTOCOL = "fmu.realtime.v1.binary"
+
+
+def encode_output_batch(header: dict[str, Any], samples: list[tuple[float, dict[str, Any]]]) -> bytes:
+    """Pack a ``sim.outputs`` batch for connections on the binary subprotocol.
+
+    Frame: little-endian ``uint32`` header length, the UTF-8 JSON header,
+    zero padding to an 8-byte boundary, then one little-endian float64 column
+    per name in ``header["columns"]`` (``simTime`` first), ``batchSize`` values
+    each. Array variables become ``name[i]`` columns; values that are not
+    numbers (strings, binaries, 64-bit integers sent as strings) are listed per
+    sample under ``header["objects"]``.
+    """
+    columns = ["simTime"]
+    rows: list[list[float]] = [[sim_time] for sim_time, _ in samples]
+    objects: dict[str, list[Any]] = {}
+    first = samples[0][1] if samples else {}
+    for name, value in first.items():
+        if isinstance(value, (bool, int, float)):
+            columns.append(name)
+            for row, (_, sample) in zip(rows, samples):
+                item = sample.get(name)
+                row.append(float("nan") if item is None else float(item))
+        elif isinstance(value, list) and value and all(isinstance(item, (bool, int, float)) for item in value):
+            width = len(value)
+            columns.extend(f"{name}[{index}]" for index in range(width))
+            for row, (_, sample) in zip(rows, samples):
+                items = sample.get(name) or []
+                row.extend(float(items[index]) if index < len(items) else float("nan") for index in range(width))
+        else:
+            objects[name] = [sample.get(name) for _, sample in samples]
+    header = dict(header, columns=columns, dtype="<f8")
+    if objects:
+        header["objects"] = objects
+    header_bytes = json.dumps(header, separators=(",", ":")).encode("utf-8")
+    padding = -(4 + len(header_bytes)) % 8
+    data = np.asarray(rows, dtype="<f8").reshape(len(samples), len(columns))
+    return b"".join((
+        len(header_bytes).to_bytes(4, "little"),
+        header_bytes,
+        b"\0" * padding,
+        np.ascontiguousarray(data.T).tobytes(),
+    ))
+
+
 @dataclass
 class _StreamSubscription:
     variables: Optional[list[str]] = None
@@ -47,6 +108,59 @@ class _StreamSubscription:
         return max(period_interval, hz_interval)
 
 
+_CATCH_UP_POLICIES = ("burst", "skip")
+
+
+@dataclass
+class _RealtimePacing:
+    """Wall-clock pacing for a running session plus the lag it has observed.
+
+    ``realtime_factor`` is simulated seconds per wall-clock second; ``0`` runs
+    as fast as possible. When a step finishes after its deadline, ``burst``
+    runs the overdue steps back to back (up to ``max_catch_up_steps`` behind)
+    and ``skip`` drops the missed wall time and re-anchors at once.
+    """
+
+    realtime_factor: float = 1.0
+    catch_up: str = "burst"
+    max_catch_up_steps: int = 10
+    steps: int = 0
+    lag_seconds: float = 0.0
+    max_lag_seconds: float = 0.0
+    overruns: int = 0
+    resyncs: int = 0
+    skipped_seconds: float = 0.0
+    step_cost_seconds: float = 0.0
+
+    def record_step(self, cost: float, budget: Optional[float]):
+        self.steps += 1
+        # Exponential average keeps the reported cost stable between heartbeats.
+        self.step_cost_seconds = cost if self.steps == 1 else 0.8 * self.step_cost_seconds + 0.2 * cost
+        if budget is not None and cost > budget:
+            self.overruns += 1
+
+    def record_lag(self, lag: float):
+        self.lag_seconds = max(0.0, lag)
+        self.max_lag_seconds = max(self.max_lag_seconds, self.lag_seconds)
+
+    def record_resync(self, lag: float):
+        self.resyncs += 1
+        self.skipped_seconds += max(0.0, lag)
+        self.lag_seconds = 0.0
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "realtimeFactor": self.realtime_factor,
+            "catchUp": self.catch_up,
+            "lagMs": round(self.lag_seconds * 1000.0, 3),
+            "maxLagMs": round(self.max_lag_seconds * 1000.0, 3),
+            "stepCostMs": round(self.step_cost_seconds * 1000.0, 3),
+            "overruns": self.overruns,
+            "resyncs": self.resyncs,
+            "skippedMs": round(self.skipped_seconds * 1000.0, 3),
+        }
+
+
 @dataclass
 class _WsConnection:
     websocket: WebSocket
@@ -55,11 +169,207 @@ class _WsConnection:
     send_lock: asyncio.Lock = field(default_factory=asyncio.Lock)
     sender_task: Optional[asyncio.Task] = None
     attached_at: float = field(default_factory=time.time)
+    binary_outputs: bool = False
 
     def __post_init__(self):
         self.queue = asyncio.Queue(maxsize=self.queue_size)
 
 
+_ACCESS_PLAN_CACHE_SIZE = 32
+_REAL_TYPES = ("Real", "Float32", "Float64")
+_INTEGER_TYPES = ("Integer", "Int8", "UInt8", "Int16", "UInt16", "Int32", "UInt32", "Int64", "UInt64")
+_SUPPORTED_TYPES = _REAL_TYPES + _INTEGER_TYPES + ("Boolean", "String", "Binary", "Clock")
+_FMI2_NATIVE_TYPES = {"Real": ctypes.c_double, "Integer": ctypes.c_int, "Boolean": ctypes.c_int}
+_FMI3_NATIVE_TYPES = {
+    "Float32": ctypes.c_float,
+    "Float64": ctypes.c_double,
+    "Int8": ctypes.c_int8,
+    "UInt8": ctypes.c_uint8,
+    "Int16": ctypes.c_int16,
+    "UInt16": ctypes.c_uint16,
+    "Int32": ctypes.c_int32,
+    "UInt32": ctypes.c_uint32,
+    "Int64": ctypes.c_int64,
+    "UInt64": ctypes.c_uint64,
+    "Boolean": ctypes.c_bool,
+}
+
+
+def _unsupported_type(variable_type: str) -> HTTPException:
+    return HTTPException(status_code=400, detail=f"Realtime sessions do not support FMU variable type {variable_type}")
+
+
+def _native_accessor(fmu: Any, variable_type: str, direction: str):
+    """FMPy's raw ``fmi2Get*``/``fmi3Set*`` binding for a type, with its C element type.
+
+    Returns ``(function, ctype, takes_value_count)`` or ``None`` when the FMU
+    only offers the list-based wrappers (mocks, strings, binaries, clocks).
+    """
+    if getattr(fmu, "component", None) is None:
+        return None
+    ctype = _FMI3_NATIVE_TYPES.get(variable_type)
+    if ctype is not None:
+        function = getattr(fmu, f"fmi3{direction}{variable_type}", None)
+        if function is not None:
+            return function, ctype, True
+    ctype = _FMI2_NATIVE_TYPES.get(variable_type)
+    if ctype is not None:
+        function = getattr(fmu, f"fmi2{direction}{variable_type}", None)
+        if function is not None:
+            return function, ctype, False
+    return None
+
+
+def _normalize_native_values(variable_type: str, view: np.ndarray) -> list[Any]:
+    if variable_type in ("Int64", "UInt64"):
+        return [str(value) for value in view.tolist()]
+    if variable_type == "Boolean":
+        return view.astype(bool).tolist()
+    return view.tolist()
+
+
+def _coerce_input_values(variable_type: str, values: list[Any]) -> list[Any]:
+    if variable_type in _REAL_TYPES:
+        return [float(value) for value in values]
+    if variable_type in _INTEGER_TYPES:
+        return [int(value) for value in values]
+    if variable_type in ("Boolean", "Clock"):
+        return [bool(value) for value in values]
+    if variable_type == "String":
+        return [str(value) for value in values]
+    if variable_type == "Binary":
+        try:
+            return [
+                value if isinstance(value, (bytes, bytearray)) else base64.b64decode(str(value), validate=True)
+                for value in values
+            ]
+        except Exception as exc:
+            raise HTTPException(status_code=400, detail="Binary inputs must be valid base64 strings") from exc
+    raise _unsupported_type(variable_type)
+
+
+class _AccessGroup:
+    """All requested variables of one FMI type, read or written with a single call."""
+
+    def __init__(self, variable_type: str):
+        self.variable_type = variable_type
+        self.names: list[str] = []
+        self.sizes: list[int] = []
+        self.refs: list[int] = []
+        self.n_values = 0
+        self.accessor = None
+        self.native = None
+        self.ref_array = None
+        self.buffer = None
+        self.view: Optional[np.ndarray] = None
+
+    def add(self, name: str, value_reference: int, size: int):
+        self.names.append(name)
+        self.refs.append(value_reference)
+        self.sizes.append(size)
+        self.n_values += size
+
+    def bind(self, fmu: Any, direction: str):
+        native = _native_accessor(fmu, self.variable_type, direction)
+        if native is not None:
+            function, ctype, takes_value_count = native
+            self.native = (function, takes_value_count)
+            self.ref_array = (ctypes.c_uint * len(self.refs))(*self.refs)
+            self.buffer = (ctype * self.n_values)()
+            self.view = np.ctypeslib.as_array(self.buffer)
+            return
+        self.accessor = getattr(fmu, f"{direction.lower()}{self.variable_type}", None)
+        if self.accessor is None:
+            raise _unsupported_type(self.variable_type)
+
+
+class _VariableAccessPlan:
+    """Compiled reads or writes for a fixed list of variable names.
+
+    Type grouping, flat sizes, value-reference arrays and C value buffers are
+    worked out once; each call is then one FMU call per FMI type. Plans belong
+    to one FMU instance and are only used from the session's FMU thread, which
+    is what makes reusing the buffers safe.
+    """
+
+    def __init__(self, session: "_RealtimeSession", names: tuple[str, ...], writable: bool):
+        self.fmu = session._fmu
+        self.variables = session._variables
+        self.writable = writable
+        groups: dict[str, _AccessGroup] = {}
+        for name in names:
+            variable = self.variables.get(name)
+            if variable is None:
+                continue
+            variable_type = session._normalize_variable_type(variable)
+            group = groups.get(variable_type)
+            if group is None:
+                group = groups[variable_type] = _AccessGroup(variable_type)
+            group.add(variable.name, int(variable.valueReference), session._variable_flat_size(variable))
+        direction = "Set" if writable else "Get"
+        for group in groups.values():
+            if group.variable_type not in _SUPPORTED_TYPES:
+                raise _unsupported_type(group.variable_type)
+            group.bind(self.fmu, direction)
+        self.groups = list(groups.values())
+
+    def read(self) -> dict[str, Any]:
+        outputs: dict[str, Any] = {}
+        for group in self.groups:
+            if group.native is not None:
+                function, takes_value_count = group.native
+                if takes_value_count:
+                    function(self.fmu.component, group.ref_array, len(group.refs), group.buffer, group.n_values)
+                else:
+                    function(self.fmu.component, group.ref_array, len(group.refs), group.buffer)
+                values = _normalize_native_values(group.variable_type, group.view)
+            else:
+                if group.n_values != len(group.refs):
+                    raw = group.accessor(list(group.refs), nValues=group.n_values)
+                else:
+                    raw = group.accessor(list(group.refs))
+                values = [
+                    _RealtimeSession._normalize_scalar_value(group.variable_type, value)
+                    for value in raw[: group.n_values]
+                ]
+            if group.n_values == len(group.names):
+                outputs.update(zip(group.names, values))
+                continue
+            offset = 0
+            for name, size in zip(group.names, group.sizes):
+                segment = values[offset: offset + size]
+                offset += size
+                outputs[name] = segment[0] if size == 1 else segment
+        return outputs
+
+    def write(self, values: dict[str, Any]):
+        for group in self.groups:
+            flat: list[Any] = []
+            for name, size in zip(group.names, group.sizes):
+                value = values[name]
+                if size > 1:
+                    if not isinstance(value, (list, tuple)):
+                        raise HTTPException(status_code=400, detail=f"Array input '{name}' must be provided as a JSON array")
+                    if len(value) != size:
+                        raise HTTPException(
+                            status_code=400,
+                            detail=f"Array input '{name}' expects {size} values but received {len(value)}",
+                        )
+                    flat.extend(value)
+                else:
+                    flat.append(value)
+            coerced = _coerce_input_values(group.variable_type, flat)
+            if group.native is None:
+                group.accessor(list(group.refs), coerced)
+                continue
+            function, takes_value_count = group.native
+            group.buffer[:] = coerced
+            if takes_value_count:
+                function(self.fmu.component, group.ref_array, len(group.refs), group.buffer, group.n_values)
+            else:
+                function(self.fmu.component, group.ref_array, len(group.refs), group.buffer)
+
+
 class _RealtimeSession:
     def __init__(self, manager: "RealtimeWsManager", session_id: str, claims: dict, fmu_path: Path):
         self.manager = manager
@@ -92,9 +402,13 @@ class _RealtimeSession:
         self._variables: dict[str, Any] = {}
         self._variables_by_value_reference: dict[int, Any] = {}
         self._fmu = None
+        self._fmu_executor: Optional[ThreadPoolExecutor] = None
+        self._access_plans: OrderedDict[tuple, _VariableAccessPlan] = OrderedDict()
+        self._default_outputs: Optional[tuple[dict, list[str]]] = None
         self._unzipdir: Optional[str] = None
         self._last_expiry_notice = 0
-        self._pending_samples: list[dict[str, Any]] = []
+        self._pending_samples: list[tuple[float, dict[str, Any]]] = []
+        self._pacing = _RealtimePacing()
         self.capabilities = {
             "pause": True,
             "reset": True,
@@ -160,11 +474,14 @@ class _RealtimeSession:
             while True:
                 payload = await connection.queue.get()
                 async with connection.send_lock:
-                    await connection.websocket.send_json(payload)
+                    if isinstance(payload, bytes):
+                        await connection.websocket.send_bytes(payload)
+                    else:
+                        await connection.websocket.send_json(payload)
         except Exception:
             return
 
-    async def _enqueue_event(self, payload: dict):
+    async def _enqueue_event(self, payload: dict | bytes):
         if not self.connection:
             return
         queue = self.connection.queue
@@ -194,6 +511,7 @@ class _RealtimeSession:
                     "serverTime": int(time.time()),
                     "state": self.state,
                     "simTime": self.current_time,
+                    "pacing": self._pacing.snapshot(),
                 })
                 if self.exp is not None:
                     remaining = self.exp - int(time.time())
@@ -208,10 +526,25 @@ class _RealtimeSession:
         except asyncio.CancelledError:
             return
 
+    async def _call_fmu(self, func, *args):
+        """Run blocking FMU work on this session's own thread, in submission order.
+
+        The single-worker executor is the session's command queue: the event
+        loop only awaits results, so a slow ``doStep`` cannot delay other
+        sessions' heartbeats or websocket I/O.
+        """
+        if self._fmu_executor is None:
+            self._fmu_executor = ThreadPoolExecutor(
+                max_workers=1,
+                thread_name_prefix=f"fmu-rt-{self.session_id[:8]}",
+            )
+        return await asyncio.get_running_loop().run_in_executor(self._fmu_executor, func, *args)
+
     def _ensure_model_loaded(self):
         if self._model_description is not None:
             return
-        md = read_model_description(str(self.fmu_path))
+        cache = self.manager.model_description_cache
+        md = cache.get(self.fmu_path, read_model_description) if cache is not None else read_model_description(str(self.fmu_path))
         self._model_description = md
         self._model_payload = self.manager.model_description_payload(md)
         self._variables = {var.name: var for var in md.modelVariables}
@@ -284,99 +617,32 @@ class _RealtimeSession:
             return bool(value)
         raise HTTPException(status_code=400, detail=f"Realtime sessions do not support FMU variable type {variable_type}")
 
+    def _access_plan(self, names: Any, writable: bool) -> "_VariableAccessPlan":
+        key = (writable, tuple(names))
+        plan = self._access_plans.get(key)
+        if plan is not None and plan.fmu is self._fmu and plan.variables is self._variables:
+            self._access_plans.move_to_end(key)
+            return plan
+        plan = _VariableAccessPlan(self, key[1], writable)
+        self._access_plans[key] = plan
+        while len(self._access_plans) > _ACCESS_PLAN_CACHE_SIZE:
+            self._access_plans.popitem(last=False)
+        return plan
+
     def _set_values(self, values: dict[str, Any]):
         if not self._fmu:
             raise HTTPException(status_code=409, detail="Simulation is not initialized")
-        by_type: dict[str, dict[str, list[Any]]] = defaultdict(lambda: {"refs": [], "values": []})
-        for name, value in values.items():
-            variable = self._variables.get(name)
-            if not variable:
-                continue
-            variable_type = self._normalize_variable_type(variable)
-            variable_size = self._variable_flat_size(variable)
-            if variable_size > 1:
-                if not isinstance(value, (list, tuple)):
-                    raise HTTPException(status_code=400, detail=f"Array input '{name}' must be provided as a JSON array")
-                if len(value) != variable_size:
-                    raise HTTPException(
-                        status_code=400,
-                        detail=f"Array input '{name}' expects {variable_size} values but received {len(value)}",
-                    )
-                by_type[variable_type]["refs"].append(int(variable.valueReference))
-                by_type[variable_type]["values"].extend(list(value))
-            else:
-                by_type[variable_type]["refs"].append(int(variable.valueReference))
-                by_type[variable_type]["values"].append(value)
-
-        for variable_type, payload in by_type.items():
-            refs = payload["refs"]
-            vals = payload["values"]
-            setter_name = f"set{variable_type}"
-            setter = getattr(self._fmu, setter_name, None)
-            if setter is None:
-                raise HTTPException(status_code=400, detail=f"Realtime sessions do not support FMU variable type {variable_type}")
-            if variable_type in ("Real", "Float32", "Float64"):
-                setter(list(refs), [float(v) for v in vals])
-            elif variable_type in ("Integer", "Int8", "UInt8", "Int16", "UInt16", "Int32", "UInt32", "Int64", "UInt64"):
-                setter(list(refs), [int(v) for v in vals])
-            elif variable_type == "Boolean":
-                setter(list(refs), [bool(v) for v in vals])
-            elif variable_type == "String":
-                setter(list(refs), [str(v) for v in vals])
-            elif variable_type == "Binary":
-                try:
-                    setter(
-                        list(refs),
-                        [
-                            value if isinstance(value, (bytes, bytearray)) else base64.b64decode(str(value), validate=True)
-                            for value in vals
-                        ],
-                    )
-                except Exception as exc:
-                    raise HTTPException(status_code=400, detail="Binary inputs must be valid base64 strings") from exc
-            elif variable_type == "Clock":
-                setter(list(refs), [bool(v) for v in vals])
-            else:
-                raise HTTPException(status_code=400, detail=f"Realtime sessions do not support FMU variable type {variable_type}")
+        self._access_plan(values.keys(), writable=True).write(values)
 
     def _get_values(self, variables: list[str]) -> dict[str, Any]:
         if not self._fmu:
             raise HTTPException(status_code=409, detail="Simulation is not initialized")
-        selected: list[Any] = []
-        for name in variables:
-            var = self._variables.get(name)
-            if var is not None:
-                selected.append(var)
-
-        by_type: dict[str, dict[str, Any]] = defaultdict(lambda: {"variables": [], "refs": [], "nValues": 0})
-        for var in selected:
-            variable_type = self._normalize_variable_type(var)
-            by_type[variable_type]["variables"].append(var)
-            by_type[variable_type]["refs"].append(int(var.valueReference))
-            by_type[variable_type]["nValues"] += self._variable_flat_size(var)
-
-        outputs: dict[str, Any] = {}
-        for variable_type, payload in by_type.items():
-            typed_variables = payload["variables"]
-            refs = payload["refs"]
-            getter_name = f"get{variable_type}"
-            getter = getattr(self._fmu, getter_name, None)
-            if getter is None:
-                raise HTTPException(status_code=400, detail=f"Realtime sessions do not support FMU variable type {variable_type}")
-            if payload["nValues"] != len(refs):
-                vals = getter(list(refs), nValues=payload["nValues"])
-            else:
-                vals = getter(list(refs))
-            offset = 0
-            for variable in typed_variables:
-                value_count = self._variable_flat_size(variable)
-                raw_segment = vals[offset: offset + value_count]
-                offset += value_count
-                normalized_segment = [self._normalize_scalar_value(variable_type, value) for value in raw_segment]
-                outputs[variable.name] = normalized_segment[0] if value_count == 1 else normalized_segment
-        return outputs
+        return self._access_plan(variables, writable=False).read()
 
     def _default_output_variables(self) -> list[str]:
+        cached = self._default_outputs
+        if cached is not None and cached[0] is self._variables:
+            return cached[1]
         names = []
         for var in self._variables.values():
             causality = (var.causality or "").lower()
@@ -384,6 +650,7 @@ class _RealtimeSession:
                 names.append(var.name)
         if not names:
             names = [var.name for var in self._variables.values()]
+        self._default_outputs = (self._variables, names)
         return names
 
     def _sample_outputs(self) -> dict[str, Any]:
@@ -393,35 +660,52 @@ class _RealtimeSession:
     async def _emit_outputs_if_needed(self, force: bool = False):
         if not self.subscription:
             return
-        self._pending_samples.append(self._sample_outputs())
+        sample = await self._call_fmu(self._sample_outputs)
+        self._pending_samples.append((self.current_time, sample))
         if len(self._pending_samples) > self.subscription.max_batch_size:
             dropped_samples = len(self._pending_samples) - self.subscription.max_batch_size
             self._pending_samples = self._pending_samples[dropped_samples:]
             self.subscription.rate_dropped += dropped_samples
 
+        # Binary batches carry every pending sample, so throttling loses nothing.
+        binary = self.connection is not None and self.connection.binary_outputs
         now_mono = time.monotonic()
         min_interval = self.subscription.min_interval_seconds()
         if not force and (now_mono - self.subscription.last_emit_monotonic) < min_interval:
-            self.subscription.rate_dropped += 1
+            if not binary:
+                self.subscription.rate_dropped += 1
             return
         self.subscription.last_emit_monotonic = now_mono
-        values = self._pending_samples[-1]
-        batch_size = len(self._pending_samples)
-        self._pending_samples.clear()
+        await self._send_pending_outputs()
+
+    async def _flush_pending_outputs(self):
+        # Binary batches hold samples back between emits; send them before the
+        # run stops, pauses or resets so the tail of the run is not lost.
+        if self.subscription and self._pending_samples and self.connection is not None and self.connection.binary_outputs:
+            self.subscription.last_emit_monotonic = time.monotonic()
+            await self._send_pending_outputs()
+
+    async def _send_pending_outputs(self):
+        binary = self.connection is not None and self.connection.binary_outputs
+        samples = self._pending_samples
+        self._pending_samples = []
         dropped = self.subscription.rate_dropped + self._pending_queue_drops
         self.subscription.rate_dropped = 0
         self._pending_queue_drops = 0
-        payload = {
+        header = {
             "type": "sim.outputs",
             "sessionId": self.session_id,
             "seq": self.seq,
             "dropped": dropped,
-            "batchSize": batch_size,
+            "batchSize": len(samples),
             "simTime": self.current_time,
-            "values": values,
         }
         self.seq += 1
-        await self._enqueue_event(payload)
+        if binary:
+            await self._enqueue_event(encode_output_batch(header, samples))
+            return
+        header["values"] = samples[-1][1]
+        await self._enqueue_event(header)
 
     async def _emit_state(self):
         await self._enqueue_event({
@@ -444,6 +728,7 @@ class _RealtimeSession:
                 # FMU runtimes may reject cleanup after a failed initialization.
                 pass
         self._fmu = None
+        self._access_plans.clear()
         if self._unzipdir:
             try:
                 shutil.rmtree(self._unzipdir, ignore_errors=True)
@@ -452,23 +737,12 @@ class _RealtimeSession:
                 pass
             self._unzipdir = None
 
-    async def initialize(self, options: dict):
-        self.ensure_reservation_window()
-        self._ensure_model_loaded()
-        if self._model_payload and self._model_payload.get("simulationKind") != "coSimulation":
-            raise HTTPException(status_code=400, detail="Realtime sessions currently support only coSimulation FMUs")
-        if self._runner_task and not self._runner_task.done():
-            self._runner_task.cancel()
-        self._runner_task = None
-
-        self.current_time = self.manager.coerce_float(options.get("startTime"), 0.0)
-        self.stop_time = self.manager.coerce_float(options.get("stopTime"), 10.0)
-        self.step_size = self.manager.coerce_float(options.get("stepSize"), 0.01)
-        if self.stop_time <= self.current_time:
-            raise HTTPException(status_code=400, detail="stopTime must be greater than startTime")
-        if self.step_size <= 0:
-            raise HTTPException(status_code=400, detail="stepSize must be positive")
-
+    def _instantiate_fmu(self, start_time: float, stop_time: float, step_size: float, start_inputs: Any):
+        # Runs behind any doStep still queued by a cancelled runner, so that
+        # step cannot move the clock of the new instance.
+        self.current_time = start_time
+        self.stop_time = stop_time
+        self.step_size = step_size
         self._shutdown_fmu()
         self._unzipdir = extract(str(self.fmu_path))
         self._fmu = instantiate_fmu(self._unzipdir, self._model_description, fmi_type="CoSimulation")
@@ -479,26 +753,89 @@ class _RealtimeSession:
         else:
             self._fmu.setupExperiment(startTime=self.current_time, stopTime=self.stop_time)
             self._fmu.enterInitializationMode()
-        start_inputs = options.get("inputs")
         if isinstance(start_inputs, dict) and start_inputs:
             self._set_values(start_inputs)
         self._fmu.exitInitializationMode()
+
+    def _release_fmu(self):
+        executor, self._fmu_executor = self._fmu_executor, None
+        if executor is None:
+            self._shutdown_fmu()
+            return
+        # Queued behind any in-flight doStep; terminating must not wait for it.
+        executor.submit(self._shutdown_fmu)
+        executor.shutdown(wait=False)
+
+    def _parse_pacing(self, options: dict) -> _RealtimePacing:
+        time_mode = str(options.get("timeMode") or "realtime").strip().lower()
+        if time_mode not in ("realtime", "simtime"):
+            # Older clients sent timeMode values that were never read; keep accepting them.
+            self.manager.logger.warning(
+                "Unknown timeMode %r for session %s; pacing in realtime", options.get("timeMode"), self.session_id
+            )
+            time_mode = "realtime"
+        # simtime is "as fast as possible" unless a factor is given explicitly.
+        realtime_factor = self.manager.coerce_float(options.get("realtimeFactor"), 1.0 if time_mode == "realtime" else 0.0)
+        if realtime_factor is None or not math.isfinite(realtime_factor) or realtime_factor < 0:
+            raise HTTPException(status_code=400, detail="realtimeFactor must be zero (as fast as possible) or positive")
+        catch_up = str(options.get("catchUp") or "burst").strip().lower()
+        if catch_up not in _CATCH_UP_POLICIES:
+            raise HTTPException(status_code=400, detail="catchUp must be 'burst' or 'skip'")
+        max_catch_up_steps = self.manager.coerce_float(options.get("maxCatchUpSteps"), 10)
+        if max_catch_up_steps is None or not math.isfinite(max_catch_up_steps) or max_catch_up_steps < 0:
+            raise HTTPException(status_code=400, detail="maxCatchUpSteps must be zero or positive")
+        return _RealtimePacing(
+            realtime_factor=realtime_factor,
+            catch_up=catch_up,
+            max_catch_up_steps=int(max_catch_up_steps),
+        )
+
+    async def initialize(self, options: dict):
+        self.ensure_reservation_window()
+        await self._call_fmu(self._ensure_model_loaded)
+        if self._model_payload and self._model_payload.get("simulationKind") != "coSimulation":
+            raise HTTPException(status_code=400, detail="Realtime sessions currently support only coSimulation FMUs")
+        if self._runner_task and not self._runner_task.done():
+            self._runner_task.cancel()
+        self._runner_task = None
+
+        start_time = self.manager.coerce_float(options.get("startTime"), 0.0)
+        stop_time = self.manager.coerce_float(options.get("stopTime"), 10.0)
+        step_size = self.manager.coerce_float(options.get("stepSize"), 0.01)
+        if stop_time <= start_time:
+            raise HTTPException(status_code=400, detail="stopTime must be greater than startTime")
+        if step_size <= 0:
+            raise HTTPException(status_code=400, detail="stepSize must be positive")
+        pacing = self._parse_pacing(options)
+
+        await self._call_fmu(self._instantiate_fmu, start_time, stop_time, step_size, options.get("inputs"))
+        self._pacing = pacing
         self.state = "initialized"
         await self._emit_state()
 
+    def _do_step(self, delta_t: float):
+        # Advance the clock on the FMU thread too, so a pause that cancels the
+        # awaiting runner cannot leave current_time behind the FMU.
+        if self._fmu is None:
+            raise HTTPException(status_code=409, detail="Simulation is not initialized")
+        self._fmu.doStep(self.current_time, delta_t)
+        self.current_time = self.current_time + delta_t
+
     async def _step_once(self, delta_t: float, emit_outputs: bool = True):
         self.ensure_reservation_window()
         if self._fmu is None:
             raise HTTPException(status_code=409, detail="Simulation is not initialized")
         if delta_t <= 0:
             raise HTTPException(status_code=400, detail="deltaT must be positive")
-        self._fmu.doStep(self.current_time, delta_t)
-        self.current_time = self.current_time + delta_t
-        await self._enqueue_event({
-            "type": "sim.progress",
-            "sessionId": self.session_id,
-            "simTime": self.current_time,
-        })
+        await self._call_fmu(self._do_step, delta_t)
+        # Subscribed binary connections read progress from the batch header
+        # simTime instead of one JSON frame per step.
+        if not (self.subscription and self.connection is not None and self.connection.binary_outputs):
+            await self._enqueue_event({
+                "type": "sim.progress",
+                "sessionId": self.session_id,
+                "simTime": self.current_time,
+            })
         if emit_outputs:
             await self._emit_outputs_if_needed()
 
@@ -518,6 +855,7 @@ class _RealtimeSession:
         if self._runner_task and not self._runner_task.done():
             self._runner_task.cancel()
         self._runner_task = None
+        await self._flush_pending_outputs()
         self.state = "paused"
         await self._emit_state()
 
@@ -535,7 +873,11 @@ class _RealtimeSession:
             "startTime": 0.0,
             "stopTime": self.stop_time if self.stop_time > 0 else 10.0,
             "stepSize": self.step_size if self.step_size > 0 else 0.01,
+            "realtimeFactor": self._pacing.realtime_factor,
+            "catchUp": self._pacing.catch_up,
+            "maxCatchUpSteps": self._pacing.max_catch_up_steps,
         }
+        await self._flush_pending_outputs()
         await self.initialize(options)
         self.state = "initialized"
         await self._emit_state()
@@ -566,7 +908,7 @@ class _RealtimeSession:
                 # The peer may already have closed the websocket.
                 pass
         await self.detach()
-        self._shutdown_fmu()
+        self._release_fmu()
         self.state = "stopped"
         self._closed = True
         self.manager.release_slot(self.lab_id)
@@ -574,25 +916,111 @@ class _RealtimeSession:
             await self._enqueue_event(close_payload)
 
     async def _run_loop(self):
+        pacing = self._pacing
+        # Deadlines are measured from an anchor, so step cost and sleep
+        # overshoot are absorbed instead of accumulating as drift.
+        anchor_wall = time.monotonic()
+        anchor_sim = self.current_time
         try:
             while self.state == "running":
                 if self.current_time >= self.stop_time:
+                    await self._flush_pending_outputs()
                     self.state = "stopped"
                     await self._emit_state()
                     break
+                step_started = time.monotonic()
                 await self._step_once(self.step_size, emit_outputs=True)
-                await asyncio.sleep(min(max(self.step_size, 0.01), 1.0))
+                finished = time.monotonic()
+                factor = pacing.realtime_factor
+                budget = self.step_size / factor if factor > 0 else None
+                pacing.record_step(finished - step_started, budget)
+                if budget is None:
+                    # As fast as possible, but still let other sessions run.
+                    await asyncio.sleep(0)
+                    continue
+                deadline = anchor_wall + (self.current_time - anchor_sim) / factor
+                lag = finished - deadline
+                if lag <= 0:
+                    pacing.record_lag(0.0)
+                    await asyncio.sleep(-lag)
+                    continue
+                pacing.record_lag(lag)
+                behind_steps = lag / budget
+                if (pacing.catch_up == "skip" and behind_steps >= 1) or behind_steps > pacing.max_catch_up_steps:
+                    pacing.record_resync(lag)
+                    anchor_wall = finished
+                    anchor_sim = self.current_time
+                await asyncio.sleep(0)
         except asyncio.CancelledError:
             return
         except HTTPException:
+            await self._flush_pending_outputs()
             self.state = "error"
             await self._emit_state()
         except Exception as exc:
             self.manager.logger.error("Realtime runner loop failed for session %s: %s", self.session_id, exc)
+            await self._flush_pending_outputs()
             self.state = "error"
             await self._emit_state()
 
 
+class _MuxStreamWebSocket:
+    """One Gateway client stream on a multiplexed Station channel.
+
+    Quacks like the Starlette WebSocket that ``handle_websocket`` expects, so
+    every stream runs the ordinary per-connection command loop and gets its
+    own session queue (flow control) and attach/detach handling.
+    """
+
+    def __init__(self, channel: WebSocket, channel_send, stream_id: str, headers: dict[str, str]):
+        self.stream_id = stream_id
+        self.headers = headers
+        self.query_params: dict[str, str] = {}
+        self.client = getattr(channel, "client", None)
+        self._channel_send = channel_send
+        self._incoming: asyncio.Queue = asyncio.Queue()
+        self._closed = False
+
+    async def accept(self, subprotocol: Optional[str] = None):
+        return None
+
+    def feed(self, payload: str):
+        self._incoming.put_nowait(payload)
+
+    def disconnect(self):
+        self._incoming.put_nowait(None)
+
+    async def receive_text(self) -> str:
+        payload = await self._incoming.get()
+        if payload is None:
+            self._closed = True
+            raise WebSocketDisconnect(code=1000)
+        return payload
+
+    async def send_json(self, payload: dict):
+        await self.send_text(json.dumps(payload))
+
+    async def send_text(self, payload: str):
+        if self._closed:
+            raise RuntimeError("multiplexed stream is closed")
+        await self._channel_send(encode_mux_frame(self.stream_id, payload))
+
+    async def send_bytes(self, payload: bytes):
+        if self._closed:
+            raise RuntimeError("multiplexed stream is closed")
+        await self._channel_send(encode_mux_frame(self.stream_id, payload))
+
+    async def close(self, code: int = 1000):
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            await self._channel_send(encode_mux_frame(self.stream_id, mux_control(MUX_CLOSED, code=code)))
+        except Exception:
+            # The shared channel may already be gone.
+            pass
+
+
 class RealtimeWsManager:
     def __init__(
         self,
@@ -616,6 +1044,7 @@ class RealtimeWsManager:
         ws_cleanup_seconds: float = 15.0,
         internal_ws_token: str = "",
         ws_create_rate_limit_per_minute: int = 30,
+        model_description_cache=None,
     ):
         self.logger = logger
         self.verify_jwt_token = verify_jwt_token
@@ -636,6 +1065,7 @@ class RealtimeWsManager:
         self.ws_cleanup_seconds = ws_cleanup_seconds
         self.internal_ws_token = internal_ws_token
         self.ws_create_rate_limit_per_minute = ws_create_rate_limit_per_minute
+        self.model_description_cache = model_description_cache
 
         self._sessions: dict[str, _RealtimeSession] = {}
         self._sessions_lock = asyncio.Lock()
@@ -789,9 +1219,90 @@ class RealtimeWsManager:
         async with connection.send_lock:
             await connection.websocket.send_json(payload)
 
+    async def _handle_multiplexed_channel(self, websocket: WebSocket):
+        """Serve many Gateway client streams over one internal Station WebSocket."""
+        await websocket.accept(subprotocol=STATION_MUX_SUBPROTOCOL)
+        send_lock = asyncio.Lock()
+
+        async def _channel_send(frame: str | bytes):
+            async with send_lock:
+                if isinstance(frame, bytes):
+                    await websocket.send_bytes(frame)
+                else:
+                    await websocket.send_text(frame)
+
+        provided = websocket.headers.get("x-internal-session-token", "")
+        if not self.internal_ws_token or not secrets.compare_digest(provided, self.internal_ws_token):
+            message = "Internal token is not configured" if not self.internal_ws_token else "Invalid internal token"
+            await websocket.send_json(self.error_payload(code="FORBIDDEN", message=message))
+            await websocket.close(code=1008)
+            return
+
+        streams: dict[str, _MuxStreamWebSocket] = {}
+        tasks: dict[str, asyncio.Task] = {}
+        try:
+            while True:
+                frame = await websocket.receive_text()
+                try:
+                    stream_id, payload = decode_mux_frame(frame)
+                except ValueError:
+                    self.logger.warning("Dropping malformed multiplexed frame")
+                    continue
+                control = parse_mux_control(payload)
+                stream = streams.get(stream_id)
+                if stream is None:
+                    if control is None or control.get("type") != MUX_OPEN:
+                        await _channel_send(encode_mux_frame(stream_id, mux_control(MUX_CLOSED, code=1008)))
+                        continue
+                    headers = {"x-internal-session-token": provided}
+                    authorization = str(control.get("authorization") or "").strip()
+                    if authorization:
+                        headers["authorization"] = authorization
+                    subprotocol = str(control.get("subprotocol") or "").strip()
+                    if subprotocol:
+                        headers["sec-websocket-protocol"] = subprotocol
+                    stream = streams[stream_id] = _MuxStreamWebSocket(websocket, _channel_send, stream_id, headers)
+                    task = asyncio.create_task(self.handle_websocket(stream, internal=True))
+                    tasks[stream_id] = task
+
+                    def _forget(_task, stream_id=stream_id):
+                        streams.pop(stream_id, None)
+                        tasks.pop(stream_id, None)
+
+                    task.add_done_callback(_forget)
+                    continue
+                if control is not None and control.get("type") == MUX_CLOSE:
+                    stream.disconnect()
+                    continue
+                if control is not None and control.get("type") == MUX_OPEN:
+                    continue
+                stream.feed(payload if isinstance(payload, str) else payload.decode("utf-8", errors="replace"))
+        except WebSocketDisconnect:
+            pass
+        finally:
+            # Sessions detach and enter their attach grace period, so the
+            # Gateway can re-attach them over a new channel.
+            for stream in list(streams.values()):
+                stream.disconnect()
+            pending = list(tasks.values())
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+
     async def handle_websocket(self, websocket: WebSocket, *, internal: bool):
-        await websocket.accept()
-        connection = _WsConnection(websocket=websocket, queue_size=self.ws_session_queue_size)
+        offered = [item.strip() for item in str(websocket.headers.get("sec-websocket-protocol") or "").split(",")]
+        if internal and STATION_MUX_SUBPROTOCOL in offered:
+            await self._handle_multiplexed_channel(websocket)
+            return
+        binary_outputs = BINARY_OUTPUTS_SUBPROTOCOL in offered
+        if binary_outputs:
+            await websocket.accept(subprotocol=BINARY_OUTPUTS_SUBPROTOCOL)
+        else:
+            await websocket.accept()
+        connection = _WsConnection(
+            websocket=websocket,
+            queue_size=self.ws_session_queue_size,
+            binary_outputs=binary_outputs,
+        )
         current_session: Optional[_RealtimeSession] = None
         local_request_cache: dict[str, dict] = {}
 
@@ -1157,7 +1668,7 @@ class RealtimeWsManager:
                             "serverTime": int(time.time()),
                         }
                     elif msg_type == "model.describe":
-                        current_session._ensure_model_loaded()
+                        await current_session._call_fmu(current_session._ensure_model_loaded)
                         payload = current_session._model_payload or {}
                         response = {
                             "type": "model.description",
@@ -1213,7 +1724,7 @@ class RealtimeWsManager:
                     elif msg_type == "sim.step":
                         delta_t = self.coerce_float(message.get("deltaT"), current_session.step_size) or current_session.step_size
                         await current_session._step_once(delta_t, emit_outputs=False)
-                        outputs = current_session._sample_outputs()
+                        outputs = await current_session._call_fmu(current_session._sample_outputs)
                         response = {
                             "type": "sim.outputs",
                             "requestId": request_id,
@@ -1226,7 +1737,7 @@ class RealtimeWsManager:
                     elif msg_type == "sim.runUntil":
                         target_time = self.coerce_float(message.get("time"), current_session.current_time) or current_session.current_time
                         await current_session.run_until(target_time)
-                        outputs = current_session._sample_outputs()
+                        outputs = await current_session._call_fmu(current_session._sample_outputs)
                         response = {
                             "type": "sim.outputs",
                             "requestId": request_id,
@@ -1240,7 +1751,7 @@ class RealtimeWsManager:
                         values = message.get("values")
                         if not isinstance(values, dict):
                             raise HTTPException(status_code=400, detail="sim.setInputs requires an object 'values'")
-                        current_session._set_values(values)
+                        await current_session._call_fmu(current_session._set_values, values)
                         response = {
                             "type": "sim.inputs.updated",
                             "requestId": request_id,
@@ -1253,7 +1764,7 @@ class RealtimeWsManager:
                             variables = current_session._default_output_variables()
                         if not isinstance(variables, list):
                             raise HTTPException(status_code=400, detail="sim.getOutputs requires 'variables' as array")
-                        outputs = current_session._get_values(variables)
+                        outputs = await current_session._call_fmu(current_session._get_values, variables)
                         response = {
                             "type": "sim.outputs",
                             "requestId": request_id,
@@ -1289,6 +1800,7 @@ class RealtimeWsManager:
                             "periodMs": subscription.period_ms,
                             "maxBatchSize": subscription.max_batch_size,
                             "maxHz": subscription.max_hz,
+                            "encoding": "binary" if connection.binary_outputs else "json",
                         }
                     elif msg_type == "sim.unsubscribeOutputs":
                         current_session.subscription = None
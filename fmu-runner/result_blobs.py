@@ -0,0 +1,412 @@
+"""Content-addressed, gzip-compressed storage for simulation history results.
+
+History rows keep a reference (the SHA-256 of the result JSON) and summary
+statistics; the time series itself lives in ``<sha[:2]>/<sha>.json.gz``
+below the store directory. Identical results share one file. Retention
+drops blobs older than ``max_age_seconds`` and then the oldest ones until
+the store fits in ``max_bytes`` (``0`` disables either limit). A blob larger
+than ``max_bytes`` on its own is refused with ``ResultTooLargeError`` rather
+than stored and evicted at once; the blob just written is never evicted.
+
+Streamed runs are collected in a ``ResultSpool`` and written to the store
+column by column, so their result is never held in memory as a whole.
+"""
+
+from __future__ import annotations
+
+import errno
+import gzip
+import hashlib
+import json
+import math
+import os
+from pathlib import Path
+import tempfile
+import threading
+import time
+from typing import Any, BinaryIO, Callable, Iterable, Iterator, Optional
+
+import numpy as np
+
+
+GZIP_MEDIA_TYPE = "application/gzip"
+_SUFFIX = ".json.gz"
+_CHUNK_BYTES = 64 * 1024
+
+
+class ResultTooLargeError(OSError):
+    """A result whose compressed blob alone exceeds ``max_bytes``.
+
+    ``digest`` and ``size`` (uncompressed bytes) describe the refused result,
+    so its row can still reference it like an expired blob.
+    """
+
+    def __init__(self, digest: str, compressed_size: int, max_bytes: int):
+        super().__init__(errno.EFBIG, f"result blob of {compressed_size} bytes exceeds the {max_bytes}-byte store")
+        self.digest = digest
+        self.size = 0
+
+
+def _valid_digest(digest: str) -> bool:
+    return len(digest) == 64 and all(char in "0123456789abcdef" for char in digest)
+
+
+def _finite(value: float) -> Optional[float]:
+    return float(value) if math.isfinite(value) else None
+
+
+def result_summary(result: Any) -> dict[str, Any]:
+    """Row count, time span and per-output min/max/mean/final of a JSON result."""
+    if not isinstance(result, dict):
+        return {}
+    time_values = result.get("time") or []
+    summary: dict[str, Any] = {
+        "rows": len(time_values),
+        "startTime": time_values[0] if time_values else None,
+        "stopTime": time_values[-1] if time_values else None,
+        "outputs": {},
+    }
+    for name, values in (result.get("outputs") or {}).items():
+        try:
+            array = np.asarray(values, dtype=np.float64)
+        except (TypeError, ValueError):
+            continue
+        finite = array[np.isfinite(array)] if array.ndim == 1 else np.empty(0)
+        if not finite.size:
+            continue
+        summary["outputs"][name] = {
+            "min": _finite(finite.min()),
+            "max": _finite(finite.max()),
+            "mean": _finite(finite.mean()),
+            "final": _finite(array[-1]),
+        }
+    return summary
+
+
+def columnar_summary(result: Any) -> dict[str, Any]:
+    """``result_summary`` of a ``ColumnarResult``, computed on its arrays."""
+    time_values = np.empty(0)
+    outputs: dict[str, np.ndarray] = {}
+    for column in result.columns:
+        if column["name"].lower() == "time":
+            time_values = result.column(column["name"])
+        else:
+            outputs[column["name"]] = result.column(column["name"])
+    summary: dict[str, Any] = {
+        "rows": int(time_values.size),
+        "startTime": time_values[0].item() if time_values.size else None,
+        "stopTime": time_values[-1].item() if time_values.size else None,
+        "outputs": {},
+    }
+    for name, values in outputs.items():
+        stats = _OutputStats()
+        stats.add(values)
+        output = stats.summary()
+        if output is not None:
+            summary["outputs"][name] = output
+    return summary
+
+
+class _OutputStats:
+    """Running min/max/mean/final of one output, matching ``result_summary``."""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.minimum = math.inf
+        self.maximum = -math.inf
+        self.final: Optional[float] = None
+        self.valid = True
+
+    def add(self, values: Any) -> None:
+        if not self.valid or not len(values):
+            return
+        try:
+            array = np.asarray(values, dtype=np.float64)
+        except (TypeError, ValueError):
+            self.valid = False
+            return
+        if array.ndim != 1:
+            self.valid = False
+            return
+        self.final = float(array[-1])
+        finite = array[np.isfinite(array)]
+        if finite.size:
+            self.count += int(finite.size)
+            self.total += float(finite.sum())
+            self.minimum = min(self.minimum, float(finite.min()))
+            self.maximum = max(self.maximum, float(finite.max()))
+
+    def summary(self) -> Optional[dict[str, Any]]:
+        if not self.valid or not self.count:
+            return None
+        return {
+            "min": _finite(self.minimum),
+            "max": _finite(self.maximum),
+            "mean": _finite(self.total / self.count),
+            "final": _finite(self.final),
+        }
+
+
+class ResultSpool:
+    """The JSON result of a streamed run, spooled to a temporary file as chunks arrive.
+
+    Each line holds one column of one chunk as ``<column>\t<values>``, the
+    values being the body of a JSON array. ``iter_json`` re-emits the merged
+    result one column at a time, byte for byte what ``json.dumps`` gives for
+    ``{"time", "outputs", "outputVariables"}``, and fills in ``summary``.
+    """
+
+    def __init__(self):
+        self._file = tempfile.TemporaryFile(mode="w+", encoding="utf-8")
+        # output name -> column number; time is column 0
+        self._columns: dict[str, int] = {}
+        self.output_variables: list[str] = []
+        self.summary: dict[str, Any] = {}
+
+    def append(self, chunk: dict) -> None:
+        self._write(0, chunk.get("time") or [])
+        for name, values in (chunk.get("outputs") or {}).items():
+            self._write(self._columns.setdefault(name, len(self._columns) + 1), values)
+
+    def _write(self, column: int, values: list) -> None:
+        body = json.dumps(list(values))[1:-1]
+        if body:
+            self._file.write(f"{column}\t{body}\n")
+
+    def iter_json(self, chunk_bytes: int = _CHUNK_BYTES) -> Iterator[bytes]:
+        names = list(dict.fromkeys([*self.output_variables, *self._columns]))
+        time_stats = {"rows": 0, "startTime": None, "stopTime": None}
+
+        def _time(values: list) -> None:
+            if time_stats["startTime"] is None:
+                time_stats["startTime"] = values[0]
+            time_stats["stopTime"] = values[-1]
+            time_stats["rows"] += len(values)
+
+        pending: list[str] = ['{"time": [']
+        size = len(pending[0])
+        for text in self._column(0, _time):
+            pending.append(text)
+            size += len(text)
+            if size >= chunk_bytes:
+                yield "".join(pending).encode("utf-8")
+                pending, size = [], 0
+        pending.append('], "outputs": {')
+        outputs: dict[str, Any] = {}
+        for position, name in enumerate(names):
+            stats = _OutputStats()
+            pending.append(f'{", " if position else ""}{json.dumps(name)}: [')
+            column = self._columns.get(name)
+            if column is not None:
+                for text in self._column(column, stats.add):
+                    pending.append(text)
+                    size += len(text)
+                    if size >= chunk_bytes:
+                        yield "".join(pending).encode("utf-8")
+                        pending, size = [], 0
+            pending.append("]")
+            summary = stats.summary()
+            if summary is not None:
+                outputs[name] = summary
+        pending.append(f'}}, "outputVariables": {json.dumps(names)}}}')
+        yield "".join(pending).encode("utf-8")
+        self.summary = {**time_stats, "outputs": outputs}
+
+    def _column(self, column: int, observe) -> Iterator[str]:
+        """Yield the stored pieces of one column, ``", "``-separated, passing each chunk to ``observe``."""
+        prefix = f"{column}\t"
+        separator = ""
+        self._file.seek(0)
+        for line in self._file:
+            if not line.startswith(prefix):
+                continue
+            body = line[len(prefix):].rstrip("\n")
+            observe(json.loads(f"[{body}]"))
+            yield separator + body
+            separator = ", "
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class ResultBlobStore:
+    """Gzip blobs named by the SHA-256 of their uncompressed content."""
+
+    def __init__(self, directory: str | os.PathLike, *, max_bytes: int = 0, max_age_seconds: float = 0.0):
+        self.directory = Path(directory)
+        self.max_bytes = max(0, int(max_bytes))
+        self.max_age_seconds = max(0.0, float(max_age_seconds))
+        self._lock = threading.Lock()
+        # Serialises writes with eviction, so a blob is never removed while
+        # a writer is storing or re-using it.
+        self._write_lock = threading.RLock()
+        # digest -> [compressed size, written_at]
+        self._index: dict[str, list[float]] = {}
+        self._loaded = False
+        self._metrics = {"stores": 0, "deduplicated": 0, "evictions": 0}
+
+    def put(self, payload: bytes) -> str:
+        """Store ``payload`` (result JSON) and return its digest; raises ``OSError`` on failure."""
+        digest = hashlib.sha256(payload).hexdigest()
+        self._ensure_loaded()
+        with self._write_lock:
+            if self._deduplicate(digest):
+                return digest
+            try:
+                return self._store(lambda handle: handle.write(payload), lambda: digest)
+            except ResultTooLargeError as exc:
+                exc.size = len(payload)
+                raise
+
+    def put_stream(self, pieces: Iterable[bytes]) -> tuple[str, int]:
+        """Store result JSON given as consecutive pieces; returns ``(digest, uncompressed size)``."""
+        self._ensure_loaded()
+        hasher = hashlib.sha256()
+        written = 0
+
+        def _copy(handle) -> None:
+            nonlocal written
+            for piece in pieces:
+                hasher.update(piece)
+                handle.write(piece)
+                written += len(piece)
+
+        with self._write_lock:
+            try:
+                return self._store(_copy, hasher.hexdigest), written
+            except ResultTooLargeError as exc:
+                exc.size = written
+                raise
+
+    def _deduplicate(self, digest: str) -> bool:
+        path = self._path(digest)
+        now = time.time()
+        with self._lock:
+            entry = self._index.get(digest)
+        if entry is None or not path.exists():
+            return False
+        # Refresh the age so retention counts from the latest run that produced it.
+        os.utime(path, (now, now))
+        with self._lock:
+            self._index[digest] = [entry[0], now]
+            self._metrics["deduplicated"] += 1
+        return True
+
+    def _store(self, fill: Callable[[Any], None], digest_of: Callable[[], str]) -> str:
+        """Gzip what ``fill`` writes to a temporary file, then move it under ``digest_of()``."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=self.directory, prefix=".tmp-", suffix=_SUFFIX)
+        try:
+            with os.fdopen(fd, "wb") as raw, gzip.GzipFile(fileobj=raw, mode="wb", compresslevel=5, mtime=0) as handle:
+                fill(handle)
+            digest = digest_of()
+            if self._deduplicate(digest):
+                Path(tmp_name).unlink(missing_ok=True)
+                return digest
+            size = os.path.getsize(tmp_name)
+            if self.max_bytes and size > self.max_bytes:
+                raise ResultTooLargeError(digest, size, self.max_bytes)
+            path = self._path(digest)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(tmp_name, path)
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+        with self._lock:
+            self._index[digest] = [size, time.time()]
+            self._metrics["stores"] += 1
+        self.evict(keep=digest)
+        return digest
+
+    def open(self, digest: str) -> Optional[BinaryIO]:
+        """Open the compressed blob, or return ``None`` when it expired or is missing."""
+        if not _valid_digest(digest):
+            return None
+        self._ensure_loaded()
+        with self._lock:
+            entry = self._index.get(digest)
+            if entry is None or self._expired(entry, time.time()):
+                return None
+        try:
+            return self._path(digest).open("rb")
+        except OSError:
+            with self._lock:
+                self._index.pop(digest, None)
+            return None
+
+    @staticmethod
+    def iter_decompressed(handle: BinaryIO, chunk_bytes: int = _CHUNK_BYTES) -> Iterator[bytes]:
+        with handle, gzip.GzipFile(fileobj=handle, mode="rb") as stream:
+            for chunk in iter(lambda: stream.read(chunk_bytes), b""):
+                yield chunk
+
+    def evict(self, keep: Optional[str] = None) -> int:
+        """Apply retention; ``keep`` (the blob just written) is never a victim."""
+        self._ensure_loaded()
+        with self._write_lock:
+            now = time.time()
+            with self._lock:
+                victims = [
+                    digest for digest, entry in self._index.items()
+                    if digest != keep and self._expired(entry, now)
+                ]
+                if self.max_bytes:
+                    remaining = sorted(
+                        (entry[1], digest, entry[0]) for digest, entry in self._index.items() if digest not in victims
+                    )
+                    total = sum(size for _, _, size in remaining)
+                    for _, digest, size in remaining:
+                        if total <= self.max_bytes:
+                            break
+                        if digest == keep:
+                            continue
+                        victims.append(digest)
+                        total -= size
+                for digest in victims:
+                    self._index.pop(digest, None)
+                self._metrics["evictions"] += len(victims)
+            for digest in victims:
+                self._path(digest).unlink(missing_ok=True)
+        return len(victims)
+
+    def metrics(self) -> dict[str, Any]:
+        self._ensure_loaded()
+        with self._lock:
+            return {
+                "entries": len(self._index),
+                "bytes": int(sum(entry[0] for entry in self._index.values())),
+                "maxBytes": self.max_bytes,
+                "maxAgeSeconds": self.max_age_seconds,
+                **self._metrics,
+            }
+
+    def _expired(self, entry: list[float], now: float) -> bool:
+        return bool(self.max_age_seconds) and now - entry[1] > self.max_age_seconds
+
+    def _path(self, digest: str) -> Path:
+        if not _valid_digest(digest):
+            raise ValueError("invalid result digest")
+        return self.directory / digest[:2] / f"{digest}{_SUFFIX}"
+
+    def _ensure_loaded(self) -> None:
+        with self._lock:
+            if self._loaded:
+                return
+            self._loaded = True
+            if not self.directory.is_dir():
+                return
+            for path in self.directory.glob(f".tmp-*{_SUFFIX}"):
+                # Leftover from an interrupted write.
+                path.unlink(missing_ok=True)
+            for path in self.directory.glob(f"*/*{_SUFFIX}"):
+                digest = path.name[: -len(_SUFFIX)]
+                if not _valid_digest(digest):
+                    # Leftover from an interrupted write.
+                    path.unlink(missing_ok=True)
+                    continue
+                try:
+                    stat = path.stat()
+                except OSError:
+                    continue
+                self._index[digest] = [stat.st_size, stat.st_mtime]
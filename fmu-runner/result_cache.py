@@ -0,0 +1,245 @@
+from __future__ import annotations
+
+import asyncio
+import gzip
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+import tempfile
+import threading
+import time
+from typing import Any, Awaitable, Callable, Optional
+
+
+logger = logging.getLogger("fmu-runner.cache")
+
+_KEY_LENGTH = 64
+
+
+def _normalize_value(value: Any) -> Any:
+    """Make equivalent JSON request values hash identically (``1`` vs ``1.0``)."""
+    if isinstance(value, bool) or value is None or isinstance(value, str):
+        return value
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, dict):
+        return {str(key): _normalize_value(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_normalize_value(item) for item in value]
+    return str(value)
+
+
+def result_cache_key(
+    fmu_sha256: str,
+    *,
+    parameters: dict,
+    start_time: float,
+    stop_time: float,
+    step_size: float,
+    fmi_type: str,
+    solver: str,
+) -> str:
+    """Content address of one simulation: model bytes plus everything that shapes its output."""
+    material = {
+        "fmu": str(fmu_sha256).lower(),
+        "parameters": _normalize_value(parameters or {}),
+        "options": _normalize_value({
+            "startTime": start_time,
+            "stopTime": stop_time,
+            "stepSize": step_size,
+        }),
+        "fmiType": str(fmi_type),
+        "solver": str(solver) if fmi_type == "ModelExchange" else "",
+    }
+    canonical = json.dumps(material, sort_keys=True, separators=(",", ":"), allow_nan=True)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def _valid_key(key: str) -> bool:
+    return len(key) == _KEY_LENGTH and all(char in "0123456789abcdef" for char in key)
+
+
+class ResultCache:
+    """Disk-backed, content-addressed store of JSON simulation results.
+
+    Entries are gzip files named by their key. Eviction drops entries older
+    than ``max_age_seconds`` and then the least recently used ones until the
+    store fits in ``max_bytes``. Concurrent misses for the same key share one
+    execution (single flight). Only a successful result is shared: when the
+    shared execution fails or is cancelled, each waiting caller runs its own
+    ``compute``, since the failure may belong to the first caller alone (its
+    lab's slots, its timeout).
+    """
+
+    def __init__(self, directory: str | os.PathLike, *, max_bytes: int, max_age_seconds: float):
+        self.directory = Path(directory)
+        self.max_bytes = max(0, int(max_bytes))
+        self.max_age_seconds = max(0.0, float(max_age_seconds))
+        self._lock = threading.Lock()
+        # key -> [size, created_at, last_used]
+        self._index: dict[str, list[float]] = {}
+        self._loaded = False
+        self._inflight: dict[str, asyncio.Future] = {}
+        self._metrics = {"hits": 0, "misses": 0, "shared": 0, "stores": 0, "evictions": 0}
+
+    async def get_or_compute(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[dict]],
+    ) -> tuple[dict, bool]:
+        """Return ``(result, cache_hit)``; ``cache_hit`` is false only for the executing caller."""
+        cached = await asyncio.to_thread(self.get, key)
+        if cached is not None:
+            return cached, True
+
+        async def _compute_and_store() -> dict:
+            result = await compute()
+            # Stay in flight until stored so a new request cannot miss both.
+            await asyncio.to_thread(self.put, key, result)
+            return result
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            try:
+                result = await asyncio.shield(inflight)
+            except asyncio.CancelledError:
+                if not inflight.cancelled():
+                    raise
+            except Exception:
+                # Fall through to an execution of our own.
+                pass
+            else:
+                with self._lock:
+                    self._metrics["shared"] += 1
+                return result, True
+            return await _compute_and_store(), False
+
+        # A task, so a disconnecting leader does not cancel the shared run.
+        task = asyncio.ensure_future(_compute_and_store())
+        self._inflight[key] = task
+
+        def _forget(_task):
+            if self._inflight.get(key) is task:
+                del self._inflight[key]
+
+        task.add_done_callback(_forget)
+        return await asyncio.shield(task), False
+
+    def get(self, key: str) -> Optional[dict]:
+        self._ensure_loaded()
+        now = time.time()
+        with self._lock:
+            entry = self._index.get(key)
+            if entry is None or self._expired(entry, now):
+                self._metrics["misses"] += 1
+                return None
+            entry[2] = now
+        try:
+            with gzip.open(self._path(key), "rt", encoding="utf-8") as handle:
+                result = json.load(handle)
+        except (OSError, ValueError):
+            self._drop(key)
+            with self._lock:
+                self._metrics["misses"] += 1
+            return None
+        with self._lock:
+            self._metrics["hits"] += 1
+        return result
+
+    def put(self, key: str, result: dict) -> None:
+        if self.max_bytes <= 0:
+            return
+        self._ensure_loaded()
+        tmp_name = None
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            fd, tmp_name = tempfile.mkstemp(dir=self.directory, prefix=".tmp-", suffix=".json.gz")
+            with os.fdopen(fd, "wb") as raw, gzip.GzipFile(fileobj=raw, mode="wb", compresslevel=5) as handle:
+                handle.write(json.dumps(result).encode("utf-8"))
+            size = os.path.getsize(tmp_name)
+            if size > self.max_bytes:
+                os.unlink(tmp_name)
+                return
+            os.replace(tmp_name, self._path(key))
+        except Exception as exc:
+            if tmp_name is not None:
+                try:
+                    os.unlink(tmp_name)
+                except OSError:
+                    pass
+            logger.warning("Unable to store cached simulation result: %s", type(exc).__name__)
+            return
+        now = time.time()
+        with self._lock:
+            self._index[key] = [size, now, now]
+            self._metrics["stores"] += 1
+        self.evict()
+
+    def evict(self) -> int:
+        now = time.time()
+        with self._lock:
+            victims = [key for key, entry in self._index.items() if self._expired(entry, now)]
+            remaining = sorted(
+                ((entry[2], key, entry[0]) for key, entry in self._index.items() if key not in victims),
+            )
+            total = sum(size for _, _, size in remaining)
+            for _, key, size in remaining:
+                if total <= self.max_bytes:
+                    break
+                victims.append(key)
+                total -= size
+            for key in victims:
+                self._index.pop(key, None)
+            self._metrics["evictions"] += len(victims)
+        for key in victims:
+            try:
+                self._path(key).unlink()
+            except OSError:
+                pass
+        return len(victims)
+
+    def metrics(self) -> dict[str, Any]:
+        with self._lock:
+            snapshot: dict[str, Any] = dict(self._metrics)
+            snapshot["entries"] = len(self._index)
+            snapshot["bytes"] = int(sum(entry[0] for entry in self._index.values()))
+        snapshot["maxBytes"] = self.max_bytes
+        snapshot["maxAgeSeconds"] = self.max_age_seconds
+        return snapshot
+
+    def _expired(self, entry: list[float], now: float) -> bool:
+        return bool(self.max_age_seconds) and now - entry[1] > self.max_age_seconds
+
+    def _path(self, key: str) -> Path:
+        if not _valid_key(key):
+            raise ValueError("invalid result cache key")
+        return self.directory / f"{key}.json.gz"
+
+    def _drop(self, key: str) -> None:
+        with self._lock:
+            self._index.pop(key, None)
+        try:
+            self._path(key).unlink()
+        except OSError:
+            pass
+
+    def _ensure_loaded(self) -> None:
+        with self._lock:
+            if self._loaded:
+                return
+            self._loaded = True
+            if not self.directory.is_dir():
+                return
+            for path in self.directory.glob("*.json.gz"):
+                key = path.name[: -len(".json.gz")]
+                if not _valid_key(key):
+                    # Leftover from an interrupted write.
+                    path.unlink(missing_ok=True)
+                    continue
+                try:
+                    stat = path.stat()
+                except OSError:
+                    continue
+                self._index[key] = [stat.st_size, stat.st_mtime, stat.st_mtime]
@@ -0,0 +1,190 @@
+"""Variable selection, time windows and plot-oriented decimation of JSON results.
+
+Works on the ``{"time": [...], "outputs": {name: [...]}}`` result shape with
+NumPy: the window is two ``searchsorted`` calls on the time column and the
+decimation picks row indices, so every selected variable keeps the same
+time base. ``m4`` keeps the first, last, minimum and maximum sample of every
+time bucket (an exact min/max envelope at plot resolution); ``lttb`` keeps
+the visually most significant sample per bucket.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Mapping, Optional
+
+import numpy as np
+
+
+DOWNSAMPLE_METHODS = ("m4", "lttb")
+
+
+@dataclass(frozen=True)
+class ResultProjection:
+    variables: Optional[tuple[str, ...]] = None
+    window_start: Optional[float] = None
+    window_end: Optional[float] = None
+    max_points: Optional[int] = None
+    method: str = "m4"
+
+    @classmethod
+    def from_options(cls, options: Mapping[str, Any]) -> Optional["ResultProjection"]:
+        """Build a projection from ``variables``/``windowStart``/``windowEnd``/``maxPoints``/``downsample``.
+
+        Returns ``None`` when none of them is set; raises ``ValueError`` for invalid values.
+        """
+        variables = options.get("variables")
+        window_start = options.get("windowStart")
+        window_end = options.get("windowEnd")
+        max_points = options.get("maxPoints")
+        method = options.get("downsample")
+        if variables is None and window_start is None and window_end is None and max_points is None:
+            if method is not None:
+                raise ValueError("downsample requires maxPoints")
+            return None
+
+        if isinstance(variables, str):
+            variables = [name.strip() for name in variables.split(",") if name.strip()]
+        if variables is not None:
+            if not isinstance(variables, (list, tuple)) or not all(isinstance(name, str) for name in variables):
+                raise ValueError("variables must be a list of variable names")
+            variables = tuple(dict.fromkeys(variables))
+        try:
+            window_start = float(window_start) if window_start is not None else None
+            window_end = float(window_end) if window_end is not None else None
+            max_points = int(max_points) if max_points is not None else None
+        except (TypeError, ValueError) as exc:
+            raise ValueError("windowStart, windowEnd and maxPoints must be numbers") from exc
+        if window_start is not None and window_end is not None and window_end < window_start:
+            raise ValueError("windowEnd must not be before windowStart")
+        if max_points is not None and max_points < 4:
+            raise ValueError("maxPoints must be at least 4")
+        method = str(method or "m4").strip().lower()
+        if method not in DOWNSAMPLE_METHODS:
+            raise ValueError(f"downsample must be one of: {', '.join(DOWNSAMPLE_METHODS)}")
+        return cls(variables, window_start, window_end, max_points, method)
+
+    def apply(self, result: Mapping[str, Any]) -> dict[str, Any]:
+        """Return a projected copy of ``result``.
+
+        Raises ``ValueError`` for unknown variables and for a ``max_points``
+        too small to decimate the selected variables within it.
+        """
+        outputs = result.get("outputs") or {}
+        names = list(self.variables) if self.variables is not None else list(outputs)
+        unknown = [name for name in names if name not in outputs]
+        if unknown:
+            raise ValueError(f"Unknown result variables: {', '.join(unknown)}")
+
+        time_values = np.asarray(result.get("time") or [], dtype=np.float64)
+        source_rows = int(time_values.size)
+        lo = 0 if self.window_start is None else int(np.searchsorted(time_values, self.window_start, side="left"))
+        hi = source_rows if self.window_end is None else int(np.searchsorted(time_values, self.window_end, side="right"))
+        hi = max(lo, hi)
+        window_time = time_values[lo:hi]
+
+        numeric = []
+        for name in names:
+            try:
+                numeric.append(np.asarray(outputs[name][lo:hi], dtype=np.float64))
+            except (TypeError, ValueError):
+                continue  # booleans/strings: kept at the chosen rows, but not used to choose them
+
+        rows: Optional[np.ndarray] = None
+        downsampled = bool(self.max_points) and window_time.size > self.max_points
+        if downsampled:
+            if self.method == "lttb":
+                rows = lttb_indices(window_time, numeric, self.max_points)
+            else:
+                rows = m4_indices(window_time, numeric, self.max_points)
+
+        picked = None if rows is None else (rows + lo).tolist()
+
+        def _take(values):
+            # Index the original list so ints, bools and strings keep their JSON types.
+            if picked is None:
+                return list(values[lo:hi])
+            return [values[index] for index in picked]
+
+        projected = dict(result)
+        projected["time"] = window_time.tolist() if rows is None else window_time[rows].tolist()
+        projected["outputs"] = {name: _take(outputs[name]) for name in names}
+        projected["outputVariables"] = names
+        projected["projection"] = {
+            "sourceRows": source_rows,
+            "rows": len(projected["time"]),
+            "windowStart": self.window_start,
+            "windowEnd": self.window_end,
+            "downsample": self.method if downsampled else None,
+        }
+        return projected
+
+
+def m4_indices(time_values: np.ndarray, series: list[np.ndarray], max_points: int) -> np.ndarray:
+    """Row indices keeping first/last/min/max of every series per time bucket.
+
+    The bucket count is chosen so the union over all series stays within
+    ``max_points`` rows; raises ``ValueError`` when not even one bucket fits.
+    """
+    count = time_values.size
+    per_bucket = 2 + 2 * len(series)
+    if max_points < per_bucket:
+        raise ValueError(f"maxPoints must be at least {per_bucket} to downsample {len(series)} numeric variables with m4")
+    buckets = max_points // per_bucket
+    span = time_values[-1] - time_values[0]
+    if span > 0:
+        bucket_of = ((time_values - time_values[0]) * (buckets / span)).astype(np.int64)
+    else:
+        bucket_of = np.arange(count, dtype=np.int64) * buckets // count
+    np.clip(bucket_of, 0, buckets - 1, out=bucket_of)
+    starts = np.flatnonzero(np.r_[True, bucket_of[1:] != bucket_of[:-1]])
+    ends = np.r_[starts[1:], count]
+    keep = [starts, ends - 1]
+    segment_of = np.repeat(np.arange(starts.size), ends - starts)
+    for values in series:
+        for reducer in (np.fmin, np.fmax):
+            extremes = reducer.reduceat(values, starts)
+            hits = np.flatnonzero(values == extremes[segment_of])
+            _, first = np.unique(segment_of[hits], return_index=True)
+            keep.append(hits[first])
+    return np.unique(np.concatenate(keep))
+
+
+def lttb_indices(time_values: np.ndarray, series: list[np.ndarray], max_points: int) -> np.ndarray:
+    """Largest-Triangle-Three-Buckets row indices, per series, merged.
+
+    Each series gets an equal share of ``max_points`` and needs at least three
+    rows of it (``ValueError`` otherwise); without numeric series the rows are
+    evenly spaced.
+    """
+    if not series:
+        return np.unique(np.linspace(0, time_values.size - 1, max_points).astype(np.int64))
+    if max_points < 3 * len(series):
+        raise ValueError(
+            f"maxPoints must be at least {3 * len(series)} to downsample {len(series)} numeric variables with lttb"
+        )
+    threshold = max_points // len(series)
+    return np.unique(np.concatenate([_lttb(time_values, values, threshold) for values in series]))
+
+
+def _lttb(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    count = x.size
+    if threshold >= count:
+        return np.arange(count)
+    y = np.where(np.isfinite(y), y, 0.0)
+    edges = np.linspace(1, count - 1, threshold - 1).astype(np.int64)
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0], selected[-1] = 0, count - 1
+    previous = 0
+    for bucket in range(threshold - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        next_end = edges[bucket + 2] if bucket + 2 < edges.size else count
+        next_x = x[end:next_end].mean() if next_end > end else x[-1]
+        next_y = y[end:next_end].mean() if next_end > end else y[-1]
+        area = np.abs(
+            (x[previous] - next_x) * (y[start:end] - y[previous])
+            - (x[previous] - x[start:end]) * (next_y - y[previous])
+        )
+        previous = start + int(np.argmax(area))
+        selected[bucket + 1] = previous
+    return selected
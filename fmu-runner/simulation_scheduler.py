@@ -0,0 +1,169 @@
+"""Gateway-wide simulation capacity with weighted fair sharing between labs.
+
+The capacity is sized once from the container limits: one simulation per CPU
+of the cgroup quota, and no more than the memory limit divided by the memory
+a worker may use. Per-lab slot limits still apply; on top of them the
+runner never executes more than ``capacity`` simulations at once. When a
+slot frees up and several labs are waiting, it goes to the lab running the
+fewest simulations relative to its weight.
+
+The scheduler keeps no counts of its own: callers pass their per-lab running
+counts and serialise access with their own lock.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+import math
+import os
+from pathlib import Path
+from typing import Any, Iterable, Mapping, Optional
+
+
+# cgroup v1 reports "no limit" as a huge page-aligned number.
+_CGROUP_V1_UNLIMITED = 1 << 60
+
+
+@dataclass(frozen=True)
+class HostLimits:
+    cpus: float
+    memory_bytes: Optional[int]
+    source: str
+
+
+def _read(path: Path) -> Optional[str]:
+    try:
+        return path.read_text(encoding="utf-8").strip()
+    except OSError:
+        return None
+
+
+def _visible_cpus() -> int:
+    try:
+        return len(os.sched_getaffinity(0))
+    except (AttributeError, OSError):
+        return os.cpu_count() or 1
+
+
+def _physical_memory() -> Optional[int]:
+    try:
+        return int(os.sysconf("SC_PAGE_SIZE")) * int(os.sysconf("SC_PHYS_PAGES"))
+    except (AttributeError, OSError, ValueError):
+        return None
+
+
+def read_host_limits(root: str | os.PathLike = "/sys/fs/cgroup") -> HostLimits:
+    """CPU and memory available to this container (cgroup v2, then v1, then the host)."""
+    base = Path(root)
+    cpus = float(_visible_cpus())
+    memory = _physical_memory()
+    source = "host"
+
+    cpu_max = _read(base / "cpu.max")
+    memory_max = _read(base / "memory.max")
+    if cpu_max is not None or memory_max is not None:
+        source = "cgroup2"
+        quota, _, period = (cpu_max or "max").partition(" ")
+        if quota != "max" and period:
+            cpus = min(cpus, int(quota) / int(period))
+        if memory_max and memory_max != "max":
+            memory = min(memory or int(memory_max), int(memory_max))
+        return HostLimits(cpus, memory, source)
+
+    quota = _read(base / "cpu" / "cpu.cfs_quota_us")
+    period = _read(base / "cpu" / "cpu.cfs_period_us")
+    limit = _read(base / "memory" / "memory.limit_in_bytes")
+    if quota is not None or limit is not None:
+        source = "cgroup1"
+        if quota and period and int(quota) > 0:
+            cpus = min(cpus, int(quota) / int(period))
+        if limit and int(limit) < _CGROUP_V1_UNLIMITED:
+            memory = min(memory or int(limit), int(limit))
+    return HostLimits(cpus, memory, source)
+
+
+def size_capacity(limits: HostLimits, *, worker_memory_bytes: int, address_space_limit: int = 0) -> int:
+    """Simulations the host can run at once.
+
+    A worker is assumed to use ``worker_memory_bytes``, never more than its
+    ``address_space_limit`` (``RLIMIT_AS``) allows.
+    """
+    cpu_slots = max(1, math.floor(limits.cpus))
+    per_worker = worker_memory_bytes
+    if address_space_limit > 0:
+        per_worker = min(per_worker, address_space_limit)
+    if not limits.memory_bytes or per_worker <= 0:
+        return cpu_slots
+    return max(1, min(cpu_slots, limits.memory_bytes // per_worker))
+
+
+def parse_lab_weights(text: str) -> dict[str, float]:
+    """``"1=2,lab-7=0.5"`` -> ``{"1": 2.0, "lab-7": 0.5}``; raises ``ValueError`` on bad entries."""
+    weights: dict[str, float] = {}
+    for item in (text or "").split(","):
+        if not item.strip():
+            continue
+        lab_id, separator, value = item.partition("=")
+        weight = float(value) if separator else math.nan
+        if not lab_id.strip() or not math.isfinite(weight) or weight <= 0:
+            raise ValueError(f"invalid lab weight: {item.strip()!r}")
+        weights[lab_id.strip()] = weight
+    return weights
+
+
+class SimulationScheduler:
+    def __init__(
+        self,
+        capacity: int,
+        *,
+        weights: Optional[Mapping[str, float]] = None,
+        limits: Optional[HostLimits] = None,
+    ):
+        self.capacity = max(1, int(capacity))
+        self.weights = dict(weights or {})
+        self.limits = limits
+
+    def weight(self, lab_id: str) -> float:
+        return self.weights.get(lab_id, 1.0)
+
+    def has_room(self, running: Mapping[str, int]) -> bool:
+        return sum(running.values()) < self.capacity
+
+    def next_lab(self, running: Mapping[str, int], waiting_labs: Iterable[str]) -> Optional[str]:
+        """The waiting lab furthest below its weighted share, if any."""
+        return min(
+            waiting_labs,
+            key=lambda lab_id: (running.get(lab_id, 0) / self.weight(lab_id), -self.weight(lab_id), lab_id),
+            default=None,
+        )
+
+    def fair_shares(self, labs: Iterable[str]) -> dict[str, float]:
+        """Capacity split by weight between ``labs`` (the ones running or waiting)."""
+        labs = list(labs)
+        total = sum(self.weight(lab_id) for lab_id in labs)
+        return {lab_id: round(self.capacity * self.weight(lab_id) / total, 3) for lab_id in labs} if total else {}
+
+    def snapshot(self, running: Mapping[str, int], waiting: Mapping[str, int]) -> dict[str, Any]:
+        labs = sorted({lab_id for lab_id, count in running.items() if count} | set(waiting))
+        shares = self.fair_shares(labs)
+        payload: dict[str, Any] = {
+            "capacity": self.capacity,
+            "running": sum(running.values()),
+            "waiting": sum(waiting.values()),
+            "labs": {
+                lab_id: {
+                    "running": running.get(lab_id, 0),
+                    "waiting": waiting.get(lab_id, 0),
+                    "weight": self.weight(lab_id),
+                    "fairShare": shares[lab_id],
+                }
+                for lab_id in labs
+            },
+        }
+        if self.limits is not None:
+            payload["host"] = {
+                "cpus": round(self.limits.cpus, 3),
+                "memoryBytes": self.limits.memory_bytes,
+                "source": self.limits.source,
+            }
+        return payload
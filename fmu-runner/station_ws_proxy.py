@@ -3,15 +3,28 @@ from __future__ import annotations
 import asyncio
 import inspect
 import json
+import re
 import secrets
 import time
-from collections import defaultdict, deque
+from collections import OrderedDict, defaultdict, deque
+from uuid import uuid4
 from dataclasses import dataclass
 from collections.abc import AsyncIterator
 from typing import Any, Awaitable, Callable, Optional, Protocol, cast
 
 from fastapi import HTTPException, WebSocket, WebSocketDisconnect
 
+from ws_mux import (
+    MUX_CLOSE,
+    MUX_CLOSED,
+    MUX_OPEN,
+    STATION_MUX_SUBPROTOCOL,
+    decode_mux_frame,
+    encode_mux_frame,
+    mux_control,
+    parse_mux_control,
+)
+
 
 class _StationWebSocket(Protocol):
     def __aiter__(self) -> AsyncIterator[str | bytes]:
@@ -24,6 +37,43 @@ class _StationWebSocket(Protocol):
         raise NotImplementedError
 
 
+# Mirrors realtime_ws.BINARY_OUTPUTS_SUBPROTOCOL; the proxy does not import
+# the native runtime module.
+BINARY_OUTPUTS_SUBPROTOCOL = "fmu.realtime.v1.binary"
+
+# Station frames the relay must inspect. Everything else without a requestId
+# (outputs, state, heartbeats, errors) is forwarded exactly as received.
+_RELAY_CONTROL_TYPES = frozenset({"session.created", "session.attached", "session.closed"})
+_FRAME_TYPE_RE = re.compile(r'\{\s*"type"\s*:\s*"([A-Za-z0-9_.-]*)"')
+
+
+def _is_passthrough_frame(frame: str) -> bool:
+    """Classify a Station text frame without decoding it."""
+    match = _FRAME_TYPE_RE.match(frame)
+    if match is None or match.group(1) in _RELAY_CONTROL_TYPES:
+        return False
+    return '"requestId"' not in frame
+
+
+class _RequestCache(OrderedDict):
+    """Per-connection requestId replay cache, evicting least recently used entries."""
+
+    def __init__(self, maxsize: int):
+        super().__init__()
+        self.maxsize = max(1, maxsize)
+
+    def __getitem__(self, key):
+        value = super().__getitem__(key)
+        self.move_to_end(key)
+        return value
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self.move_to_end(key)
+        while len(self) > self.maxsize:
+            self.popitem(last=False)
+
+
 def _public_http_detail(exc: HTTPException, fallback: str) -> str:
     if exc.status_code >= 500:
         return fallback
@@ -64,6 +114,300 @@ class _GatewayStationSession:
         )
 
 
+_REATTACH_DELAYS_SECONDS = (0.0, 0.5, 1.0, 2.0, 4.0)
+
+
+class _StationChannelLost(RuntimeError):
+    pass
+
+
+class _StationStreamOverflow(RuntimeError):
+    pass
+
+
+class _MultiplexedStationStream:
+    """A client's view of a shared Station channel; stands in for a dedicated socket.
+
+    Frames for this stream are buffered in a bounded queue drained by the
+    client's own reader, so a slow public client never stalls the shared
+    channel. When the buffer is full the oldest frame without a ``requestId``
+    (outputs, progress, heartbeats) is dropped; command responses are kept.
+    A buffer holding only command responses means the client stopped reading
+    them, so the stream fails with ``_StationStreamOverflow`` instead.
+    """
+
+    def __init__(
+        self,
+        channel: "_StationChannel",
+        stream_id: str,
+        authorization: Optional[str],
+        queue_size: int,
+        subprotocol: Optional[str] = None,
+    ):
+        self.channel = channel
+        self.stream_id = stream_id
+        self.authorization = authorization
+        self.subprotocol = subprotocol
+        self.queue_size = max(1, queue_size)
+        self.session_id: Optional[str] = None
+        self.dropped = 0
+        self.closed = False
+        self._frames: deque = deque()
+        self._ready = asyncio.Event()
+        self._failure: Optional[BaseException] = None
+        self._reattach_request_id: Optional[str] = None
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        while not self._frames:
+            if self._failure is not None:
+                raise self._failure
+            if self.closed:
+                raise StopAsyncIteration
+            self._ready.clear()
+            await self._ready.wait()
+        return self._frames.popleft()
+
+    def deliver(self, payload: str | bytes):
+        if self.closed:
+            return
+        control = parse_mux_control(payload)
+        if control is not None:
+            if control.get("type") == MUX_CLOSED:
+                self._finish()
+            return
+        if isinstance(payload, str) and ('"session.created"' in payload or '"session.attached"' in payload or '"session.closed"' in payload):
+            if self._track_session(payload):
+                return
+        if len(self._frames) >= self.queue_size:
+            victim = next(
+                (index for index, frame in enumerate(self._frames)
+                 if isinstance(frame, bytes) or '"requestId"' not in frame),
+                None,
+            )
+            self.dropped += 1
+            self.channel.pool.dropped_frames += 1
+            if victim is None:
+                self.dropped += len(self._frames)
+                self.channel.pool.dropped_frames += len(self._frames)
+                self._frames.clear()
+                self.fail(_StationStreamOverflow("Realtime client is not reading its Station stream"))
+                return
+            del self._frames[victim]
+        self._frames.append(payload)
+        self._ready.set()
+
+    def _track_session(self, payload: str) -> bool:
+        """Follow the stream's session; swallow the reply to our own re-attach."""
+        try:
+            message = json.loads(payload)
+        except json.JSONDecodeError:
+            return False
+        msg_type = message.get("type")
+        session_id = str(message.get("sessionId") or "").strip() or None
+        if self._reattach_request_id and message.get("requestId") == self._reattach_request_id:
+            self._reattach_request_id = None
+            return True
+        if msg_type in ("session.created", "session.attached") and session_id:
+            self.session_id = session_id
+        elif msg_type == "session.closed" and session_id == self.session_id:
+            self.session_id = None
+        return False
+
+    async def send(self, message: Any, text: bool | None = None) -> None:
+        if self.closed:
+            raise HTTPException(status_code=503, detail="Station realtime channel is unavailable")
+        await self.channel.send(self.stream_id, message)
+
+    async def open(self):
+        fields = {"authorization": self.authorization or ""}
+        if self.subprotocol:
+            fields["subprotocol"] = self.subprotocol
+        await self.channel.send(self.stream_id, mux_control(MUX_OPEN, **fields))
+
+    async def reattach(self):
+        """Re-open this stream on a fresh channel and re-attach its live session."""
+        await self.open()
+        if self.session_id is None:
+            raise _StationChannelLost("Station realtime channel was lost before the session was created")
+        self._reattach_request_id = f"reattach-{uuid4().hex[:12]}"
+        await self.channel.send(self.stream_id, json.dumps({
+            "type": "session.attach",
+            "requestId": self._reattach_request_id,
+            "sessionId": self.session_id,
+        }))
+
+    def fail(self, exc: BaseException):
+        self._failure = exc
+        self.closed = True
+        self._ready.set()
+
+    def _finish(self):
+        self.closed = True
+        self._ready.set()
+
+    async def close(self) -> None:
+        if self.closed and self.channel.streams.get(self.stream_id) is not self:
+            return
+        self._finish()
+        self.channel.streams.pop(self.stream_id, None)
+        try:
+            await self.channel.send(self.stream_id, mux_control(MUX_CLOSE))
+        except Exception:
+            # The Station detaches the session itself when the channel drops.
+            pass
+
+
+class _StationChannel:
+    """One long-lived Station WebSocket carrying many client streams."""
+
+    def __init__(self, pool: "_StationChannelPool", index: int):
+        self.pool = pool
+        self.index = index
+        self.streams: dict[str, _MultiplexedStationStream] = {}
+        self._socket: Optional[_StationWebSocket] = None
+        self._reader_task: Optional[asyncio.Task] = None
+        self._connect_lock = asyncio.Lock()
+        self._send_lock = asyncio.Lock()
+
+    @property
+    def connected(self) -> bool:
+        return self._socket is not None
+
+    async def ensure_connected(self):
+        async with self._connect_lock:
+            if self._socket is not None:
+                return
+            socket = await self.pool.connect()
+            if getattr(socket, "subprotocol", None) != STATION_MUX_SUBPROTOCOL:
+                try:
+                    await socket.close()
+                except Exception:
+                    # Nothing useful can be done with the rejected socket.
+                    pass
+                raise HTTPException(status_code=503, detail="Station does not support multiplexed realtime channels")
+            self._socket = socket
+            self.pool.connects += 1
+            self._reader_task = asyncio.create_task(self._reader(socket))
+
+    async def send(self, stream_id: str, payload: str | bytes):
+        socket = self._socket
+        if socket is None:
+            raise HTTPException(status_code=503, detail="Station realtime channel is unavailable")
+        async with self._send_lock:
+            await socket.send(encode_mux_frame(stream_id, payload))
+
+    async def _reader(self, socket: _StationWebSocket):
+        try:
+            async for frame in socket:
+                try:
+                    stream_id, payload = decode_mux_frame(frame)
+                except ValueError:
+                    continue
+                stream = self.streams.get(stream_id)
+                if stream is not None:
+                    stream.deliver(payload)
+        except asyncio.CancelledError:
+            return
+        except Exception as exc:
+            self.pool.logger.warning("Station realtime channel %s failed: %s", self.index, type(exc).__name__)
+        if self._socket is socket:
+            self._socket = None
+            self._reader_task = None
+            asyncio.create_task(self._recover())
+
+    async def _recover(self):
+        streams = [stream for stream in self.streams.values() if not stream.closed]
+        if not streams:
+            return
+        self.pool.reconnects += 1
+        last_error: BaseException = _StationChannelLost("Station realtime channel closed unexpectedly")
+        for delay in _REATTACH_DELAYS_SECONDS:
+            if delay:
+                await asyncio.sleep(delay)
+            try:
+                await self.ensure_connected()
+                break
+            except Exception as exc:
+                last_error = exc
+        else:
+            for stream in streams:
+                self.streams.pop(stream.stream_id, None)
+                stream.fail(_StationChannelLost(str(last_error)))
+            return
+        for stream in streams:
+            try:
+                await stream.reattach()
+                self.pool.reattached += 1
+            except Exception as exc:
+                self.streams.pop(stream.stream_id, None)
+                stream.fail(exc if isinstance(exc, _StationChannelLost) else _StationChannelLost(str(exc)))
+
+    async def close(self):
+        socket, self._socket = self._socket, None
+        if self._reader_task is not None:
+            self._reader_task.cancel()
+            self._reader_task = None
+        for stream in list(self.streams.values()):
+            stream.fail(_StationChannelLost("Station realtime channel closed"))
+        self.streams.clear()
+        if socket is not None:
+            try:
+                await socket.close()
+            except Exception:
+                # The Station may already have closed the channel.
+                pass
+
+
+class _StationChannelPool:
+    """A small, fixed set of shared Station channels; streams go to the least loaded one."""
+
+    def __init__(self, *, size: int, connect: Callable[[], Awaitable[_StationWebSocket]], stream_queue_size: int, logger):
+        self.connect = connect
+        self.stream_queue_size = stream_queue_size
+        self.logger = logger
+        self.channels = [_StationChannel(self, index) for index in range(max(1, size))]
+        self.connects = 0
+        self.reconnects = 0
+        self.reattached = 0
+        self.dropped_frames = 0
+
+    async def open(self, headers: dict[str, str], *, subprotocol: Optional[str] = None) -> _MultiplexedStationStream:
+        channel = min(self.channels, key=lambda item: (not item.connected, len(item.streams)))
+        await channel.ensure_connected()
+        stream = _MultiplexedStationStream(
+            channel,
+            uuid4().hex[:16],
+            headers.get("Authorization"),
+            self.stream_queue_size,
+            subprotocol,
+        )
+        channel.streams[stream.stream_id] = stream
+        try:
+            await stream.open()
+        except Exception:
+            channel.streams.pop(stream.stream_id, None)
+            raise
+        return stream
+
+    async def close(self):
+        for channel in self.channels:
+            await channel.close()
+
+    def metrics(self) -> dict[str, Any]:
+        return {
+            "channels": len(self.channels),
+            "connected": sum(1 for channel in self.channels if channel.connected),
+            "streams": sum(len(channel.streams) for channel in self.channels),
+            "connects": self.connects,
+            "reconnects": self.reconnects,
+            "reattached": self.reattached,
+            "droppedFrames": self.dropped_frames,
+        }
+
+
 class StationRealtimeWsProxyManager:
     def __init__(
         self,
@@ -81,6 +425,9 @@ class StationRealtimeWsProxyManager:
         ws_cleanup_seconds: float = 15.0,
         internal_ws_token: str = "",
         ws_create_rate_limit_per_minute: int = 30,
+        station_channels: int = 0,
+        station_stream_queue_size: int = 256,
+        request_cache_size: int = 256,
     ):
         self.logger = logger
         self.station_backend = station_backend
@@ -100,6 +447,18 @@ class StationRealtimeWsProxyManager:
         self._sessions_lock = asyncio.Lock()
         self._cleanup_task: Optional[asyncio.Task] = None
         self._create_hits: dict[str, deque[float]] = defaultdict(deque)
+        self.request_cache_size = request_cache_size
+        self._channel_pool: Optional[_StationChannelPool] = None
+        if station_channels > 0:
+            self._channel_pool = _StationChannelPool(
+                size=station_channels,
+                connect=self._connect_station_channel,
+                stream_queue_size=station_stream_queue_size,
+                logger=logger,
+            )
+
+    def channel_metrics(self) -> Optional[dict[str, Any]]:
+        return self._channel_pool.metrics() if self._channel_pool is not None else None
 
     async def start(self):
         if self._cleanup_task is None or self._cleanup_task.done():
@@ -122,6 +481,8 @@ class StationRealtimeWsProxyManager:
                         session.session_id,
                         exc_info=True,
                     )
+        if self._channel_pool is not None:
+            await self._channel_pool.close()
 
     async def _cleanup_loop(self):
         while True:
@@ -207,7 +568,20 @@ class StationRealtimeWsProxyManager:
         async with send_lock:
             await websocket.send_json(payload)
 
-    async def _connect_station(self, headers: dict[str, str]) -> _StationWebSocket:
+    async def _send_raw(self, websocket: WebSocket, send_lock: asyncio.Lock, frame: str | bytes):
+        async with send_lock:
+            if isinstance(frame, bytes):
+                await websocket.send_bytes(frame)
+            else:
+                await websocket.send_text(frame)
+
+    async def _connect_station_channel(self) -> _StationWebSocket:
+        # Shared channels authenticate as the Gateway only; each stream's
+        # bearer travels in its mux.open message.
+        headers = self.station_backend.build_internal_session_headers(authorization=None)
+        return await self._connect_station(headers, subprotocols=[STATION_MUX_SUBPROTOCOL])
+
+    async def _connect_station(self, headers: dict[str, str], *, subprotocols: Optional[list[str]] = None) -> _StationWebSocket:
         try:
             import websockets
         except ModuleNotFoundError as exc:
@@ -222,12 +596,19 @@ class StationRealtimeWsProxyManager:
             connect_kwargs["additional_headers"] = headers
         else:
             connect_kwargs["extra_headers"] = headers
+        if subprotocols:
+            connect_kwargs["subprotocols"] = subprotocols
         return await websockets.connect(self.station_backend.station_session_ws_url(), **connect_kwargs)
 
     async def handle_websocket(self, websocket: WebSocket, *, internal: bool):
-        await websocket.accept()
+        offered = [item.strip() for item in str(websocket.headers.get("sec-websocket-protocol") or "").split(",")]
+        binary_outputs = BINARY_OUTPUTS_SUBPROTOCOL in offered
+        if binary_outputs:
+            await websocket.accept(subprotocol=BINARY_OUTPUTS_SUBPROTOCOL)
+        else:
+            await websocket.accept()
         send_lock = asyncio.Lock()
-        local_request_cache: dict[str, dict] = {}
+        local_request_cache = _RequestCache(self.request_cache_size)
         pending_creates: dict[str, dict] = {}
         current_session_id: Optional[str] = None
         station_ws: Optional[_StationWebSocket] = None
@@ -281,7 +662,15 @@ class StationRealtimeWsProxyManager:
             if station_ws is not None:
                 return
             station_headers = self.station_backend.build_internal_session_headers(authorization=authorization or None)
-            station_ws = await self._connect_station(station_headers)
+            if self._channel_pool is not None:
+                station_ws = await self._channel_pool.open(
+                    station_headers,
+                    subprotocol=BINARY_OUTPUTS_SUBPROTOCOL if binary_outputs else None,
+                )
+            elif binary_outputs:
+                station_ws = await self._connect_station(station_headers, subprotocols=[BINARY_OUTPUTS_SUBPROTOCOL])
+            else:
+                station_ws = await self._connect_station(station_headers)
             station_reader_task = asyncio.create_task(_station_reader())
 
         async def _send_station(raw_message: str):
@@ -297,8 +686,17 @@ class StationRealtimeWsProxyManager:
                 return
             try:
                 async for raw_message in connection:
+                    # Fast path: high-rate data frames are relayed verbatim;
+                    # only session lifecycle frames and command responses
+                    # (which feed the replay cache) are decoded.
                     if isinstance(raw_message, bytes):
+                        if binary_outputs:
+                            await self._send_raw(websocket, send_lock, raw_message)
+                            continue
                         raw_message = raw_message.decode("utf-8")
+                    if _is_passthrough_frame(raw_message):
+                        await self._send_raw(websocket, send_lock, raw_message)
+                        continue
                     try:
                         payload = json.loads(raw_message)
                     except json.JSONDecodeError:
@@ -397,6 +795,23 @@ class StationRealtimeWsProxyManager:
                         return
             except asyncio.CancelledError:
                 return
+            except _StationStreamOverflow as exc:
+                self.logger.warning("Station realtime stream closed: %s", exc)
+                try:
+                    await self._send_json(
+                        websocket,
+                        send_lock,
+                        self.error_payload(
+                            code="RATE_LIMITED",
+                            message="Realtime client fell too far behind its session output",
+                            retryable=True,
+                            session_id=current_session_id,
+                        ),
+                    )
+                    await websocket.close(code=1008)
+                except Exception:
+                    # Closing an already-closed client websocket is harmless.
+                    pass
             except Exception as exc:
                 self.logger.error("Station realtime websocket proxy failed: %s", exc)
                 try:
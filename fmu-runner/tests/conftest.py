@@ -6,6 +6,9 @@ is invoked, as long as the working directory is fmu-runner/ or any parent.
 
 import sys
 import os
+import tempfile
+
+import pytest
 
 # Existing unit tests exercise the native backend; make that opt-in explicit in
 # the test environment rather than inheriting the production-safe defaults.
@@ -14,8 +17,25 @@ os.environ.setdefault("FMU_LOCAL_DEV_MODE", "true")
 os.environ.setdefault("FMU_LOCAL_REALTIME_ENABLED", "true")
 os.environ.setdefault("AAS_ALLOWED_HOSTS", "127.0.0.1,basyx-mock,basyx-test")
 os.environ.setdefault("AAS_SERVICE_TOKEN", "test-aas-service-token")
+# Per-lab limits are under test; do not size the gateway-wide cap from the CI host.
+os.environ.setdefault("FMU_GLOBAL_MAX_CONCURRENT", "64")
+# Keep persisted FMU digests out of the production data directory.
+os.environ.setdefault(
+    "FMU_DIGEST_CACHE_PATH",
+    os.path.join(tempfile.gettempdir(), f"fmu-runner-tests-{os.getpid()}", "fmu-digests.json"),
+)
 
 # Ensure the fmu-runner directory (parent of this tests/ dir) is on sys.path
 FMU_RUNNER_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 if FMU_RUNNER_ROOT not in sys.path:
     sys.path.insert(0, FMU_RUNNER_ROOT)
+
+
+@pytest.fixture(autouse=True)
+def _reset_model_metadata_cache():
+    # Tests patch read_model_description per test; never serve one test's
+    # parsed model to the next.
+    yield
+    main = sys.modules.get("main")
+    if main is not None:
+        main._model_metadata_cache.clear()
@@ -664,6 +664,38 @@ class TestSyncFmuToBasyxDegradation:
         finally:
             _aas_mod.BASYX_AAS_URL = original
 
+    @pytest.mark.asyncio
+    async def test_fmu_digest_is_computed_off_the_event_loop(self, tmp_path, monkeypatch):
+        import threading
+
+        fmu = tmp_path / "motor.fmu"
+        fmu.write_bytes(b"motor")
+        monkeypatch.setattr(_aas_mod, "BASYX_AAS_URL", "https://basyx-test:8081")
+        threads = []
+
+        def _digest(path):
+            threads.append(threading.current_thread())
+            return "a" * 64
+
+        monkeypatch.setattr(_aas_mod, "_fmu_digest", _digest)
+        mock_resp = MagicMock()
+        mock_resp.status_code = 201
+        mock_client = AsyncMock()
+        mock_client.put = AsyncMock(return_value=mock_resp)
+        mock_client.__aenter__ = AsyncMock(return_value=mock_client)
+        mock_client.__aexit__ = AsyncMock(return_value=False)
+
+        with patch("httpx.AsyncClient", return_value=mock_client):
+            result = await _aas_mod.sync_fmu_to_basyx("42", "motor.fmu", SAMPLE_METADATA, fmu_path=fmu)
+
+        assert result.get("synced") is True
+        assert len(threads) == 1 and threads[0] is not threading.main_thread()
+        submodel = next(
+            call.kwargs["json"] for call in mock_client.put.call_args_list if call.args[0].startswith("/submodels/")
+        )
+        model_file = next(el for el in submodel["submodelElements"][0]["value"] if el["idShort"] == "ModelFile")
+        assert model_file["extensions"][0]["value"] == "a" * 64
+
 
 # ── _parse_aasx unit tests ──────────────────────────────────────────
 
@@ -0,0 +1,77 @@
+import asyncio
+import threading
+
+import pytest
+
+from admission_queue import AdmissionQueue, AdmissionQueueFull
+
+
+def test_earliest_reservation_end_is_admitted_first_then_arrival_order():
+    async def scenario():
+        queue = AdmissionQueue(max_depth=4, max_wait_seconds=5)
+        late = queue.enqueue("lab", deadline=2_000)
+        open_ended = queue.enqueue("lab")
+        soon = queue.enqueue("lab", deadline=1_000)
+        also_soon = queue.enqueue("lab", deadline=1_000)
+
+        assert [queue.position(ticket) for ticket in (soon, also_soon, late, open_ended)] == [1, 2, 3, 4]
+        with pytest.raises(AdmissionQueueFull):
+            queue.enqueue("lab")
+        assert queue.waiting("other") == 0
+
+        admitted = []
+        for _ in range(4):
+            assert queue.grant("lab")
+            await asyncio.sleep(0)
+            admitted.append(next(
+                ticket for ticket in (soon, also_soon, late, open_ended)
+                if ticket.granted.done() and ticket not in admitted
+            ))
+        assert admitted == [soon, also_soon, late, open_ended]
+        assert not queue.grant("lab")
+        return queue.metrics()
+
+    metrics = asyncio.run(scenario())
+    assert (metrics["queued"], metrics["admitted"], metrics["rejectedFull"], metrics["waiting"]) == (4, 4, 1, 0)
+
+
+def test_grant_from_another_thread_wakes_the_waiter():
+    async def scenario():
+        queue = AdmissionQueue(max_depth=2, max_wait_seconds=5)
+        ticket = queue.enqueue("lab", deadline=10)
+        assert not await queue.wait(ticket, 0.01)
+        threading.Timer(0.05, queue.grant, args=("lab",)).start()
+        return await queue.wait(ticket, 2), queue.position(ticket)
+
+    assert asyncio.run(scenario()) == (True, None)
+
+
+def test_withdraw_reports_slots_granted_before_the_waiter_gave_up():
+    async def scenario():
+        queue = AdmissionQueue(max_depth=2, max_wait_seconds=5)
+        leaving = queue.enqueue("lab")
+        staying = queue.enqueue("lab")
+        assert queue.withdraw(leaving, timed_out=True)
+        assert queue.position(staying) == 1
+
+        assert queue.grant("lab")
+        # The slot is already the waiter's: withdrawing cannot give it back silently.
+        assert not queue.withdraw(staying)
+        return queue.metrics()
+
+    metrics = asyncio.run(scenario())
+    assert (metrics["timedOut"], metrics["admitted"], metrics["depth"]) == (1, 1, {})
+
+
+def test_waiters_on_closed_loops_are_skipped():
+    queue = AdmissionQueue(max_depth=2, max_wait_seconds=5)
+
+    async def enqueue():
+        return queue.enqueue("lab")
+
+    orphan = asyncio.run(enqueue())
+
+    assert not queue.grant("lab")
+    assert queue.position(orphan) is None
+    assert queue.metrics()["abandoned"] == 1
+    assert not AdmissionQueue(max_depth=0).enabled
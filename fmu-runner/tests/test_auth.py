@@ -1,4 +1,6 @@
+import asyncio
 import json
+import time
 from types import SimpleNamespace
 
 import httpx
@@ -22,6 +24,11 @@ def _reset_auth_state(monkeypatch):
     monkeypatch.setattr(auth, "JWT_ISSUER", None)
     monkeypatch.setattr(auth, "JWT_AUDIENCE", "https://gateway.example/fmu")
     monkeypatch.setattr(auth, "JWKS_CACHE_TTL", 300)
+    monkeypatch.setattr(auth, "_signing_keys", {"source": None, "keys": {}})
+    monkeypatch.setattr(auth, "_verified_claims", auth.VerifiedClaimsCache(64))
+    monkeypatch.setattr(auth, "_jwks_refresh", {"task": None, "completed_at": float("-inf"), "refresher": None})
+    monkeypatch.setattr(auth, "_jwks_refresh_metrics", dict.fromkeys(auth._jwks_refresh_metrics, 0))
+    monkeypatch.setattr(auth, "_unknown_kids", auth.OrderedDict())
 
 
 def test_resolve_auth_jwks_url_prefers_explicit_env(monkeypatch):
@@ -427,3 +434,185 @@ async def test_verify_jwt_extracts_token_before_validation(monkeypatch):
     claims = await auth.verify_jwt(request)
 
     assert claims == {"sub": "user-1"}
+
+
+@pytest.mark.asyncio
+async def test_verify_jwt_token_parses_jwks_once_and_caches_verified_claims(monkeypatch, signing_material):
+    async def _fake_fetch(*, force=False):
+        return signing_material["jwks"]
+
+    parses = []
+    decodes = []
+    real_from_dict = auth.jwt.PyJWKSet.from_dict
+    real_decode = auth.jwt.decode
+    monkeypatch.setattr(auth, "_fetch_jwks", _fake_fetch)
+    monkeypatch.setattr(auth.jwt.PyJWKSet, "from_dict", lambda data: parses.append(data) or real_from_dict(data))
+    monkeypatch.setattr(auth.jwt, "decode", lambda *a, **kw: decodes.append(a) or real_decode(*a, **kw))
+    token = signing_material["issue_token"]()
+    other = signing_material["issue_token"](claims={"sub": "user-2"})
+
+    first = await auth.verify_jwt_token(token)
+    first["sub"] = "mutated"
+    second = await auth.verify_jwt_token(token)
+    third = await auth.verify_jwt_token(other)
+
+    assert second["sub"] == "user-1"
+    assert second["_credentialHash"] == first["_credentialHash"]
+    assert third["sub"] == "user-2"
+    assert len(parses) == 1
+    assert len(decodes) == 2
+    assert auth.claims_cache_metrics()["hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_cached_claims_expire_with_the_token_and_follow_the_current_jwks(monkeypatch, signing_material):
+    jwks = {"current": signing_material["jwks"]}
+
+    async def _fake_fetch(*, force=False):
+        return jwks["current"]
+
+    decodes = []
+    real_decode = auth.jwt.decode
+    monkeypatch.setattr(auth, "_fetch_jwks", _fake_fetch)
+    monkeypatch.setattr(auth.jwt, "decode", lambda *a, **kw: decodes.append(a) or real_decode(*a, **kw))
+    now = time.time()
+    token = signing_material["issue_token"](claims={"exp": int(now) + 60})
+
+    await auth.verify_jwt_token(token)
+    await auth.verify_jwt_token(token)
+    assert len(decodes) == 1
+
+    # The cache entry ends at exp even if the caller's clock is the only one that moved.
+    monkeypatch.setattr(auth.time, "time", lambda: now + 61)
+    await auth.verify_jwt_token(token)
+    assert len(decodes) == 2
+
+    # A changed audience or a removed signing key is never answered from the cache.
+    monkeypatch.setattr(auth, "JWT_AUDIENCE", "https://gateway.example/other")
+    with pytest.raises(HTTPException):
+        await auth.verify_jwt_token(token)
+    monkeypatch.setattr(auth, "JWT_AUDIENCE", "https://gateway.example/fmu")
+    jwks["current"] = {"keys": [dict(signing_material["jwks"]["keys"][0], kid="rotated-kid")]}
+    with pytest.raises(HTTPException) as exc:
+        await auth.verify_jwt_token(token)
+    assert exc.value.detail == "No matching signing key found"
+
+
+def test_verified_claims_cache_is_a_bounded_lru():
+    cache = auth.VerifiedClaimsCache(2)
+    key = SimpleNamespace(key_id="kid")
+    keys = {"kid": key}
+    for name in ("a", "b"):
+        cache.put(name, {"sub": name, "exp": 2000}, key=key, context=())
+    assert cache.get("a", now=1000, keys=keys, context=()) == {"sub": "a", "exp": 2000}
+    cache.put("c", {"sub": "c", "exp": 2000}, key=key, context=())
+
+    assert cache.get("b", now=1000, keys=keys, context=()) is None
+    assert cache.get("a", now=1000, keys=keys, context=())["sub"] == "a"
+    assert cache.get("c", now=2000, keys=keys, context=()) is None
+    assert cache.metrics()["evictions"] == 1
+    assert auth.VerifiedClaimsCache(0).get("a", now=0, keys=keys, context=()) is None
+
+
+def _counting_jwks_client(monkeypatch, payload, calls, *, delay=0.0):
+    class _Response:
+        def raise_for_status(self):
+            return None
+
+        def json(self):
+            return payload() if callable(payload) else payload
+
+    class _AsyncClient:
+        def __init__(self, *args, **kwargs):
+            pass
+
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, exc_type, exc, tb):
+            return False
+
+        async def get(self, url):
+            calls.append(url)
+            await asyncio.sleep(delay)
+            return _Response()
+
+    monkeypatch.setattr(auth.httpx, "AsyncClient", _AsyncClient)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_cold_fetches_share_one_jwks_download(monkeypatch):
+    calls = []
+    payload = {"keys": [{"kid": "k1"}]}
+    _counting_jwks_client(monkeypatch, payload, calls, delay=0.05)
+
+    results = await asyncio.gather(*(auth._fetch_jwks() for _ in range(20)))
+
+    assert all(result == payload for result in results)
+    assert len(calls) == 1
+    assert auth.jwks_refresh_metrics()["coalesced"] == 19
+
+
+@pytest.mark.asyncio
+async def test_expired_jwks_is_served_while_one_background_refresh_runs(monkeypatch):
+    calls = []
+    cached = {"keys": [{"kid": "old"}]}
+    fresh = {"keys": [{"kid": "new"}]}
+    _counting_jwks_client(monkeypatch, fresh, calls, delay=0.05)
+    now = time.time()
+    monkeypatch.setattr(auth, "_jwks_cache", {"data": cached, "fetched_at": now - 400, "stale_since": 0.0})
+
+    assert await auth._fetch_jwks() is cached
+    assert await auth._fetch_jwks() is cached
+    await auth._jwks_refresh["task"]
+
+    assert len(calls) == 1
+    assert await auth._fetch_jwks() == fresh
+    assert auth.jwks_refresh_metrics()["servedStale"] == 2
+
+
+@pytest.mark.asyncio
+async def test_unknown_kid_is_backed_off_instead_of_refetching(monkeypatch, signing_material):
+    calls = []
+    _counting_jwks_client(monkeypatch, signing_material["jwks"], calls)
+    monkeypatch.setattr(auth, "JWKS_REFRESH_MIN_INTERVAL_SECONDS", 0)
+    token = signing_material["issue_token"](headers={"kid": "forged-kid"})
+
+    for _ in range(5):
+        with pytest.raises(HTTPException) as exc:
+            await auth.verify_jwt_token(token)
+        assert exc.value.status_code == 401
+
+    # One cold load plus one forced refresh for the unknown kid.
+    assert len(calls) == 2
+    assert auth.jwks_refresh_metrics()["unknownKidRejections"] == 4
+    assert (await auth.verify_jwt_token(signing_material["issue_token"]()))["sub"] == "user-1"
+
+
+@pytest.mark.asyncio
+async def test_forced_refreshes_are_rate_limited(monkeypatch):
+    calls = []
+    _counting_jwks_client(monkeypatch, {"keys": [{"kid": "k1"}]}, calls)
+    monkeypatch.setattr(auth, "JWKS_REFRESH_MIN_INTERVAL_SECONDS", 60)
+
+    await auth._fetch_jwks(force=True)
+    await auth._fetch_jwks(force=True)
+
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_background_refresher_renews_keys_ahead_of_ttl(monkeypatch):
+    calls = []
+    _counting_jwks_client(monkeypatch, lambda: {"keys": [{"kid": f"k{len(calls)}"}]}, calls)
+    monkeypatch.setattr(auth, "JWKS_CACHE_TTL", 0)
+    monkeypatch.setattr(auth, "JWKS_REFRESH_MIN_INTERVAL_SECONDS", 0.01)
+    monkeypatch.setattr(auth, "_JWKS_REFRESH_FLOOR_SECONDS", 0.01)
+
+    auth.start_jwks_refresher()
+    await asyncio.sleep(0.2)
+    await auth.stop_jwks_refresher()
+
+    assert len(calls) >= 2
+    assert auth._jwks_cache["data"] == {"keys": [{"kid": f"k{len(calls)}"}]}
+    assert auth._jwks_refresh["refresher"] is None
@@ -0,0 +1,112 @@
+import asyncio
+
+import httpx
+import pytest
+
+import auth_service_client
+from auth_service_client import AuthServiceClient
+
+
+class _FlakyClient:
+    instances = []
+
+    def __init__(self, *, failures, **kwargs):
+        self.kwargs = kwargs
+        self.failures = failures
+        self.calls = []
+        _FlakyClient.instances.append(self)
+
+    async def post(self, url, *, headers=None, json=None):
+        self.calls.append(url)
+        if self.failures:
+            raise self.failures.pop(0)
+        return httpx.Response(200, json={"ok": True})
+
+    async def aclose(self):
+        pass
+
+
+@pytest.fixture
+def flaky(monkeypatch):
+    _FlakyClient.instances = []
+    failures = []
+
+    def _factory(**kwargs):
+        return _FlakyClient(failures=failures, **kwargs)
+
+    monkeypatch.setattr(auth_service_client.httpx, "AsyncClient", _factory)
+    sleeps = []
+
+    async def _sleep(delay):
+        sleeps.append(delay)
+
+    monkeypatch.setattr(auth_service_client.asyncio, "sleep", _sleep)
+    return failures, sleeps
+
+
+def test_requests_on_one_loop_share_a_keep_alive_client(flaky):
+    client = AuthServiceClient(max_connections=4, keepalive_expiry=5.0)
+
+    async def _calls():
+        for _ in range(3):
+            await client.post("http://auth/issue", headers={}, json={})
+
+    asyncio.run(_calls())
+    asyncio.run(_calls())
+
+    # One pool per event loop, reused for every call made on it.
+    assert len(_FlakyClient.instances) == 2
+    assert [len(instance.calls) for instance in _FlakyClient.instances] == [3, 3]
+    assert _FlakyClient.instances[0].kwargs["limits"].max_connections == 4
+    assert client.metrics()["requests"] == 6
+
+
+def test_connect_failures_are_retried_with_jittered_backoff(flaky):
+    failures, sleeps = flaky
+    request = httpx.Request("POST", "http://auth/redeem")
+    failures.extend([httpx.ConnectError("refused", request=request), httpx.PoolTimeout("busy")])
+    client = AuthServiceClient(max_attempts=3, retry_backoff=0.1)
+
+    response = asyncio.run(client.post("http://auth/redeem", headers={}, json={}))
+
+    assert response.status_code == 200
+    assert len(sleeps) == 2
+    assert 0.0 <= sleeps[0] <= 0.1 and 0.0 <= sleeps[1] <= 0.2
+    assert client.metrics()["retries"] == 2
+
+
+def test_failures_after_the_request_was_sent_are_not_retried(flaky):
+    failures, sleeps = flaky
+    failures.append(httpx.ReadTimeout("slow"))
+    client = AuthServiceClient(max_attempts=3)
+
+    with pytest.raises(httpx.ReadTimeout):
+        asyncio.run(client.post("http://auth/redeem", headers={}, json={}))
+    assert sleeps == []
+
+    request = httpx.Request("POST", "http://auth/redeem")
+    failures.extend([httpx.ConnectError("refused", request=request)] * 3)
+    with pytest.raises(httpx.ConnectError):
+        asyncio.run(client.post("http://auth/redeem", headers={}, json={}))
+    assert client.metrics()["failures"] == 1
+
+
+def test_cached_tokens_are_reused_until_the_refresh_margin(monkeypatch):
+    now = {"value": 1000.0}
+    monkeypatch.setattr(auth_service_client.time, "time", lambda: now["value"])
+    minted = []
+
+    def _mint():
+        minted.append(now["value"])
+        return f"token-{len(minted)}", now["value"] + 60
+
+    client = AuthServiceClient(token_refresh_margin=15)
+
+    assert client.cached_token("observer", _mint) == "token-1"
+    now["value"] = 1044.0
+    assert client.cached_token("observer", _mint) == "token-1"
+    now["value"] = 1045.0
+    assert client.cached_token("observer", _mint) == "token-2"
+    client.discard_token("observer")
+    assert client.cached_token("observer", _mint) == "token-3"
+    assert client.metrics()["tokensReused"] == 1
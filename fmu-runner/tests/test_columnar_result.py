@@ -0,0 +1,105 @@
+import io
+import json
+from multiprocessing import shared_memory
+
+import numpy as np
+import pytest
+
+from columnar_result import (
+    ColumnarResult,
+    discard_columnar_result,
+    export_columns,
+    wants_columnar,
+)
+from result_blobs import columnar_summary, result_summary
+
+
+def _structured_result(length=5):
+    result = np.zeros(length, dtype=[("time", "<f8"), ("x", "<f8"), ("on", "?"), ("n", "<i4")])
+    result["time"] = np.arange(length) * 0.1
+    result["x"] = np.arange(length) * 2.0
+    result["on"] = np.arange(length) % 2 == 0
+    result["n"] = 7
+    return result
+
+
+def test_accept_header_selects_npz_only_when_explicit():
+    assert wants_columnar("application/x-npz")
+    assert wants_columnar("application/json, application/x-npz;q=0.9")
+    assert not wants_columnar("application/x-npz;q=0")
+    assert not wants_columnar("*/*")
+    assert not wants_columnar(None)
+
+
+def test_npz_stream_round_trips_every_column_dtype():
+    structured = _structured_result()
+    result = ColumnarResult(export_columns(structured))
+    try:
+        payload = b"".join(result.iter_npz(chunk_bytes=8))
+    finally:
+        result.close()
+
+    archive = np.load(io.BytesIO(payload))
+    assert archive.files == ["time", "x", "on", "n"]
+    for name in archive.files:
+        assert archive[name].dtype == structured.dtype.fields[name][0]
+        assert archive[name].tolist() == structured[name].tolist()
+
+
+def test_json_view_matches_the_default_result_shape():
+    result = ColumnarResult(export_columns(_structured_result(3)))
+    try:
+        payload = result.to_json_result()
+        streamed = b"".join(result.iter_json(chunk_rows=2))
+        summary = columnar_summary(result)
+    finally:
+        result.close()
+
+    assert payload["time"] == pytest.approx([0.0, 0.1, 0.2])
+    assert payload["outputVariables"] == ["x", "on", "n"]
+    assert payload["outputs"]["on"] == [True, False, True]
+    assert streamed == json.dumps(payload).encode("utf-8")
+    assert summary == result_summary(payload)
+
+
+def test_closing_or_discarding_unlinks_the_shared_segment():
+    descriptor = export_columns(_structured_result())
+    ColumnarResult(descriptor).close()
+    with pytest.raises(FileNotFoundError):
+        shared_memory.SharedMemory(name=descriptor["shm"])
+
+    abandoned = export_columns(_structured_result())
+    discard_columnar_result({"columnar": abandoned})
+    with pytest.raises(FileNotFoundError):
+        shared_memory.SharedMemory(name=abandoned["shm"])
+
+
+def test_results_larger_than_free_shared_memory_travel_inline(monkeypatch):
+    import columnar_result
+
+    monkeypatch.setattr(columnar_result, "_shm_free_bytes", lambda: 16)
+    structured = _structured_result()
+    descriptor = export_columns(structured)
+    assert "shm" not in descriptor
+
+    result = ColumnarResult(descriptor)
+    payload = b"".join(result.iter_npz())
+    result.close()
+    discard_columnar_result({"columnar": descriptor})
+
+    assert np.load(io.BytesIO(payload))["x"].tolist() == structured["x"].tolist()
+
+
+def test_unread_results_are_unlinked_when_collected_and_detached_copies_outlive_close():
+    import gc
+
+    descriptor = export_columns(_structured_result())
+    result = ColumnarResult(descriptor)
+    detached = result.detached()
+    body = (chunk for chunk in result.iter_npz())  # a response body that never starts
+    del result, body
+    gc.collect()
+
+    with pytest.raises(FileNotFoundError):
+        shared_memory.SharedMemory(name=descriptor["shm"])
+    assert detached.to_json_result()["outputs"]["x"] == [0.0, 2.0, 4.0, 6.0, 8.0]
@@ -1,3 +1,6 @@
+import asyncio
+import json
+
 import pytest
 import httpx
 from fastapi import HTTPException
@@ -55,7 +58,7 @@ async def test_station_health_is_degraded_when_not_configured():
 async def test_station_backend_normalizes_model_metadata(monkeypatch):
     backend = StationFmuBackend(base_url="https://station.internal")
 
-    async def _fake_request(operation: str, *, access_key: str | None = None):
+    async def _fake_request(operation: str, *, access_key: str | None = None, **_kwargs):
         assert operation == "describe"
         assert access_key == "demo.fmu"
         return {
@@ -105,7 +108,7 @@ async def test_station_backend_normalizes_model_metadata(monkeypatch):
 async def test_station_catalog_404_falls_back_to_describe(monkeypatch):
     backend = StationFmuBackend(base_url="https://station.internal")
 
-    async def _fake_request(operation: str, *, access_key: str | None = None):
+    async def _fake_request(operation: str, *, access_key: str | None = None, **_kwargs):
         if operation == "catalog" and access_key == "demo.fmu":
             raise HTTPException(status_code=404, detail="missing")
         if operation == "describe" and access_key == "demo.fmu":
@@ -280,3 +283,82 @@ def test_station_backend_builds_internal_session_message():
     assert message["gatewayContext"]["accessKey"] == "demo.fmu"
     assert message["gatewayContext"]["claims"]["sub"] == "user-1"
     assert message["gatewayContext"]["reservationKey"] == "res-1"
+
+
+async def _serve_station_health(connections: list):
+    async def _handle(reader, writer):
+        connections.append(writer)
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                if not head:
+                    break
+                body = json.dumps({"status": "UP", "fmuCount": 2}).encode()
+                writer.write(
+                    b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                    + f"Content-Length: {len(body)}\r\n\r\n".encode()
+                    + body
+                )
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionResetError):
+            pass
+        finally:
+            writer.close()
+
+    return await asyncio.start_server(_handle, "127.0.0.1", 0)
+
+
+@pytest.mark.asyncio
+async def test_station_backend_reuses_pooled_connections():
+    connections: list = []
+    server = await _serve_station_health(connections)
+    port = server.sockets[0].getsockname()[1]
+    backend = StationFmuBackend(base_url=f"http://127.0.0.1:{port}", max_concurrency=2)
+    try:
+        results = [await backend.health() for _ in range(3)]
+        metrics = backend.pool_metrics()
+    finally:
+        await backend.aclose()
+        server.close()
+        await server.wait_closed()
+
+    assert [result["fmuCount"] for result in results] == [2, 2, 2]
+    assert len(connections) == 1
+    assert metrics["requests"] == 3
+    assert metrics["newConnections"] == 1
+    assert metrics["reuseRatio"] == pytest.approx(2 / 3, abs=1e-3)
+    assert metrics["inFlight"] == 0
+    assert results[-1]["stationPool"]["maxConcurrency"] == 2
+    # One pool wait per request, covering both the slot and the connection.
+    assert backend._pool_waits == 3
+
+
+@pytest.mark.asyncio
+async def test_station_describe_is_cached_and_revalidated_with_etag(monkeypatch):
+    backend = StationFmuBackend(base_url="https://station.internal", metadata_cache_ttl=60)
+    sent_etags = []
+    clock = [1000.0]
+
+    async def _fake_request(operation: str, *, access_key: str | None = None, revalidation=None):
+        assert operation == "describe"
+        sent_etags.append(revalidation.etag)
+        if revalidation.etag == '"v1"':
+            revalidation.not_modified = True
+            return {}
+        revalidation.etag = '"v1"'
+        return {"modelName": "DemoPlant", "modelVariables": [{"name": "y", "type": "Real"}]}
+
+    monkeypatch.setattr(backend, "_request_json", _fake_request)
+    monkeypatch.setattr("fmu_backend.time.monotonic", lambda: clock[0])
+    claims = {"accessKey": "demo.fmu"}
+
+    first = await backend.get_authorized_model_metadata(claims=claims)
+    assert await backend.get_authorized_model_metadata(claims=claims) is first
+    clock[0] += 120
+    assert await backend.get_authorized_model_metadata(claims=claims) is first
+    backend.invalidate_model_metadata("demo.fmu")
+    refreshed = await backend.get_authorized_model_metadata(claims=claims)
+
+    assert sent_etags == [None, '"v1"', None]
+    assert refreshed is not first
+    assert refreshed["modelName"] == "DemoPlant"
@@ -0,0 +1,157 @@
+import hashlib
+import os
+
+import pytest
+
+import fmu_inventory
+from fmu_inventory import FmuDigestStore, FmuInventory, default_inventory, shared_inventory
+
+
+def _write(path, payload=b"fmu"):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(payload)
+    return path
+
+
+def test_index_keeps_the_runner_resolution_rules(tmp_path):
+    direct = _write(tmp_path / "direct.fmu")
+    provider = _write(tmp_path / "provider-1" / "provider.fmu", b"provider")
+    _write(tmp_path / "provider-1" / "nested" / "deep.fmu")
+    _write(tmp_path / "notes.txt")
+    outside = _write(tmp_path.parent / f"{tmp_path.name}-outside.fmu")
+    try:
+        (tmp_path / "outside.fmu").symlink_to(outside)
+    except OSError:
+        pytest.skip("symlinks are unavailable in this test environment")
+
+    inventory = FmuInventory(tmp_path)
+
+    assert inventory.available()
+    assert inventory.count() == 3  # every FMU below the root, like the old rglob
+    assert inventory.find("direct.fmu").path == direct.resolve()
+    entry = inventory.find("provider.fmu")
+    assert (entry.path, entry.relative, entry.size) == (provider.resolve(), os.path.join("provider-1", "provider.fmu"), 8)
+    assert inventory.find("deep.fmu") is None  # only one provider level is searched
+    assert inventory.find("outside.fmu") is None
+    assert not FmuInventory(tmp_path / "missing").available()
+
+
+def test_inotify_rescans_only_after_a_change(tmp_path):
+    _write(tmp_path / "a.fmu")
+    inventory = FmuInventory(tmp_path)
+    if inventory.mode != "inotify":
+        pytest.skip("inotify is unavailable")
+
+    for _ in range(5):
+        assert inventory.count() == 1
+    assert inventory.metrics()["scans"] == 1
+
+    _write(tmp_path / "provider" / "b.fmu")
+    assert inventory.find("b.fmu") is not None
+    (tmp_path / "a.fmu").unlink()
+    assert inventory.find("a.fmu") is None
+    assert inventory.count() == 1
+    inventory.close()
+
+
+def test_polling_rescans_after_the_interval(tmp_path, monkeypatch):
+    now = {"value": 100.0}
+    monkeypatch.setattr(fmu_inventory.time, "monotonic", lambda: now["value"])
+    _write(tmp_path / "a.fmu")
+    inventory = FmuInventory(tmp_path, watch="poll", poll_interval=30)
+
+    assert inventory.mode == "poll"
+    assert inventory.count() == 1
+    _write(tmp_path / "b.fmu")
+    assert inventory.count() == 1
+    now["value"] = 130.0
+    assert inventory.count() == 2
+
+    # A file replaced behind the index is noticed on lookup.
+    (tmp_path / "a.fmu").unlink()
+    assert inventory.find("a.fmu") is None
+
+
+def test_sha256_is_computed_once_per_file_version(tmp_path):
+    fmu = _write(tmp_path / "model.fmu", b"v1")
+    inventory = FmuInventory(tmp_path, watch="poll", poll_interval=3600)
+
+    first = inventory.sha256(inventory.find("model.fmu"))
+    assert inventory.sha256(inventory.find("model.fmu")) == first == hashlib.sha256(b"v1").hexdigest()
+    assert inventory.metrics()["digestsComputed"] == 1
+
+    fmu.write_bytes(b"version-2")
+    assert inventory.sha256(inventory.find("model.fmu")) == hashlib.sha256(b"version-2").hexdigest()
+    assert inventory.metrics()["digestsComputed"] == 2
+
+
+def test_sha256_file_shares_digests_with_indexed_entries(tmp_path):
+    root = tmp_path / "fmus"
+    fmu = _write(root / "model.fmu", b"v1")
+    outside = _write(tmp_path / "elsewhere.fmu", b"outside")
+    inventory = FmuInventory(root, watch="poll", poll_interval=3600)
+
+    inventory.sha256(inventory.find("model.fmu"))
+    assert inventory.sha256_file(str(fmu)) == hashlib.sha256(b"v1").hexdigest()
+    assert inventory.sha256_file(outside) == hashlib.sha256(b"outside").hexdigest()
+    assert (inventory.metrics()["digestsComputed"], inventory.metrics()["digestHits"]) == (2, 1)
+    with pytest.raises(OSError):
+        inventory.sha256_file(tmp_path / "missing.fmu")
+
+
+def test_persisted_digests_survive_a_new_inventory(tmp_path):
+    root = tmp_path / "fmus"
+    fmu = _write(root / "model.fmu", b"v1")
+    _write(root / "other.fmu", b"other")
+    cache = tmp_path / "data" / "fmu-digests.json"
+
+    first = FmuInventory(root, watch="poll", poll_interval=3600, digest_store=FmuDigestStore(cache))
+    first.sha256(first.find("model.fmu"))
+    first.sha256(first.find("other.fmu"))
+    assert first.metrics()["digestsPersisted"] == 2
+
+    restarted = FmuInventory(root, watch="poll", poll_interval=3600, digest_store=FmuDigestStore(cache))
+    assert restarted.sha256(restarted.find("model.fmu")) == hashlib.sha256(b"v1").hexdigest()
+    assert (restarted.metrics()["digestsLoaded"], restarted.metrics()["digestsComputed"]) == (1, 0)
+
+    # A changed file is re-hashed; digests of deleted files are dropped.
+    fmu.write_bytes(b"version-2")
+    (root / "other.fmu").unlink()
+    restarted.refresh()
+    assert restarted.sha256(restarted.find("model.fmu")) == hashlib.sha256(b"version-2").hexdigest()
+    assert restarted.metrics()["digestsComputed"] == 1
+    assert len(FmuDigestStore(cache)) == 1
+
+
+def test_digest_store_ignores_corrupt_or_unwritable_files(tmp_path, caplog):
+    cache = tmp_path / "fmu-digests.json"
+    cache.write_text("{not json", encoding="utf-8")
+    store = FmuDigestStore(cache)
+    assert store.get("1:2:3:4") is None
+
+    blocked = FmuDigestStore(cache / "nested.json")  # parent is a file
+    blocked.put("1:2:3:4", "a" * 64, live=[])
+    blocked.put("1:2:3:5", "b" * 64, live=["1:2:3:4"])
+    assert (blocked.get("1:2:3:4"), blocked.get("1:2:3:5")) == ("a" * 64, "b" * 64)
+    assert sum("Unable to persist" in record.message for record in caplog.records) == 1
+
+
+def test_runner_and_aas_generator_share_the_default_inventory(tmp_path, monkeypatch):
+    import aas_generator
+    import main
+
+    monkeypatch.setattr(main, "FMU_DATA_PATH", str(tmp_path))
+    monkeypatch.setattr(aas_generator, "FMU_DATA_PATH", str(tmp_path))
+    _write(tmp_path / "model.fmu", b"shared")
+
+    inventory = main._fmu_inventory()
+    assert inventory is default_inventory(tmp_path)
+    assert inventory.digest_store is not None
+    aas_generator._fmu_digest(tmp_path / "model.fmu")
+    assert main._fmu_content_digest(str(tmp_path / "model.fmu")) == hashlib.sha256(b"shared").hexdigest()
+    assert inventory.metrics()["digestsComputed"] == 1
+
+
+def test_shared_inventory_is_one_instance_per_root(tmp_path):
+    assert shared_inventory(tmp_path) is shared_inventory(str(tmp_path))
+    assert shared_inventory(tmp_path, watch="poll") is not shared_inventory(tmp_path)
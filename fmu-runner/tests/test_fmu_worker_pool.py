@@ -0,0 +1,132 @@
+import os
+import time
+import zipfile
+
+import pytest
+
+from fmu_worker_pool import FmuWorkerPool, FmuWorkerUnavailable
+
+
+_MODEL_DESCRIPTION = """<?xml version="1.0" encoding="UTF-8"?>
+<fmiModelDescription fmiVersion="2.0" modelName="Pooled" guid="{pooled}">
+  <CoSimulation modelIdentifier="Pooled"/>
+  <ModelVariables>
+    <ScalarVariable name="x" valueReference="0" causality="output" variability="continuous"><Real/></ScalarVariable>
+  </ModelVariables>
+  <ModelStructure><Outputs><Unknown index="1"/></Outputs></ModelStructure>
+</fmiModelDescription>
+"""
+
+
+def _describe_job(fmu_path, delay=0.0, *, prepared_model=None):
+    if delay:
+        time.sleep(delay)
+    return {
+        "pid": os.getpid(),
+        "directory": prepared_model.directory,
+        "modelName": prepared_model.model_description.modelName,
+    }
+
+
+def _write_fmu(path, model_name="Pooled"):
+    with zipfile.ZipFile(path, "w") as archive:
+        archive.writestr("modelDescription.xml", _MODEL_DESCRIPTION.replace("Pooled", model_name))
+    return str(path)
+
+
+@pytest.fixture
+def pool():
+    worker_pool = FmuWorkerPool(_describe_job, size=1, max_jobs_per_worker=3)
+    yield worker_pool
+    worker_pool.shutdown(wait=True)
+
+
+def test_repeated_model_runs_reuse_the_warm_worker_and_extraction(pool, tmp_path):
+    fmu_path = _write_fmu(tmp_path / "model.fmu")
+    assert pool.warm() == 1
+
+    first_lease, first = pool.submit(fmu_path)
+    first_result = first.result(timeout=10)
+    # The worker is idle again before the result resolves.
+    assert first_lease.done and pool.metrics()["idle"] == 1
+    second_lease, second = pool.submit(fmu_path)
+    second_result = second.result(timeout=10)
+
+    assert first_result["modelName"] == "Pooled"
+    assert second_result["pid"] == first_result["pid"]
+    assert second_result["directory"] == first_result["directory"]
+    assert (first_lease.hit, second_lease.hit) == (False, True)
+    metrics = pool.metrics()
+    assert metrics["hits"] == 1
+    assert metrics["misses"] == 1
+    assert metrics["spawned"] == 1
+    assert metrics["spawnSecondsLast"] > 0
+
+
+def test_killed_worker_fails_its_job_and_is_replaced(pool, tmp_path):
+    fmu_path = _write_fmu(tmp_path / "model.fmu")
+    lease, future = pool.submit(fmu_path, 30.0)
+
+    assert lease.kill() is True
+    with pytest.raises(FmuWorkerUnavailable):
+        future.result(timeout=10)
+
+    _, retry = pool.submit(fmu_path)
+    assert retry.result(timeout=10)["pid"] != lease.pid
+    assert pool.metrics()["killed"] == 1
+
+
+def test_killing_a_finished_lease_does_not_touch_the_reused_worker(pool, tmp_path):
+    fmu_path = _write_fmu(tmp_path / "model.fmu")
+    stale_lease, stale = pool.submit(fmu_path)
+    stale.result(timeout=10)
+    deadline = time.monotonic() + 5
+    while not stale_lease.done and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    _, running = pool.submit(fmu_path, 0.2)
+
+    assert stale_lease.kill() is False
+    assert running.result(timeout=10)["pid"] == stale_lease.pid
+
+
+def test_worker_is_recycled_after_max_jobs(pool, tmp_path):
+    fmu_path = _write_fmu(tmp_path / "model.fmu")
+    pids = []
+    for _ in range(4):
+        lease, future = pool.submit(fmu_path)
+        pids.append(future.result(timeout=10)["pid"])
+        deadline = time.monotonic() + 5
+        while not lease.done and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    assert len(set(pids[:3])) == 1
+    assert pids[3] != pids[0]
+    assert pool.metrics()["recycled"] == 1
+
+
+def test_worker_reports_job_errors_and_stays_usable(pool, tmp_path):
+    missing = tmp_path / "broken.fmu"
+    missing.write_bytes(b"not a zip archive")
+    _, future = pool.submit(str(missing))
+    with pytest.raises(Exception):
+        future.result(timeout=10)
+
+    _, retry = pool.submit(_write_fmu(tmp_path / "model.fmu"))
+    assert retry.result(timeout=10)["modelName"] == "Pooled"
+
+
+def test_submit_after_shutdown_is_rejected(tmp_path):
+    worker_pool = FmuWorkerPool(_describe_job, size=0)
+    worker_pool.shutdown()
+    with pytest.raises(FmuWorkerUnavailable):
+        worker_pool.submit(_write_fmu(tmp_path / "model.fmu"))
+
+
+def test_digest_source_replaces_the_pool_digest_cache(tmp_path):
+    fmu_path = _write_fmu(tmp_path / "model.fmu")
+    calls = []
+    worker_pool = FmuWorkerPool(_describe_job, size=0, digest=lambda path: calls.append(path) or "d" * 64)
+
+    assert worker_pool.fmu_digest(fmu_path) == "d" * 64
+    assert calls == [fmu_path]
@@ -0,0 +1,116 @@
+import asyncio
+import sqlite3
+import threading
+
+from history_store import HistoryStore
+
+
+_INSERT = "INSERT INTO items (id, value) VALUES (?, ?)"
+
+
+def _create_schema(path):
+    with sqlite3.connect(path) as connection:
+        connection.execute("CREATE TABLE items (id TEXT PRIMARY KEY, value TEXT)")
+
+
+def test_queued_writes_are_batched_and_visible_to_readers(tmp_path):
+    path = str(tmp_path / "history.db")
+    _create_schema(path)
+    store = HistoryStore(path, checkpoint_interval_seconds=0)
+    release = threading.Event()
+    try:
+        # Hold the writer on a slow row so the following writes queue up behind it.
+        store.submit(_INSERT, lambda: (release.wait(5), ("slow", "0"))[1])
+        for index in range(20):
+            assert store.submit(_INSERT, (f"id-{index}", str(index)), keys=("items",))
+        release.set()
+
+        rows = asyncio.run(store.fetchall("SELECT id FROM items ORDER BY id", after="items"))
+        metrics = store.metrics()
+    finally:
+        store.close()
+
+    assert len(rows) == 21
+    assert metrics["written"] == 21
+    assert metrics["batches"] <= 2
+    assert metrics["queued"] == 0
+    with sqlite3.connect(path) as connection:
+        assert connection.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+
+def test_reads_wait_only_for_the_writes_carrying_their_key(tmp_path):
+    path = str(tmp_path / "history.db")
+    _create_schema(path)
+    store = HistoryStore(path, checkpoint_interval_seconds=0)
+    release = threading.Event()
+    try:
+        store.submit(_INSERT, lambda: (release.wait(5), ("slow", "0"))[1], keys=("slow",))
+        store.submit(_INSERT, ("mine", "1"), keys=("mine",))
+
+        # Nothing queued carries this key, so the read does not wait for the writer.
+        assert asyncio.run(store.fetchone("SELECT value FROM items WHERE id = ?", ("other",), after="other")) is None
+        assert store.pending() == 2
+
+        release.set()
+        row = asyncio.run(store.fetchone("SELECT value FROM items WHERE id = ?", ("mine",), after="mine"))
+    finally:
+        release.set()
+        store.close()
+
+    assert row == {"value": "1"}
+
+
+def test_failed_row_does_not_discard_the_rest_of_its_batch(tmp_path):
+    path = str(tmp_path / "history.db")
+    _create_schema(path)
+    store = HistoryStore(path, checkpoint_interval_seconds=0)
+    try:
+        store.submit(_INSERT, ("dup", "1"))
+        store.submit(_INSERT, ("dup", "2"))
+        store.submit(_INSERT, lambda: 1 / 0)
+        store.submit(_INSERT, ("ok", "3"))
+        assert store.flush()
+
+        row = asyncio.run(store.fetchone("SELECT value FROM items WHERE id = ?", ("ok",)))
+        metrics = store.metrics()
+    finally:
+        store.close()
+
+    assert row == {"value": "3"}
+    assert metrics["written"] == 2
+    assert metrics["failed"] == 2
+
+
+def test_close_commits_pending_writes_and_truncates_the_wal(tmp_path):
+    path = tmp_path / "history.db"
+    _create_schema(str(path))
+    store = HistoryStore(str(path), checkpoint_interval_seconds=0)
+    for index in range(50):
+        store.submit(_INSERT, (str(index), "x" * 1024))
+
+    store.close()
+
+    assert not store.submit(_INSERT, ("late", "x"))
+    assert store.metrics()["checkpoints"] == 1
+    wal = path.with_name(path.name + "-wal")
+    assert not wal.exists() or wal.stat().st_size == 0
+    with sqlite3.connect(path) as connection:
+        assert connection.execute("SELECT count(*) FROM items").fetchone()[0] == 50
+
+
+def test_full_queue_drops_instead_of_blocking(tmp_path):
+    path = str(tmp_path / "history.db")
+    _create_schema(path)
+    store = HistoryStore(path, queue_size=1, checkpoint_interval_seconds=0)
+    release = threading.Event()
+    try:
+        store.submit(_INSERT, lambda: (release.wait(5), ("slow", "0"))[1])
+        accepted = [store.submit(_INSERT, (str(index), "x")) for index in range(5)]
+        release.set()
+        store.flush()
+        metrics = store.metrics()
+    finally:
+        store.close()
+
+    assert accepted.count(False) >= 3
+    assert metrics["dropped"] == accepted.count(False)
@@ -7,6 +7,7 @@ Mocks fmpy functions and JWT auth to test endpoints in isolation.
 
 import asyncio
 import json
+import os
 import time
 import zipfile
 import io
@@ -42,6 +43,10 @@ with patch("auth.verify_jwt", return_value={"sub": "test-user", "labId": 1, "acc
         FMU_WORKER_ADDRESS_SPACE_LIMIT,
     )
     from auth import verify_jwt as _original_verify_jwt
+    from admission_queue import AdmissionQueue
+    from auth_service_client import AuthServiceClient
+    from proxy_artifact import ProxyTemplateCache
+    import main
 
 
 # Override FastAPI dependency so all endpoints skip real JWT validation
@@ -128,6 +133,47 @@ def test_native_worker_is_killed_when_isolated_executor_is_forced_to_stop():
     assert shutdown_calls == [{"wait": False, "cancel_futures": True}]
 
 
+def test_submission_runs_off_the_event_loop_and_kills_jobs_of_cancelled_callers(monkeypatch):
+    import threading
+
+    release = threading.Event()
+    threads = []
+    killed = []
+
+    class FakeLease:
+        def kill(self):
+            killed.append(True)
+
+    def _submit(*args, on_chunk=None):
+        threads.append(threading.current_thread())
+        release.wait(5)
+        future = Future()
+        return FakeLease(), future
+
+    monkeypatch.setattr("main._submit_simulation", _submit)
+    monkeypatch.setattr("main.FmuWorkerLease", FakeLease)
+
+    async def _scenario():
+        release.set()
+        await main._submit_simulation_off_loop("model.fmu")
+        release.clear()
+        task = asyncio.ensure_future(main._submit_simulation_off_loop("model.fmu"))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        release.set()
+        for _ in range(100):
+            if killed:
+                break
+            await asyncio.sleep(0.01)
+
+    asyncio.run(_scenario())
+
+    assert threading.main_thread() not in threads
+    assert killed == [True]
+
+
 @pytest.fixture(autouse=True)
 def _stub_browser_session_observation(monkeypatch):
     observer = AsyncMock(return_value=True)
@@ -346,6 +392,41 @@ def test_confirm_fmu_session_started_uses_authenticated_gateway_and_hashed_ticke
     assert "gatewayId" not in call["json"]
 
 
+def test_session_calls_share_a_pooled_client_and_reuse_the_observer_token():
+    responses = [
+        _FakeHttpxResponse(json_data={"claims": {"reservationKey": "RES-1"}}),
+        _FakeHttpxResponse(status_code=401, json_data={"error": "replayed token"}),
+        _FakeHttpxResponse(json_data={"recorded": True}),
+    ]
+
+    class _PooledClient(_FakeAsyncClient):
+        async def post(self, url, *, headers=None, json=None):
+            self.calls.append({"url": url, "headers": headers, "json": json})
+            return responses.pop(0)
+
+    fake_client = _PooledClient(None)
+
+    async def _session():
+        claims = await _redeem_session_ticket(session_ticket="st_1", lab_id="42", reservation_key="RES-1")
+        return await _confirm_fmu_session_started(session_ticket="st_1", claims=claims, session_id="sess-1")
+
+    with patch("main.httpx.AsyncClient", return_value=fake_client) as client_factory, \
+         patch("main._auth_service_client", AuthServiceClient()), \
+         patch("main.ACCESS_AUDIT_URL", "https://full.example/access-audit/internal/session-observed"), \
+         patch("main.SESSION_OBSERVER_GATEWAY_ID", "gateway.example"), \
+         patch("main.SESSION_OBSERVER_SIGNING_SECRET", "YS0zMi1ieXRlLXNlc3Npb24tb2JzZXJ2ZXItc2VjcmV0ISE"):
+        assert asyncio.run(_session()) is True
+        metrics = main._auth_service_client.metrics()
+
+    assert client_factory.call_count == 1
+    redeem, refused, confirmed = (call["headers"]["Authorization"] for call in fake_client.calls)
+    # The redeem token is reused for the confirmation and re-minted once it is refused.
+    assert refused == redeem
+    assert confirmed != redeem
+    assert metrics["tokensMinted"] == 2
+    assert metrics["tokensReused"] == 1
+
+
 def test_redeem_session_ticket_preserves_json_error_payload():
     fake_response = _FakeHttpxResponse(
         status_code=400,
@@ -1209,6 +1290,118 @@ def test_run_returns_429_when_concurrency_exceeded(mock_resolve):
     assert "Concurrency limit" in response.json()["detail"]
 
 
+@patch("main.MAX_CONCURRENT_PER_MODEL", 1)
+@patch("main._resolve_fmu_path")
+@patch("main._executor")
+@patch("main.read_model_description", return_value=MockModelDescription())
+def test_run_waits_in_lab_queue_until_a_slot_is_released(mock_md, mock_exec, mock_resolve, monkeypatch):
+    import threading
+
+    mock_resolve.return_value = "/fake/path/spring.fmu"
+    mock_exec.submit.return_value = _make_future(_make_run_result())
+    queue = AdmissionQueue(max_depth=4, max_wait_seconds=5)
+    monkeypatch.setattr("main._admission_queue", queue)
+    main._active_counts["1"] = 1
+    releaser = threading.Timer(0.3, main._release_slot, args=("1",))
+    releaser.start()
+    try:
+        started = time.monotonic()
+        response = client.post("/api/v1/simulations/run", json={
+            "labId": "1", "parameters": {}, "options": {"startTime": 0, "stopTime": 1, "stepSize": 0.1},
+        })
+    finally:
+        releaser.join()
+
+    assert response.status_code == 200
+    assert time.monotonic() - started >= 0.25
+    assert main._active_counts["1"] == 0
+    metrics = queue.metrics()
+    assert (metrics["queued"], metrics["admitted"], metrics["waiting"]) == (1, 1, 0)
+    assert metrics["waitSecondsMax"] >= 0.25
+    assert client.get("/health").json()["admissionQueue"]["admitted"] == 1
+
+
+@patch("main.MAX_CONCURRENT_PER_MODEL", 1)
+@patch("main._resolve_fmu_path")
+def test_run_gives_up_after_max_queue_wait(mock_resolve, monkeypatch):
+    mock_resolve.return_value = "/fake/path/spring.fmu"
+    queue = AdmissionQueue(max_depth=4, max_wait_seconds=0.2)
+    monkeypatch.setattr("main._admission_queue", queue)
+    monkeypatch.setattr("main.FMU_ADMISSION_MAX_WAIT_SECONDS", 0.2)
+    main._active_counts["1"] = 1
+    try:
+        response = client.post("/api/v1/simulations/run", json={
+            "labId": "1", "parameters": {}, "options": {"startTime": 0, "stopTime": 1, "stepSize": 0.1},
+        })
+    finally:
+        main._active_counts["1"] = 0
+
+    assert response.status_code == 429
+    assert response.headers["retry-after"] == "1"
+    assert "within 0.2s" in response.json()["detail"]
+    assert (queue.metrics()["timedOut"], queue.metrics()["waiting"]) == (1, 0)
+
+
+def test_gateway_capacity_goes_to_the_waiting_lab_furthest_below_its_share(monkeypatch):
+    from simulation_scheduler import SimulationScheduler
+
+    monkeypatch.setattr("main._active_counts", defaultdict(int))
+    monkeypatch.setattr("main._scheduler", SimulationScheduler(3, weights={"b": 2}))
+    monkeypatch.setattr("main._admission_queue", AdmissionQueue(max_depth=8, max_wait_seconds=5))
+
+    async def scenario():
+        assert all(main._try_acquire_slot("a") for _ in range(3))
+        assert not main._try_acquire_slot("b")
+        first_a, first_b, second_b, second_a = (
+            main._enqueue_for_slot(lab_id, {}) for lab_id in ("a", "b", "b", "a")
+        )
+        granted = []
+        for _ in range(3):
+            main._release_slot("a")
+            await asyncio.sleep(0)
+            granted.extend(
+                name for name, ticket in
+                (("a1", first_a), ("b1", first_b), ("b2", second_b), ("a2", second_a))
+                if ticket.granted.done() and name not in granted
+            )
+        main._abandon_slot_wait(second_a)
+        return granted, dict(main._active_counts)
+
+    granted, running = asyncio.run(scenario())
+    # b (weight 2) is served twice before a gets its slot back.
+    assert granted == ["b1", "b2", "a1"]
+    assert running == {"a": 1, "b": 2}
+    scheduler = client.get("/health").json()["scheduler"]
+    assert scheduler["capacity"] == 3
+    assert scheduler["labs"]["b"] == {"running": 2, "waiting": 0, "weight": 2.0, "fairShare": 2.0}
+
+
+@patch("main._resolve_fmu_path", return_value="/fake/path/spring.fmu")
+def test_realtime_sessions_hold_lab_slots_but_not_gateway_capacity(mock_resolve, monkeypatch):
+    from simulation_scheduler import SimulationScheduler
+
+    monkeypatch.setattr("main._active_counts", defaultdict(int))
+    monkeypatch.setattr("main._realtime_counts", defaultdict(int))
+    monkeypatch.setattr("main._scheduler", SimulationScheduler(1))
+    monkeypatch.setattr("main._admission_queue", AdmissionQueue(max_depth=0, max_wait_seconds=0))
+
+    main._acquire_realtime_slot("a")
+    main._acquire_realtime_slot("b")
+    assert main._try_acquire_slot("a")
+
+    response = client.post("/api/v1/simulations/run", json={
+        "labId": "1",
+        "parameters": {},
+        "options": {"startTime": 0, "stopTime": 10, "stepSize": 0.1},
+    })
+    assert response.status_code == 429
+    assert "Gateway-wide simulation limit (1)" in response.json()["detail"]
+
+    main._release_realtime_slot("b")
+    assert main._active_counts["b"] == 0
+    assert client.get("/health").json()["scheduler"]["running"] == 1
+
+
 # ─── #18 — NDJSON Streaming ─────────────────────────────────────────
 
 @patch("main._resolve_fmu_path")
@@ -1242,6 +1435,349 @@ def test_stream_returns_ndjson_events(mock_md, mock_exec, mock_resolve):
     assert "simId" in started
 
 
+@patch("main.MAX_CONCURRENT_PER_MODEL", 1)
+@patch("main._resolve_fmu_path")
+@patch("main._executor")
+@patch("main.read_model_description", return_value=MockModelDescription())
+def test_stream_reports_queue_position_before_starting(mock_md, mock_exec, mock_resolve, monkeypatch):
+    import threading
+
+    mock_resolve.return_value = "/fake/path/spring.fmu"
+    mock_exec.submit.return_value = _make_future(_make_run_result())
+    monkeypatch.setattr("main._admission_queue", AdmissionQueue(max_depth=4, max_wait_seconds=5))
+    main._active_counts["1"] = 1
+    releaser = threading.Timer(0.2, main._release_slot, args=("1",))
+    releaser.start()
+    try:
+        response = client.post("/api/v1/simulations/stream", json={
+            "labId": "1", "parameters": {}, "options": {"startTime": 0, "stopTime": 1, "stepSize": 0.1},
+        })
+    finally:
+        releaser.join()
+
+    events = [json.loads(line) for line in response.text.strip().split("\n") if line.strip()]
+    assert [event["type"] for event in events[:2]] == ["queued", "started"]
+    assert events[0]["position"] == 1
+    assert events[0]["simId"] == events[1]["simId"]
+    assert events[-1]["type"] == "completed"
+    assert main._active_counts["1"] == 0
+
+
+def test_stream_delivers_worker_rows_in_fixed_size_chunks(tmp_path, monkeypatch):
+    from pathlib import Path
+    import main
+    from fmu_worker_pool import FmuWorkerPool
+
+    fmu_path = Path(__file__).resolve().parents[2] / "fmu-data" / "BouncingBall.fmu"
+    monkeypatch.setattr("main.HISTORY_DB_PATH", str(tmp_path / "history.db"))
+    asyncio.run(_init_db())
+    pool = FmuWorkerPool(main._run_pooled_simulation, size=0)
+    monkeypatch.setattr("main._executor", pool)
+    monkeypatch.setattr("main._resolve_fmu_path", lambda _name: fmu_path)
+    try:
+        response = client.post("/api/v1/simulations/stream", json={
+            "labId": 1,
+            "parameters": {},
+            "options": {
+                "startTime": 0, "stopTime": 1, "stepSize": 0.01,
+                "fmiType": "CoSimulation", "chunkSize": 25,
+            },
+        })
+    finally:
+        pool.shutdown(wait=True)
+
+    events = [json.loads(line) for line in response.text.strip().split("\n") if line.strip()]
+    data = [event for event in events if event["type"] == "data"]
+    completed = events[-1]
+    assert completed["type"] == "completed"
+    assert completed["totalChunks"] == len(data) > 1
+    # 101 grid rows in chunks of 25.
+    assert {event["totalChunks"] for event in data} == {5}
+    assert all(len(event["time"]) <= 25 for event in data)
+    assert [event["chunkIndex"] for event in data] == list(range(len(data)))
+    streamed_time = [value for event in data for value in event["time"]]
+    assert streamed_time == sorted(streamed_time)
+
+    stored = client.get(f"/api/v1/simulations/{completed['simId']}/result").json()
+    assert stored["result"]["time"] == streamed_time
+    assert len(stored["result"]["outputs"]["h"]) == len(streamed_time)
+
+
+def test_sweep_runs_cases_on_warm_workers_and_records_one_history_entry(tmp_path, monkeypatch):
+    from pathlib import Path
+    import main
+    from fmu_worker_pool import FmuWorkerPool
+
+    fmu_path = Path(__file__).resolve().parents[2] / "fmu-data" / "BouncingBall.fmu"
+    monkeypatch.setattr("main.HISTORY_DB_PATH", str(tmp_path / "history.db"))
+    asyncio.run(_init_db())
+    pool = FmuWorkerPool(main._run_pooled_simulation, size=1)
+    monkeypatch.setattr("main._executor", pool)
+    monkeypatch.setattr("main._resolve_fmu_path", lambda _name: fmu_path)
+    try:
+        response = client.post("/api/v1/simulations/sweep", json={
+            "labId": 1,
+            "parameters": {"g": -9.81},
+            "grid": {"e": [0.5, 0.7, 0.9]},
+            "options": {
+                "startTime": 0, "stopTime": 1, "stepSize": 0.01,
+                "fmiType": "CoSimulation", "maxParallel": 1, "variables": ["h"],
+            },
+        })
+        metrics = pool.metrics()
+    finally:
+        pool.shutdown(wait=True)
+
+    assert response.status_code == 200
+    assert "application/x-ndjson" in response.headers.get("content-type", "")
+    events = [json.loads(line) for line in response.text.strip().split("\n") if line.strip()]
+    started, cases, completed = events[0], events[1:-1], events[-1]
+    assert started == {"type": "started", "sweepId": started["sweepId"], "cases": 3, "parallel": 1}
+    assert sorted(case["index"] for case in cases) == [0, 1, 2]
+    assert all(case["status"] == "completed" and list(case["outputs"]) == ["h"] for case in cases)
+    assert [case["parameters"] for case in sorted(cases, key=lambda case: case["index"])] == [
+        {"e": 0.5}, {"e": 0.7}, {"e": 0.9},
+    ]
+    assert (completed["type"], completed["status"], completed["completedCases"]) == ("completed", "completed", 3)
+    # Extracted once, then reused by every later case on the same worker.
+    assert metrics["misses"] == 1 and metrics["hits"] >= 2
+    # Each case finds the previous case's worker idle again.
+    assert metrics["spawned"] == 1
+    assert main._active_counts["1"] == 0
+
+    sweep_id = started["sweepId"]
+    history = client.get("/api/v1/simulations/history").json()
+    assert [entry["id"] for entry in history["simulations"]] == [sweep_id]
+    stored = client.get(f"/api/v1/simulations/{sweep_id}/result").json()
+    assert stored["status"] == "completed"
+    assert stored["parameters"] == {"g": -9.81}
+    assert [case["parameters"] for case in stored["result"]["cases"]] == [{"e": 0.5}, {"e": 0.7}, {"e": 0.9}]
+    case = client.get(f"/api/v1/simulations/{sweep_id}/cases/2/result").json()
+    assert case["parameters"] == {"e": 0.9}
+    assert case["result"]["time"] == next(event for event in cases if event["index"] == 2)["time"]
+    assert client.get(f"/api/v1/simulations/{sweep_id}/cases/3/result").status_code == 404
+
+
+@patch("main.MAX_CONCURRENT_PER_MODEL", 1)
+@patch("main._resolve_fmu_path")
+@patch("main.read_model_description", return_value=MockModelDescription())
+def test_sweep_keeps_its_slot_until_a_case_cancelled_during_submission_is_killed(
+    mock_md, mock_resolve, tmp_path, monkeypatch,
+):
+    import threading
+    from result_cache import ResultCache
+
+    monkeypatch.setattr("main._result_cache", ResultCache(tmp_path / "cache", max_bytes=1024 * 1024, max_age_seconds=60))
+    monkeypatch.setattr("main._fmu_content_digest", lambda _path: "ab" * 32)
+    monkeypatch.setattr("main.HISTORY_DB_PATH", str(tmp_path / "history.db"))
+    mock_resolve.return_value = "/fake/path/spring.fmu"
+    submitting = threading.Event()
+    job = object()
+    killed = []
+
+    def _slow_submit(*_args, on_chunk=None):
+        submitting.set()
+        time.sleep(0.3)
+        return job, Future()
+
+    def _shutdown(executor, *, force=False):
+        if force:
+            killed.append(executor)
+
+    monkeypatch.setattr("main._submit_simulation", _slow_submit)
+    monkeypatch.setattr("main._shutdown_simulation_executor", _shutdown)
+    request = MagicMock()
+    claims = {"sub": "test-user", "labId": "1", "accessKey": "test.fmu", "resourceType": "fmu",
+              "reservationKey": "0xreservation", "pucHash": "puc-test-user"}
+    req = main.SweepRequest(labId="1", parameters={}, cases=[{"k": 1}],
+                            options={"startTime": 0, "stopTime": 1, "stepSize": 0.1})
+
+    async def _scenario():
+        await _init_db()
+        response = await main.sweep_simulation(req, request, claims)
+        body = response.body_iterator
+        assert json.loads(await body.__anext__())["type"] == "started"
+        pulling = asyncio.ensure_future(body.__anext__())
+        await asyncio.to_thread(submitting.wait, 1)
+        # The client disconnects while the case is still being submitted.
+        pulling.cancel()
+        await asyncio.sleep(0.1)
+        during = (main._active_counts["1"], list(killed))
+        with pytest.raises(asyncio.CancelledError):
+            await pulling
+        await body.aclose()
+        return during
+
+    active_during, killed_during = asyncio.run(_scenario())
+
+    assert (active_during, killed_during) == (1, [])
+    assert killed == [job]
+    assert main._active_counts["1"] == 0
+
+
+@patch("main.MAX_CONCURRENT_PER_MODEL", 2)
+@patch("main._resolve_fmu_path")
+@patch("main._executor")
+@patch("main.read_model_description", return_value=MockModelDescription())
+def test_sweep_stays_within_lab_slots_and_reports_failed_cases(mock_md, mock_exec, mock_resolve, tmp_path, monkeypatch):
+    import threading
+    import main
+    from concurrent.futures import Future
+
+    mock_resolve.return_value = "/fake/path/spring.fmu"
+    monkeypatch.setattr("main.HISTORY_DB_PATH", str(tmp_path / "hist.db"))
+    asyncio.run(_init_db())
+    lock = threading.Lock()
+    peak = {"active": 0, "max": 0}
+
+    def _submit(_target, *args):
+        parameters = args[4]
+        future = Future()
+        with lock:
+            peak["active"] += 1
+            peak["max"] = max(peak["max"], peak["active"], main._active_counts["1"])
+
+        def _finish():
+            with lock:
+                peak["active"] -= 1
+            if parameters["k"] < 0:
+                future.set_exception(RuntimeError("diverged"))
+            else:
+                future.set_result(_make_run_result())
+
+        threading.Timer(0.02, _finish).start()
+        return future
+
+    mock_exec.submit.side_effect = _submit
+    response = client.post("/api/v1/simulations/sweep", json={
+        "labId": "1",
+        "cases": [{"k": -1}],
+        "grid": {"k": [1, 2, 3], "c": [0.1, 0.2]},
+        "options": {"startTime": 0, "stopTime": 1, "stepSize": 0.1},
+    })
+
+    events = [json.loads(line) for line in response.text.strip().split("\n") if line.strip()]
+    assert events[0]["parallel"] == 2
+    cases = {event["index"]: event for event in events if event["type"] == "case"}
+    assert len(cases) == 7
+    assert cases[0]["status"] == "failed" and cases[0]["detail"] == "Simulation failed"
+    assert cases[1]["parameters"] == {"k": 1, "c": 0.1}
+    assert events[-1]["status"] == "partial"
+    assert (events[-1]["completedCases"], events[-1]["failedCases"]) == (6, 1)
+    assert peak["max"] <= 2
+    assert main._active_counts["1"] == 0
+
+    too_many = client.post("/api/v1/simulations/sweep", json={
+        "labId": "1", "grid": {"k": list(range(40)), "c": list(range(40))},
+        "options": {"startTime": 0, "stopTime": 1, "stepSize": 0.1},
+    })
+    assert too_many.status_code == 400
+    assert client.post("/api/v1/simulations/sweep", json={"labId": "1", "options": {}}).status_code == 400
+
+    main._active_counts["1"] = 2
+    monkeypatch.setattr("main._admission_queue", AdmissionQueue(max_depth=0))
+    try:
+        busy = client.post("/api/v1/simulations/sweep", json={
+            "labId": "1", "cases": [{"k": 1}], "options": {"startTime": 0, "stopTime": 1, "stepSize": 0.1},
+        })
+    finally:
+        main._active_counts["1"] = 0
+    error = json.loads(busy.text)
+    assert (error["type"], error["status"]) == ("error", 429)
+    assert "Concurrency limit" in error["detail"]
+
+
+@patch("main._resolve_fmu_path", return_value="/fake/path/spring.fmu")
+@patch("main._executor")
+@patch("main.read_model_description", return_value=MockModelDescription())
+def test_sweep_left_mid_stream_keeps_its_history_row_and_case_results(
+    mock_md, mock_exec, mock_resolve, tmp_path, monkeypatch,
+):
+    import main
+    from concurrent.futures import Future
+
+    monkeypatch.setattr("main.HISTORY_DB_PATH", str(tmp_path / "hist.db"))
+    asyncio.run(_init_db())
+
+    def _submit(_target, *args):
+        future = Future()
+        if args[4]["k"] == 1:
+            future.set_result(_make_run_result())
+        return future  # other cases never finish
+
+    mock_exec.submit.side_effect = _submit
+    req = main.SweepRequest(
+        labId="1", grid={"k": [1, 2]}, options={"startTime": 0, "stopTime": 1, "stepSize": 0.1, "maxParallel": 1},
+    )
+    request = Request({"type": "http", "method": "POST", "path": "/", "headers": [], "query_string": b""})
+
+    async def _scenario():
+        response = await main.sweep_simulation(req, request, claims=await _fake_jwt(labId="1")())
+        body = response.body_iterator
+        lines = [json.loads(await body.__anext__()) for _ in range(2)]
+        await body.aclose()
+        return lines
+
+    started, case = asyncio.run(_scenario())
+    assert (started["type"], case["index"], case["status"]) == ("started", 0, "completed")
+
+    sweep_id = started["sweepId"]
+    stored = client.get(f"/api/v1/simulations/{sweep_id}/result").json()
+    assert stored["status"] == "cancelled"
+    assert stored["result"]["cases"][0]["status"] == "completed"
+    assert client.get(f"/api/v1/simulations/{sweep_id}/cases/0/result").status_code == 200
+    assert main._active_counts["1"] == 0
+
+
+@patch("main._resolve_fmu_path", return_value="/fake/path/spring.fmu")
+@patch("main.read_model_description", return_value=MockModelDescription())
+def test_sweep_releases_its_slots_when_the_client_leaves_during_observation(mock_md, mock_resolve, monkeypatch):
+    import main
+
+    observing = asyncio.Event()
+
+    async def _observe_forever(*_args):
+        observing.set()
+        await asyncio.Event().wait()
+
+    monkeypatch.setattr("main._record_browser_session_started", _observe_forever)
+    monkeypatch.setattr("main.MAX_CONCURRENT_PER_MODEL", 2)
+    request = Request({"type": "http", "method": "POST", "path": "/", "headers": [], "query_string": b""})
+    req = main.SweepRequest(
+        labId="1", grid={"k": [1, 2, 3]}, options={"startTime": 0, "stopTime": 1, "stepSize": 0.1},
+    )
+
+    async def _scenario():
+        response = await main.sweep_simulation(req, request, claims=await _fake_jwt(labId="1")())
+        body = response.body_iterator
+        reader = asyncio.ensure_future(body.__anext__())
+        await observing.wait()
+        assert main._active_counts["1"] == 2
+        reader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await reader
+
+    asyncio.run(_scenario())
+
+    assert main._active_counts["1"] == 0
+
+
+@patch("main._resolve_fmu_path")
+@patch("main._executor")
+@patch("main.read_model_description")
+def test_stream_rejects_invalid_chunk_size(mock_md, mock_exec, mock_resolve):
+    mock_resolve.return_value = "/fake/path/spring.fmu"
+
+    response = client.post("/api/v1/simulations/stream", json={
+        "labId": 1,
+        "parameters": {},
+        "options": {"startTime": 0, "stopTime": 1, "stepSize": 0.1, "chunkSize": 0},
+    })
+
+    assert response.status_code == 400
+    assert not mock_exec.submit.called
+
+
 @patch("main._resolve_fmu_path")
 @patch("main.read_model_description")
 @patch("main._executor")
@@ -1663,6 +2199,98 @@ def test_proxy_download_rate_limited(mock_resolve, mock_issue_ticket, mock_read_
     finally:
         app.dependency_overrides[_original_verify_jwt] = _fake_jwt()
 
+
+@patch("main.read_model_description", return_value=MockModelDescription())
+@patch("main._issue_session_ticket", new_callable=AsyncMock)
+@patch("main._resolve_fmu_path")
+def test_proxy_download_reuses_template_until_runtime_changes(mock_resolve, mock_issue_ticket, mock_read_md, tmp_path, monkeypatch):
+    mock_resolve.return_value = tmp_path / "test.fmu"
+    mock_issue_ticket.side_effect = [
+        ("st_ticket_1", 4102444800),
+        ("st_ticket_2", 4102444800),
+        ("st_ticket_3", 4102444800),
+    ]
+
+    runtime_root = tmp_path / "runtime"
+    runtime_bin = runtime_root / "binaries" / "linux64"
+    runtime_bin.mkdir(parents=True, exist_ok=True)
+    runtime_binary = runtime_bin / "decentralabs_proxy.so"
+    runtime_binary.write_bytes(b"binary")
+    monkeypatch.setattr("main.FMU_PROXY_RUNTIME_PATH", str(runtime_root))
+    monkeypatch.setattr("main._proxy_template_cache", ProxyTemplateCache(max_entries=4))
+
+    app.dependency_overrides[_original_verify_jwt] = _fake_jwt(
+        accessKey="test.fmu",
+        resourceType="fmu",
+        labId="1",
+        reservationKey="0xabc",
+        aud="https://gateway.example/auth",
+    )
+    try:
+        responses = [
+            client.get(
+                "/api/v1/fmu/proxy/1?reservationKey=0xabc",
+                headers={"Authorization": "Bearer booking-token"},
+            )
+            for _ in range(2)
+        ]
+        # Deployed like a release: written aside, then renamed over the old binary.
+        staged = runtime_bin / ".decentralabs_proxy.so.new"
+        staged.write_bytes(b"rebuilt-binary")
+        os.replace(staged, runtime_binary)
+        responses.append(client.get(
+            "/api/v1/fmu/proxy/1?reservationKey=0xabc",
+            headers={"Authorization": "Bearer booking-token"},
+        ))
+
+        metrics = main._proxy_template_cache.metrics()
+        assert metrics["misses"] == 2
+        assert metrics["hits"] == 1
+        tickets = []
+        for response in responses:
+            assert response.status_code == 200
+            assert response.headers["content-length"] == str(len(response.content))
+            assert response.headers["x-proxy-artifact-sha256"] == hashlib.sha256(response.content).hexdigest()
+            archive = zipfile.ZipFile(io.BytesIO(response.content))
+            tickets.append(json.loads(archive.read("resources/config.json"))["sessionTicket"])
+        assert tickets == ["st_ticket_1", "st_ticket_2", "st_ticket_3"]
+        archive = zipfile.ZipFile(io.BytesIO(responses[-1].content))
+        assert archive.read("binaries/linux64/decentralabs_proxy.so") == b"rebuilt-binary"
+    finally:
+        app.dependency_overrides[_original_verify_jwt] = _fake_jwt()
+
+
+def test_proxy_templates_are_built_once_off_the_event_loop(tmp_path, monkeypatch):
+    import threading
+
+    runtime_bin = tmp_path / "runtime" / "binaries" / "linux64"
+    runtime_bin.mkdir(parents=True)
+    (runtime_bin / "decentralabs_proxy.so").write_bytes(b"binary")
+    monkeypatch.setattr("main.FMU_PROXY_RUNTIME_PATH", str(tmp_path / "runtime"))
+    monkeypatch.setattr("main._proxy_template_cache", ProxyTemplateCache(max_entries=4))
+    built_on = []
+    real_template = main.ProxyArtifactTemplate
+
+    def _counting_template(members):
+        built_on.append(threading.current_thread())
+        return real_template(members)
+
+    monkeypatch.setattr("main.ProxyArtifactTemplate", _counting_template)
+    metadata = {"fmiVersion": "2.0", "modelName": "Spring", "modelVariables": []}
+
+    async def _scenario():
+        return await asyncio.gather(*(
+            main._proxy_artifact_template(metadata, "2.0.3", "decentralabs_proxy") for _ in range(3)
+        ))
+
+    templates = asyncio.run(_scenario())
+    again = asyncio.run(_scenario())
+
+    assert len(built_on) == 1 and built_on[0] is not threading.main_thread()
+    assert all(template is templates[0] for template in [*templates, *again])
+    assert main._proxy_runtime_index().metrics()["scans"] == 1
+
+
 def test_history_empty_initially(tmp_path, monkeypatch):
     monkeypatch.setattr("main.HISTORY_DB_PATH", str(tmp_path / "test.db"))
     # Ensure schema exists
@@ -1721,6 +2349,199 @@ def test_run_persists_to_history(mock_md, mock_exec, mock_resolve, tmp_path, mon
         app.dependency_overrides[_original_verify_jwt] = _fake_jwt()
 
 
+def test_history_migrates_legacy_rows_and_pages_by_cursor(tmp_path, monkeypatch):
+    import sqlite3
+
+    db_path = str(tmp_path / "legacy.db")
+    with sqlite3.connect(db_path) as connection:
+        connection.execute(
+            "CREATE TABLE simulation_history (id TEXT PRIMARY KEY, lab_id TEXT NOT NULL, user_sub TEXT, "
+            "reservation_key TEXT, puc_hash TEXT, fmu_filename TEXT, fmi_type TEXT, parameters TEXT, "
+            "options TEXT, result TEXT, elapsed_seconds REAL, status TEXT DEFAULT 'completed', created_at TEXT)"
+        )
+        connection.executemany(
+            "INSERT INTO simulation_history (id, lab_id, reservation_key, puc_hash, result, created_at) "
+            "VALUES (?, '1', ?, ?, '{}', ?)",
+            [
+                (f"sim_{index:02d}", " 0xRESERVATION", "PUC-TEST-USER", f"2026-01-01 00:00:{index // 2:02d}")
+                for index in range(7)
+            ] + [("sim_other", "0xother", "puc-test-user", "2026-01-01 00:01:00")],
+        )
+    monkeypatch.setattr("main.HISTORY_DB_PATH", db_path)
+    asyncio.run(_init_db())
+
+    pages = []
+    cursor = None
+    while True:
+        response = client.get("/api/v1/simulations/history", params={"limit": 3, **({"cursor": cursor} if cursor else {})})
+        assert response.status_code == 200
+        body = response.json()
+        pages.append([row["id"] for row in body["simulations"]])
+        cursor = body["nextCursor"]
+        if cursor is None:
+            break
+
+    assert pages == [["sim_06", "sim_05", "sim_04"], ["sim_03", "sim_02", "sim_01"], ["sim_00"]]
+    result = client.get("/api/v1/simulations/sim_03/result").json()
+    assert "reservation_key_norm" not in result
+    assert client.get("/api/v1/simulations/history?cursor=not-a-cursor").status_code == 400
+    assert client.get(f"/api/v1/simulations/history?offset=3&cursor={cursor or 'x'}").status_code == 400
+    with sqlite3.connect(db_path) as connection:
+        plan = connection.execute(
+            "EXPLAIN QUERY PLAN SELECT id, created_at, status FROM simulation_history "
+            "WHERE lab_id = '1' AND reservation_key_norm = 'a' AND puc_hash_norm = 'b' "
+            "ORDER BY created_at DESC, id DESC"
+        ).fetchall()
+    assert "COVERING INDEX idx_history_binding" in plan[0][-1]
+
+
+@patch("main._resolve_fmu_path")
+@patch("main._executor")
+@patch("main.read_model_description", return_value=MockModelDescription())
+def test_history_result_is_stored_as_blob_and_served_with_ranges(mock_md, mock_exec, mock_resolve, tmp_path, monkeypatch):
+    import gzip
+    import sqlite3
+
+    mock_resolve.return_value = "/fake/path/spring.fmu"
+    mock_exec.submit.return_value = _make_future(_make_run_result())
+    db_path = str(tmp_path / "hist.db")
+    monkeypatch.setattr("main.HISTORY_DB_PATH", db_path)
+    asyncio.run(_init_db())
+
+    sim_id = client.post("/api/v1/simulations/run", json={
+        "labId": "1",
+        "parameters": {},
+        "options": {"startTime": 0, "stopTime": 1, "stepSize": 0.1},
+    }).json()["simId"]
+
+    stored = client.get(f"/api/v1/simulations/{sim_id}/result").json()
+    assert stored["result"]["outputs"] == _make_run_result()["outputs"]
+    assert stored["result_summary"]["outputs"]["position"] == {"min": 0.0, "max": 0.35, "mean": 0.5 / 3, "final": 0.35}
+    with sqlite3.connect(db_path) as connection:
+        inline, digest = connection.execute(
+            "SELECT result, result_sha256 FROM simulation_history WHERE id = ?", (sim_id,)
+        ).fetchone()
+    assert inline is None
+    assert (tmp_path / "results" / digest[:2] / f"{digest}.json.gz").is_file()
+
+    full = client.get(f"/api/v1/simulations/{sim_id}/result", headers={"Accept": "application/gzip"})
+    assert full.status_code == 200
+    assert full.headers["etag"] == f'"{digest}"'
+    assert json.loads(gzip.decompress(full.content))["time"] == [0.0, 0.1, 0.2]
+
+    size = len(full.content)
+    tail = client.get(
+        f"/api/v1/simulations/{sim_id}/result",
+        headers={"Accept": "application/gzip", "Range": "bytes=10-"},
+    )
+    assert tail.status_code == 206
+    assert tail.headers["content-range"] == f"bytes 10-{size - 1}/{size}"
+    assert tail.content == full.content[10:]
+    unsatisfiable = client.get(
+        f"/api/v1/simulations/{sim_id}/result",
+        headers={"Accept": "application/gzip", "Range": f"bytes={size}-"},
+    )
+    assert unsatisfiable.status_code == 416
+    assert unsatisfiable.headers["content-range"] == f"bytes */{size}"
+    projected_gzip = client.get(
+        f"/api/v1/simulations/{sim_id}/result?maxPoints=10",
+        headers={"Accept": "application/gzip"},
+    )
+    assert projected_gzip.status_code == 400
+
+    main._result_blob_store().max_age_seconds = 1e-9
+    assert client.get(f"/api/v1/simulations/{sim_id}/result").status_code == 410
+
+
+@patch("main._resolve_fmu_path")
+@patch("main._executor")
+@patch("main.read_model_description", return_value=MockModelDescription())
+def test_history_result_above_the_blob_cap_keeps_only_its_summary(mock_md, mock_exec, mock_resolve, tmp_path, monkeypatch):
+    import sqlite3
+
+    mock_resolve.return_value = "/fake/path/spring.fmu"
+    mock_exec.submit.return_value = _make_future(_make_run_result())
+    db_path = str(tmp_path / "hist.db")
+    monkeypatch.setattr("main.HISTORY_DB_PATH", db_path)
+    monkeypatch.setattr("main.FMU_RESULT_BLOB_MAX_BYTES", 1)
+    asyncio.run(_init_db())
+
+    sim_id = client.post("/api/v1/simulations/run", json={
+        "labId": "1",
+        "parameters": {},
+        "options": {"startTime": 0, "stopTime": 1, "stepSize": 0.1},
+    }).json()["simId"]
+
+    assert client.get(f"/api/v1/simulations/{sim_id}/result").status_code == 410
+    with sqlite3.connect(db_path) as connection:
+        inline, digest, size, summary = connection.execute(
+            "SELECT result, result_sha256, result_size, result_summary FROM simulation_history WHERE id = ?",
+            (sim_id,),
+        ).fetchone()
+    assert inline is None
+    assert digest and size > 0
+    assert json.loads(summary)["outputs"]["position"]["final"] == 0.35
+    assert not list((tmp_path / "results").rglob("*.json.gz"))
+
+
+@patch("main._resolve_fmu_path")
+@patch("main._executor")
+@patch("main.read_model_description", return_value=MockModelDescription())
+def test_run_and_result_apply_variable_window_and_downsampling(mock_md, mock_exec, mock_resolve, tmp_path, monkeypatch):
+    rows = 2001
+    series = {
+        "time": [index * 0.01 for index in range(rows)],
+        "outputs": {
+            "position": [float((index * 37) % 101) for index in range(rows)],
+            "velocity": [0.0] * rows,
+        },
+        "outputVariables": ["position", "velocity"],
+    }
+    mock_resolve.return_value = "/fake/path/spring.fmu"
+    mock_exec.submit.return_value = _make_future(series)
+    monkeypatch.setattr("main.HISTORY_DB_PATH", str(tmp_path / "hist.db"))
+    asyncio.run(_init_db())
+
+    resp = client.post("/api/v1/simulations/run", json={
+        "labId": "1",
+        "parameters": {},
+        "options": {"stopTime": 20, "stepSize": 0.01, "variables": ["position"], "maxPoints": 100},
+    })
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["outputVariables"] == ["position"]
+    assert list(data["outputs"]) == ["position"]
+    assert data["projection"]["sourceRows"] == rows
+    assert data["projection"]["rows"] <= 100
+    assert max(data["outputs"]["position"]) == 100.0
+    assert min(data["outputs"]["position"]) == 0.0
+
+    sim_id = data["simId"]
+    full = client.get(f"/api/v1/simulations/{sim_id}/result").json()
+    assert len(full["result"]["time"]) == rows
+    assert "projection" not in full["result"]
+
+    windowed = client.get(
+        f"/api/v1/simulations/{sim_id}/result",
+        params={"variables": "velocity", "windowStart": 5, "windowEnd": 6},
+    ).json()
+    assert windowed["id"] == sim_id
+    assert list(windowed["result"]["outputs"]) == ["velocity"]
+    assert windowed["result"]["time"][0] == pytest.approx(5.0)
+    assert windowed["result"]["projection"]["rows"] == 101
+
+    lttb = client.get(f"/api/v1/simulations/{sim_id}/result", params={"maxPoints": 50, "downsample": "lttb"}).json()
+    assert lttb["result"]["projection"]["downsample"] == "lttb"
+    assert len(lttb["result"]["time"]) <= 50
+
+    assert client.get(f"/api/v1/simulations/{sim_id}/result", params={"variables": "missing"}).status_code == 400
+    assert client.get(f"/api/v1/simulations/{sim_id}/result", params={"maxPoints": 2}).status_code == 400
+    bad = client.post("/api/v1/simulations/run", json={
+        "labId": "1", "parameters": {}, "options": {"maxPoints": 10, "downsample": "mean"},
+    })
+    assert bad.status_code == 400
+
+
 # ─── #31 — Model Exchange ───────────────────────────────────────────
 
 class MockModelExchangeDescription:
@@ -1784,7 +2605,7 @@ def test_run_model_exchange_auto_detect(mock_md, mock_exec, mock_resolve):
     assert data["fmiType"] == "ModelExchange"
     # Verify _run_simulation was called with ModelExchange fmi_type
     call_args = mock_exec.submit.call_args
-    # positional args: _run_simulation, fmu_path, start, stop, step, params, timeout, fmi_type, solver
+    # positional args: _run_simulation, fmu_path, start, stop, step, params, timeout, fmi_type, solver, result format
     assert call_args[0][7] == "ModelExchange"
 
 
@@ -1808,7 +2629,152 @@ def test_run_explicit_fmi_type_and_solver(mock_md, mock_exec, mock_resolve):
     assert response.json()["fmiType"] == "ModelExchange"
 
 
+@patch("main._resolve_fmu_path")
+@patch("main._executor")
+@patch("main.read_model_description", return_value=MockModelExchangeDescription())
+def test_run_returns_npz_columns_when_requested(mock_md, mock_exec, mock_resolve, tmp_path, monkeypatch):
+    import numpy as np
+    from columnar_result import export_columns
+
+    monkeypatch.setattr("main.HISTORY_DB_PATH", str(tmp_path / "history.db"))
+    asyncio.run(_init_db())
+    mock_resolve.return_value = "/fake/path/pendulum.fmu"
+    structured = np.zeros(3, dtype=[("time", "<f8"), ("theta", "<f8")])
+    structured["time"] = [0.0, 0.5, 1.0]
+    structured["theta"] = [0.5, 0.4, 0.1]
+    mock_exec.submit.return_value = _make_future({"columnar": export_columns(structured)})
+
+    response = client.post(
+        "/api/v1/simulations/run",
+        headers={"Accept": "application/x-npz"},
+        json={"labId": "1", "parameters": {}, "options": {"startTime": 0, "stopTime": 1, "stepSize": 0.5}},
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-npz"
+    assert mock_exec.submit.call_args[0][9] == "npz"
+    archive = np.load(io.BytesIO(response.content))
+    assert archive.files == ["time", "theta"]
+    assert archive["theta"].tolist() == [0.5, 0.4, 0.1]
+
+    sim_id = response.headers["X-Simulation-Id"]
+    stored = client.get(f"/api/v1/simulations/{sim_id}/result").json()
+    assert stored["result"]["outputs"] == {"theta": [0.5, 0.4, 0.1]}
+    assert stored["result_summary"]["outputs"]["theta"]["final"] == 0.1
+
+
+@patch("main._resolve_fmu_path")
+@patch("main._executor")
+@patch("main.read_model_description", return_value=MockModelExchangeDescription())
+def test_run_keeps_json_as_default_result_format(mock_md, mock_exec, mock_resolve):
+    mock_resolve.return_value = "/fake/path/pendulum.fmu"
+    mock_exec.submit.return_value = _make_future(_make_run_result("ModelExchange"))
+
+    response = client.post(
+        "/api/v1/simulations/run",
+        headers={"Accept": "*/*"},
+        json={"labId": "1", "parameters": {}, "options": {"startTime": 0, "stopTime": 1, "stepSize": 0.01}},
+    )
+
+    assert response.status_code == 200
+    assert mock_exec.submit.call_args[0][9] == "json"
+    assert response.json()["outputs"]["position"] == [0.0, 0.15, 0.35]
+
+
+@patch("main._resolve_fmu_path")
+@patch("main._executor")
+@patch("main.read_model_description", return_value=MockModelExchangeDescription())
+def test_run_serves_identical_requests_from_result_cache(mock_md, mock_exec, mock_resolve, tmp_path, monkeypatch):
+    from result_cache import ResultCache
+
+    monkeypatch.setattr("main._result_cache", ResultCache(tmp_path, max_bytes=1024 * 1024, max_age_seconds=60))
+    monkeypatch.setattr("main._fmu_content_digest", lambda _path: "ab" * 32)
+    mock_resolve.return_value = "/fake/path/pendulum.fmu"
+    mock_exec.submit.return_value = _make_future(_make_run_result("ModelExchange"))
+    body = {"labId": "1", "parameters": {"theta": 0.5}, "options": {"startTime": 0, "stopTime": 1, "stepSize": 0.01}}
+
+    first = client.post("/api/v1/simulations/run", json=body)
+    second = client.post("/api/v1/simulations/run", json=body)
+    bypass = client.post("/api/v1/simulations/run", json={**body, "options": {**body["options"], "cache": False}})
+
+    assert first.json()["cacheHit"] is False
+    assert second.json()["cacheHit"] is True
+    assert second.json()["outputs"] == first.json()["outputs"]
+    assert second.json()["simId"] != first.json()["simId"]
+    assert bypass.json()["cacheHit"] is False
+    assert mock_exec.submit.call_count == 2
 
 
+@patch("main.MAX_CONCURRENT_PER_MODEL", 1)
+@patch("main._resolve_fmu_path")
+@patch("main._executor")
+@patch("main.read_model_description", return_value=MockModelExchangeDescription())
+def test_cached_run_does_not_share_another_labs_rejection(mock_md, mock_exec, mock_resolve, tmp_path, monkeypatch):
+    from result_cache import ResultCache
 
+    monkeypatch.setattr("main._result_cache", ResultCache(tmp_path, max_bytes=1024 * 1024, max_age_seconds=60))
+    monkeypatch.setattr("main._fmu_content_digest", lambda _path: "ab" * 32)
+    monkeypatch.setattr("main._admission_queue", AdmissionQueue(max_depth=4, max_wait_seconds=0.2))
+    monkeypatch.setattr("main.HISTORY_DB_PATH", str(tmp_path / "history.db"))
+    mock_resolve.return_value = "/fake/path/pendulum.fmu"
+    mock_exec.submit.return_value = _make_future(_make_run_result("ModelExchange"))
+    options = {"startTime": 0, "stopTime": 1, "stepSize": 0.01}
+    request = MagicMock()
+    request.headers = {}
+
+    def _claims(lab_id):
+        return {"sub": f"user-{lab_id}", "labId": lab_id, "accessKey": "pendulum.fmu",
+                "resourceType": "fmu", "reservationKey": f"0x{lab_id}", "pucHash": "puc"}
+
+    async def _run(lab_id, delay):
+        await asyncio.sleep(delay)
+        req = main.SimulationRequest(labId=lab_id, parameters={"theta": 0.5}, options=dict(options))
+        try:
+            return await main.run_simulation(req, request, _claims(lab_id))
+        except HTTPException as exc:
+            return exc.status_code
+
+    async def _scenario():
+        await _init_db()
+        return await asyncio.gather(_run("1", 0), _run("2", 0.05))
+
+    # Lab 1 is full, so its request (the first one in flight) waits and is rejected.
+    main._active_counts["1"] = 1
+    try:
+        busy, free = asyncio.run(_scenario())
+    finally:
+        main._active_counts["1"] = 0
 
+    assert busy == 429
+    assert free["status"] == "completed" and free["cacheHit"] is False
+    assert mock_exec.submit.call_count == 1
+    assert main._active_counts["2"] == 0
+
+
+@patch("main.MAX_CONCURRENT_PER_MODEL", 1)
+@patch("main._resolve_fmu_path")
+@patch("main._executor")
+@patch("main.read_model_description", return_value=MockModelExchangeDescription())
+def test_cached_run_is_observed_only_after_admission(
+    mock_md, mock_exec, mock_resolve, tmp_path, monkeypatch, _stub_browser_session_observation,
+):
+    from result_cache import ResultCache
+
+    monkeypatch.setattr("main._result_cache", ResultCache(tmp_path, max_bytes=1024 * 1024, max_age_seconds=60))
+    monkeypatch.setattr("main._fmu_content_digest", lambda _path: "ab" * 32)
+    monkeypatch.setattr("main._admission_queue", AdmissionQueue(max_depth=0, max_wait_seconds=0))
+    mock_resolve.return_value = "/fake/path/pendulum.fmu"
+    mock_exec.submit.return_value = _make_future(_make_run_result("ModelExchange"))
+    body = {"labId": "1", "parameters": {"theta": 0.5}, "options": {"startTime": 0, "stopTime": 1, "stepSize": 0.01}}
+
+    main._active_counts["1"] = 1
+    rejected = client.post("/api/v1/simulations/run", json=body)
+    main._active_counts["1"] = 0
+    assert rejected.status_code == 429
+    _stub_browser_session_observation.assert_not_awaited()
+
+    first = client.post("/api/v1/simulations/run", json=body)
+    second = client.post("/api/v1/simulations/run", json=body)
+    assert (first.json()["cacheHit"], second.json()["cacheHit"]) == (False, True)
+    observed = [call.args[2] for call in _stub_browser_session_observation.await_args_list]
+    assert observed == [first.json()["simId"], second.json()["simId"]]
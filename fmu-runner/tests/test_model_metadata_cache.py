@@ -0,0 +1,138 @@
+import os
+from pathlib import Path
+
+from fmpy import read_model_description
+
+from model_metadata_cache import ModelDescriptionCache
+
+
+_BOUNCING_BALL = Path(__file__).resolve().parents[2] / "fmu-data" / "BouncingBall.fmu"
+
+
+def _counting_loader(calls):
+    def _load(path):
+        calls.append(path)
+        return {"path": path, "parse": len(calls)}
+
+    return _load
+
+
+def test_unchanged_file_is_served_without_reparsing(tmp_path):
+    fmu = tmp_path / "model.fmu"
+    fmu.write_bytes(b"fmu-v1")
+    calls = []
+    cache = ModelDescriptionCache(max_entries=4, max_age_seconds=60)
+
+    first = cache.get(fmu, _counting_loader(calls))
+    second = cache.get(fmu, _counting_loader(calls))
+    derived = [cache.derived(fmu, "names", _counting_loader(calls), lambda md: [md["parse"]]) for _ in range(2)]
+
+    assert first is second
+    assert len(calls) == 1
+    assert derived[0] is derived[1]
+    assert cache.metrics()["hits"] == 3
+
+
+def test_touched_file_is_revalidated_by_content_hash(tmp_path):
+    fmu = tmp_path / "model.fmu"
+    fmu.write_bytes(b"fmu-v1")
+    calls = []
+    cache = ModelDescriptionCache(max_entries=4, max_age_seconds=60)
+    original = cache.get(fmu, _counting_loader(calls))
+
+    stat = fmu.stat()
+    os.utime(fmu, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert cache.get(fmu, _counting_loader(calls)) is original
+    assert cache.metrics()["revalidated"] == 1
+
+    fmu.write_bytes(b"fmu-v2-with-new-content")
+    assert cache.get(fmu, _counting_loader(calls))["parse"] == 2
+
+    copy = tmp_path / "copy.fmu"
+    copy.write_bytes(fmu.read_bytes())
+    assert cache.get(copy, _counting_loader(calls))["parse"] == 2
+    assert len(calls) == 2
+
+
+def test_entries_expire_and_are_evicted_least_recently_used(tmp_path):
+    paths = []
+    for name in ("a", "b", "c"):
+        path = tmp_path / f"{name}.fmu"
+        path.write_bytes(name.encode())
+        paths.append(path)
+    calls = []
+    cache = ModelDescriptionCache(max_entries=2, max_age_seconds=60)
+
+    for path in (paths[0], paths[1], paths[0], paths[2]):
+        cache.get(path, _counting_loader(calls))
+    cache.get(paths[0], _counting_loader(calls))
+    assert len(calls) == 3
+    assert cache.metrics()["evictions"] == 1
+
+    cache.invalidate(paths[0])
+    cache.get(paths[0], _counting_loader(calls))
+    assert len(calls) == 4
+
+    disabled = ModelDescriptionCache(max_entries=0)
+    disabled.get(paths[0], _counting_loader(calls))
+    disabled.get(paths[0], _counting_loader(calls))
+    assert len(calls) == 6
+
+
+def test_expired_entries_revalidate_through_the_digest_source(tmp_path):
+    fmu = tmp_path / "model.fmu"
+    fmu.write_bytes(b"fmu-v1")
+    calls, digests = [], []
+
+    def _digest(path):
+        digests.append(path)
+        return "cached-digest"
+
+    cache = ModelDescriptionCache(max_entries=4, max_age_seconds=0, digest=_digest)
+    first = cache.get(fmu, _counting_loader(calls))
+    assert cache.get(fmu, _counting_loader(calls)) is first
+    assert (len(calls), len(digests), cache.metrics()["revalidated"]) == (1, 2, 1)
+
+
+def test_replaced_file_with_the_same_mtime_and_size_is_rechecked(tmp_path):
+    fmu = tmp_path / "model.fmu"
+    fmu.write_bytes(b"fmu-v1")
+    calls = []
+    cache = ModelDescriptionCache(max_entries=4, max_age_seconds=60)
+    cache.get(fmu, _counting_loader(calls))
+
+    stat = fmu.stat()
+    replacement = tmp_path / "replacement.fmu"
+    replacement.write_bytes(b"fmu-v2")
+    os.utime(replacement, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    keep = tmp_path / "keep.fmu"
+    os.link(fmu, keep)  # keep the old inode alive so it is not reused
+    os.replace(replacement, fmu)
+
+    assert cache.get(fmu, _counting_loader(calls))["parse"] == 2
+
+
+def test_missing_file_is_left_to_the_loader(tmp_path):
+    calls = []
+    cache = ModelDescriptionCache()
+
+    cache.get(tmp_path / "missing.fmu", _counting_loader(calls))
+
+    assert calls == [str(tmp_path / "missing.fmu")]
+    assert cache.metrics()["entries"] == 0
+
+
+def test_real_fmu_model_description_is_parsed_once():
+    cache = ModelDescriptionCache()
+    calls = []
+
+    def _load(path):
+        calls.append(path)
+        return read_model_description(path)
+
+    first = cache.get(_BOUNCING_BALL, _load)
+    second = cache.get(_BOUNCING_BALL, _load)
+
+    assert first is second
+    assert first.modelName == "BouncingBall"
+    assert len(calls) == 1
@@ -0,0 +1,90 @@
+import hashlib
+import hmac
+import io
+import json
+import zipfile
+
+from proxy_artifact import CONFIG_MEMBER, ProxyArtifactTemplate, ProxyRuntimeIndex, ProxyTemplateCache
+
+
+def _template(tmp_path):
+    binary = tmp_path / "decentralabs_proxy.so"
+    binary.write_bytes(b"\x7fELF" + bytes(range(256)) * 64)
+    return ProxyArtifactTemplate([
+        ("modelDescription.xml", b"<fmiModelDescription/>"),
+        ("resources/modelDescription.xml", b"<fmiModelDescription/>"),
+        ("binaries/linux64/decentralabs_proxy.so", binary),
+    ])
+
+
+def test_assembled_archive_is_a_valid_zip_with_stored_config(tmp_path):
+    template = _template(tmp_path)
+    config = json.dumps({"sessionTicket": "st_1"}).encode("utf-8")
+
+    artifact = template.assemble(config, signing_key=b"top-secret")
+    content = artifact.to_bytes()
+
+    assert len(content) == artifact.size
+    assert artifact.sha256 == hashlib.sha256(content).hexdigest()
+    assert artifact.signature == hmac.new(b"top-secret", content, hashlib.sha256).hexdigest()
+    with zipfile.ZipFile(io.BytesIO(content)) as archive:
+        assert archive.testzip() is None
+        assert archive.namelist()[-1] == CONFIG_MEMBER
+        assert archive.getinfo(CONFIG_MEMBER).compress_type == zipfile.ZIP_STORED
+        assert archive.getinfo("binaries/linux64/decentralabs_proxy.so").compress_type == zipfile.ZIP_DEFLATED
+        assert archive.read(CONFIG_MEMBER) == config
+        assert archive.read("modelDescription.xml") == b"<fmiModelDescription/>"
+
+
+def test_downloads_share_template_bytes_and_differ_only_in_config(tmp_path):
+    template = _template(tmp_path)
+
+    first = template.assemble(b'{"sessionTicket":"st_1"}')
+    second = template.assemble(b'{"sessionTicket":"st_2"}', signing_key=b"k")
+
+    assert first._entries.obj is second._entries.obj
+    assert first.sha256 != second.sha256
+    assert first.signature is None and second.signature
+    with zipfile.ZipFile(io.BytesIO(second.to_bytes())) as archive:
+        assert json.loads(archive.read(CONFIG_MEMBER)) == {"sessionTicket": "st_2"}
+
+
+def test_template_cache_builds_once_per_key_and_evicts_lru(tmp_path):
+    cache = ProxyTemplateCache(max_entries=2)
+    builds = []
+
+    def _build():
+        builds.append(1)
+        return _template(tmp_path)
+
+    first = cache.get(("model-a", "2.0.3"), _build)
+    assert cache.get(("model-a", "2.0.3"), _build) is first
+    cache.get(("model-b", "2.0.3"), _build)
+    cache.get(("model-c", "3.0"), _build)
+    cache.get(("model-a", "2.0.3"), _build)
+
+    metrics = cache.metrics()
+    assert len(builds) == 4
+    assert metrics["hits"] == 1
+    assert metrics["evictions"] == 2
+    assert metrics["entries"] == 2
+
+
+def test_runtime_index_rescans_only_when_the_runtime_changes(tmp_path):
+    binaries = tmp_path / "binaries" / "linux64"
+    binaries.mkdir(parents=True)
+    (binaries / "decentralabs_proxy.so").write_bytes(b"v1")
+    index = ProxyRuntimeIndex(tmp_path, rescan_seconds=3600)
+
+    first = index.files()
+    assert [runtime_file.relative for runtime_file in first] == [("linux64", "decentralabs_proxy.so")]
+    assert index.files() is first
+
+    (binaries / "decentralabs_proxy.dll").write_bytes(b"v1")
+    assert len(index.files()) == 2
+    assert index.metrics()["scans"] == 2
+
+    (binaries / "decentralabs_proxy.so").write_bytes(b"rebuilt")
+    assert index.files()[1].size == 2
+    index.rescan_seconds = 0
+    assert index.files()[1].size == len(b"rebuilt")
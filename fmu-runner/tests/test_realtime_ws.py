@@ -8,7 +8,24 @@ import pytest
 from fastapi import HTTPException
 from fastapi.testclient import TestClient
 
-from realtime_ws import RealtimeWsManager, _RealtimeSession, _StreamSubscription, _WsConnection
+from realtime_ws import (
+    BINARY_OUTPUTS_SUBPROTOCOL,
+    RealtimeWsManager,
+    _RealtimeSession,
+    _StreamSubscription,
+    _WsConnection,
+    encode_output_batch,
+)
+from ws_mux import (
+    MUX_CLOSE,
+    MUX_CLOSED,
+    MUX_OPEN,
+    STATION_MUX_SUBPROTOCOL,
+    decode_mux_frame,
+    encode_mux_frame,
+    mux_control,
+    parse_mux_control,
+)
 
 
 with patch("auth.verify_jwt", return_value={"sub": "test-user", "labId": "1", "accessKey": "test.fmu", "resourceType": "fmu", "reservationKey": "res-1", "pucHash": "puc-user-1"}):
@@ -184,6 +201,20 @@ def test_ws_requires_request_id():
         assert "requestId" in payload["message"]
 
 
+def test_ws_negotiates_binary_outputs_subprotocol():
+    with client.websocket_connect(
+        "/api/v1/fmu/sessions",
+        headers={"Authorization": "Bearer test-token"},
+        subprotocols=["fmu.realtime.v0", BINARY_OUTPUTS_SUBPROTOCOL],
+    ) as ws:
+        assert ws.accepted_subprotocol == BINARY_OUTPUTS_SUBPROTOCOL
+        ws.send_text("{not-json")
+        assert ws.receive_json()["code"] == "INVALID_COMMAND"
+
+    with client.websocket_connect("/api/v1/fmu/sessions", headers={"Authorization": "Bearer test-token"}) as ws:
+        assert ws.accepted_subprotocol is None
+
+
 def test_ws_rejects_invalid_json_payload():
     with client.websocket_connect("/api/v1/fmu/sessions", headers={"Authorization": "Bearer test-token"}) as ws:
         ws.send_text("{not-json")
@@ -817,6 +848,8 @@ async def test_realtime_session_heartbeat_emits_expiring_notice_once(monkeypatch
     await session._heartbeat_loop()
 
     assert [event["type"] for event in events] == ["session.heartbeat", "session.expiring"]
+    assert events[0]["pacing"]["realtimeFactor"] == 1.0
+    assert events[0]["pacing"]["lagMs"] == 0
     assert events[1]["secondsRemaining"] == 5
 
 
@@ -889,6 +922,102 @@ async def test_realtime_run_loop_transitions_to_error_on_http_exception(monkeypa
     assert emitted_states == ["error"]
 
 
+class _PacedFmu:
+    def __init__(self, step_cost=0.0):
+        self.step_cost = step_cost
+        self.steps = 0
+
+    def doStep(self, current_time, delta_t):
+        import time as time_module
+
+        if self.step_cost:
+            time_module.sleep(self.step_cost)
+        self.steps += 1
+
+    def terminate(self):
+        pass
+
+    def freeInstance(self):
+        pass
+
+
+async def _run_paced(session, seconds):
+    async def _fake_enqueue(payload):
+        return None
+
+    session._enqueue_event = _fake_enqueue
+    session.state = "running"
+    runner = asyncio.create_task(session._run_loop())
+    await asyncio.sleep(seconds)
+    session.state = "paused"
+    runner.cancel()
+    await asyncio.gather(runner, return_exceptions=True)
+    await session.terminate("test")
+
+
+@pytest.mark.asyncio
+async def test_realtime_run_loop_tracks_wall_clock_without_the_old_step_cap():
+    import time as time_module
+
+    session = _build_session()
+    session._fmu = _PacedFmu()
+    session.step_size = 0.002
+    session.stop_time = 100.0
+
+    started = time_module.monotonic()
+    await _run_paced(session, 0.3)
+    elapsed = time_module.monotonic() - started
+
+    # 0.002 s steps used to be capped at 100 steps/s (0.06 s of sim time here).
+    assert session.current_time == pytest.approx(elapsed, abs=0.08)
+    assert session._pacing.resyncs == 0
+
+
+@pytest.mark.asyncio
+async def test_realtime_run_loop_honours_realtime_factor():
+    session = _build_session()
+    session._fmu = _PacedFmu()
+    session.step_size = 0.01
+    session.stop_time = 100.0
+    session._pacing = session._parse_pacing({"realtimeFactor": 10})
+
+    await _run_paced(session, 0.2)
+
+    assert 1.0 <= session.current_time <= 3.0
+
+
+@pytest.mark.asyncio
+async def test_realtime_run_loop_skip_policy_resyncs_and_reports_lag():
+    session = _build_session()
+    session._fmu = _PacedFmu(step_cost=0.02)
+    session.step_size = 0.005
+    session.stop_time = 100.0
+    session._pacing = session._parse_pacing({"catchUp": "skip"})
+
+    await _run_paced(session, 0.2)
+
+    snapshot = session._pacing.snapshot()
+    assert snapshot["catchUp"] == "skip"
+    assert snapshot["overruns"] >= 3
+    assert snapshot["resyncs"] >= 3
+    assert snapshot["skippedMs"] > 0
+    assert snapshot["maxLagMs"] > 0
+    assert snapshot["stepCostMs"] >= 15
+
+
+def test_realtime_parse_pacing_rejects_invalid_options():
+    session = _build_session()
+
+    assert session._parse_pacing({"realtimeFactor": 0}).realtime_factor == 0
+    assert session._parse_pacing({"timeMode": "simtime"}).realtime_factor == 0
+    assert session._parse_pacing({"timeMode": "realtime"}).realtime_factor == 1.0
+    assert session._parse_pacing({"timeMode": "warp"}).realtime_factor == 1.0
+    for options in ({"realtimeFactor": -1}, {"realtimeFactor": "nan"}, {"catchUp": "rewind"}, {"maxCatchUpSteps": -2}):
+        with pytest.raises(HTTPException) as exc_info:
+            session._parse_pacing(options)
+        assert exc_info.value.status_code == 400
+
+
 @pytest.mark.asyncio
 async def test_realtime_emit_outputs_batches_and_resets_drop_counters(monkeypatch):
     session = _build_session()
@@ -933,6 +1062,121 @@ async def test_realtime_emit_outputs_batches_and_resets_drop_counters(monkeypatc
     assert session._pending_queue_drops == 0
 
 
+def _decode_output_batch(frame):
+    import numpy as np
+
+    header_length = int.from_bytes(frame[:4], "little")
+    header = json.loads(frame[4:4 + header_length])
+    offset = 4 + header_length
+    offset += -offset % 8
+    data = np.frombuffer(frame, dtype="<f8", offset=offset).reshape(len(header["columns"]), header["batchSize"])
+    return header, {name: data[index].tolist() for index, name in enumerate(header["columns"])}
+
+
+def test_encode_output_batch_packs_columns_arrays_and_objects():
+    frame = encode_output_batch(
+        {"type": "sim.outputs", "sessionId": "sess-1", "seq": 3, "dropped": 0, "batchSize": 2, "simTime": 0.2},
+        [
+            (0.1, {"y": 1.5, "flag": True, "vec": [1, 2], "label": "a"}),
+            (0.2, {"y": 2.5, "flag": False, "vec": [3, 4], "label": "b"}),
+        ],
+    )
+
+    header, columns = _decode_output_batch(frame)
+
+    assert header["seq"] == 3
+    assert header["dtype"] == "<f8"
+    assert header["columns"] == ["simTime", "y", "flag", "vec[0]", "vec[1]"]
+    assert header["objects"] == {"label": ["a", "b"]}
+    assert columns == {
+        "simTime": [0.1, 0.2],
+        "y": [1.5, 2.5],
+        "flag": [1.0, 0.0],
+        "vec[0]": [1.0, 3.0],
+        "vec[1]": [2.0, 4.0],
+    }
+
+
+@pytest.mark.asyncio
+async def test_realtime_emit_outputs_sends_every_sample_on_binary_connections(monkeypatch):
+    session = _build_session()
+    session.subscription = _StreamSubscription(period_ms=1000, max_batch_size=8, max_hz=None)
+    session.connection = _WsConnection(websocket=SimpleNamespace(), queue_size=8, binary_outputs=True)
+    samples = iter([{"y": 1.0}, {"y": 2.0}, {"y": 3.0}])
+    monkeypatch.setattr(session, "_sample_outputs", lambda: next(samples))
+    monkeypatch.setattr("realtime_ws.time.monotonic", lambda: 5000.0)
+
+    payloads = []
+
+    async def _fake_enqueue(payload):
+        payloads.append(payload)
+
+    monkeypatch.setattr(session, "_enqueue_event", _fake_enqueue)
+
+    for sim_time, force in ((0.5, False), (1.0, False), (1.5, True)):
+        session.current_time = sim_time
+        await session._emit_outputs_if_needed(force=force)
+
+    assert len(payloads) == 2
+    assert all(isinstance(payload, bytes) for payload in payloads)
+    header, columns = _decode_output_batch(payloads[-1])
+    assert header["batchSize"] == 2
+    assert header["dropped"] == 0
+    assert columns == {"simTime": [1.0, 1.5], "y": [2.0, 3.0]}
+
+
+@pytest.mark.asyncio
+async def test_realtime_binary_run_flushes_held_samples_when_it_stops(monkeypatch):
+    import time as time_module
+
+    session = _build_session()
+    session._fmu = _PacedFmu()
+    session.step_size = 0.5
+    session.stop_time = 1.5
+    session._pacing = session._parse_pacing({"realtimeFactor": 0})
+    session.subscription = _StreamSubscription(period_ms=60_000, max_batch_size=8, max_hz=None)
+    session.subscription.last_emit_monotonic = time_module.monotonic()
+    session.connection = _WsConnection(websocket=SimpleNamespace(), queue_size=8, binary_outputs=True)
+    monkeypatch.setattr(session, "_sample_outputs", lambda: {"y": session.current_time * 2})
+
+    payloads = []
+
+    async def _fake_enqueue(payload):
+        payloads.append(payload)
+
+    monkeypatch.setattr(session, "_enqueue_event", _fake_enqueue)
+    session.state = "running"
+
+    await session._run_loop()
+
+    assert session.state == "stopped"
+    assert not any(isinstance(payload, dict) and payload["type"] == "sim.progress" for payload in payloads)
+    header, columns = _decode_output_batch(payloads[0])
+    assert header["batchSize"] == 3
+    assert columns == {"simTime": [0.5, 1.0, 1.5], "y": [1.0, 2.0, 3.0]}
+    assert payloads[1] == {"type": "sim.state", "sessionId": "sess-unit", "state": "stopped", "simTime": 1.5}
+
+
+@pytest.mark.asyncio
+async def test_realtime_pause_flushes_held_binary_samples():
+    session = _build_session()
+    session.subscription = _StreamSubscription(period_ms=60_000, max_batch_size=8, max_hz=None)
+    session.connection = _WsConnection(websocket=SimpleNamespace(), queue_size=8, binary_outputs=True)
+    session._pending_samples = [(0.5, {"y": 1.0})]
+    session.current_time = 0.5
+    session.state = "running"
+
+    await session.pause()
+
+    frames = []
+    while not session.connection.queue.empty():
+        frames.append(session.connection.queue.get_nowait())
+    assert isinstance(frames[0], bytes)
+    assert _decode_output_batch(frames[0])[1] == {"simTime": [0.5], "y": [1.0]}
+    assert frames[1]["state"] == "paused"
+    assert session._pending_samples == []
+
+
 @pytest.mark.asyncio
 async def test_initialize_fmi3_uses_enter_initialization_mode_without_setup_experiment(monkeypatch):
     from realtime_ws import _RealtimeSession
@@ -1314,6 +1558,54 @@ async def test_realtime_step_once_validates_state_and_emits_progress(monkeypatch
     assert outputs_called == [True]
 
 
+@pytest.mark.asyncio
+async def test_realtime_step_once_runs_fmu_off_the_event_loop(monkeypatch):
+    import threading
+    import time as time_module
+
+    session = _build_session()
+    step_threads = []
+
+    class _SlowFmu:
+        def doStep(self, current_time, delta_t):
+            step_threads.append(threading.current_thread().name)
+            time_module.sleep(0.2)
+
+        def terminate(self):
+            pass
+
+        def freeInstance(self):
+            pass
+
+    async def _fake_enqueue(payload):
+        return None
+
+    session._fmu = _SlowFmu()
+    monkeypatch.setattr(session, "_enqueue_event", _fake_enqueue)
+
+    ticks = 0
+
+    async def _ticker():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.01)
+            ticks += 1
+
+    ticker = asyncio.create_task(_ticker())
+    try:
+        await session._step_once(0.5, emit_outputs=False)
+    finally:
+        ticker.cancel()
+
+    assert step_threads and step_threads[0].startswith("fmu-rt-")
+    assert step_threads[0] != threading.current_thread().name
+    assert ticks >= 5
+    assert session.current_time == 0.5
+
+    await session.terminate("test")
+    assert session._fmu_executor is None
+
+
 @pytest.mark.asyncio
 async def test_realtime_session_attach_and_detach_manage_tasks(monkeypatch):
     session = _build_session()
@@ -1379,6 +1671,24 @@ async def test_realtime_sender_loop_sends_payload_and_stops_on_error():
     assert sent == [{"type": "first"}]
 
 
+@pytest.mark.asyncio
+async def test_realtime_sender_loop_sends_binary_batches_as_bytes():
+    sent = []
+
+    class _WebSocket:
+        async def send_bytes(self, payload):
+            sent.append(payload)
+            raise RuntimeError("send failed")
+
+    session = _build_session()
+    connection = _WsConnection(websocket=_WebSocket(), queue_size=2, binary_outputs=True)
+    await connection.queue.put(b"frame")
+
+    await session._sender_loop(connection)
+
+    assert sent == [b"frame"]
+
+
 def test_realtime_session_dimension_helpers_cover_error_paths():
     session = _build_session()
 
@@ -1586,6 +1896,61 @@ def test_realtime_session_set_and_get_values_support_extended_fmi3_integer_width
     }
 
 
+@pytest.mark.parametrize("fmu_name", ["Feedthrough", "VanDerPol"])
+def test_realtime_session_access_plans_use_native_buffers_on_real_fmus(fmu_name):
+    from fmpy import extract, instantiate_fmu, read_model_description
+
+    fmu_path = Path(__file__).resolve().parents[2] / "fmu-data" / f"{fmu_name}.fmu"
+    session = _RealtimeSession(_build_manager(), "sess-plan", _claims(), fmu_path)
+    session._ensure_model_loaded()
+    md = session._model_description
+    session._unzipdir = extract(str(fmu_path))
+    session._fmu = instantiate_fmu(session._unzipdir, md, fmi_type="CoSimulation")
+    try:
+        session._fmu.instantiate()
+        if md.fmiVersion.startswith("3"):
+            session._fmu.enterInitializationMode(startTime=0.0, stopTime=1.0)
+        else:
+            session._fmu.setupExperiment(startTime=0.0, stopTime=1.0)
+            session._fmu.enterInitializationMode()
+        session._fmu.exitInitializationMode()
+
+        if fmu_name == "Feedthrough":
+            session._set_values({
+                "Float64_continuous_input": 2.5,
+                "Int32_input": -7,
+                "Boolean_input": True,
+                "String_input": "hello",
+            })
+            session._fmu.doStep(0.0, 0.1)
+            names = ["Float64_continuous_output", "Int32_output", "Boolean_output", "String_output"]
+            expected = {
+                "Float64_continuous_output": 2.5,
+                "Int32_output": -7,
+                "Boolean_output": True,
+                "String_output": "hello",
+            }
+        else:
+            session._fmu.doStep(0.0, 0.1)
+            names = ["x0", "x1"]
+            refs = [int(session._variables[name].valueReference) for name in names]
+            expected = dict(zip(names, session._fmu.getFloat64(refs)))
+
+        outputs = session._get_values(names)
+        plan = session._access_plan(names, writable=False)
+
+        assert outputs == expected
+        assert all(type(outputs[name]) is type(expected[name]) for name in names)
+        assert session._get_values(names) == expected
+        assert session._access_plan(names, writable=False) is plan
+        native_types = {group.variable_type for group in plan.groups if group.native is not None}
+        assert native_types == ({"Real", "Integer", "Boolean"} if fmu_name == "Feedthrough" else {"Float64"})
+    finally:
+        session._shutdown_fmu()
+
+    assert session._access_plans == {}
+
+
 @pytest.mark.asyncio
 async def test_realtime_session_terminate_notifies_attached_client_on_expiry():
     sent = []
@@ -1788,3 +2153,38 @@ def test_ws_top_level_http_exception_maps_to_forbidden(monkeypatch):
         payload = ws.receive_json()
         assert payload["type"] == "error"
         assert payload["code"] == "FORBIDDEN"
+
+
+def test_ws_internal_mux_channel_routes_streams_independently(monkeypatch):
+    async def _fake_verify(_token: str):
+        return _claims()
+
+    monkeypatch.setattr(_realtime_manager, "verify_jwt_token", _fake_verify)
+    monkeypatch.setattr(_realtime_manager, "internal_ws_token", "gateway-internal")
+
+    with client.websocket_connect(
+        "/internal/fmu/sessions",
+        headers={"x-internal-session-token": "gateway-internal"},
+        subprotocols=[STATION_MUX_SUBPROTOCOL],
+    ) as ws:
+        assert ws.accepted_subprotocol == STATION_MUX_SUBPROTOCOL
+
+        ws.send_text(encode_mux_frame("orphan", json.dumps({"type": "session.attach", "requestId": "r0"})))
+        stream_id, payload = decode_mux_frame(ws.receive_text())
+        assert stream_id == "orphan"
+        assert parse_mux_control(payload) == {"type": MUX_CLOSED, "code": 1008}
+
+        for stream_id in ("a", "b"):
+            ws.send_text(encode_mux_frame(stream_id, mux_control(MUX_OPEN, authorization="Bearer test-token")))
+        ws.send_text(encode_mux_frame("b", json.dumps({"type": "session.attach", "requestId": "rb", "sessionId": "missing"})))
+        ws.send_text(encode_mux_frame("a", json.dumps({"type": "session.attach", "requestId": "ra", "sessionId": "missing"})))
+        replies = dict(decode_mux_frame(ws.receive_text()) for _ in range(2))
+        assert json.loads(replies["a"])["requestId"] == "ra"
+        assert json.loads(replies["b"])["requestId"] == "rb"
+        assert json.loads(replies["a"])["code"] == "FORBIDDEN"
+
+        ws.send_text(encode_mux_frame("a", mux_control(MUX_CLOSE)))
+        ws.send_text(encode_mux_frame("b", json.dumps({"type": "session.attach", "requestId": "rb2", "sessionId": "missing"})))
+        stream_id, payload = decode_mux_frame(ws.receive_text())
+        assert stream_id == "b"
+        assert json.loads(payload)["requestId"] == "rb2"
@@ -0,0 +1,122 @@
+import errno
+import gzip
+import json
+import os
+import time
+
+import pytest
+
+from result_blobs import ResultBlobStore, ResultSpool, ResultTooLargeError, result_summary
+
+
+def _payload(index: int, rows: int = 200) -> bytes:
+    return json.dumps({"time": list(range(rows)), "outputs": {"h": [index] * rows}}).encode("utf-8")
+
+
+def test_identical_results_share_one_compressed_blob(tmp_path):
+    store = ResultBlobStore(tmp_path)
+    payload = _payload(1)
+
+    first = store.put(payload)
+    second = store.put(payload)
+
+    assert first == second
+    files = list(tmp_path.glob("*/*.json.gz"))
+    assert [path.name for path in files] == [f"{first}.json.gz"]
+    assert files[0].stat().st_size < len(payload)
+    assert gzip.decompress(files[0].read_bytes()) == payload
+    assert b"".join(ResultBlobStore.iter_decompressed(store.open(first), chunk_bytes=100)) == payload
+    assert store.metrics()["deduplicated"] == 1
+
+
+def test_retention_expires_old_blobs_and_caps_total_size(tmp_path):
+    store = ResultBlobStore(tmp_path, max_age_seconds=60)
+    old = store.put(_payload(1))
+    path = next(tmp_path.glob(f"*/{old}.json.gz"))
+    stale = time.time() - 120
+    os.utime(path, (stale, stale))
+
+    reloaded = ResultBlobStore(tmp_path, max_age_seconds=60)
+    assert reloaded.open(old) is None
+    assert reloaded.evict() == 1
+    assert not path.exists()
+
+    probe = ResultBlobStore(tmp_path / "probe")
+    probe.put(_payload(2))
+    blob_size = probe.metrics()["bytes"]
+    capped = ResultBlobStore(tmp_path / "capped", max_bytes=blob_size * 2 + blob_size // 2)
+    digests = []
+    for index in range(4):
+        digests.append(capped.put(_payload(index)))
+        time.sleep(0.01)
+
+    assert capped.open(digests[0]) is None
+    assert capped.open(digests[1]) is None
+    for digest in digests[2:]:
+        handle = capped.open(digest)
+        assert handle is not None
+        handle.close()
+    assert capped.metrics()["evictions"] == 2
+
+
+def test_summary_reports_span_and_finite_statistics():
+    summary = result_summary({
+        "time": [0.0, 0.5, 1.0],
+        "outputs": {"h": [1.0, float("nan"), 3.0], "flag": ["on", "off", "on"], "empty": []},
+    })
+
+    assert summary["rows"] == 3
+    assert (summary["startTime"], summary["stopTime"]) == (0.0, 1.0)
+    assert summary["outputs"] == {"h": {"min": 1.0, "max": 3.0, "mean": 2.0, "final": 3.0}}
+    assert result_summary("not a result") == {}
+
+
+def test_spooled_result_is_stored_as_the_merged_json(tmp_path):
+    chunks = [
+        {"time": [0.0, 0.5], "outputs": {"h": [1.0, float("nan")], "flag": ["on", "off"]}},
+        {"time": [], "outputs": {"h": []}},
+        {"time": [1.0], "outputs": {"h": [3.0], "flag": ["on"]}},
+    ]
+    merged = {
+        "time": [0.0, 0.5, 1.0],
+        "outputs": {"v": [], "h": [1.0, float("nan"), 3.0], "flag": ["on", "off", "on"]},
+        "outputVariables": ["v", "h", "flag"],
+    }
+    spool = ResultSpool()
+    for chunk in chunks:
+        spool.append(chunk)
+    spool.output_variables = ["v", "h"]
+    store = ResultBlobStore(tmp_path)
+
+    digest, size = store.put_stream(spool.iter_json(chunk_bytes=8))
+    spool.close()
+
+    expected = json.dumps(merged).encode("utf-8")
+    assert (digest, size) == (store.put(expected), len(expected))
+    assert store.metrics()["deduplicated"] == 1
+    assert b"".join(ResultBlobStore.iter_decompressed(store.open(digest))) == expected
+    assert spool.summary == result_summary(merged)
+
+
+def test_retention_keeps_the_blob_just_written_and_refuses_one_above_the_cap(tmp_path):
+    probe = ResultBlobStore(tmp_path / "probe")
+    probe.put(_payload(1))
+    blob_size = probe.metrics()["bytes"]
+
+    store = ResultBlobStore(tmp_path / "store", max_bytes=blob_size + blob_size // 2)
+    first = store.put(_payload(1))
+    time.sleep(0.01)
+    second = store.put(_payload(2))
+    assert store.open(first) is None
+    handle = store.open(second)
+    assert handle is not None
+    handle.close()
+
+    with pytest.raises(ResultTooLargeError) as refused:
+        store.put(_payload(3, rows=20000))
+    assert refused.value.errno == errno.EFBIG
+    assert refused.value.size == len(_payload(3, rows=20000))
+    assert store.open(refused.value.digest) is None
+    assert store.metrics()["entries"] == 1
+    assert not list((tmp_path / "store").glob(".tmp-*"))
+    assert store.metrics()["evictions"] == 1
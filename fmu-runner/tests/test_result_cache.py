@@ -0,0 +1,92 @@
+import asyncio
+import os
+import time
+
+from result_cache import ResultCache, result_cache_key
+
+
+_FMU_SHA = "ab" * 32
+
+
+def _key(**overrides):
+    values = {
+        "parameters": {"mass": 1},
+        "start_time": 0,
+        "stop_time": 1,
+        "step_size": 0.1,
+        "fmi_type": "CoSimulation",
+        "solver": "Euler",
+    }
+    values.update(overrides)
+    return result_cache_key(_FMU_SHA, **values)
+
+
+def test_key_normalizes_numbers_and_ignores_solver_for_cosimulation():
+    assert _key() == _key(parameters={"mass": 1.0}, start_time=0.0)
+    assert _key(solver="CVode") == _key()
+    assert _key(fmi_type="ModelExchange", solver="CVode") != _key(fmi_type="ModelExchange")
+    assert _key(parameters={"mass": 2}) != _key()
+    assert result_cache_key("cd" * 32, parameters={"mass": 1}, start_time=0, stop_time=1,
+                            step_size=0.1, fmi_type="CoSimulation", solver="Euler") != _key()
+
+
+def test_results_round_trip_through_disk_and_survive_restart(tmp_path):
+    cache = ResultCache(tmp_path, max_bytes=1024 * 1024, max_age_seconds=60)
+    result = {"time": [0.0, 0.1], "outputs": {"x": [1.0, 2.0]}, "outputVariables": ["x"]}
+
+    cache.put(_key(), result)
+
+    assert cache.get(_key()) == result
+    assert ResultCache(tmp_path, max_bytes=1024 * 1024, max_age_seconds=60).get(_key()) == result
+    assert cache.metrics()["hits"] == 1
+
+
+def test_expired_entries_are_misses_and_evicted(tmp_path):
+    cache = ResultCache(tmp_path, max_bytes=1024 * 1024, max_age_seconds=10)
+    cache.put(_key(), {"time": []})
+    cache._index[_key()][1] = time.time() - 11
+
+    assert cache.get(_key()) is None
+    assert cache.evict() == 1
+    assert not any(name.endswith(".json.gz") for name in os.listdir(tmp_path))
+
+
+def test_size_eviction_drops_least_recently_used_first(tmp_path):
+    payload = {"time": [float(index) for index in range(200)]}
+    probe = ResultCache(tmp_path / "probe", max_bytes=1024 * 1024, max_age_seconds=0)
+    probe.put(_key(), payload)
+    entry_size = probe.metrics()["bytes"]
+
+    cache = ResultCache(tmp_path / "store", max_bytes=entry_size * 2, max_age_seconds=0)
+    first, second, third = _key(stop_time=1), _key(stop_time=2), _key(stop_time=3)
+    cache.put(first, payload)
+    cache.put(second, payload)
+    cache._index[second][2] -= 10
+    assert cache.get(first) is not None
+    cache.put(third, payload)
+
+    assert cache.get(second) is None
+    assert cache.get(first) is not None
+    assert cache.get(third) is not None
+
+
+def test_concurrent_identical_misses_share_one_execution(tmp_path):
+    cache = ResultCache(tmp_path, max_bytes=1024 * 1024, max_age_seconds=60)
+    calls = []
+
+    async def compute():
+        calls.append(True)
+        await asyncio.sleep(0.05)
+        return {"time": [0.0], "outputs": {}, "outputVariables": []}
+
+    async def scenario():
+        outcomes = await asyncio.gather(*(cache.get_or_compute(_key(), compute) for _ in range(3)))
+        later = await cache.get_or_compute(_key(), compute)
+        return outcomes, later
+
+    outcomes, later = asyncio.run(scenario())
+
+    assert len(calls) == 1
+    assert sorted(hit for _, hit in outcomes) == [False, True, True]
+    assert later[1] is True
+    assert cache.metrics()["shared"] == 2
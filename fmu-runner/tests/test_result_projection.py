@@ -0,0 +1,110 @@
+import numpy as np
+import pytest
+
+from result_projection import ResultProjection, m4_indices
+
+
+def _result(rows: int = 10_000) -> dict:
+    time_values = np.linspace(0.0, 10.0, rows)
+    rng = np.random.default_rng(7)
+    noisy = np.sin(time_values) + rng.normal(0.0, 0.2, rows)
+    return {
+        "time": time_values.tolist(),
+        "outputs": {
+            "noisy": noisy.tolist(),
+            "count": list(range(rows)),
+            "flag": [index % 2 == 0 for index in range(rows)],
+        },
+        "outputVariables": ["noisy", "count", "flag"],
+    }
+
+
+def test_options_are_validated_and_absent_options_mean_no_projection():
+    assert ResultProjection.from_options({}) is None
+    projection = ResultProjection.from_options({"variables": "noisy, count,noisy", "maxPoints": "100"})
+    assert projection.variables == ("noisy", "count")
+    assert (projection.max_points, projection.method) == (100, "m4")
+
+    for options in (
+        {"downsample": "lttb"},
+        {"maxPoints": 2},
+        {"maxPoints": 100, "downsample": "average"},
+        {"windowStart": 5, "windowEnd": 1},
+        {"windowStart": "soon"},
+        {"variables": [1, 2]},
+    ):
+        with pytest.raises(ValueError):
+            ResultProjection.from_options(options)
+    with pytest.raises(ValueError, match="missing"):
+        ResultProjection.from_options({"variables": ["missing"]}).apply(_result(10))
+
+
+def test_window_and_variable_selection_keep_original_values():
+    result = _result(1001)
+    projected = ResultProjection.from_options(
+        {"variables": ["count", "flag"], "windowStart": 2.0, "windowEnd": 3.0}
+    ).apply(result)
+
+    assert projected["outputVariables"] == ["count", "flag"]
+    assert projected["time"][0] == pytest.approx(2.0)
+    assert projected["time"][-1] == pytest.approx(3.0)
+    assert projected["outputs"]["count"] == list(range(200, 301))
+    assert projected["outputs"]["flag"][0] is True
+    assert projected["projection"] == {
+        "sourceRows": 1001, "rows": 101, "windowStart": 2.0, "windowEnd": 3.0, "downsample": None,
+    }
+
+
+def test_m4_stays_within_budget_and_keeps_the_min_max_envelope():
+    result = _result()
+    projected = ResultProjection.from_options({"variables": ["noisy"], "maxPoints": 400}).apply(result)
+    noisy = result["outputs"]["noisy"]
+
+    assert projected["projection"]["downsample"] == "m4"
+    assert projected["projection"]["rows"] <= 400
+    assert max(projected["outputs"]["noisy"]) == max(noisy)
+    assert min(projected["outputs"]["noisy"]) == min(noisy)
+    assert projected["time"][0] == result["time"][0]
+    assert projected["time"][-1] == result["time"][-1]
+    assert projected["time"] == sorted(projected["time"])
+
+    # Every bucket keeps its own extremes, not only the global ones.
+    time_values = np.asarray(result["time"])
+    values = np.asarray(noisy)
+    rows = m4_indices(time_values, [values], 400)
+    buckets = 400 // 4  # first/last/min/max of one series per bucket
+    bucket_edges = np.linspace(0.0, 10.0, buckets + 1)[1:-1]
+    for segment in np.split(np.arange(values.size), np.searchsorted(time_values, bucket_edges)):
+        assert segment[np.argmax(values[segment])] in rows
+        assert segment[np.argmin(values[segment])] in rows
+
+
+def test_max_points_too_small_for_the_selected_variables_is_rejected():
+    rows = 1000
+    time_values = np.linspace(0.0, 1.0, rows)
+    result = {
+        "time": time_values.tolist(),
+        "outputs": {f"y{index}": np.sin(time_values * (index + 1)).tolist() for index in range(12)},
+    }
+
+    with pytest.raises(ValueError, match="at least 26"):
+        ResultProjection.from_options({"maxPoints": 20}).apply(result)
+    with pytest.raises(ValueError, match="at least 36"):
+        ResultProjection.from_options({"maxPoints": 20, "downsample": "lttb"}).apply(result)
+    for method, max_points in (("m4", 26), ("lttb", 36)):
+        projected = ResultProjection.from_options({"maxPoints": max_points, "downsample": method}).apply(result)
+        assert projected["projection"]["rows"] <= max_points
+
+
+def test_lttb_downsamples_every_variable_on_a_shared_time_base():
+    result = _result()
+    projected = ResultProjection.from_options({"maxPoints": 300, "downsample": "LTTB"}).apply(result)
+
+    rows = projected["projection"]["rows"]
+    assert projected["projection"]["downsample"] == "lttb"
+    assert 100 <= rows <= 300
+    assert all(len(values) == rows for values in projected["outputs"].values())
+    assert projected["time"][0] == 0.0 and projected["time"][-1] == 10.0
+    assert all(isinstance(value, int) for value in projected["outputs"]["count"])
+    index = projected["outputs"]["count"]
+    assert projected["outputs"]["noisy"] == [result["outputs"]["noisy"][row] for row in index]
@@ -0,0 +1,78 @@
+import pytest
+
+from simulation_scheduler import (
+    HostLimits,
+    SimulationScheduler,
+    parse_lab_weights,
+    read_host_limits,
+    size_capacity,
+)
+
+
+GIB = 1024 ** 3
+
+
+def test_reads_cgroup_v2_quota_and_memory_limit(tmp_path):
+    (tmp_path / "cpu.max").write_text("150000 100000\n")
+    (tmp_path / "memory.max").write_text(str(3 * GIB))
+
+    limits = read_host_limits(tmp_path)
+
+    assert limits.source == "cgroup2"
+    assert limits.cpus <= 1.5
+    assert limits.memory_bytes <= 3 * GIB
+
+    (tmp_path / "cpu.max").write_text("max 100000\n")
+    (tmp_path / "memory.max").write_text("max\n")
+    unlimited = read_host_limits(tmp_path)
+    assert unlimited.cpus >= 1
+    assert unlimited.memory_bytes is None or unlimited.memory_bytes > 0
+
+
+def test_reads_cgroup_v1_and_falls_back_to_the_host(tmp_path):
+    (tmp_path / "cpu").mkdir()
+    (tmp_path / "memory").mkdir()
+    (tmp_path / "cpu" / "cpu.cfs_quota_us").write_text("50000")
+    (tmp_path / "cpu" / "cpu.cfs_period_us").write_text("100000")
+    (tmp_path / "memory" / "memory.limit_in_bytes").write_text(str(GIB))
+
+    limits = read_host_limits(tmp_path)
+    assert (limits.source, limits.cpus) == ("cgroup1", 0.5)
+    assert limits.memory_bytes <= GIB
+
+    (tmp_path / "cpu" / "cpu.cfs_quota_us").write_text("-1")
+    (tmp_path / "memory" / "memory.limit_in_bytes").write_text(str(9223372036854771712))
+    assert read_host_limits(tmp_path).cpus >= 1
+    assert read_host_limits(tmp_path / "missing").source == "host"
+
+
+def test_capacity_is_bounded_by_cpus_and_worker_memory():
+    assert size_capacity(HostLimits(8, 16 * GIB, "cgroup2"), worker_memory_bytes=GIB) == 8
+    assert size_capacity(HostLimits(8, 4 * GIB, "cgroup2"), worker_memory_bytes=GIB) == 4
+    # A worker can never use more than its address-space limit.
+    assert size_capacity(
+        HostLimits(8, 4 * GIB, "cgroup2"), worker_memory_bytes=2 * GIB, address_space_limit=GIB,
+    ) == 4
+    assert size_capacity(HostLimits(0.5, GIB // 4, "cgroup1"), worker_memory_bytes=GIB) == 1
+    assert size_capacity(HostLimits(2, None, "host"), worker_memory_bytes=GIB) == 2
+
+
+def test_waiting_labs_are_served_by_weighted_share():
+    assert parse_lab_weights(" 1=2, lab-7=0.5 ,") == {"1": 2.0, "lab-7": 0.5}
+    for text in ("1", "1=0", "=2", "1=abc"):
+        with pytest.raises(ValueError):
+            parse_lab_weights(text)
+
+    scheduler = SimulationScheduler(4, weights={"heavy": 3})
+    running = {"heavy": 2, "light": 1}
+    assert scheduler.has_room(running)
+    assert not scheduler.has_room({"heavy": 3, "light": 1})
+    # heavy runs 2/3 of its weight, light 1/1: heavy is further below its share.
+    assert scheduler.next_lab(running, ["light", "heavy"]) == "heavy"
+    assert scheduler.next_lab({"heavy": 3, "light": 0}, ["light", "heavy"]) == "light"
+    assert scheduler.next_lab(running, []) is None
+
+    snapshot = scheduler.snapshot(running, {"idle": 1})
+    assert (snapshot["capacity"], snapshot["running"], snapshot["waiting"]) == (4, 3, 1)
+    assert snapshot["labs"]["heavy"] == {"running": 2, "waiting": 0, "weight": 3, "fairShare": 2.4}
+    assert snapshot["labs"]["idle"]["fairShare"] == 0.8
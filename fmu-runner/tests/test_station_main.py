@@ -57,13 +57,6 @@ class _StationBackendStub:
             "authorization": authorization,
         }
 
-        class _Client:
-            def __init__(self):
-                self.closed = False
-
-            async def aclose(self):
-                self.closed = True
-
         class _Response:
             status_code = 200
             headers = {"content-type": "application/x-ndjson"}
@@ -78,7 +71,7 @@ class _StationBackendStub:
             async def aclose(self):
                 self.closed = True
 
-        return _Client(), _Response()
+        return _Response()
 
 
 def test_run_station_mode_forwards_request(monkeypatch):
@@ -10,7 +10,17 @@ from fastapi import HTTPException, WebSocket, WebSocketDisconnect
 from typing import cast
 
 from fmu_backend import StationFmuBackend
-from station_ws_proxy import StationRealtimeWsProxyManager, _GatewayStationSession
+from station_ws_proxy import (
+    BINARY_OUTPUTS_SUBPROTOCOL,
+    StationRealtimeWsProxyManager,
+    _GatewayStationSession,
+    _MultiplexedStationStream,
+    _RequestCache,
+    _StationChannelPool,
+    _StationStreamOverflow,
+    _is_passthrough_frame,
+)
+from ws_mux import MUX_CLOSE, MUX_OPEN, STATION_MUX_SUBPROTOCOL, decode_mux_frame, encode_mux_frame, parse_mux_control
 
 
 with patch("auth.verify_jwt", return_value={"sub": "test-user", "labId": "1", "accessKey": "test.fmu", "resourceType": "fmu", "reservationKey": "res-1", "pucHash": "puc-user-1"}):
@@ -87,6 +97,53 @@ class _ExpiredStationConnection(_FakeStationConnection):
             }))
 
 
+class _FakeMuxStationChannel:
+    subprotocol = STATION_MUX_SUBPROTOCOL
+
+    def __init__(self):
+        self.frames = []
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self.closed = False
+
+    def sent(self, stream_id=None):
+        return [
+            (sid, parse_mux_control(payload) or json.loads(payload))
+            for sid, payload in map(decode_mux_frame, self.frames)
+            if stream_id is None or sid == stream_id
+        ]
+
+    async def send(self, frame: str):
+        self.frames.append(frame)
+        stream_id, payload = decode_mux_frame(frame)
+        if parse_mux_control(payload) is not None:
+            return
+        message = json.loads(payload)
+        if message["type"] == "session.create":
+            reply = {"type": "session.created", "requestId": message["requestId"], "sessionId": f"sess_{stream_id}"}
+            reply.update({"expiresAt": 4102444800, "reservationWindow": {"nbf": 0, "exp": 4102444800}})
+        elif message["type"] == "session.attach":
+            reply = {"type": "session.attached", "requestId": message["requestId"], "sessionId": message["sessionId"]}
+        else:
+            reply = {"type": "sim.state", "requestId": message["requestId"], "sessionId": message.get("sessionId")}
+        await self._queue.put(encode_mux_frame(stream_id, json.dumps(reply)))
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        item = await self._queue.get()
+        if item is None:
+            raise StopAsyncIteration
+        return item
+
+    def drop(self):
+        self._queue.put_nowait(None)
+
+    async def close(self):
+        self.closed = True
+        self.drop()
+
+
 class _AsyncTestWebSocket:
     def __init__(self, messages, *, headers=None, query_params=None, client_host="127.0.0.1", idle_disconnect_after=0.05):
         self._messages = asyncio.Queue()
@@ -96,12 +153,15 @@ class _AsyncTestWebSocket:
         self.query_params = query_params or {}
         self.client = SimpleNamespace(host=client_host)
         self.sent_json = []
+        self.sent_raw = []
         self.closed_code = None
         self.accepted = False
+        self.accepted_subprotocol = None
         self.idle_disconnect_after = idle_disconnect_after
 
-    async def accept(self):
+    async def accept(self, subprotocol=None):
         self.accepted = True
+        self.accepted_subprotocol = subprotocol
 
     async def receive_text(self):
         waited = 0.0
@@ -123,6 +183,12 @@ class _AsyncTestWebSocket:
     async def send_json(self, payload):
         self.sent_json.append(payload)
 
+    async def send_text(self, payload):
+        self.sent_raw.append(payload)
+
+    async def send_bytes(self, payload):
+        self.sent_raw.append(payload)
+
     async def close(self, code=1000):
         self.closed_code = code
 
@@ -152,7 +218,7 @@ class _ExplodingReaderStationConnection(_FakeStationConnection):
         return await super().__anext__()
 
 
-def _build_manager():
+def _build_manager(**overrides):
     async def _fake_verify(token: str):
         if token != "test-token":
             raise AssertionError("unexpected token")
@@ -192,6 +258,7 @@ def _build_manager():
         ws_cleanup_seconds=60,
         internal_ws_token="gateway-internal",
         ws_create_rate_limit_per_minute=30,
+        **overrides,
     )
 
 
@@ -1055,3 +1122,177 @@ async def test_station_proxy_handle_websocket_tolerates_station_close_errors(mon
     await manager.handle_websocket(cast(WebSocket, websocket), internal=False)
 
     assert fake_station.sent_messages[0]["type"] == "session.create"
+
+
+@pytest.mark.asyncio
+async def test_station_channel_pool_routes_streams_and_reattaches_after_channel_loss():
+    channels = []
+
+    async def _connect():
+        channel = _FakeMuxStationChannel()
+        channels.append(channel)
+        return channel
+
+    pool = _StationChannelPool(size=1, connect=_connect, stream_queue_size=8, logger=main.logger)
+    first = await pool.open({"Authorization": "Bearer token-a"})
+    second = await pool.open({})
+    for stream in (first, second):
+        await stream.send(json.dumps({"type": "session.create", "requestId": f"create-{stream.stream_id}"}))
+    created = [json.loads(await asyncio.wait_for(stream.__anext__(), 1)) for stream in (first, second)]
+
+    assert len(channels) == 1
+    assert [item["requestId"] for item in created] == [f"create-{first.stream_id}", f"create-{second.stream_id}"]
+    assert first.session_id == f"sess_{first.stream_id}"
+    assert channels[0].sent(first.stream_id)[0] == (first.stream_id, {"type": MUX_OPEN, "authorization": "Bearer token-a"})
+
+    channels[0].drop()
+    for _ in range(50):
+        if pool.metrics()["reattached"] == 2:
+            break
+        await asyncio.sleep(0.01)
+
+    assert len(channels) == 2
+    reopened = channels[1].sent(first.stream_id)
+    assert reopened[0][1]["type"] == MUX_OPEN
+    assert reopened[1][1] == {"type": "session.attach", "requestId": reopened[1][1]["requestId"], "sessionId": first.session_id}
+
+    await first.send(json.dumps({"type": "sim.getState", "requestId": "state-1", "sessionId": first.session_id}))
+    reply = json.loads(await asyncio.wait_for(first.__anext__(), 1))
+    assert reply["requestId"] == "state-1"
+
+    await first.close()
+    assert channels[1].sent(first.stream_id)[-1][1] == {"type": MUX_CLOSE}
+    assert pool.metrics()["streams"] == 1
+    await pool.close()
+    with pytest.raises(RuntimeError):
+        await second.__anext__()
+
+
+@pytest.mark.asyncio
+async def test_station_channel_pool_evicts_data_frames_before_command_responses():
+    pool = _StationChannelPool(size=1, connect=None, stream_queue_size=2, logger=main.logger)
+    channel = pool.channels[0]
+    stream = _MultiplexedStationStream(channel, "s1", None, 2)
+    stream.deliver(json.dumps({"type": "sim.state", "requestId": "cmd-1"}))
+    stream.deliver(json.dumps({"type": "sim.outputs", "simTime": 0.1}))
+    stream.deliver(json.dumps({"type": "sim.outputs", "simTime": 0.2}))
+
+    assert [json.loads(frame).get("requestId") or json.loads(frame)["simTime"] for frame in stream._frames] == ["cmd-1", 0.2]
+    assert stream.dropped == 1
+    assert pool.metrics()["droppedFrames"] == 1
+
+
+@pytest.mark.asyncio
+async def test_station_channel_pool_fails_stream_when_only_command_responses_are_queued():
+    pool = _StationChannelPool(size=1, connect=None, stream_queue_size=2, logger=main.logger)
+    channel = pool.channels[0]
+    stream = _MultiplexedStationStream(channel, "s1", None, 2)
+    for index in range(3):
+        stream.deliver(json.dumps({"type": "sim.state", "requestId": f"cmd-{index}"}))
+    stream.deliver(json.dumps({"type": "sim.state", "requestId": "cmd-late"}))
+
+    assert not stream._frames
+    assert stream.closed
+    assert stream.dropped == 3
+    assert pool.metrics()["droppedFrames"] == 3
+    with pytest.raises(_StationStreamOverflow):
+        await stream.__anext__()
+
+
+@pytest.mark.asyncio
+async def test_station_ws_proxy_shares_one_station_channel_across_clients(monkeypatch):
+    manager = _build_manager(station_channels=1)
+    channels = []
+    captured = []
+
+    async def _fake_connect(headers, *, subprotocols=None):
+        captured.append((headers, subprotocols))
+        channel = _FakeMuxStationChannel()
+        channels.append(channel)
+        return channel
+
+    monkeypatch.setattr(manager, "_connect_station", _fake_connect)
+
+    websockets = [
+        _AsyncTestWebSocket(
+            messages=[json.dumps({
+                "type": "session.create",
+                "requestId": request_id,
+                "labId": "1",
+                "reservationKey": "res-1",
+                "sessionTicket": "st_valid",
+            })],
+            headers={"authorization": "Bearer test-token"},
+            idle_disconnect_after=0.2,
+        )
+        for request_id in ("shared-1", "shared-2")
+    ]
+    await asyncio.gather(*(manager.handle_websocket(cast(WebSocket, websocket), internal=False) for websocket in websockets))
+
+    created = [websocket.sent_json[0] for websocket in websockets]
+    assert [item["type"] for item in created] == ["session.created", "session.created"]
+    assert [item["requestId"] for item in created] == ["shared-1", "shared-2"]
+    assert created[0]["sessionId"] != created[1]["sessionId"]
+    assert len(channels) == 1
+    assert captured[0][1] == [STATION_MUX_SUBPROTOCOL]
+    assert captured[0][0]["X-Internal-Session-Token"] == "station-secret"
+    assert "Authorization" not in captured[0][0]
+    opens = [message for _sid, message in channels[0].sent() if message["type"] == MUX_OPEN]
+    assert [message["authorization"] for message in opens] == ["Bearer test-token", "Bearer test-token"]
+    assert manager.channel_metrics()["connects"] == 1
+
+    await manager.stop()
+    assert channels[0].closed is True
+
+
+def test_station_relay_classifies_frames_without_decoding():
+    assert _is_passthrough_frame(json.dumps({"type": "sim.outputs", "sessionId": "s", "values": {"x": 1.0}})) is True
+    assert _is_passthrough_frame(json.dumps({"type": "session.heartbeat", "sessionId": "s"})) is True
+    assert _is_passthrough_frame(json.dumps({"type": "session.closed", "sessionId": "s"})) is False
+    assert _is_passthrough_frame(json.dumps({"type": "session.created", "sessionId": "s"})) is False
+    assert _is_passthrough_frame(json.dumps({"type": "sim.state", "requestId": "r1"})) is False
+    assert _is_passthrough_frame(json.dumps({"sessionId": "s", "type": "sim.outputs"})) is False
+    assert _is_passthrough_frame("not-json") is False
+
+
+def test_station_relay_request_cache_evicts_least_recently_used():
+    cache = _RequestCache(2)
+    cache["a"] = {"n": 1}
+    cache["b"] = {"n": 2}
+    assert cache["a"] == {"n": 1}
+    cache["c"] = {"n": 3}
+
+    assert list(cache) == ["a", "c"]
+    assert "b" not in cache
+
+
+@pytest.mark.asyncio
+async def test_station_proxy_relays_data_frames_verbatim(monkeypatch):
+    manager = _build_manager()
+    fake_station = _FakeStationConnection()
+    outputs = '{"type": "sim.outputs",  "sessionId": "sess_station_1", "values": {"x": 1.0}}'
+    batch = b"\x10\x00\x00\x00binary-output-batch"
+    captured = {}
+
+    async def _fake_connect(headers, *, subprotocols=None):
+        captured["subprotocols"] = subprotocols
+        return fake_station
+
+    async def _send_with_outputs(raw_message: str):
+        await _FakeStationConnection.send(fake_station, raw_message)
+        await fake_station._queue.put(outputs)
+        await fake_station._queue.put(batch)
+
+    monkeypatch.setattr(manager, "_connect_station", _fake_connect)
+    monkeypatch.setattr(fake_station, "send", _send_with_outputs)
+    websocket = _AsyncTestWebSocket(
+        messages=[json.dumps({"type": "session.create", "requestId": "req-create", "labId": "1"})],
+        headers={"authorization": "Bearer test-token", "sec-websocket-protocol": BINARY_OUTPUTS_SUBPROTOCOL},
+    )
+
+    await manager.handle_websocket(cast(WebSocket, websocket), internal=False)
+
+    assert websocket.accepted_subprotocol == BINARY_OUTPUTS_SUBPROTOCOL
+    assert captured["subprotocols"] == [BINARY_OUTPUTS_SUBPROTOCOL]
+    assert websocket.sent_json[0]["type"] == "session.created"
+    assert websocket.sent_raw == [outputs, batch]
@@ -0,0 +1,55 @@
+"""Framing for several realtime client streams sharing one Gateway-to-Station WebSocket.
+
+Each frame is ``<streamId>\\n<payload>``: text frames carry the JSON message
+unchanged, binary frames carry the raw bytes. A stream starts with a
+``mux.open`` control message (carrying the client's bearer, which a
+dedicated connection would have sent as a header) and ends with
+``mux.close`` from the Gateway or ``mux.closed`` from the Station.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+from typing import Optional
+
+
+STATION_MUX_SUBPROTOCOL = "fmu.station.mux.v1"
+MUX_OPEN = "mux.open"
+MUX_CLOSE = "mux.close"
+MUX_CLOSED = "mux.closed"
+
+_STREAM_ID_RE = re.compile(r"[A-Za-z0-9_-]{1,64}")
+_CONTROL_PREFIX = '{"type":"mux.'
+
+
+def encode_mux_frame(stream_id: str, payload: str | bytes) -> str | bytes:
+    if isinstance(payload, (bytes, bytearray, memoryview)):
+        return stream_id.encode("ascii") + b"\n" + bytes(payload)
+    return f"{stream_id}\n{payload}"
+
+
+def decode_mux_frame(frame: str | bytes) -> tuple[str, str | bytes]:
+    if isinstance(frame, (bytes, bytearray)):
+        raw_stream, separator, payload = bytes(frame).partition(b"\n")
+        stream_id = raw_stream.decode("ascii", errors="replace")
+    else:
+        stream_id, separator, payload = frame.partition("\n")
+    if not separator or not _STREAM_ID_RE.fullmatch(stream_id):
+        raise ValueError("invalid multiplexed frame")
+    return stream_id, payload
+
+
+def mux_control(msg_type: str, **fields) -> str:
+    return json.dumps({"type": msg_type, **fields}, separators=(",", ":"))
+
+
+def parse_mux_control(payload: str | bytes) -> Optional[dict]:
+    """Return a ``mux.*`` control message, or ``None`` for ordinary stream data."""
+    if not isinstance(payload, str) or not payload.startswith(_CONTROL_PREFIX):
+        return None
+    try:
+        message = json.loads(payload)
+    except json.JSONDecodeError:
+        return None
+    return message if isinstance(message, dict) else None